@@ -93,6 +93,8 @@ class BackgroundTaskManager:
             try:
                 async for progress in task_generator:
                     if task.cancel_requested:
+                        # Run the generator's cleanup (e.g. killing a subprocess) now.
+                        await task_generator.aclose()
                         task.status = TaskStatus.CANCELLED
                         task.ended_at = datetime.now()
                         task.message = "已取消"
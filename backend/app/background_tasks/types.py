@@ -12,6 +12,7 @@ class TaskType(str, Enum):
     WORLD_RESTORE = "world_restore"
     CHUNK_PRUNE_PREVIEW = "chunk_prune_preview"
     CHUNK_PRUNE_APPLY = "chunk_prune_apply"
+    SNAPSHOT_BACKUP = "snapshot_backup"
 
 
 class TaskStatus(str, Enum):
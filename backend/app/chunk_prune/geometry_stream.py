@@ -0,0 +1,96 @@
+"""Streamed chunk-prune preview geometry.
+
+A big preview's geometry is tens of MB of JSON that the browser had to parse
+in one go before drawing anything. The stream sends it as SSE events the map
+overlay can draw as they arrive. A completed preview keeps only its selected
+cells; shapes are traced one dimension at a time as the stream reaches it
+and serialized one batch at a time, so no full geometry is ever held:
+
+- ``geometry``: preview task, mode and threshold, plus the simplify level;
+- ``dimension``: one per dimension, before its shapes, with its totals;
+- ``shapes``: up to ``GEOMETRY_STREAM_BATCH_SHAPES`` shapes of a dimension;
+- ``complete``.
+
+``simplify`` trades ring detail for size: level ``n > 0`` runs
+Douglas-Peucker with a tolerance of ``2 ** (n - 1)`` grid cells. Holes that
+collapse are dropped; an exterior that collapses is sent unsimplified, so
+small shapes never disappear from the overlay.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Any, Optional
+
+from ..grid_geometry import GridShapeData, build_grid_shapes, simplify_ring
+from .models import ChunkPruneTaskMetadata, geometry_unit
+
+GEOMETRY_STREAM_BATCH_SHAPES = 256
+MAX_SIMPLIFY_LEVEL = 4
+
+
+def simplify_tolerance(level: int) -> float:
+    return 0.0 if level <= 0 else float(2 ** (level - 1))
+
+
+def simplify_shape_rings(
+    rings: list[list[tuple[int, int]]], tolerance: float
+) -> list[list[tuple[int, int]]]:
+    if tolerance <= 0 or not rings:
+        return rings
+    exterior, *holes = rings
+    out = [simplify_ring(exterior, tolerance) or exterior]
+    for hole in holes:
+        simplified = simplify_ring(hole, tolerance)
+        if simplified:
+            out.append(simplified)
+    return out
+
+
+def _shape_payload(shape: GridShapeData, tolerance: float) -> dict[str, Any]:
+    return {
+        "id": shape.id,
+        "cell_count": shape.cell_count,
+        "bbox": shape.bbox,
+        "rings": simplify_shape_rings(shape.rings, tolerance),
+    }
+
+
+def iter_geometry_events(
+    metadata: ChunkPruneTaskMetadata,
+    *,
+    simplify: int = 0,
+    region_dir_relpath: Optional[str] = None,
+) -> Iterator[dict[str, Any]]:
+    """Events for a completed preview's ``selected_cells``."""
+    assert metadata.selected_cells is not None
+    tolerance = simplify_tolerance(simplify)
+    yield {
+        "event_type": "geometry",
+        "task_id": metadata.task_id,
+        "server_id": metadata.server_id,
+        "mode": metadata.mode,
+        "threshold_seconds": metadata.threshold_seconds,
+        "threshold_ticks": metadata.threshold_ticks,
+        "simplify": simplify,
+    }
+    unit = geometry_unit(metadata.mode)
+    for relpath, cells in sorted(metadata.selected_cells.items()):
+        if region_dir_relpath is not None and relpath != region_dir_relpath:
+            continue
+        shapes = build_grid_shapes(cells, id_prefix=relpath)
+        yield {
+            "event_type": "dimension",
+            "region_dir_relpath": relpath,
+            "unit": unit,
+            "cell_count": len(cells),
+            "shape_count": len(shapes),
+        }
+        for start in range(0, len(shapes), GEOMETRY_STREAM_BATCH_SHAPES):
+            batch = shapes[start : start + GEOMETRY_STREAM_BATCH_SHAPES]
+            yield {
+                "event_type": "shapes",
+                "region_dir_relpath": relpath,
+                "shapes": [_shape_payload(shape, tolerance) for shape in batch],
+            }
+    yield {"event_type": "complete"}
@@ -0,0 +1,240 @@
+"""Persistent per-dimension ``InhabitedTime`` index for chunk-prune previews.
+
+A prune preview used to run ``mcmap prune-inhabited --dry-run`` over the
+whole data dir, decompressing every chunk just to read ``InhabitedTime``,
+and did so again for every threshold tried. The index keeps, per region,
+the MCA's ``(mtime_ns, size)`` and every chunk's ``InhabitedTime`` as
+reported by an unbounded-threshold dry-run. Later previews only rescan
+regions whose MCA changed, and evaluate any threshold in-process.
+
+Selection mirrors mcmap: a chunk is selected when ``InhabitedTime <
+threshold``; a region when all its chunks are (its max is below the
+threshold). Per dimension, chunks and regions are kept sorted by time, so
+a threshold is one ``bisect`` plus a prefix slice.
+
+On disk (``data/.mcmap/inhabited/<region_dir_relpath>.idx``)::
+
+    MAGIC | u32 header length | JSON header | per region: u16 cells, i64 times
+
+The header lists ``[rx, rz, mtime_ns, size, count]`` per region in payload
+order plus the writer's byte order. Any mismatch (magic, version, truncated
+payload) makes the index load empty, i.e. everything is rescanned.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+from ..mcmap.cache import ServerMapCache
+
+INDEX_VERSION = 1
+INDEX_MAGIC = b"MCAIDX\x00\x01"
+INDEX_SUFFIX = ".idx"
+# Dry-run threshold that selects every chunk, so mcmap reports all of them.
+INDEX_SCAN_THRESHOLD_TICKS = 2**63 - 1
+
+CHUNKS_PER_REGION_AXIS = 32
+
+Region = tuple[int, int]
+Chunk = tuple[int, int]
+
+
+@dataclass
+class RegionEntry:
+    mtime_ns: int
+    size: int
+    # Region-local chunk index (``rel_z * 32 + rel_x``) and its InhabitedTime.
+    cells: array = field(default_factory=lambda: array("H"))
+    times: array = field(default_factory=lambda: array("q"))
+
+    @property
+    def max_time(self) -> int:
+        return max(self.times, default=0)
+
+
+@dataclass
+class _SortedView:
+    chunk_times: array
+    chunk_x: array
+    chunk_z: array
+    region_times: array
+    regions: list[Region]
+
+
+@dataclass
+class ChunkSelection:
+    cells: set[tuple[int, int]]
+    regions: set[Region]
+    skipped_by_claims: int
+
+
+class DimensionIndex:
+    def __init__(self) -> None:
+        self.regions: dict[Region, RegionEntry] = {}
+        self._view: Optional[_SortedView] = None
+
+    @property
+    def chunk_count(self) -> int:
+        return sum(len(entry.times) for entry in self.regions.values())
+
+    def stale_regions(self, live: dict[Region, os.stat_result]) -> list[Region]:
+        """Drop regions gone from disk; return live regions needing a rescan."""
+        for region in self.regions.keys() - live.keys():
+            del self.regions[region]
+            self._view = None
+        stale: list[Region] = []
+        for region, st in live.items():
+            entry = self.regions.get(region)
+            if entry is None or (entry.mtime_ns, entry.size) != (
+                st.st_mtime_ns,
+                st.st_size,
+            ):
+                stale.append(region)
+        return sorted(stale)
+
+    def put(
+        self,
+        region: Region,
+        st: os.stat_result,
+        chunks: Iterable[tuple[int, int, int]],
+    ) -> None:
+        """Record a scanned region; ``chunks`` are ``(rel_x, rel_z, time)``."""
+        entry = RegionEntry(mtime_ns=st.st_mtime_ns, size=st.st_size)
+        for rel_x, rel_z, inhabited in chunks:
+            entry.cells.append(rel_z * CHUNKS_PER_REGION_AXIS + rel_x)
+            entry.times.append(inhabited)
+        self.regions[region] = entry
+        self._view = None
+
+    def select_chunks(
+        self, threshold_ticks: int, claimed: frozenset[Chunk] = frozenset()
+    ) -> ChunkSelection:
+        view = self._sorted_view()
+        k = bisect_left(view.chunk_times, threshold_ticks)
+        selection = ChunkSelection(cells=set(), regions=set(), skipped_by_claims=0)
+        for cx, cz in zip(view.chunk_x[:k], view.chunk_z[:k]):
+            if (cx, cz) in claimed:
+                selection.skipped_by_claims += 1
+                continue
+            selection.cells.add((cx, cz))
+            selection.regions.add(
+                (cx // CHUNKS_PER_REGION_AXIS, cz // CHUNKS_PER_REGION_AXIS)
+            )
+        return selection
+
+    def select_regions(
+        self, threshold_ticks: int, claimed: frozenset[Chunk] = frozenset()
+    ) -> ChunkSelection:
+        view = self._sorted_view()
+        k = bisect_left(view.region_times, threshold_ticks)
+        claimed_regions = {
+            (cx // CHUNKS_PER_REGION_AXIS, cz // CHUNKS_PER_REGION_AXIS)
+            for cx, cz in claimed
+        }
+        selection = ChunkSelection(cells=set(), regions=set(), skipped_by_claims=0)
+        for region in view.regions[:k]:
+            if region in claimed_regions:
+                selection.skipped_by_claims += 1
+                continue
+            selection.cells.add(region)
+            selection.regions.add(region)
+        return selection
+
+    def _sorted_view(self) -> _SortedView:
+        if self._view is not None:
+            return self._view
+        chunks: list[tuple[int, int, int]] = []
+        region_maxes: list[tuple[int, Region]] = []
+        for (rx, rz), entry in self.regions.items():
+            base_x = rx * CHUNKS_PER_REGION_AXIS
+            base_z = rz * CHUNKS_PER_REGION_AXIS
+            for cell, inhabited in zip(entry.cells, entry.times):
+                rel_z, rel_x = divmod(cell, CHUNKS_PER_REGION_AXIS)
+                chunks.append((inhabited, base_x + rel_x, base_z + rel_z))
+            region_maxes.append((entry.max_time, (rx, rz)))
+        chunks.sort()
+        region_maxes.sort()
+        self._view = _SortedView(
+            chunk_times=array("q", (c[0] for c in chunks)),
+            chunk_x=array("i", (c[1] for c in chunks)),
+            chunk_z=array("i", (c[2] for c in chunks)),
+            region_times=array("q", (r[0] for r in region_maxes)),
+            regions=[r[1] for r in region_maxes],
+        )
+        return self._view
+
+
+def index_path(data_path: Path, region_dir_relpath: str) -> Path:
+    cache = ServerMapCache(data_path)
+    return cache.cache_dir / "inhabited" / f"{region_dir_relpath}{INDEX_SUFFIX}"
+
+
+def load_index_sync(path: Path) -> DimensionIndex:
+    index = DimensionIndex()
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return index
+    try:
+        _decode(raw, index)
+    except (ValueError, KeyError, TypeError, struct.error):
+        index.regions.clear()
+    return index
+
+
+def _decode(raw: bytes, index: DimensionIndex) -> None:
+    if not raw.startswith(INDEX_MAGIC):
+        raise ValueError("bad magic")
+    offset = len(INDEX_MAGIC)
+    (header_len,) = struct.unpack_from("<I", raw, offset)
+    offset += 4
+    header = json.loads(raw[offset : offset + header_len])
+    offset += header_len
+    if header["version"] != INDEX_VERSION:
+        raise ValueError("unsupported version")
+    swap = header["byteorder"] != sys.byteorder
+    for rx, rz, mtime_ns, size, count in header["regions"]:
+        entry = RegionEntry(mtime_ns=mtime_ns, size=size)
+        cells_end = offset + count * entry.cells.itemsize
+        times_end = cells_end + count * entry.times.itemsize
+        if times_end > len(raw):
+            raise ValueError("truncated payload")
+        entry.cells.frombytes(raw[offset:cells_end])
+        entry.times.frombytes(raw[cells_end:times_end])
+        if swap:
+            entry.cells.byteswap()
+            entry.times.byteswap()
+        index.regions[(rx, rz)] = entry
+        offset = times_end
+
+
+def save_index_sync(path: Path, index: DimensionIndex) -> None:
+    ordered = sorted(index.regions.items())
+    header = json.dumps(
+        {
+            "version": INDEX_VERSION,
+            "byteorder": sys.byteorder,
+            "regions": [
+                [rx, rz, entry.mtime_ns, entry.size, len(entry.times)]
+                for (rx, rz), entry in ordered
+            ],
+        },
+        separators=(",", ":"),
+    ).encode()
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(INDEX_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for _, entry in ordered:
+            f.write(entry.cells.tobytes())
+            f.write(entry.times.tobytes())
+    os.replace(tmp, path)
@@ -26,6 +26,10 @@ class ChunkPruneStartResponse(BaseModel):
 GridGeometryUnit = Literal["chunk", "region"]
 
 
+def geometry_unit(mode: PruneMode) -> GridGeometryUnit:
+    return "chunk" if mode == "chunks" else "region"
+
+
 class GridShape(BaseModel):
     id: str
     cell_count: int
@@ -49,6 +53,18 @@ class ChunkPrunePreviewGeometryResponse(BaseModel):
     dimensions: list[GridGeometryDimension] = Field(default_factory=list)
 
 
+@dataclass
+class PrunePlanRegion:
+    """A region a preview selected, with the MCA stat it was evaluated on."""
+
+    # None when the MCA wasn't statted before the scan; apply then rescans it.
+    mtime_ns: Optional[int]
+    size: Optional[int]
+    chunk_count: int
+    # Region-relative ``(rel_x, rel_z)`` of the selected chunks, chunks mode only.
+    chunks: list[tuple[int, int]] = field(default_factory=list)
+
+
 @dataclass
 class ChunkPruneTaskMetadata:
     task_id: str
@@ -61,7 +77,13 @@ class ChunkPruneTaskMetadata:
     user_id: Optional[int] = None
     claims_file: Optional[Path] = None
     result: Optional[dict[str, Any]] = None
-    geometry: Optional[ChunkPrunePreviewGeometryResponse] = None
+    # region_dir_relpath -> selected cells (chunks or regions, per ``mode``).
+    # Geometry is built from these on request rather than kept as shapes.
+    selected_cells: Optional[dict[str, set[tuple[int, int]]]] = None
     affected_regions_by_dimension: dict[str, set[tuple[int, int]]] = field(
         default_factory=dict
     )
+    # region_dir_relpath -> (rx, rz) -> what the preview selected there.
+    plan: dict[str, dict[tuple[int, int], PrunePlanRegion]] = field(
+        default_factory=dict
+    )
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 import os
 import posixpath
+import secrets
 import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
@@ -14,39 +16,65 @@ import aiofiles.os as aioos
 
 from ..background_tasks import task_manager
 from ..background_tasks.types import TaskProgress, TaskStatus, TaskType
-from ..ftb_claims.extract import NoFtbDataError, _run_extract
+from ..dynamic_config import config
+from ..ftb_claims.extract import _resolve_dimensions, load_cached_claims
 from ..grid_geometry import build_grid_shapes
 from ..logger import logger
 from ..mcmap import runner as mcmap_runner
+from ..mcmap.cache import ServerMapCache
 from ..mcmap.events import (
     MCMAP_PRUNE_EVENT_ADAPTER,
+    MCMAP_REMOVE_CHUNKS_EVENT_ADAPTER,
     MCMapChunksPrunedEvent,
     MCMapErrorEvent,
+    MCMapFtbClaimsPayload,
     MCMapPruneProgressEvent,
     MCMapPruneRegionDirEvent,
     MCMapPruneResultEvent,
     MCMapRegionPrunedEvent,
 )
 from ..minecraft import DockerMCManager, MCServerStatus, docker_mc_manager
+from ..utils import async_fs
 from ..world import png_invalidate
-from ..world.layout import discover_world_root_paths
+from ..world.layout import WorldRootPath, discover_world_root_paths, discover_world_roots
 from ..world.locks import (
     LockHolder,
     ServerOperationKind,
     ServerOperationLock,
     server_operation_lock,
 )
-from ..world.region_files import parse_region_filename
+from ..world.region_files import parse_mcc_filename, parse_region_filename
+from ..world.region_manifest import list_region_stats
+from .inhabited_index import (
+    CHUNKS_PER_REGION_AXIS,
+    INDEX_SCAN_THRESHOLD_TICKS,
+    Chunk,
+    DimensionIndex,
+    Region,
+    index_path,
+    load_index_sync,
+    save_index_sync,
+)
 from .models import (
     ChunkPrunePreviewGeometryResponse,
     ChunkPrunePreviewRequest,
     ChunkPruneTaskMetadata,
     GridGeometryDimension,
     GridShape,
+    PrunePlanRegion,
+    geometry_unit,
 )
 
 TICKS_PER_SECOND = 20
 PRUNE_TEMP_BASE_DIR = Path(tempfile.gettempdir()) / "mc-admin-chunk-prune"
+# Under data/.mcmap/ so scan trees hard-link the server's MCAs instead of
+# copying them across filesystems.
+PRUNE_SCAN_DIR_NAME = "prune-scan"
+# The index scan only needs each region's chunks, not the per-region summaries.
+INDEX_SCAN_EVENT_TYPES = ("progress", "chunks_pruned", "error")
+RECHECK_EVENT_TYPES = ("progress", "chunks_pruned", "region_pruned", "error")
+# Dimension subdirs holding per-region MCAs; pruning a chunk clears all three.
+PRUNE_SUBDIRS = ("region", "entities", "poi")
 STOPPED_STATUSES = {
     MCServerStatus.EXISTS,
     MCServerStatus.CREATED,
@@ -80,6 +108,8 @@ class ChunkPruneService:
         self._docker = docker
         self._operation_lock = operation_lock
         self._metadata: dict[str, ChunkPruneTaskMetadata] = {}
+        # (data_path, region_dir_relpath) -> index, loaded from disk once.
+        self._indexes: dict[tuple[Path, str], DimensionIndex] = {}
 
     async def start_preview(
         self,
@@ -144,6 +174,8 @@ class ChunkPruneService:
             mode=preview.mode,
             user_id=preview.user_id,
             claims_file=preview.claims_file,
+            # Narrowed in place by the apply's recheck; the preview keeps its own.
+            plan={relpath: dict(regions) for relpath, regions in preview.plan.items()},
         )
         self._metadata[task_id] = metadata
 
@@ -160,6 +192,16 @@ class ChunkPruneService:
     def get_preview_geometry(
         self, *, server_id: str, preview_task_id: str
     ) -> ChunkPrunePreviewGeometryResponse:
+        metadata = self.get_completed_preview(
+            server_id=server_id, preview_task_id=preview_task_id
+        )
+        assert metadata.selected_cells is not None
+        return build_preview_geometry(metadata, metadata.selected_cells)
+
+    def get_completed_preview(
+        self, *, server_id: str, preview_task_id: str
+    ) -> ChunkPruneTaskMetadata:
+        """Metadata of a completed preview whose selection is available."""
         metadata = self._metadata.get(preview_task_id)
         if metadata is None or metadata.operation != "preview":
             raise ChunkPruneTaskNotFound("Preview task not found")
@@ -168,9 +210,9 @@ class ChunkPruneService:
         task = task_manager.get_task(preview_task_id)
         if task is None or task.status != TaskStatus.COMPLETED:
             raise ChunkPruneValidationError("Preview task has not completed")
-        if metadata.geometry is None:
+        if metadata.selected_cells is None:
             raise ChunkPruneValidationError("Preview geometry is not available")
-        return metadata.geometry
+        return metadata
 
     async def _run_apply_task(
         self, metadata: ChunkPruneTaskMetadata
@@ -185,7 +227,7 @@ class ChunkPruneService:
             status = await self._docker.get_instance(metadata.server_id).get_status()
             if status not in STOPPED_STATUSES:
                 raise ChunkPruneConflictError("Stop the server before deleting chunks")
-            async for progress in self._run_prune_task(metadata, dry_run=False):
+            async for progress in self._run_planned_apply(metadata):
                 yield progress
 
             pngs: set[Path] = set()
@@ -202,31 +244,241 @@ class ChunkPruneService:
                 )
             await png_invalidate.delete_pngs(pngs)
 
+    async def _run_planned_apply(
+        self, metadata: ChunkPruneTaskMetadata
+    ) -> AsyncGenerator[TaskProgress, None]:
+        """Prune exactly the preview's plan instead of rescanning the world.
+
+        A region whose MCA still has the stat the preview saw can't have
+        gained InhabitedTime. Changed regions are rechecked at the preview's
+        threshold and keep only chunks that still qualify; the plan never
+        grows. The rest is ``remove-chunks`` (chunks mode) or deleting the
+        region's files (regions mode), per region.
+        """
+        yield TaskProgress(progress=0, message="正在校验预览结果")
+        planned_regions = sum(len(regions) for regions in metadata.plan.values())
+        planned_chunks = sum(
+            region.chunk_count
+            for regions in metadata.plan.values()
+            for region in regions.values()
+        )
+        changed = await self._changed_plan_regions(metadata)
+        if changed:
+            async for progress in self._recheck_regions(metadata, changed):
+                yield progress
+            if self._cancel_requested(metadata):
+                return
+
+        jobs = [
+            (relpath, region, planned)
+            for relpath, regions in sorted(metadata.plan.items())
+            for region, planned in sorted(regions.items())
+        ]
+        chunks_selected = sum(planned.chunk_count for _, _, planned in jobs)
+        sidecars: dict[tuple[str, Region], list[Path]] = {}
+        if metadata.mode == "regions":
+            sidecars = await asyncio.to_thread(
+                _mcc_sidecars_by_region, metadata.data_path, metadata.plan
+            )
+        semaphore = asyncio.Semaphore(config.mcmap.prune_apply_workers)
+
+        async def prune(job: tuple[str, Region, PrunePlanRegion]) -> None:
+            relpath, (rx, rz), planned = job
+            async with semaphore:
+                # Before touching files, so a cancelled job still drops its tiles.
+                self._add_affected_region(metadata, relpath, rx, rz)
+                mcas = _region_mcas(metadata.data_path / relpath, (rx, rz))
+                if metadata.mode == "chunks":
+                    for mca in mcas:
+                        if await aioos.path.exists(mca):
+                            await self._remove_chunks(
+                                mca, planned.chunks, metadata.data_path
+                            )
+                else:
+                    for path in mcas + sidecars.get((relpath, (rx, rz)), []):
+                        try:
+                            await aioos.remove(path)
+                        except FileNotFoundError:
+                            pass
+
+        done = 0
+        tasks = [asyncio.create_task(prune(job)) for job in jobs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                await next_done
+                done += 1
+                if self._cancel_requested(metadata):
+                    yield TaskProgress(
+                        progress=10 + done / len(jobs) * 90, message="已取消"
+                    )
+                    return
+                yield TaskProgress(
+                    progress=10 + done / len(jobs) * 90,
+                    message=f"已清理 {done}/{len(jobs)} 个区域文件",
+                )
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        result = self._annotate_result(
+            metadata,
+            {
+                "mode": metadata.mode,
+                "dry_run": False,
+                "region_dirs": sum(1 for regions in metadata.plan.values() if regions),
+                "regions_scanned": planned_regions,
+                "chunks_scanned": planned_chunks,
+                "chunks_selected": chunks_selected,
+                "regions_selected": len(jobs),
+                "regions_rescanned": sum(len(r) for r in changed.values()),
+                "chunks_dropped": planned_chunks - chunks_selected,
+            },
+        )
+        metadata.result = result
+        yield TaskProgress(progress=100, message="区块清理完成", result=result)
+
+    async def _changed_plan_regions(
+        self, metadata: ChunkPruneTaskMetadata
+    ) -> dict[str, list[Region]]:
+        """Planned regions whose MCA changed since the preview.
+
+        Regions whose MCA is gone or empty are dropped from the plan.
+        """
+        changed: dict[str, list[Region]] = {}
+        for relpath, regions in metadata.plan.items():
+            stats = await list_region_stats(metadata.data_path / relpath)
+            for region in sorted(regions):
+                st = stats.get(region)
+                if st is None:
+                    del regions[region]
+                elif (
+                    regions[region].mtime_ns != st.st_mtime_ns
+                    or regions[region].size != st.st_size
+                ):
+                    changed.setdefault(relpath, []).append(region)
+        return changed
+
+    async def _recheck_regions(
+        self, metadata: ChunkPruneTaskMetadata, changed: dict[str, list[Region]]
+    ) -> AsyncGenerator[TaskProgress, None]:
+        """Narrow ``changed`` plan entries to what still qualifies now."""
+        data_path = metadata.data_path
+        total = sum(len(regions) for regions in changed.values())
+        yield TaskProgress(progress=0, message=f"正在重新检查 {total} 个已修改的区域文件")
+        scan_root = await self._link_scan_tree(metadata, changed)
+        # region -> region-relative chunks (chunks mode) or chunk count (regions).
+        found: dict[str, dict[Region, set[Chunk] | int]] = {}
+        path_mapper = PruneEventPathMapper(scan_root)
+        try:
+            async with mcmap_runner.prune_inhabited(
+                path=scan_root,
+                threshold_ticks=metadata.threshold_ticks,
+                mode=metadata.mode,
+                dry_run=True,
+                owned_by=data_path,
+                exclude_ftb_claims=metadata.claims_file,
+            ) as proc:
+                async for event in proc.events(
+                    MCMAP_PRUNE_EVENT_ADAPTER, types=RECHECK_EVENT_TYPES
+                ):
+                    if self._cancel_requested(metadata):
+                        await proc.terminate()
+                        yield TaskProgress(progress=0, message="已取消")
+                        return
+                    if isinstance(event, MCMapPruneProgressEvent):
+                        if event.regions_total > 0:
+                            yield TaskProgress(
+                                progress=event.regions_processed
+                                / event.regions_total
+                                * 10,
+                                message=(
+                                    f"正在重新检查 {event.regions_processed}/"
+                                    f"{event.regions_total}"
+                                ),
+                            )
+                    elif isinstance(
+                        event, (MCMapChunksPrunedEvent, MCMapRegionPrunedEvent)
+                    ):
+                        relpath = path_mapper.region_relpath(event.region)
+                        if relpath is None or relpath not in changed:
+                            continue
+                        found.setdefault(relpath, {})[
+                            (event.region_x, event.region_z)
+                        ] = (
+                            {(chunk.rel_x, chunk.rel_z) for chunk in event.chunks}
+                            if isinstance(event, MCMapChunksPrunedEvent)
+                            else event.chunks
+                        )
+                    elif isinstance(event, MCMapErrorEvent):
+                        raise ChunkPruneError(event.message)
+                if proc.returncode not in (0, None):
+                    stderr = (await proc.stderr()).strip()
+                    raise ChunkPruneError(stderr or "mcmap prune-inhabited failed")
+        finally:
+            await async_fs.rmtree(scan_root, ignore_errors=True)
+
+        for relpath, regions in changed.items():
+            plan = metadata.plan[relpath]
+            for region in regions:
+                planned = plan.pop(region)
+                now = found.get(relpath, {}).get(region)
+                if now is None:
+                    continue
+                if isinstance(now, int):
+                    plan[region] = _plan_region(None, now)
+                    continue
+                chunks = [chunk for chunk in planned.chunks if chunk in now]
+                if chunks:
+                    plan[region] = _plan_region(None, len(chunks), chunks)
+
+    async def _remove_chunks(
+        self, mca: Path, chunks: list[Chunk], owned_by: Path
+    ) -> None:
+        async with mcmap_runner.remove_chunks(
+            target_mca=mca, chunks=chunks, owned_by=owned_by
+        ) as proc:
+            async for event in proc.events(
+                MCMAP_REMOVE_CHUNKS_EVENT_ADAPTER, types=("error",)
+            ):
+                if isinstance(event, MCMapErrorEvent):
+                    raise ChunkPruneError(event.message)
+        if proc.returncode != 0:
+            stderr = (await proc.stderr()).strip()
+            raise ChunkPruneError(stderr or f"mcmap remove-chunks failed for {mca}")
+
     async def _run_prune_task(
-        self, metadata: ChunkPruneTaskMetadata, *, dry_run: bool
+        self, metadata: ChunkPruneTaskMetadata
     ) -> AsyncGenerator[TaskProgress, None]:
+        """Preview with a full ``prune-inhabited --dry-run`` over the data dir."""
         selected_cells_by_dimension: dict[str, set[tuple[int, int]]] = {}
         path_mapper = PruneEventPathMapper(metadata.data_path)
         progress_percent = 0.0
         saw_result = False
 
-        if metadata.claims_file is None and metadata.operation == "preview":
+        if metadata.claims_file is None:
             metadata.claims_file = await self._write_claims_file(
                 metadata.server_id,
                 metadata.data_path,
             )
+        # Statted before the scan, so a write racing it reads as changed at apply.
+        stats = {
+            relpath: await list_region_stats(region_dir)
+            for relpath, region_dir in (
+                await self._prune_dimensions(metadata.data_path)
+            ).items()
+        }
 
         async with mcmap_runner.prune_inhabited(
             path=metadata.data_path,
             threshold_ticks=metadata.threshold_ticks,
             mode=metadata.mode,
-            dry_run=dry_run,
+            dry_run=True,
             owned_by=metadata.data_path,
             exclude_ftb_claims=metadata.claims_file,
         ) as proc:
             async for event in proc.events(MCMAP_PRUNE_EVENT_ADAPTER):
-                task = task_manager.get_task(metadata.task_id)
-                if task is not None and task.cancel_requested:
+                if self._cancel_requested(metadata):
                     await proc.terminate()
                     yield TaskProgress(progress=progress_percent, message="已取消")
                     return
@@ -259,10 +511,17 @@ class ChunkPruneService:
                     self._add_affected_region(
                         metadata, relpath, event.region_x, event.region_z
                     )
-                    if dry_run:
-                        selected_cells_by_dimension.setdefault(relpath, set()).update(
-                            (chunk.chunk_x, chunk.chunk_z) for chunk in event.chunks
-                        )
+                    selected_cells_by_dimension.setdefault(relpath, set()).update(
+                        (chunk.chunk_x, chunk.chunk_z) for chunk in event.chunks
+                    )
+                    chunks = [(chunk.rel_x, chunk.rel_z) for chunk in event.chunks]
+                    metadata.plan.setdefault(relpath, {})[
+                        (event.region_x, event.region_z)
+                    ] = _plan_region(
+                        stats.get(relpath, {}).get((event.region_x, event.region_z)),
+                        len(chunks),
+                        chunks,
+                    )
                 elif isinstance(event, MCMapRegionPrunedEvent):
                     relpath = path_mapper.region_relpath(event.region)
                     if relpath is None:
@@ -274,30 +533,25 @@ class ChunkPruneService:
                     self._add_affected_region(
                         metadata, relpath, event.region_x, event.region_z
                     )
-                    if dry_run:
-                        selected_cells_by_dimension.setdefault(relpath, set()).add(
-                            (event.region_x, event.region_z)
-                        )
+                    selected_cells_by_dimension.setdefault(relpath, set()).add(
+                        (event.region_x, event.region_z)
+                    )
+                    metadata.plan.setdefault(relpath, {})[
+                        (event.region_x, event.region_z)
+                    ] = _plan_region(
+                        stats.get(relpath, {}).get((event.region_x, event.region_z)),
+                        event.chunks,
+                    )
                 elif isinstance(event, MCMapPruneResultEvent):
                     saw_result = True
-                    result = event.model_dump(exclude_none=True)
-                    result["threshold_seconds"] = metadata.threshold_seconds
-                    result["threshold_ticks"] = metadata.threshold_ticks
-                    result["affected_region_counts_by_dimension"] = {
-                        relpath: len(regions)
-                        for relpath, regions in sorted(
-                            metadata.affected_regions_by_dimension.items()
-                        )
-                    }
-                    if dry_run:
-                        metadata.geometry = build_preview_geometry(
-                            metadata,
-                            selected_cells_by_dimension,
-                        )
+                    result = self._annotate_result(
+                        metadata, event.model_dump(exclude_none=True)
+                    )
+                    metadata.selected_cells = selected_cells_by_dimension
                     metadata.result = result
                     yield TaskProgress(
                         progress=100,
-                        message="清理预览完成" if dry_run else "区块清理完成",
+                        message="清理预览完成",
                         result=result,
                     )
                 elif isinstance(event, MCMapErrorEvent):
@@ -313,9 +567,213 @@ class ChunkPruneService:
         self, metadata: ChunkPruneTaskMetadata
     ) -> AsyncGenerator[TaskProgress, None]:
         yield TaskProgress(progress=0, message="正在准备预览任务")
-        async for progress in self._run_prune_task(metadata, dry_run=True):
+        if config.mcmap.prune_index_enabled:
+            preview = self._run_indexed_preview(metadata)
+        else:
+            preview = self._run_prune_task(metadata)
+        async for progress in preview:
             yield progress
 
+    async def _run_indexed_preview(
+        self, metadata: ChunkPruneTaskMetadata
+    ) -> AsyncGenerator[TaskProgress, None]:
+        """Preview from the InhabitedTime index, rescanning changed regions only."""
+        data_path = metadata.data_path
+        claimed: dict[str, frozenset[Chunk]] = {}
+        claims_loaded: Optional[int] = None
+        claims = await self._extract_claims(metadata.server_id, data_path)
+        if claims is not None:
+            world_root, payload = claims
+            metadata.claims_file = await self._save_claims_payload(
+                metadata.server_id, payload
+            )
+            claimed = claimed_chunks_by_dimension(payload, world_root, data_path)
+            claims_loaded = sum(len(team.claims) for team in payload.teams)
+
+        dimensions = await self._prune_dimensions(data_path)
+        live: dict[str, dict[Region, os.stat_result]] = {}
+        stale: dict[str, list[Region]] = {}
+        for relpath, region_dir in dimensions.items():
+            live[relpath] = await list_region_stats(region_dir)
+            index = await self._load_index(data_path, relpath)
+            regions = index.stale_regions(live[relpath])
+            if regions:
+                stale[relpath] = regions
+
+        if stale:
+            async for progress in self._rescan_regions(metadata, stale, live):
+                yield progress
+            if self._cancel_requested(metadata):
+                return
+            for relpath in stale:
+                await self._save_index(data_path, relpath)
+
+        indexes = {
+            relpath: self._indexes[(data_path, relpath)] for relpath in dimensions
+        }
+        selected_cells_by_dimension, result = await asyncio.to_thread(
+            select_from_indexes,
+            indexes,
+            metadata.threshold_ticks,
+            metadata.mode,
+            claimed,
+        )
+        for relpath, regions in result.pop("regions_by_dimension").items():
+            for rx, rz in regions:
+                self._add_affected_region(metadata, relpath, rx, rz)
+        metadata.plan = await asyncio.to_thread(
+            plan_from_indexes, indexes, metadata.mode, selected_cells_by_dimension
+        )
+        result["regions_rescanned"] = sum(len(r) for r in stale.values())
+        if claims_loaded is not None:
+            result["claims_loaded"] = claims_loaded
+        else:
+            result.pop("chunks_skipped_by_claims", None)
+            result.pop("regions_skipped_by_claims", None)
+        result = self._annotate_result(metadata, result)
+        metadata.selected_cells = selected_cells_by_dimension
+        metadata.result = result
+        yield TaskProgress(progress=100, message="清理预览完成", result=result)
+
+    async def _rescan_regions(
+        self,
+        metadata: ChunkPruneTaskMetadata,
+        stale: dict[str, list[Region]],
+        live: dict[str, dict[Region, os.stat_result]],
+    ) -> AsyncGenerator[TaskProgress, None]:
+        """Refresh ``stale`` index entries with an unbounded-threshold dry-run.
+
+        Scans the data dir itself when every region is stale; otherwise a
+        scratch tree of links to just the stale MCAs (plus ``level.dat``s,
+        so mcmap still recognises the world roots).
+        """
+        data_path = metadata.data_path
+        total = sum(len(regions) for regions in stale.values())
+        yield TaskProgress(progress=0, message=f"正在为 {total} 个区域文件建立区块索引")
+        scan_root = data_path
+        if total < sum(len(regions) for regions in live.values()):
+            scan_root = await self._link_scan_tree(metadata, stale)
+        scanned: dict[str, dict[Region, list[tuple[int, int, int]]]] = {}
+        path_mapper = PruneEventPathMapper(scan_root)
+        try:
+            async with mcmap_runner.prune_inhabited(
+                path=scan_root,
+                threshold_ticks=INDEX_SCAN_THRESHOLD_TICKS,
+                mode="chunks",
+                dry_run=True,
+                owned_by=data_path,
+            ) as proc:
+                async for event in proc.events(
+                    MCMAP_PRUNE_EVENT_ADAPTER, types=INDEX_SCAN_EVENT_TYPES
+                ):
+                    if self._cancel_requested(metadata):
+                        await proc.terminate()
+                        yield TaskProgress(progress=0, message="已取消")
+                        return
+                    if isinstance(event, MCMapPruneProgressEvent):
+                        if event.regions_total > 0:
+                            yield TaskProgress(
+                                progress=event.regions_processed
+                                / event.regions_total
+                                * 90,
+                                message=(
+                                    f"正在建立区块索引 {event.regions_processed}/"
+                                    f"{event.regions_total}"
+                                ),
+                            )
+                    elif isinstance(event, MCMapChunksPrunedEvent):
+                        relpath = path_mapper.region_relpath(event.region)
+                        if relpath is None or relpath not in stale:
+                            continue
+                        scanned.setdefault(relpath, {})[
+                            (event.region_x, event.region_z)
+                        ] = [
+                            (chunk.rel_x, chunk.rel_z, chunk.inhabited_time)
+                            for chunk in event.chunks
+                        ]
+                    elif isinstance(event, MCMapErrorEvent):
+                        raise ChunkPruneError(event.message)
+                if proc.returncode not in (0, None):
+                    stderr = (await proc.stderr()).strip()
+                    raise ChunkPruneError(stderr or "mcmap prune-inhabited failed")
+        finally:
+            if scan_root != data_path:
+                await async_fs.rmtree(scan_root, ignore_errors=True)
+
+        for relpath, regions in stale.items():
+            index = self._indexes[(data_path, relpath)]
+            found = scanned.get(relpath, {})
+            for region in regions:
+                # No event means mcmap found no chunks in that region.
+                index.put(region, live[relpath][region], found.get(region, ()))
+
+    async def _link_scan_tree(
+        self, metadata: ChunkPruneTaskMetadata, stale: dict[str, list[Region]]
+    ) -> Path:
+        data_path = metadata.data_path
+        cache = ServerMapCache(data_path)
+        scan_base = cache.cache_dir / PRUNE_SCAN_DIR_NAME
+        await cache.ensure_dir(scan_base)
+        scan_root = scan_base / f"scan-{secrets.token_hex(6)}"
+        for root in await discover_world_root_paths(data_path):
+            level_dat = root.path / "level.dat"
+            if await aioos.path.exists(level_dat):
+                await async_fs.link_or_copy(
+                    level_dat, scan_root / level_dat.relative_to(data_path)
+                )
+        for relpath, regions in stale.items():
+            for rx, rz in regions:
+                name = f"r.{rx}.{rz}.mca"
+                await async_fs.link_or_copy(
+                    data_path / relpath / name, scan_root / relpath / name
+                )
+        return scan_root
+
+    async def _prune_dimensions(self, data_path: Path) -> dict[str, Path]:
+        """``region_dir_relpath -> region_dir`` for every dimension mcmap prunes."""
+        dimensions: dict[str, Path] = {}
+        for root in await discover_world_roots(data_path):
+            for dim in root.dimensions:
+                if dim.region_dir.name != "region":
+                    continue
+                relpath = dim.region_dir.relative_to(data_path).as_posix()
+                dimensions[relpath] = dim.region_dir
+        return dimensions
+
+    async def _load_index(self, data_path: Path, relpath: str) -> DimensionIndex:
+        key = (data_path, relpath)
+        index = self._indexes.get(key)
+        if index is None:
+            index = await asyncio.to_thread(
+                load_index_sync, index_path(data_path, relpath)
+            )
+            self._indexes[key] = index
+        return index
+
+    async def _save_index(self, data_path: Path, relpath: str) -> None:
+        path = index_path(data_path, relpath)
+        cache = ServerMapCache(data_path)
+        await cache.ensure_dir(path.parent)
+        await asyncio.to_thread(save_index_sync, path, self._indexes[(data_path, relpath)])
+        await cache.chown_to_data_owner(path)
+
+    def _cancel_requested(self, metadata: ChunkPruneTaskMetadata) -> bool:
+        task = task_manager.get_task(metadata.task_id)
+        return task is not None and task.cancel_requested
+
+    def _annotate_result(
+        self, metadata: ChunkPruneTaskMetadata, result: dict
+    ) -> dict:
+        result["threshold_seconds"] = metadata.threshold_seconds
+        result["threshold_ticks"] = metadata.threshold_ticks
+        result["affected_region_counts_by_dimension"] = {
+            relpath: len(regions)
+            for relpath, regions in sorted(
+                metadata.affected_regions_by_dimension.items()
+            )
+        }
+        return result
+
     async def _ensure_server_exists(self, server_id: str) -> None:
         instance = self._docker.get_instance(server_id)
         if not await instance.exists():
@@ -324,19 +782,31 @@ class ChunkPruneService:
     async def _write_claims_file(
         self, server_id: str, data_path: Path
     ) -> Optional[Path]:
-        world_root = await self._primary_world_root(data_path)
-        if world_root is None:
+        claims = await self._extract_claims(server_id, data_path)
+        if claims is None:
             return None
-        try:
-            payload = await _run_extract(world_root, data_path)
-        except NoFtbDataError:
+        return await self._save_claims_payload(server_id, claims[1])
+
+    async def _extract_claims(
+        self, server_id: str, data_path: Path
+    ) -> Optional[tuple[WorldRootPath, MCMapFtbClaimsPayload]]:
+        roots = await discover_world_root_paths(data_path)
+        if not roots:
             return None
+        try:
+            cached = await load_cached_claims(data_path, roots[0])
         except Exception:
             logger.exception(
                 "chunk-prune: failed to extract FTB claims for %s", server_id
             )
             raise ChunkPruneError("Failed to extract FTB claims")
+        if cached.payload is None:
+            return None
+        return roots[0], cached.payload
 
+    async def _save_claims_payload(
+        self, server_id: str, payload: MCMapFtbClaimsPayload
+    ) -> Path:
         task_dir = PRUNE_TEMP_BASE_DIR / server_id
         await aioos.makedirs(task_dir, exist_ok=True)
         target = (
@@ -349,10 +819,6 @@ class ChunkPruneService:
             )
         return target
 
-    async def _primary_world_root(self, data_path: Path) -> Optional[Path]:
-        roots = await discover_world_root_paths(data_path)
-        return roots[0].path if roots else None
-
     def _add_affected_region(
         self,
         metadata: ChunkPruneTaskMetadata,
@@ -374,11 +840,148 @@ def seconds_to_ticks(seconds: int) -> int:
     return max(0, int(seconds) * TICKS_PER_SECOND)
 
 
+def claimed_chunks_by_dimension(
+    payload: MCMapFtbClaimsPayload, world_root: WorldRootPath, data_path: Path
+) -> dict[str, frozenset[Chunk]]:
+    _, relpath_by_ftb_id = _resolve_dimensions(
+        payload.dimensions, world_root, data_path
+    )
+    claimed: dict[str, set[Chunk]] = {}
+    for team in payload.teams:
+        for claim in team.claims:
+            relpath = relpath_by_ftb_id.get(claim.dim)
+            if relpath is not None:
+                claimed.setdefault(relpath, set()).add((claim.cx, claim.cz))
+    return {relpath: frozenset(chunks) for relpath, chunks in claimed.items()}
+
+
+def select_from_indexes(
+    indexes: dict[str, DimensionIndex],
+    threshold_ticks: int,
+    mode: str,
+    claimed: dict[str, frozenset[Chunk]],
+) -> tuple[dict[str, set[tuple[int, int]]], dict]:
+    """Evaluate a threshold over every dimension index, like a dry-run would.
+
+    Returns the selected grid cells per dimension and an mcmap-shaped result
+    dict whose ``regions_by_dimension`` entry lists affected regions.
+    """
+    cells_by_dimension: dict[str, set[tuple[int, int]]] = {}
+    regions_by_dimension: dict[str, set[Region]] = {}
+    result = {
+        "mode": mode,
+        "dry_run": True,
+        "region_dirs": len(indexes),
+        "regions_scanned": 0,
+        "chunks_scanned": 0,
+        "chunks_selected": 0,
+        "regions_selected": 0,
+        "chunks_skipped_by_claims": 0,
+        "regions_skipped_by_claims": 0,
+    }
+    for relpath, index in sorted(indexes.items()):
+        result["regions_scanned"] += len(index.regions)
+        result["chunks_scanned"] += index.chunk_count
+        dimension_claims = claimed.get(relpath, frozenset())
+        if mode == "chunks":
+            selection = index.select_chunks(threshold_ticks, dimension_claims)
+            result["chunks_selected"] += len(selection.cells)
+            result["chunks_skipped_by_claims"] += selection.skipped_by_claims
+        else:
+            selection = index.select_regions(threshold_ticks, dimension_claims)
+            result["chunks_selected"] += sum(
+                len(index.regions[region].times) for region in selection.regions
+            )
+            result["regions_skipped_by_claims"] += selection.skipped_by_claims
+        result["regions_selected"] += len(selection.regions)
+        if selection.cells:
+            cells_by_dimension[relpath] = selection.cells
+            regions_by_dimension[relpath] = selection.regions
+    result["regions_by_dimension"] = regions_by_dimension
+    return cells_by_dimension, result
+
+
+def plan_from_indexes(
+    indexes: dict[str, DimensionIndex],
+    mode: str,
+    cells_by_dimension: dict[str, set[tuple[int, int]]],
+) -> dict[str, dict[Region, PrunePlanRegion]]:
+    """The prune plan for cells chosen by ``select_from_indexes``."""
+    plan: dict[str, dict[Region, PrunePlanRegion]] = {}
+    for relpath, cells in cells_by_dimension.items():
+        index = indexes[relpath]
+        if mode == "chunks":
+            by_region: dict[Region, list[Chunk]] = {}
+            for cx, cz in sorted(cells):
+                by_region.setdefault(
+                    (cx // CHUNKS_PER_REGION_AXIS, cz // CHUNKS_PER_REGION_AXIS), []
+                ).append((cx % CHUNKS_PER_REGION_AXIS, cz % CHUNKS_PER_REGION_AXIS))
+        else:
+            by_region = {region: [] for region in cells}
+        plan[relpath] = {}
+        for region, chunks in by_region.items():
+            entry = index.regions[region]
+            plan[relpath][region] = PrunePlanRegion(
+                mtime_ns=entry.mtime_ns,
+                size=entry.size,
+                chunk_count=len(chunks) if mode == "chunks" else len(entry.times),
+                chunks=chunks,
+            )
+    return plan
+
+
+def _plan_region(
+    st: Optional[os.stat_result], chunk_count: int, chunks: Optional[list[Chunk]] = None
+) -> PrunePlanRegion:
+    return PrunePlanRegion(
+        mtime_ns=st.st_mtime_ns if st is not None else None,
+        size=st.st_size if st is not None else None,
+        chunk_count=chunk_count,
+        chunks=chunks or [],
+    )
+
+
+def _region_mcas(region_dir: Path, region: Region) -> list[Path]:
+    """The region's MCA in ``region/`` and its ``entities/``/``poi/`` siblings."""
+    rx, rz = region
+    return [
+        region_dir.parent / subdir / f"r.{rx}.{rz}.mca" for subdir in PRUNE_SUBDIRS
+    ]
+
+
+def _mcc_sidecars_by_region(
+    data_path: Path, plan: dict[str, dict[Region, PrunePlanRegion]]
+) -> dict[tuple[str, Region], list[Path]]:
+    """Oversized-chunk ``.mcc`` files of each planned region, all subdirs."""
+    sidecars: dict[tuple[str, Region], list[Path]] = {}
+    for relpath, regions in plan.items():
+        if not regions:
+            continue
+        dimension_dir = (data_path / relpath).parent
+        for subdir in PRUNE_SUBDIRS:
+            directory = dimension_dir / subdir
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                chunk = parse_mcc_filename(name)
+                if chunk is None:
+                    continue
+                region = (
+                    chunk[0] // CHUNKS_PER_REGION_AXIS,
+                    chunk[1] // CHUNKS_PER_REGION_AXIS,
+                )
+                if region in regions:
+                    sidecars.setdefault((relpath, region), []).append(directory / name)
+    return sidecars
+
+
 def build_preview_geometry(
     metadata: ChunkPruneTaskMetadata,
     selected_cells_by_dimension: dict[str, set[tuple[int, int]]],
 ) -> ChunkPrunePreviewGeometryResponse:
-    unit = "chunk" if metadata.mode == "chunks" else "region"
+    unit = geometry_unit(metadata.mode)
     dimensions: list[GridGeometryDimension] = []
     for relpath, cells in sorted(selected_cells_by_dimension.items()):
         shapes = [
@@ -429,6 +1032,8 @@ class PruneEventPathMapper:
         if (
             len(parts) < 3
             or any(part in ("", ".", "..") for part in parts)
+            # Hidden dirs (``.mcmap`` scan trees included) are never worlds.
+            or parts[0].startswith(".")
             or parts[-2] != "region"
             or parse_region_filename(parts[-1]) is None
         ):
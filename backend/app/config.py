@@ -3,7 +3,7 @@ import shutil
 from pathlib import Path
 from typing import Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from pydantic_settings import (
     BaseSettings,
     PydanticBaseSettingsSource,
@@ -78,6 +78,16 @@ class Settings(BaseSettings):
     server_path: Path
     logs_dir: Path = Field(default=Path("logs"))
     archive_path: Path = Field(default=Path("archives"))
+    mcmap_store_path: Path = Field(default=Path("mcmap_store"))
+
+    @field_validator("mcmap_store_path")
+    @classmethod
+    def _anchor_to_data_dir(cls, value: Path) -> Path:
+        # The store is shared by every server and hard-linked into their
+        # data dirs, so pin it under the app data dir (the working directory
+        # db.sqlite3, logs/ and archives/ live in) rather than wherever a
+        # later relative lookup happens to run.
+        return value.absolute()
 
     @classmethod
     def settings_customise_sources(
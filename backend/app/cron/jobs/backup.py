@@ -1,16 +1,20 @@
+import asyncio
 import time
+from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Annotated, List, Optional, cast
+from typing import Annotated, AsyncIterator, List, Optional, Sequence, cast
 
 import aiofiles.os as aioos
 import httpx2
 from pydantic import ConfigDict, Field, field_validator, model_validator
 
+from ...background_tasks import TaskType, task_manager
 from ...config import settings
 from ...dynamic_config.schemas import BaseConfigSchema
 from ...minecraft import docker_mc_manager
-from ...snapshots import snapshot_service
+from ...snapshots import SnapshotService, snapshot_service
+from ...snapshots.tasks import backup_task
 from ...utils import async_fs
 from ...world import (
     GLOBAL_LOCK_KEY,
@@ -39,6 +43,35 @@ class BackupJobParams(BaseConfigSchema):
         Field(title="备份路径", description="服务器数据目录内的可选路径。"),
     ] = None
 
+    flush_world: Annotated[
+        bool,
+        Field(
+            title="备份前刷新存档",
+            description="对运行中的服务器在备份前执行 save-off 与 save-all flush，"
+            "备份结束后执行 save-on，避免快照包含写了一半的区域文件。",
+        ),
+    ] = True
+
+    # Parallel per-server mode
+    parallel_servers: Annotated[
+        bool,
+        Field(
+            title="按服务器并行备份",
+            description="未指定服务器时，为每个服务器单独创建快照并并行执行；"
+            "每个服务器只持有自己的操作锁，被恢复占用的服务器会被跳过而不阻塞其他服务器。"
+            "保留策略按服务器分别应用。",
+        ),
+    ] = False
+    max_parallel_backups: Annotated[
+        int,
+        Field(
+            title="最大并行备份数",
+            description="按服务器并行备份时同时运行的 restic 备份进程数。",
+            ge=1,
+            le=16,
+        ),
+    ] = 2
+
     # Forget configuration
     enable_forget: Annotated[
         bool,
@@ -210,6 +243,180 @@ async def _resolve_backup_path(server_id: Optional[str], path: Optional[str]) ->
         raise ValueError(f"备份路径越界，不在服务器目录内: {e}")
 
 
+@asynccontextmanager
+async def _worlds_flushed(
+    context: ExecutionContext, params: BackupJobParams, server_ids: list[str]
+) -> AsyncIterator[None]:
+    """Keep running servers at ``save-off`` (after ``save-all flush``) for a backup."""
+    async with AsyncExitStack() as stack:
+        if params.flush_world:
+            for server_id in server_ids:
+                instance = docker_mc_manager.get_instance(server_id)
+                if await stack.enter_async_context(instance.saves_flushed()):
+                    context.log(f"已暂停服务器 '{server_id}' 的自动保存并刷新存档")
+        yield
+
+
+def _skip_message(lock_key: str) -> str:
+    current = server_operation_lock.get_holder(lock_key)
+    if current is None:
+        return f"跳过备份: 服务器 '{lock_key}' 当前被占用"
+    current_kind = "备份" if current.kind == ServerOperationKind.BACKUP else "恢复"
+    return (
+        f"跳过备份: 服务器 '{lock_key}' 被{current_kind}占用"
+        f" ({current.description}, 起始 {current.started_at.isoformat()})"
+    )
+
+
+async def _create_snapshot_task(
+    context: ExecutionContext,
+    service: SnapshotService,
+    backup_path: Path,
+    *,
+    name: str,
+    server_id: Optional[str],
+) -> dict:
+    """Run the snapshot as a background task (progress in the task center); returns its result."""
+    context.log(f"正在创建快照: {backup_path}")
+    submitted = task_manager.submit(
+        TaskType.SNAPSHOT_BACKUP,
+        name,
+        backup_task(service, [backup_path]),
+        server_id=server_id,
+        cancellable=True,
+    )
+    task_result = await submitted.awaitable
+    if not task_result.success or not task_result.data:
+        raise RuntimeError(f"创建快照失败: {task_result.error}")
+    data = task_result.data
+
+    context.log(f"快照创建成功: {data['short_id']} ({data['snapshot_id']})")
+    if data.get("total_files_processed") is not None:
+        context.log(
+            f"备份统计: {data['total_files_processed']} 个文件, "
+            f"{data['total_bytes_processed']} 字节"
+        )
+    return data
+
+
+async def _forget_old_snapshots(
+    context: ExecutionContext,
+    service: SnapshotService,
+    params: BackupJobParams,
+    paths: Sequence[Path] = (),
+    prune: Optional[bool] = None,
+) -> None:
+    """Apply the job's retention policy; ``paths`` limits it to snapshots of those paths."""
+    if paths:
+        context.log(f"开始清理旧快照: {', '.join(str(p) for p in paths)}")
+    else:
+        context.log("开始清理旧快照...")
+    try:
+        await service.forget(
+            keep_last=params.keep_last,
+            keep_hourly=params.keep_hourly,
+            keep_daily=params.keep_daily,
+            keep_weekly=params.keep_weekly,
+            keep_monthly=params.keep_monthly,
+            keep_yearly=params.keep_yearly,
+            keep_tag=params.keep_tag,
+            keep_within=params.keep_within,
+            prune=params.prune if prune is None else prune,
+            paths=paths,
+        )
+        context.log("旧快照清理完成")
+    except Exception as e:
+        context.log(f"警告: 清理旧快照时出错: {str(e)}")
+        # Don't fail the entire job if forget fails
+
+
+async def _backup_one_server(
+    context: ExecutionContext,
+    service: SnapshotService,
+    params: BackupJobParams,
+    server_id: str,
+    semaphore: asyncio.Semaphore,
+) -> Optional[Path]:
+    """Snapshot one server under its own lock; returns the path snapshotted, or
+    ``None`` when skipped because the server is busy."""
+    holder = LockHolder(
+        kind=ServerOperationKind.BACKUP,
+        started_at=datetime.now(timezone.utc),
+        user_id=None,
+        description=f"定时备份（{server_id}）",
+    )
+    async with semaphore:
+        async with server_operation_lock.try_acquire(server_id, holder) as acquired:
+            if not acquired:
+                context.log(_skip_message(server_id))
+                return None
+            backup_path = await _resolve_backup_path(server_id, None)
+            async with _worlds_flushed(context, params, [server_id]):
+                await _create_snapshot_task(
+                    context,
+                    service,
+                    backup_path,
+                    name=f"定时备份 {server_id}",
+                    server_id=server_id,
+                )
+            return backup_path
+
+
+async def _backup_servers_in_parallel(
+    context: ExecutionContext, params: BackupJobParams
+) -> str:
+    """One snapshot per server, ``max_parallel_backups`` at a time; returns a summary line.
+
+    Servers are locked individually, so a restore running on one server only
+    skips that server. Retention is applied to each backed-up server's own
+    snapshot series (``restic forget --path``); snapshots of any other path
+    set are left to the usual repo-wide policy. The repo is pruned once,
+    after the last server's forget.
+    """
+    service = _get_snapshot_service()
+    server_ids = await docker_mc_manager.get_all_server_names()
+    context.log(
+        f"开始并行备份 {len(server_ids)} 个服务器（并发 {params.max_parallel_backups}）"
+    )
+    semaphore = asyncio.Semaphore(params.max_parallel_backups)
+    results = await asyncio.gather(
+        *(
+            _backup_one_server(context, service, params, server_id, semaphore)
+            for server_id in server_ids
+        ),
+        return_exceptions=True,
+    )
+
+    created: list[Path] = []
+    skipped: list[str] = []
+    failed: list[str] = []
+    for server_id, result in zip(server_ids, results):
+        if isinstance(result, BaseException):
+            context.log(f"服务器 '{server_id}' 备份失败: {result}")
+            failed.append(server_id)
+        elif result is None:
+            skipped.append(server_id)
+        else:
+            created.append(result)
+
+    if params.enable_forget:
+        for i, backup_path in enumerate(created):
+            await _forget_old_snapshots(
+                context,
+                service,
+                params,
+                paths=[backup_path],
+                prune=params.prune and i == len(created) - 1,
+            )
+
+    summary = (
+        f"{len(created)} 个服务器已备份, {len(skipped)} 个跳过, {len(failed)} 个失败"
+    )
+    if failed:
+        raise RuntimeError(f"部分服务器备份失败 ({', '.join(failed)}): {summary}")
+    return summary
+
+
 async def backup_cronjob(context: ExecutionContext):
     """
     Create a backup snapshot and optionally forget old snapshots.
@@ -220,6 +427,9 @@ async def backup_cronjob(context: ExecutionContext):
     If the server-operation lock is currently held (by a restore or another
     backup), this run is skipped with a structured log entry. Skips also send
     a "skipped" Uptime Kuma notification when configured.
+
+    With ``parallel_servers`` and no ``server_id``, each server is snapshotted
+    separately and concurrently under its own lock instead.
     """
     params = cast(BackupJobParams, context.params)
     start_time = time.time()
@@ -234,21 +444,19 @@ async def backup_cronjob(context: ExecutionContext):
     )
 
     try:
+        if params.server_id is None and params.parallel_servers:
+            summary = await _backup_servers_in_parallel(context, params)
+            context.log(f"备份任务完成: {summary}")
+            if params.uptimekuma_url and params.uptimekuma_url.strip():
+                running_time = time.time() - start_time
+                await _send_uptimekuma_notification(
+                    context, params.uptimekuma_url, True, "OK", running_time
+                )
+            return
+
         async with server_operation_lock.try_acquire(lock_key, holder) as acquired:
             if not acquired:
-                current = server_operation_lock.get_holder(lock_key)
-                if current is not None:
-                    current_kind = (
-                        "备份"
-                        if current.kind == ServerOperationKind.BACKUP
-                        else "恢复"
-                    )
-                    skip_msg = (
-                        f"跳过备份: 服务器 '{lock_key}' 被{current_kind}占用"
-                        f" ({current.description}, 起始 {current.started_at.isoformat()})"
-                    )
-                else:
-                    skip_msg = f"跳过备份: 服务器 '{lock_key}' 当前被占用"
+                skip_msg = _skip_message(lock_key)
                 context.log(skip_msg)
                 if params.uptimekuma_url and params.uptimekuma_url.strip():
                     running_time = time.time() - start_time
@@ -277,37 +485,25 @@ async def backup_cronjob(context: ExecutionContext):
             if not await aioos.path.exists(backup_path):
                 raise RuntimeError(f"备份路径不存在: {backup_path}")
 
-            # Create backup
-            context.log(f"正在创建快照: {backup_path}")
-            snapshot = await service.create_snapshot([backup_path])
-
-            context.log(f"快照创建成功: {snapshot.short_id} ({snapshot.id})")
-            if snapshot.summary:
-                context.log(
-                    f"备份统计: {snapshot.summary.total_files_processed} 个文件, "
-                    f"{snapshot.summary.total_bytes_processed} 字节"
+            # Create backup as a background task so progress shows in the task center
+            flushed_servers = (
+                [params.server_id]
+                if params.server_id
+                else await docker_mc_manager.get_all_server_names()
+            )
+            async with _worlds_flushed(context, params, flushed_servers):
+                data = await _create_snapshot_task(
+                    context,
+                    service,
+                    backup_path,
+                    name=f"定时备份 {lock_key}",
+                    server_id=params.server_id,
                 )
+            snapshot_short_id = data["short_id"]
 
             # Run forget if enabled
             if params.enable_forget:
-                context.log("开始清理旧快照...")
-
-                try:
-                    await service.forget(
-                        keep_last=params.keep_last,
-                        keep_hourly=params.keep_hourly,
-                        keep_daily=params.keep_daily,
-                        keep_weekly=params.keep_weekly,
-                        keep_monthly=params.keep_monthly,
-                        keep_yearly=params.keep_yearly,
-                        keep_tag=params.keep_tag,
-                        keep_within=params.keep_within,
-                        prune=params.prune,
-                    )
-                    context.log("旧快照清理完成")
-                except Exception as e:
-                    context.log(f"警告: 清理旧快照时出错: {str(e)}")
-                    # Don't fail the entire job if forget fails
+                await _forget_old_snapshots(context, service, params)
 
             # Final success message
             backup_desc = (
@@ -316,7 +512,7 @@ async def backup_cronjob(context: ExecutionContext):
             if params.server_id and params.path:
                 backup_desc += f" 路径 '{params.path}'"
 
-            context.log(f"备份任务完成: {backup_desc} -> 快照 {snapshot.short_id}")
+            context.log(f"备份任务完成: {backup_desc} -> 快照 {snapshot_short_id}")
 
             # Send Uptime Kuma notification for success if configured
             if params.uptimekuma_url and params.uptimekuma_url.strip():
@@ -1,9 +1,11 @@
-from typing import Annotated
+from typing import Annotated, Literal, TypeAlias
 
 from pydantic import ConfigDict, Field
 
 from ..schemas import BaseConfigSchema
 
+TileFormat: TypeAlias = Literal["png", "png_quantized", "webp"]
+
 
 class MCMapConfig(BaseConfigSchema):
     """Server map (mcmap) rendering configuration."""
@@ -37,6 +39,67 @@ class MCMapConfig(BaseConfigSchema):
             le=600,
         ),
     ] = 30
+    palette_parallel_jobs: Annotated[
+        int,
+        Field(
+            title="调色板并行任务数",
+            description="增量生成调色板时同时运行的 mcmap gen-palette 进程数量（每个模组 jar 一个进程）。",
+            ge=1,
+            le=32,
+        ),
+    ] = 4
+    shared_store_enabled: Annotated[
+        bool,
+        Field(
+            title="跨服务器共享客户端与调色板",
+            description="相同游戏版本的服务器共享 client.jar，相同版本与模组组合的服务器共享 palette.json；与服务器数据位于同一文件系统时使用硬链接，否则复制。",
+        ),
+    ] = True
+    tile_format: Annotated[
+        TileFormat,
+        Field(
+            title="瓦片存储格式",
+            description=(
+                "渲染完成后瓦片的存储格式：png 为 mcmap 原始输出；"
+                "png_quantized 为调色板量化 PNG；webp 为无损 WebP。"
+                "不支持 WebP 的浏览器会收到首次请求时转码并缓存的 PNG。"
+            ),
+        ),
+    ] = "png"
+    tile_quantize_colors: Annotated[
+        int,
+        Field(
+            title="量化颜色数",
+            description="png_quantized 格式使用的调色板颜色数量。",
+            ge=2,
+            le=256,
+        ),
+    ] = 256
+    tile_cache_server_budget_mb: Annotated[
+        int,
+        Field(
+            title="单服务器瓦片缓存上限",
+            description="每个服务器 .mcmap/tiles 目录允许占用的最大空间 (MB)，超出后按最近访问时间淘汰；0 表示不限制。",
+            ge=0,
+        ),
+    ] = 0
+    tile_cache_global_budget_mb: Annotated[
+        int,
+        Field(
+            title="全局瓦片缓存上限",
+            description="所有服务器瓦片缓存合计允许占用的最大空间 (MB)，超出后跨服务器按最近访问时间淘汰；0 表示不限制。",
+            ge=0,
+        ),
+    ] = 0
+    tile_cache_eviction_interval_seconds: Annotated[
+        int,
+        Field(
+            title="瓦片缓存淘汰间隔",
+            description="后台扫描瓦片缓存并执行淘汰的间隔秒数。",
+            ge=10,
+            le=60 * 60 * 24,
+        ),
+    ] = 600
     prune_default_threshold_seconds: Annotated[
         int,
         Field(
@@ -46,3 +109,23 @@ class MCMapConfig(BaseConfigSchema):
             le=60 * 60 * 24 * 365,
         ),
     ] = 30
+    prune_index_enabled: Annotated[
+        bool,
+        Field(
+            title="区块清理预览索引",
+            description=(
+                "在 .mcmap/inhabited/ 下持久化每个区块的 InhabitedTime 索引；"
+                "预览只重新扫描修改过的区域文件，并在后端直接计算任意阈值的结果。"
+                "关闭后每次预览都由 mcmap 全量扫描。"
+            ),
+        ),
+    ] = True
+    prune_apply_workers: Annotated[
+        int,
+        Field(
+            title="区块清理并行进程数",
+            description="执行区块清理时同时处理的区域文件数量（每个区域一个 mcmap remove-chunks 进程）。",
+            ge=1,
+            le=64,
+        ),
+    ] = 4
@@ -47,6 +47,38 @@ class RconValidationConfig(BaseConfigSchema):
     ] = 60
 
 
+class LivePositionsConfig(BaseConfigSchema):
+    """RCON 实时玩家位置配置。"""
+
+    model_config = ConfigDict(title="RCON 实时玩家位置配置")
+
+    enabled: Annotated[
+        bool,
+        Field(
+            title="启用实时位置",
+            description="通过RCON定期查询在线玩家的坐标和维度，叠加到玩家位置接口并通过事件WebSocket推送",
+        ),
+    ] = False
+
+    poll_interval_seconds: Annotated[
+        float,
+        Field(
+            title="轮询间隔",
+            description="每轮查询所有在线玩家位置的间隔（秒）",
+            ge=1,
+        ),
+    ] = 5
+
+    command_timeout_seconds: Annotated[
+        float,
+        Field(
+            title="RCON 超时",
+            description="RCON连接与单条命令的超时时间（秒），超时后断开并在下一轮重连",
+            gt=0,
+        ),
+    ] = 5
+
+
 class SkinFetcherConfig(BaseConfigSchema):
     """玩家皮肤获取配置。"""
 
@@ -96,6 +128,11 @@ class PlayersConfig(BaseConfigSchema):
         Field(title="RCON 玩家状态验证", description="RCON玩家状态验证配置"),
     ] = RconValidationConfig()
 
+    live_positions: Annotated[
+        LivePositionsConfig,
+        Field(title="RCON 实时玩家位置", description="RCON实时玩家位置配置"),
+    ] = LivePositionsConfig()
+
     skin_fetcher: Annotated[
         SkinFetcherConfig,
         Field(title="玩家皮肤获取", description="玩家皮肤获取配置"),
@@ -44,6 +44,17 @@ class WorldRestoreConfig(BaseConfigSchema):
             ge=1,
         ),
     ] = 8 * 1024 * 1024
+    stage_cache_max_bytes: Annotated[
+        int,
+        Field(
+            title="快照暂存缓存上限",
+            description=(
+                "预览与区块恢复共享的快照文件暂存缓存的最大字节数;"
+                "同一快照的文件在预览后提交恢复时直接硬链接复用,0 表示禁用"
+            ),
+            ge=0,
+        ),
+    ] = 4 * 1024 * 1024 * 1024
 
 
 class SnapshotsConfig(BaseConfigSchema):
@@ -59,6 +70,34 @@ class SnapshotsConfig(BaseConfigSchema):
     world_restore: Annotated[
         WorldRestoreConfig, Field(title="世界恢复预览", description="世界恢复临时目录与预览会话配置")
     ] = WorldRestoreConfig()
+    catalogue_refresh_seconds: Annotated[
+        int,
+        Field(
+            title="快照目录刷新间隔",
+            description=(
+                "快照列表缓存的完整刷新间隔(秒)。本地仓库每次读取时按 snapshots 目录增量同步，"
+                "该间隔仅在远程仓库或目录不可读时生效；本系统自身的备份与清理操作会立即更新缓存。"
+            ),
+            ge=0,
+        ),
+    ] = 300
+    ls_cache_max_nodes: Annotated[
+        int,
+        Field(
+            title="快照目录列表缓存上限",
+            description="恢复规划时缓存的 restic ls 结果最多包含的节点数; 快照不可变, 预览后再恢复同一范围无需重复调用 restic ls",
+            ge=0,
+        ),
+    ] = 200_000
+    restore_parallel_steps: Annotated[
+        int,
+        Field(
+            title="恢复并行步骤数",
+            description="一次恢复计划中同时运行的 restic restore 进程数量; 各步骤作用于互不重叠的目录",
+            ge=1,
+            le=16,
+        ),
+    ] = 2
     # 忽略路径配置
     ignored_paths: Annotated[
         list[str],
@@ -32,6 +32,15 @@ class WorldConfig(BaseConfigSchema):
             le=256,
         ),
     ] = 32
+    chunk_merge_workers: Annotated[
+        int,
+        Field(
+            title="区块恢复并行进程数",
+            description="区块范围恢复时同时运行的 mcmap replace-chunks / remove-chunks 进程数量; 每个进程只写一个 MCA 文件",
+            ge=1,
+            le=64,
+        ),
+    ] = 4
     dimension_max_depth_from_world_root: Annotated[
         int,
         Field(
@@ -41,6 +50,15 @@ class WorldConfig(BaseConfigSchema):
             le=32,
         ),
     ] = 4
+    layout_probe_workers: Annotated[
+        int,
+        Field(
+            title="世界布局探测线程数",
+            description="识别世界布局时并发 stat 目录、检查维度 region 目录的最大线程数",
+            ge=1,
+            le=256,
+        ),
+    ] = 16
     dimension_labels: Annotated[
         dict[str, str],
         Field(
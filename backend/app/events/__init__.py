@@ -2,9 +2,11 @@ from .bus import EventBus, Subscription, event_bus
 from .models import (
     ChatEvent,
     EventPlayer,
+    EventPlayerPosition,
     HeartbeatFrame,
     PlayerJoinEvent,
     PlayerLeaveEvent,
+    PlayerPositionsEvent,
     PublicEventFrame,
     ServerStoppingEvent,
     StreamResetFrame,
@@ -16,9 +18,11 @@ __all__ = [
     "event_bus",
     "ChatEvent",
     "EventPlayer",
+    "EventPlayerPosition",
     "HeartbeatFrame",
     "PlayerJoinEvent",
     "PlayerLeaveEvent",
+    "PlayerPositionsEvent",
     "PublicEventFrame",
     "ServerStoppingEvent",
     "StreamResetFrame",
@@ -43,6 +43,24 @@ class ServerStoppingEvent(BaseModel):
     timestamp: datetime
 
 
+class EventPlayerPosition(BaseModel):
+    player: EventPlayer
+    dimension_id: str
+    x: float
+    y: float
+    z: float
+
+
+class PlayerPositionsEvent(BaseModel):
+    """Live positions of every online player on a server, from RCON polling."""
+
+    cursor: None = None
+    type: Literal["player_positions"] = "player_positions"
+    server_id: str
+    timestamp: datetime
+    positions: list[EventPlayerPosition]
+
+
 class HeartbeatFrame(BaseModel):
     type: Literal["heartbeat"] = "heartbeat"
     timestamp: datetime
@@ -58,6 +76,7 @@ PublicEventFrame: TypeAlias = (
     | PlayerJoinEvent
     | PlayerLeaveEvent
     | ServerStoppingEvent
+    | PlayerPositionsEvent
     | HeartbeatFrame
     | StreamResetFrame
 )
@@ -1,8 +1,11 @@
+from .cache import CachedClaims
 from .cluster import build_clusters
 from .extract import (
     FtbExtractError,
     NoFtbDataError,
     extract_claims_for_server,
+    ftb_claims_cache,
+    load_cached_claims,
 )
 from .models import (
     ClaimDimensionEntry,
@@ -15,6 +18,7 @@ from .models import (
 )
 
 __all__ = [
+    "CachedClaims",
     "ClaimDimensionEntry",
     "ClaimMember",
     "ClaimsResponse",
@@ -26,4 +30,6 @@ __all__ = [
     "TeamType",
     "build_clusters",
     "extract_claims_for_server",
+    "ftb_claims_cache",
+    "load_cached_claims",
 ]
@@ -0,0 +1,155 @@
+"""In-memory cache of extracted FTB claims, keyed on the FTB data files.
+
+Claims change far less often than the overlay is opened, yet every request
+(and every chunk-prune preview) used to spawn ``mcmap extract-ftb-claims``
+and re-cluster every team. Entries are kept per ``(data_path, world root)``
+and validated against a stat signature of the FTB data under the world
+root: every file below an entry whose name starts with one of
+``FTB_DATA_PREFIXES``, in the world root or its ``data/`` dir, as
+``(relpath, inode, size, mtime_ns)``. FTB saves by atomic rename and
+restores replace files, so the inode catches rewrites that keep the mtime.
+
+Callers that must not act on outdated claims (prune) wait for a refresh
+when the signature changed. The overlay passes ``allow_stale=True`` and gets
+the previous entry immediately while a background refresh replaces it.
+Extraction failures are never cached; "no FTB data" is. The shared
+instance is ``extract.ftb_claims_cache``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from ..logger import logger
+from ..mcmap.events import MCMapFtbClaimsPayload
+from ..world.layout import WorldRootPath
+from .models import ClaimsResponse
+
+FTB_DATA_PREFIXES = ("ftb", "serverutilities", "latmod")
+
+CacheKey = tuple[Path, Path]
+FtbSignature = tuple[tuple[str, int, int, int], ...]
+# Runs the extraction: (payload or None when there is no FTB data, response).
+ClaimsLoader = Callable[
+    [Path, WorldRootPath],
+    Awaitable[tuple[Optional[MCMapFtbClaimsPayload], ClaimsResponse]],
+]
+
+
+@dataclass(frozen=True)
+class CachedClaims:
+    signature: FtbSignature
+    # None when mcmap found no FTB data in the world.
+    payload: Optional[MCMapFtbClaimsPayload]
+    response: ClaimsResponse
+
+
+def _collect_sync(
+    entries: list[os.DirEntry], world_dir: str, out: list[tuple[str, int, int, int]]
+) -> None:
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                _collect_sync(list(os.scandir(entry.path)), world_dir, out)
+                continue
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        out.append(
+            (
+                os.path.relpath(entry.path, world_dir),
+                st.st_ino,
+                st.st_size,
+                st.st_mtime_ns,
+            )
+        )
+
+
+def ftb_data_signature_sync(world_dir: Path) -> FtbSignature:
+    out: list[tuple[str, int, int, int]] = []
+    for base in (world_dir, world_dir / "data"):
+        try:
+            entries = list(os.scandir(base))
+        except OSError:
+            continue
+        ftb_entries = [
+            entry
+            for entry in entries
+            if entry.name.lower().startswith(FTB_DATA_PREFIXES)
+        ]
+        _collect_sync(ftb_entries, os.fspath(world_dir), out)
+    return tuple(sorted(out))
+
+
+class FtbClaimsCache:
+    def __init__(self, loader: ClaimsLoader) -> None:
+        self._loader = loader
+        self._entries: dict[CacheKey, CachedClaims] = {}
+        # In-flight extraction per key, with the signature it was started for.
+        self._refreshes: dict[
+            CacheKey, tuple[FtbSignature, asyncio.Task[CachedClaims]]
+        ] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(
+        self,
+        data_path: Path,
+        world_root: WorldRootPath,
+        *,
+        allow_stale: bool = False,
+    ) -> CachedClaims:
+        key = (data_path, world_root.path)
+        signature = await asyncio.to_thread(ftb_data_signature_sync, world_root.path)
+        cached = self._entries.get(key)
+        if cached is not None and cached.signature == signature:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        refresh = self._refresh(key, data_path, world_root, signature)
+        if cached is not None and allow_stale:
+            return cached
+        return await asyncio.shield(refresh)
+
+    def _refresh(
+        self,
+        key: CacheKey,
+        data_path: Path,
+        world_root: WorldRootPath,
+        signature: FtbSignature,
+    ) -> asyncio.Task[CachedClaims]:
+        """Start the extraction for ``key``, or join one for the same signature."""
+        running = self._refreshes.get(key)
+        if running is not None and running[0] == signature and not running[1].done():
+            return running[1]
+        task = asyncio.create_task(
+            self._extract(key, data_path, world_root, signature)
+        )
+        self._refreshes[key] = (signature, task)
+        task.add_done_callback(lambda t: self._refresh_done(key, t))
+        return task
+
+    def _refresh_done(self, key: CacheKey, task: asyncio.Task) -> None:
+        running = self._refreshes.get(key)
+        if running is not None and running[1] is task:
+            del self._refreshes[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(
+                "ftb-claims: refresh failed for %s: %s", key[1], task.exception()
+            )
+
+    async def _extract(
+        self,
+        key: CacheKey,
+        data_path: Path,
+        world_root: WorldRootPath,
+        signature: FtbSignature,
+    ) -> CachedClaims:
+        payload, response = await self._loader(data_path, world_root)
+        entry = CachedClaims(signature=signature, payload=payload, response=response)
+        self._entries[key] = entry
+        return entry
@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -17,6 +18,7 @@ from ..world.layout import (
     discover_world_root_paths,
     resolve_dimension_folder,
 )
+from .cache import CachedClaims, FtbClaimsCache
 from .cluster import build_clusters
 from .models import (
     ClaimDimensionEntry,
@@ -167,21 +169,42 @@ def _shape_response(
     )
 
 
-async def extract_claims_for_server(
-    data_path: Path, world_root: Optional[WorldRootPath] = None
-) -> ClaimsResponse:
-    if world_root is None:
-        roots = await discover_world_root_paths(data_path)
-        world_root = roots[0] if roots else None
-    if world_root is None:
-        return ClaimsResponse(available=False)
+async def _load_claims(
+    data_path: Path, world_root: WorldRootPath
+) -> Tuple[Optional[MCMapFtbClaimsPayload], ClaimsResponse]:
     try:
         data = await _run_extract(world_root.path, data_path)
     except NoFtbDataError:
-        return ClaimsResponse(available=False)
+        return None, ClaimsResponse(available=False)
     except FtbExtractError:
         logger.exception(
             "ftb-claims: mcmap extract failed for world=%s", world_root.path
         )
         raise
-    return _shape_response(data, world_root, data_path)
+    # Clustering is pure CPU; keep it off the event loop.
+    response = await asyncio.to_thread(_shape_response, data, world_root, data_path)
+    return data, response
+
+
+ftb_claims_cache = FtbClaimsCache(_load_claims)
+
+
+async def load_cached_claims(
+    data_path: Path, world_root: WorldRootPath, *, allow_stale: bool = False
+) -> CachedClaims:
+    return await ftb_claims_cache.get(data_path, world_root, allow_stale=allow_stale)
+
+
+async def extract_claims_for_server(
+    data_path: Path,
+    world_root: Optional[WorldRootPath] = None,
+    *,
+    allow_stale: bool = False,
+) -> ClaimsResponse:
+    if world_root is None:
+        roots = await discover_world_root_paths(data_path)
+        world_root = roots[0] if roots else None
+    if world_root is None:
+        return ClaimsResponse(available=False)
+    cached = await load_cached_claims(data_path, world_root, allow_stale=allow_stale)
+    return cached.response
@@ -1,8 +1,20 @@
+"""Connected components of grid cells and their boundary rings.
+
+Cells are packed into one integer key each (``x`` in the high bits, ``z`` in
+the low 30, both offset to be non-negative; keys stay below 2**60 so CPython
+keeps them two digits wide), so sorting the keys orders
+cells by ``(x, z)`` and a cell's neighbours are ``key ± 1`` (along z) and
+``key ± _X_STRIDE`` (along x). Neighbour lookups walk the sorted keys with
+monotonic cursors instead of hashing tuples, components are labelled with
+union-find over key indexes, and boundary edges are keyed by packed
+vertices. Large prune previews feed millions of cells through here.
+"""
+
 from __future__ import annotations
 
-from collections import deque
+from array import array
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Iterable, Optional, Sequence
 
 Cell = tuple[int, int]
 Vertex = tuple[int, int]
@@ -18,95 +30,229 @@ class GridShapeData:
 
 
 def connected_components(cells: Iterable[Cell]) -> list[list[Cell]]:
-    remaining = set(cells)
-    components: list[list[Cell]] = []
-    while remaining:
-        seed = next(iter(remaining))
-        component: list[Cell] = []
-        queue: deque[Cell] = deque([seed])
-        remaining.discard(seed)
-        while queue:
-            x, z = queue.popleft()
-            component.append((x, z))
-            for dx, dz in ((1, 0), (-1, 0), (0, 1), (0, -1)):
-                neighbor = (x + dx, z + dz)
-                if neighbor in remaining:
-                    remaining.discard(neighbor)
-                    queue.append(neighbor)
-        component.sort()
-        components.append(component)
-    components.sort(key=lambda comp: (min(z for _, z in comp), min(x for x, _ in comp)))
-    return components
+    """4-connected components, each sorted, ordered by ``(min z, min x)``."""
+    return [
+        [_unpack(key) for key in component]
+        for component in _components(_sorted_keys(cells))
+    ]
 
 
 def compute_boundary_rings(cells: Iterable[Cell]) -> list[Ring]:
-    cell_set = set(cells)
-    if not cell_set:
-        return []
-
-    def has(x: int, z: int) -> bool:
-        return (x, z) in cell_set
-
-    adj: dict[Vertex, list[Vertex]] = {}
-
-    def push_edge(start: Vertex, end: Vertex) -> None:
-        adj.setdefault(start, []).append(end)
-
-    for x, z in sorted(cell_set):
-        if not has(x, z - 1):
-            push_edge((x + 1, z), (x, z))
-        if not has(x, z + 1):
-            push_edge((x, z + 1), (x + 1, z + 1))
-        if not has(x - 1, z):
-            push_edge((x, z), (x, z + 1))
-        if not has(x + 1, z):
-            push_edge((x + 1, z + 1), (x + 1, z))
-
-    rings: list[Ring] = []
-    while adj:
-        start = next(iter(adj))
-        ring: Ring = [start]
-        cursor = _pop_adj(adj, start)
-        if cursor is None:
-            adj.pop(start, None)
-            continue
-        while cursor != start:
-            ring.append(cursor)
-            next_cursor = _pop_adj(adj, cursor)
-            if next_cursor is None:
-                break
-            cursor = next_cursor
-        if len(ring) >= 3:
-            rings.append(_simplify_collinear(ring))
-    return rings
+    return _boundary_rings(_sorted_keys(cells))
 
 
 def build_grid_shapes(cells: Iterable[Cell], *, id_prefix: str) -> list[GridShapeData]:
     shapes: list[GridShapeData] = []
-    for idx, component in enumerate(connected_components(cells)):
-        xs = [x for x, _ in component]
-        zs = [z for _, z in component]
-        rings = compute_boundary_rings(component)
+    for idx, component in enumerate(_components(_sorted_keys(cells))):
+        min_x, _ = _unpack(component[0])
+        max_x, _ = _unpack(component[-1])
+        z_values = [key & _Z_MASK for key in component]
+        rings = _boundary_rings(component)
         rings.sort(key=_ring_area_abs, reverse=True)
         shapes.append(
             GridShapeData(
                 id=f"{id_prefix}-{idx}",
                 cell_count=len(component),
-                bbox=(min(xs), min(zs), max(xs), max(zs)),
+                bbox=(
+                    min_x,
+                    min(z_values) - _OFFSET,
+                    max_x,
+                    max(z_values) - _OFFSET,
+                ),
                 rings=rings,
             )
         )
     return shapes
 
 
-def _pop_adj(adj: dict[Vertex, list[Vertex]], key: Vertex) -> Vertex | None:
-    values = adj.get(key)
-    if not values:
-        return None
-    value = values.pop(0)
-    if not values:
-        adj.pop(key, None)
-    return value
+_Z_BITS = 30
+_OFFSET = 1 << (_Z_BITS - 1)
+_X_STRIDE = 1 << _Z_BITS
+_Z_MASK = _X_STRIDE - 1
+
+
+def _unpack(key: int) -> Cell:
+    return (key >> _Z_BITS) - _OFFSET, (key & _Z_MASK) - _OFFSET
+
+
+def _sorted_keys(cells: Iterable[Cell]) -> array:
+    offset = _OFFSET
+    return array(
+        "q", sorted({((x + offset) << _Z_BITS) | (z + offset) for x, z in cells})
+    )
+
+
+def _components(keys: Sequence[int]) -> list[array]:
+    """Split sorted ``keys`` into 4-connected groups of sorted keys.
+
+    Consecutive keys form runs along z within one x column. Each run is
+    unioned with the runs of column ``x - 1`` whose z range overlaps it,
+    found by a cursor that only moves forward, so union-find works over
+    runs rather than cells. Roots are always the smallest run index, so
+    components come out in order of their first cell.
+    """
+    run_starts: list[int] = []  # index into keys
+    run_ends: list[int] = []  # exclusive
+    previous = -2
+    for i, key in enumerate(keys):
+        if key != previous + 1:
+            if run_starts:
+                run_ends.append(i)
+            run_starts.append(i)
+        previous = key
+    if run_starts:
+        run_ends.append(len(keys))
+
+    runs = len(run_starts)
+    first_keys = [keys[i] for i in run_starts]
+    last_keys = [keys[i - 1] for i in run_ends]
+    parent = list(range(runs))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    west = 0
+    for r in range(runs):
+        low = first_keys[r] - _X_STRIDE
+        high = last_keys[r] - _X_STRIDE
+        while last_keys[west] < low:
+            west += 1
+        k = west
+        while k < r and first_keys[k] <= high:
+            ra, rb = find(k), find(r)
+            if ra < rb:
+                parent[rb] = ra
+            elif rb < ra:
+                parent[ra] = rb
+            k += 1
+
+    members: dict[int, array] = {}
+    min_z: dict[int, int] = {}
+    for r in range(runs):
+        root = find(r)
+        component = members.get(root)
+        if component is None:
+            component = members[root] = array("q")
+            min_z[root] = first_keys[r] & _Z_MASK
+        else:
+            min_z[root] = min(min_z[root], first_keys[r] & _Z_MASK)
+        component.extend(keys[run_starts[r] : run_ends[r]])
+    order = sorted(members, key=lambda root: (min_z[root], first_keys[root] >> _Z_BITS))
+    return [members[root] for root in order]
+
+
+def _boundary_rings(keys: Sequence[int]) -> list[Ring]:
+    """Trace the boundary of sorted cell ``keys`` into closed vertex rings.
+
+    A vertex has at most two outgoing edges (where cells touch diagonally);
+    the first pushed is followed first, and tracing restarts from the
+    earliest vertex with edges left.
+    """
+    n = len(keys)
+    if not n:
+        return []
+    first: dict[int, int] = {}
+    second: dict[int, int] = {}
+    # Edges in the order the cell scan produces them; each cell's own key is
+    # its (x, z) corner vertex.
+    edges: list[int] = []
+    push = edges.append
+    stride = _X_STRIDE
+    west = 0
+    east = 0
+    previous = -2
+    for i in range(n):
+        key = keys[i]
+        if previous != key - 1:
+            push(key + stride)
+            push(key)
+        if not (i + 1 < n and keys[i + 1] == key + 1):
+            push(key + 1)
+            push(key + stride + 1)
+        target = key - stride
+        while keys[west] < target:
+            west += 1
+        if keys[west] != target:
+            push(key)
+            push(key + 1)
+        target = key + stride
+        while east < n and keys[east] < target:
+            east += 1
+        if not (east < n and keys[east] == target):
+            push(key + stride + 1)
+            push(key + stride)
+        previous = key
+    for j in range(0, len(edges), 2):
+        start = edges[j]
+        if start in first:
+            second[start] = edges[j + 1]
+        else:
+            first[start] = edges[j + 1]
+
+    def pop_edge(start: int) -> Optional[int]:
+        end = first.pop(start, None)
+        if end is not None and start in second:
+            first[start] = second.pop(start)
+        return end
+
+    rings: list[Ring] = []
+    for start in list(first):
+        while start in first:
+            ring = [start]
+            cursor = pop_edge(start)
+            while cursor is not None and cursor != start:
+                ring.append(cursor)
+                cursor = pop_edge(cursor)
+            if len(ring) >= 3:
+                rings.append(_simplify_collinear([_unpack(v) for v in ring]))
+    return rings
+
+
+def simplify_ring(ring: Ring, tolerance: float) -> Ring:
+    """Douglas-Peucker simplification of a closed ring, keeping original vertices.
+
+    Returns ``[]`` when fewer than three vertices survive, i.e. the ring is
+    smaller than ``tolerance``.
+    """
+    n = len(ring)
+    if tolerance <= 0 or n <= 3:
+        return list(ring)
+    # Split the ring at the vertex farthest from ring[0] and simplify both
+    # chains; ``keep`` marks surviving vertex indexes.
+    x0, z0 = ring[0]
+    far = max(
+        range(1, n),
+        key=lambda i: (ring[i][0] - x0) ** 2 + (ring[i][1] - z0) ** 2,
+    )
+    keep = [False] * n
+    keep[0] = keep[far] = True
+    limit = tolerance * tolerance
+    stack = [(0, far), (far, n)]
+    while stack:
+        first, last = stack.pop()
+        ax, az = ring[first]
+        bx, bz = ring[last % n]
+        dx, dz = bx - ax, bz - az
+        length2 = dx * dx + dz * dz
+        best, best_dist = -1, limit
+        for i in range(first + 1, last):
+            px, pz = ring[i]
+            cross = dx * (pz - az) - dz * (px - ax)
+            if length2:
+                dist = cross * cross / length2
+            else:
+                dist = (px - ax) ** 2 + (pz - az) ** 2
+            if dist > best_dist:
+                best, best_dist = i, dist
+        if best >= 0:
+            keep[best] = True
+            stack.append((first, best))
+            stack.append((best, last))
+    simplified = [vertex for vertex, kept in zip(ring, keep) if kept]
+    return simplified if len(simplified) >= 3 else []
 
 
 def _simplify_collinear(ring: Ring) -> Ring:
@@ -19,6 +19,8 @@ from .db.migrations import ensure_database_schema
 from .dns import simple_dns_manager
 from .dynamic_config import config_manager
 from .logger import logger
+from .mcmap import tile_cache_quota
+from .player_locations import live_position_poller
 from .players import start_player_system, stop_player_system
 from .routers import (
     admin,
@@ -96,9 +98,19 @@ async def lifespan(app: FastAPI):
             "World restore orchestrator not initialized (restic is not configured)."
         )
 
+    logger.info("Starting map tile-cache eviction loop...")
+    tile_cache_quota.start()
+
+    await live_position_poller.start()
+
     logger.info("Startup complete.")
     yield
 
+    await live_position_poller.stop()
+
+    logger.info("Stopping map tile-cache eviction loop...")
+    await tile_cache_quota.stop()
+
     logger.info("Stopping world-restore preview janitor...")
     if world_restore_orchestrator is not None:
         await world_restore_orchestrator.stop_janitor()
@@ -7,14 +7,17 @@ from .palette import (
     palette_is_current,
     write_palette_hash,
 )
+from .quota import tile_cache_quota
 from .types import (
     InitEvent,
     MapStatus,
     MCMapError,
+    TileCacheStatus,
 )
 
 __all__ = [
     "mcmap_manager",
+    "tile_cache_quota",
     "ServerMapCache",
     "compute_palette_hash",
     "palette_is_current",
@@ -24,4 +27,5 @@ __all__ = [
     "MapStatus",
     "InitEvent",
     "MCMapError",
+    "TileCacheStatus",
 ]
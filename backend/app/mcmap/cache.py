@@ -7,11 +7,25 @@ from typing import List, Literal
 
 import aiofiles.os as aioos
 
+from ..dynamic_config.configs.mcmap import TileFormat
 from ..logger import logger
 from ..utils import async_fs
 
 FreshnessState = Literal["fresh", "stale", "missing_mca", "missing_png"]
 
+# mcmap always writes ``.png``; other formats are re-encoded siblings of it.
+TILE_SUFFIXES: dict[TileFormat, str] = {
+    "png": ".png",
+    "png_quantized": ".q.png",
+    "webp": ".webp",
+}
+
+
+def tile_variants(png: Path) -> List[Path]:
+    """Every stored encoding of the tile whose mcmap output is ``png``."""
+    stem = png.name.removesuffix(".png")
+    return [png.with_name(stem + suffix) for suffix in TILE_SUFFIXES.values()]
+
 
 @dataclass
 class ServerMapCache:
@@ -40,6 +54,10 @@ class ServerMapCache:
     def palette_hash_file(self) -> Path:
         return self.cache_dir / "palette.hash"
 
+    @property
+    def palettes_dir(self) -> Path:
+        return self.cache_dir / "palettes"
+
     def tiles_dir(self, region_path: str) -> Path:
         return self.cache_dir / "tiles" / region_path
 
@@ -49,7 +67,14 @@ class ServerMapCache:
     def png_path(self, region_path: str, x: int, z: int) -> Path:
         return self.tiles_dir(region_path) / f"r.{x}.{z}.png"
 
-    async def is_fresh(self, region_path: str, x: int, z: int) -> FreshnessState:
+    def tile_path(
+        self, region_path: str, x: int, z: int, fmt: TileFormat = "png"
+    ) -> Path:
+        return self.tiles_dir(region_path) / f"r.{x}.{z}{TILE_SUFFIXES[fmt]}"
+
+    async def is_fresh(
+        self, region_path: str, x: int, z: int, fmt: TileFormat = "png"
+    ) -> FreshnessState:
         mca = self.mca_path(region_path, x, z)
         try:
             mca_st = await aioos.stat(mca)
@@ -58,7 +83,7 @@ class ServerMapCache:
         # Zero-byte MCAs make fastanvil raise UnexpectedEof on header read; treat as absent.
         if mca_st.st_size == 0:
             return "missing_mca"
-        png = self.png_path(region_path, x, z)
+        png = self.tile_path(region_path, x, z, fmt)
         try:
             png_st = await aioos.stat(png)
         except FileNotFoundError:
@@ -0,0 +1,122 @@
+"""Post-render tile re-encoding (palette-quantised PNG, lossless WebP).
+
+mcmap only emits full-colour PNGs. When ``config.mcmap.tile_format`` asks
+for something smaller, the render queue re-encodes each fresh PNG into its
+format-specific sibling path, copies the source MCA's mtime onto it so the
+freshness check keeps working, and drops the original PNG.
+
+Clients that cannot decode WebP get a PNG decoded from the WebP tile once and
+kept at the tile's ``.png`` path. WebP tiles are lossless, so that file is the
+same image mcmap wrote.
+"""
+
+import asyncio
+import io
+import os
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+from ..dynamic_config.configs.mcmap import TileFormat
+
+TILE_MEDIA_TYPES: dict[TileFormat, str] = {
+    "png": "image/png",
+    "png_quantized": "image/png",
+    "webp": "image/webp",
+}
+
+
+def encode_tile_bytes(
+    img: Image.Image, fmt: TileFormat, *, quantize_colors: int = 256
+) -> bytes:
+    out = io.BytesIO()
+    if fmt == "webp":
+        # In lossless mode ``quality`` is encoder effort; 50 lands within ~6%
+        # of the max-effort size at under a third of the encode time (see
+        # benchmarks/tile_encoding.py).
+        img.save(out, format="WEBP", lossless=True, quality=50, method=4)
+    elif fmt == "png_quantized":
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        quantized = img.quantize(
+            colors=quantize_colors, method=Image.Quantize.FASTOCTREE
+        )
+        quantized.save(out, format="PNG", optimize=True)
+    else:
+        img.save(out, format="PNG")
+    return out.getvalue()
+
+
+def encode_tile_sync(
+    src: Path, dst: Path, fmt: TileFormat, *, quantize_colors: int = 256
+) -> int:
+    """Re-encode ``src`` into ``dst``, carry over its mtime, and remove ``src``.
+
+    The write goes through a temp file in ``dst``'s directory so tile readers
+    never observe a half-written image. Returns the encoded size in bytes.
+    """
+    st = os.stat(src)
+    with Image.open(src) as img:
+        img.load()
+        data = encode_tile_bytes(img, fmt, quantize_colors=quantize_colors)
+    _write_tile_sync(dst, data, st)
+    if src != dst:
+        os.unlink(src)
+    return len(data)
+
+
+def _write_tile_sync(dst: Path, data: bytes, st: os.stat_result) -> None:
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(tmp, dst)
+
+
+async def encode_tile(
+    src: Path, dst: Path, fmt: TileFormat, *, quantize_colors: int = 256
+) -> int:
+    return await asyncio.to_thread(
+        encode_tile_sync, src, dst, fmt, quantize_colors=quantize_colors
+    )
+
+
+def transcode_to_png_sync(src: Path) -> bytes:
+    with Image.open(src) as img:
+        img.load()
+        return encode_tile_bytes(img, "png")
+
+
+async def transcode_to_png(src: Path) -> bytes:
+    """Decode a stored tile back to PNG for clients that cannot take its format."""
+    return await asyncio.to_thread(transcode_to_png_sync, src)
+
+
+def png_fallback_sync(tile: Path) -> Optional[Path]:
+    """Return a PNG of the WebP ``tile``, decoding and storing it on first use.
+
+    The PNG lives at the tile's ``.png`` sibling with the tile's mtime, so it
+    is reused while the tile stays fresh and removed with the tile's other
+    variants. A sibling newer than the tile is a render still waiting to be
+    encoded; it is left alone and None is returned.
+    """
+    png = tile.with_name(tile.name.removesuffix(".webp") + ".png")
+    st = os.stat(tile)
+    try:
+        png_mtime: Optional[int] = int(os.stat(png).st_mtime)
+    except FileNotFoundError:
+        png_mtime = None
+    if png_mtime == int(st.st_mtime):
+        return png
+    if png_mtime is not None and png_mtime > int(st.st_mtime):
+        return None
+    _write_tile_sync(png, transcode_to_png_sync(tile), st)
+    if os.geteuid() == 0:
+        # mcmap renders as the data dir's owner and must be able to replace it.
+        os.chown(png, st.st_uid, st.st_gid)
+    return png
+
+
+async def png_fallback(tile: Path) -> Optional[Path]:
+    return await asyncio.to_thread(png_fallback_sync, tile)
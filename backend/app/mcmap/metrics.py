@@ -0,0 +1,89 @@
+"""Per-invocation resource metrics for mcmap subprocesses.
+
+Every mcmap run goes through ``runner.run_mcmap``, which reaps the child with
+``os.wait4`` and records one ``MCMapInvocation``: wall time, user and system
+CPU time, peak RSS and the volume of JSON events read from stdout. The
+recorder keeps the last ``RECENT_INVOCATIONS`` runs and running totals per
+subcommand, served by ``GET /system/mcmap-metrics`` so it's visible which map
+operations (renders, prune scans, extractions, ...) dominate host load.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+RECENT_INVOCATIONS = 200
+
+
+class MCMapInvocation(BaseModel):
+    subcommand: str
+    started_at: datetime
+    wall_seconds: float
+    user_cpu_seconds: Optional[float] = None
+    system_cpu_seconds: Optional[float] = None
+    peak_rss_bytes: Optional[int] = None
+    event_count: int
+    event_bytes: int
+    returncode: Optional[int] = None
+
+
+class MCMapSubcommandStats(BaseModel):
+    subcommand: str
+    invocations: int = 0
+    failures: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_bytes: int = 0
+    event_bytes: int = 0
+
+
+class MCMapMetrics(BaseModel):
+    subcommands: list[MCMapSubcommandStats]
+    recent: list[MCMapInvocation]
+
+
+class MCMapMetricsRecorder:
+    def __init__(self, recent: int = RECENT_INVOCATIONS) -> None:
+        self._recent: deque[MCMapInvocation] = deque(maxlen=recent)
+        self._totals: dict[str, MCMapSubcommandStats] = {}
+
+    def record(self, invocation: MCMapInvocation) -> None:
+        self._recent.append(invocation)
+        stats = self._totals.setdefault(
+            invocation.subcommand,
+            MCMapSubcommandStats(subcommand=invocation.subcommand),
+        )
+        stats.invocations += 1
+        # Negative codes are signals, mostly our own terminate() after the
+        # result event; only real non-zero exits count as failures.
+        if invocation.returncode is not None and invocation.returncode > 0:
+            stats.failures += 1
+        stats.wall_seconds += invocation.wall_seconds
+        stats.cpu_seconds += (invocation.user_cpu_seconds or 0.0) + (
+            invocation.system_cpu_seconds or 0.0
+        )
+        stats.peak_rss_bytes = max(stats.peak_rss_bytes, invocation.peak_rss_bytes or 0)
+        stats.event_bytes += invocation.event_bytes
+
+    def snapshot(self) -> MCMapMetrics:
+        """Totals ordered by CPU time, heaviest first, and the recent runs."""
+        return MCMapMetrics(
+            subcommands=[
+                stats.model_copy()
+                for stats in sorted(
+                    self._totals.values(), key=lambda s: s.cpu_seconds, reverse=True
+                )
+            ],
+            recent=list(self._recent),
+        )
+
+    def reset(self) -> None:
+        self._recent.clear()
+        self._totals.clear()
+
+
+mcmap_metrics = MCMapMetricsRecorder()
@@ -1,6 +1,12 @@
+import asyncio
 import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 import aiofiles
 import aiofiles.os as aioos
@@ -9,12 +15,67 @@ from ..minecraft.properties import read_level_name
 from ..utils import async_fs
 from .cache import ServerMapCache
 
+# (path, size, mtime_ns) -> sha256; jars are only re-read when they change.
+# LRU-bounded: every jar update adds a key and the old one is never looked
+# up again. Digests are computed in worker threads, hence the lock.
+JAR_DIGEST_MEMO_SIZE = 1024
+_jar_digest_memo: OrderedDict[Tuple[str, int, int], str] = OrderedDict()
+_jar_digest_lock = threading.Lock()
+_FLATTENED_VERSION_RE = re.compile(r"^1\.(\d+)(?:\.\d+)?$")
+FLATTENING_MINOR = 13
+
+
+class PaletteMergeError(ValueError):
+    """A partial palette is not a block -> colour object and cannot be merged."""
+
+
+def _jar_digest_sync(path: Path) -> str:
+    st = os.stat(path)
+    key = (str(path), st.st_size, st.st_mtime_ns)
+    with _jar_digest_lock:
+        digest = _jar_digest_memo.get(key)
+        if digest is not None:
+            _jar_digest_memo.move_to_end(key)
+            return digest
+    with open(path, "rb") as f:
+        digest = hashlib.file_digest(f, "sha256").hexdigest()
+    with _jar_digest_lock:
+        _jar_digest_memo[key] = digest
+        while len(_jar_digest_memo) > JAR_DIGEST_MEMO_SIZE:
+            _jar_digest_memo.popitem(last=False)
+    return digest
+
+
+async def jar_digest(path: Path) -> str:
+    return await asyncio.to_thread(_jar_digest_sync, path)
+
+
+async def list_mod_jars(mods_dir: Optional[Path]) -> List[Path]:
+    if mods_dir is None or not await aioos.path.isdir(mods_dir):
+        return []
+    entries = await async_fs.iterdir(mods_dir)
+    return sorted((p for p in entries if p.suffix == ".jar"), key=lambda p: p.name)
+
+
+async def mod_jar_digests(mods_dir: Optional[Path]) -> List[Tuple[Path, str]]:
+    """``(jar, sha256)`` for every mod jar, sorted by file name."""
+    jars = await list_mod_jars(mods_dir)
+    return await asyncio.to_thread(
+        lambda: [(jar, _jar_digest_sync(jar)) for jar in jars]
+    )
+
+
+def mods_set_digest(jars: List[Tuple[Path, str]]) -> str:
+    """Content digest of a whole mod set, independent of file names."""
+    return hashlib.sha256(
+        "\n".join(sorted(digest for _, digest in jars)).encode()
+    ).hexdigest()
+
 
 async def compute_palette_hash(version: str, mods_dir: Optional[Path]) -> str:
     parts = [version]
-    if mods_dir is not None and await aioos.path.isdir(mods_dir):
-        entries = await async_fs.iterdir(mods_dir)
-        parts.extend(sorted(p.name for p in entries if p.suffix == ".jar"))
+    for jar, digest in await mod_jar_digests(mods_dir):
+        parts.append(f"{jar.name}:{digest}")
     return hashlib.sha256("\n".join(parts).encode()).hexdigest()
 
 
@@ -40,6 +101,122 @@ async def write_palette_hash(
     await cache.chown_to_data_owner(cache.palette_hash_file)
 
 
+def supports_partial_palettes(version: str) -> bool:
+    """Whether per-jar palettes can be merged for ``version``.
+
+    Pre-1.13 palettes are built from the numeric block registry in
+    ``level.dat``, which spans the whole mod set; only flattened (1.13+)
+    palettes are keyed by namespaced block state and safe to merge.
+    """
+    if version.upper() in ("LATEST", "SNAPSHOT"):
+        return True
+    match = _FLATTENED_VERSION_RE.match(version)
+    return match is not None and int(match.group(1)) >= FLATTENING_MINOR
+
+
+def partial_palette_path(
+    cache: ServerMapCache,
+    client_digest: str,
+    jar_digest: Optional[str],
+    *,
+    mods_digest: Optional[str] = None,
+) -> Path:
+    """Partial palette for one mod jar (or the client alone when ``jar_digest`` is None).
+
+    Keyed by content, so renamed or re-downloaded jars reuse their partial,
+    and by the client jar, since mod models resolve vanilla parents from it.
+    A ``mods_digest`` names a linked partial: one generated with the whole
+    mods dir on the pack path because the jar alone left blocks unresolved
+    (addons reusing their parent mod's models/textures). Any jar in the set
+    may have supplied a parent, so the key covers the set as well.
+    """
+    name = "client" if jar_digest is None else jar_digest
+    if mods_digest is None:
+        return cache.palettes_dir / f"{client_digest[:16]}-{name}.json"
+    linked = f"{client_digest[:16]}-{name}-{mods_digest[:16]}.linked.json"
+    return cache.palettes_dir / linked
+
+
+def _load_partial_palette_sync(partial: Path) -> Dict[str, List[int]]:
+    """Parse and validate one partial: block id -> ``[r, g, b]`` or ``[r, g, b, a]``."""
+    with open(partial, "rb") as f:
+        try:
+            data = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise PaletteMergeError(f"{partial.name}: {e}") from e
+    if not isinstance(data, dict):
+        raise PaletteMergeError(f"{partial.name}: not a JSON object")
+    for block, colour in data.items():
+        if not (
+            isinstance(colour, list)
+            and len(colour) in (3, 4)
+            and all(
+                isinstance(c, int) and not isinstance(c, bool) and 0 <= c <= 255
+                for c in colour
+            )
+        ):
+            raise PaletteMergeError(f"{partial.name}: bad colour for {block!r}")
+    return data
+
+
+def _partial_palette_usable_sync(partial: Path) -> bool:
+    try:
+        _load_partial_palette_sync(partial)
+    except FileNotFoundError:
+        return False
+    except (OSError, PaletteMergeError):
+        # Corrupt (truncated write, disk error): drop it and re-extract.
+        try:
+            os.unlink(partial)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+async def partial_palette_usable(partial: Path) -> bool:
+    """Whether a cached partial exists and parses; a corrupt one is deleted."""
+    return await asyncio.to_thread(_partial_palette_usable_sync, partial)
+
+
+def merge_partial_palettes_sync(partials: List[Path], output: Path) -> int:
+    """Merge block -> colour objects in order (later wins) into ``output``.
+
+    Returns the merged entry count. Raises ``PaletteMergeError`` when any
+    partial is not a valid block -> colour object so the caller can fall
+    back to a full build.
+    """
+    merged: Dict[str, List[int]] = {}
+    for partial in partials:
+        merged.update(_load_partial_palette_sync(partial))
+    tmp = output.with_name(f".{output.name}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(merged, f, separators=(",", ":"))
+    os.replace(tmp, output)
+    return len(merged)
+
+
+async def merge_partial_palettes(partials: List[Path], output: Path) -> int:
+    return await asyncio.to_thread(merge_partial_palettes_sync, partials, output)
+
+
+async def prune_partial_palettes(cache: ServerMapCache, keep: List[Path]) -> int:
+    """Delete partials no longer referenced by the current client + mod set."""
+    if not await aioos.path.isdir(cache.palettes_dir):
+        return 0
+    wanted = set(keep)
+    removed = 0
+    for child in await async_fs.iterdir(cache.palettes_dir):
+        if child in wanted:
+            continue
+        try:
+            await aioos.unlink(child)
+            removed += 1
+        except OSError:
+            continue
+    return removed
+
+
 async def discover_mods_dir(data_path: Path) -> Optional[Path]:
     mods = data_path / "mods"
     if not await aioos.path.isdir(mods):
@@ -5,19 +5,25 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+import aiofiles.os as aioos
+
 from ..dynamic_config import config
+from ..dynamic_config.configs.mcmap import TileFormat
 from ..logger import logger
-from . import runner
+from . import encoding, runner
 from .cache import ServerMapCache
 from .events import (
     MCMAP_RENDER_EVENT_ADAPTER,
     MCMapErrorEvent,
     MCMapRenderRegionEvent,
 )
+from .quota import tile_cache_quota
 from .types import MCMapError
 
 WORKER_IDLE_TIMEOUT_SECONDS = 60.0
 BATCH_COLLECT_TIMEOUT_SECONDS = 0.01
+# Progress and the final result don't resolve any tile.
+RENDER_EVENT_TYPES = ("region", "error")
 
 Key = Tuple[int, int]
 
@@ -37,14 +43,23 @@ class ServerRenderQueue:
     Coalesces duplicate (x, z) requests via refcount onto a shared Future,
     batches them per render invocation, and terminates the running mcmap
     subprocess if every consumer in the active batch has cancelled.
+
+    ``tile_format`` pins the stored tile encoding; ``None`` follows
+    ``config.mcmap.tile_format`` per batch. Non-PNG formats are encoded as
+    each region event arrives, and futures resolve to the encoded path.
     """
 
     def __init__(
-        self, server_name: str, region_path: str, cache: ServerMapCache
+        self,
+        server_name: str,
+        region_path: str,
+        cache: ServerMapCache,
+        tile_format: Optional[TileFormat] = None,
     ) -> None:
         self._server_name = server_name
         self._region_path = region_path
         self._cache = cache
+        self._tile_format: Optional[TileFormat] = tile_format
         self._pending: Dict[Key, _PendingRequest] = {}
         self._queue: asyncio.Queue[_PendingRequest] = asyncio.Queue()
         self._worker_task: Optional[asyncio.Task] = None
@@ -131,10 +146,17 @@ class ServerRenderQueue:
             if not live:
                 continue
 
-            await self._render_batch(live, cfg.thread_count)
+            fmt = self._tile_format or cfg.tile_format
+            await self._render_batch(
+                live, cfg.thread_count, fmt, cfg.tile_quantize_colors
+            )
 
     async def _render_batch(
-        self, batch: List[_PendingRequest], threads: int
+        self,
+        batch: List[_PendingRequest],
+        threads: int,
+        fmt: TileFormat = "png",
+        quantize_colors: int = 256,
     ) -> None:
         mcas = [
             self._cache.mca_path(self._region_path, p.x, p.z) for p in batch
@@ -152,7 +174,9 @@ class ServerRenderQueue:
                 owned_by=self._cache.data_path,
             ) as proc:
                 self._running_proc = proc
-                async for event in proc.events(MCMAP_RENDER_EVENT_ADAPTER):
+                async for event in proc.events(
+                    MCMAP_RENDER_EVENT_ADAPTER, types=RENDER_EVENT_TYPES
+                ):
                     if isinstance(event, MCMapErrorEvent):
                         raise MCMapError(event.message)
                     if not isinstance(event, MCMapRenderRegionEvent):
@@ -164,9 +188,19 @@ class ServerRenderQueue:
                     if pending is None or pending.future.done():
                         continue
                     if event.status == "rendered":
-                        pending.future.set_result(
-                            self._cache.png_path(self._region_path, *key)
-                        )
+                        try:
+                            tile = await self._encode(key, fmt, quantize_colors)
+                        except Exception as e:
+                            logger.warning(
+                                "mcmap: failed to encode tile %s as %s: %s",
+                                key,
+                                fmt,
+                                e,
+                            )
+                            pending.future.set_exception(MCMapError(str(e)))
+                            continue
+                        if not pending.future.done():
+                            pending.future.set_result(tile)
                     elif event.status == "missing":
                         pending.future.set_exception(
                             FileNotFoundError(f"region ({key[0]}, {key[1]}) missing")
@@ -198,3 +232,22 @@ class ServerRenderQueue:
                         f"render did not complete for ({p.x}, {p.z})"
                     )
                 )
+
+    async def _encode(
+        self, key: Key, fmt: TileFormat, quantize_colors: int
+    ) -> Path:
+        png = self._cache.png_path(self._region_path, *key)
+        if fmt == "png":
+            tile = png
+        else:
+            tile = self._cache.tile_path(self._region_path, *key, fmt)
+            await encoding.encode_tile(
+                png, tile, fmt, quantize_colors=quantize_colors
+            )
+            await self._cache.chown_to_data_owner(tile)
+        try:
+            st = await aioos.stat(tile)
+        except OSError:
+            return tile  # left for the next full rescan
+        tile_cache_quota.record_write(self._server_name, tile, st)
+        return tile
@@ -0,0 +1,315 @@
+"""Tile-cache disk budget: access tracking, hit counters, and LRU eviction.
+
+Tiles are regenerable, so the cache under ``data/.mcmap/tiles/`` is bounded
+by a per-server and a global byte budget. Recency is the file's atime,
+bumped explicitly on every serve (``os.utime`` works regardless of
+``noatime``/``relatime`` mounts) while the mtime — which the freshness check
+compares against the MCA — is left untouched.
+
+The per-tile index is built by one full scan per server and then kept up to
+date in memory: the render queue records each tile it writes, serving
+records the new atime, and eviction drops what it deletes. A server is
+rescanned only when the index has drifted from disk (eviction found a tile
+already gone, e.g. removed by restore invalidation) or has not been
+rescanned for ``FULL_RESCAN_INTERVAL_SECONDS``.
+"""
+
+import asyncio
+import heapq
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..dynamic_config import config
+from ..logger import logger
+from .cache import ServerMapCache
+from .types import TileCacheStatus
+
+MB = 1024 * 1024
+# Serving a tile bumps its atime at most this often; LRU ordering doesn't
+# need sub-minute precision and the utime is a metadata write.
+TOUCH_GRANULARITY_NS = 60 * 1_000_000_000
+EVICTION_BATCH_SIZE = 256
+# Safety net for deletions the index never hears about.
+FULL_RESCAN_INTERVAL_SECONDS = 24 * 3600
+
+# (atime_ns, size, path)
+TileEntry = Tuple[int, int, str]
+
+
+@dataclass
+class _ServerTileStats:
+    hits: int = 0
+    misses: int = 0
+    tiles: int = 0
+    bytes: int = 0
+    evicted_tiles: int = 0
+    evicted_bytes: int = 0
+    scanned_at: Optional[datetime] = None
+    drifted: bool = False
+    # path -> (atime_ns, size)
+    entries: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    def put(self, path: str, atime_ns: int, size: int) -> None:
+        old = self.entries.get(path)
+        if old is None:
+            self.tiles += 1
+        else:
+            self.bytes -= old[1]
+        self.entries[path] = (atime_ns, size)
+        self.bytes += size
+
+    def oldest_first(self) -> List[TileEntry]:
+        return sorted(
+            (atime, size, path) for path, (atime, size) in self.entries.items()
+        )
+
+
+def scan_tiles_sync(tiles_root: Path) -> List[TileEntry]:
+    """Every tile file under ``tiles_root``, oldest access first."""
+    entries: List[TileEntry] = []
+    stack = [str(tiles_root)]
+    while stack:
+        current = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    if entry.name.startswith("."):
+                        continue  # in-flight encoder temp file
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                entries.append((st.st_atime_ns, st.st_size, entry.path))
+    entries.sort()
+    return entries
+
+
+def _unlink_many_sync(paths: Iterable[str]) -> int:
+    """Delete ``paths``; return how many were already gone."""
+    missing = 0
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            missing += 1
+        except OSError as e:
+            logger.warning("tile cache: failed to evict %s: %s", path, e)
+    return missing
+
+
+class TileCacheQuota:
+    """Per-server tile stats plus the background eviction loop."""
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, _ServerTileStats] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _server(self, server_id: str) -> _ServerTileStats:
+        stats = self._stats.get(server_id)
+        if stats is None:
+            stats = self._stats[server_id] = _ServerTileStats()
+        return stats
+
+    def record_hit(self, server_id: str) -> None:
+        self._server(server_id).hits += 1
+
+    def record_miss(self, server_id: str) -> None:
+        self._server(server_id).misses += 1
+
+    def record_write(self, server_id: str, tile: Path, st: os.stat_result) -> None:
+        """Index a tile the render queue (or PNG fallback) just wrote.
+
+        Servers not scanned yet are skipped; their first scan picks it up.
+        """
+        stats = self._server(server_id)
+        if stats.scanned_at is None:
+            return
+        stats.put(str(tile), st.st_atime_ns, st.st_size)
+
+    async def touch(self, server_id: str, tile: Path, st: os.stat_result) -> None:
+        """Mark ``tile`` as just used, keeping its mtime intact."""
+        now = time.time_ns()
+        if now - st.st_atime_ns < TOUCH_GRANULARITY_NS:
+            return
+        try:
+            await asyncio.to_thread(os.utime, tile, ns=(now, st.st_mtime_ns))
+        except OSError as e:
+            logger.debug("tile cache: failed to touch %s: %s", tile, e)
+            return
+        stats = self._server(server_id)
+        if stats.scanned_at is not None:
+            stats.put(str(tile), now, st.st_size)
+
+    def _needs_scan(self, stats: _ServerTileStats) -> bool:
+        if stats.scanned_at is None or stats.drifted:
+            return True
+        age = (datetime.now(timezone.utc) - stats.scanned_at).total_seconds()
+        return age >= FULL_RESCAN_INTERVAL_SECONDS
+
+    async def scan(self, server_id: str, data_path: Path) -> _ServerTileStats:
+        tiles_root = ServerMapCache(data_path=data_path).cache_dir / "tiles"
+        entries = await asyncio.to_thread(scan_tiles_sync, tiles_root)
+        stats = self._server(server_id)
+        stats.entries = {path: (atime, size) for atime, size, path in entries}
+        stats.tiles = len(entries)
+        stats.bytes = sum(size for _, size, _ in entries)
+        stats.scanned_at = datetime.now(timezone.utc)
+        stats.drifted = False
+        return stats
+
+    async def status(self, server_id: str, data_path: Path) -> TileCacheStatus:
+        stats = self._server(server_id)
+        if stats.scanned_at is None:
+            await self.scan(server_id, data_path)
+        requests = stats.hits + stats.misses
+        budget_mb = config.mcmap.tile_cache_server_budget_mb
+        return TileCacheStatus(
+            tiles=stats.tiles,
+            bytes=stats.bytes,
+            hits=stats.hits,
+            misses=stats.misses,
+            hit_ratio=(stats.hits / requests) if requests else None,
+            budget_bytes=budget_mb * MB if budget_mb else None,
+            evicted_tiles=stats.evicted_tiles,
+            evicted_bytes=stats.evicted_bytes,
+            scanned_at=stats.scanned_at,
+        )
+
+    async def _evict(self, server_id: str, victims: List[TileEntry]) -> None:
+        stats = self._server(server_id)
+        for start in range(0, len(victims), EVICTION_BATCH_SIZE):
+            batch = victims[start : start + EVICTION_BATCH_SIZE]
+            missing = await asyncio.to_thread(
+                _unlink_many_sync, [p for _, _, p in batch]
+            )
+            if missing:
+                stats.drifted = True
+            for _, _, path in batch:
+                entry = stats.entries.pop(path, None)
+                if entry is None:
+                    continue
+                stats.evicted_tiles += 1
+                stats.evicted_bytes += entry[1]
+                stats.tiles -= 1
+                stats.bytes -= entry[1]
+
+    async def enforce(self, data_paths: Dict[str, Path]) -> int:
+        """Evict every server down to both budgets; return tiles evicted.
+
+        Only servers whose index is missing or has drifted are rescanned,
+        one at a time; deletions run in batches, so a large cache never
+        holds the event loop or a worker thread for long.
+        """
+        cfg = config.mcmap
+        server_budget = cfg.tile_cache_server_budget_mb * MB
+        global_budget = cfg.tile_cache_global_budget_mb * MB
+
+        for server_id in list(self._stats):
+            if server_id not in data_paths:
+                del self._stats[server_id]
+
+        evicted = 0
+        for server_id, data_path in data_paths.items():
+            stats = self._server(server_id)
+            if self._needs_scan(stats):
+                stats = await self.scan(server_id, data_path)
+            if server_budget and stats.bytes > server_budget:
+                excess = stats.bytes - server_budget
+                victims = _oldest_covering(stats.oldest_first(), excess)
+                await self._evict(server_id, victims)
+                evicted += len(victims)
+
+        total = sum(self._server(s).bytes for s in data_paths)
+        if global_budget and total > global_budget:
+            merged = heapq.merge(
+                *(
+                    [
+                        (*entry, server_id)
+                        for entry in self._server(server_id).oldest_first()
+                    ]
+                    for server_id in data_paths
+                )
+            )
+            excess = total - global_budget
+            victims_by_server: Dict[str, List[TileEntry]] = {}
+            for atime, size, path, server_id in merged:
+                if excess <= 0:
+                    break
+                victims_by_server.setdefault(server_id, []).append(
+                    (atime, size, path)
+                )
+                excess -= size
+            for server_id, victims in victims_by_server.items():
+                await self._evict(server_id, victims)
+                evicted += len(victims)
+
+        if evicted:
+            logger.info("tile cache: evicted %d tiles", evicted)
+        return evicted
+
+    async def _list_data_paths(self) -> Dict[str, Path]:
+        from ..minecraft import docker_mc_manager
+
+        names = await docker_mc_manager.get_all_server_names()
+        return {
+            name: docker_mc_manager.get_instance(name).get_data_path()
+            for name in names
+        }
+
+    async def eviction_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(config.mcmap.tile_cache_eviction_interval_seconds)
+                cfg = config.mcmap
+                if not (
+                    cfg.tile_cache_server_budget_mb or cfg.tile_cache_global_budget_mb
+                ):
+                    continue
+                await self.enforce(await self._list_data_paths())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("tile cache eviction: unexpected error; continuing")
+
+    def start(self) -> asyncio.Task:
+        if self._task is not None and not self._task.done():
+            return self._task
+        self._task = asyncio.create_task(self.eviction_loop())
+        return self._task
+
+    async def stop(self) -> None:
+        task = self._task
+        self._task = None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+def _oldest_covering(entries: List[TileEntry], excess: int) -> List[TileEntry]:
+    """Shortest oldest-first prefix of ``entries`` whose sizes sum to ``excess``."""
+    victims: List[TileEntry] = []
+    for entry in entries:
+        if excess <= 0:
+            break
+        victims.append(entry)
+        excess -= entry[1]
+    return victims
+
+
+tile_cache_quota = TileCacheQuota()
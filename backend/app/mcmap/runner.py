@@ -1,8 +1,31 @@
+"""Spawning mcmap subcommands.
+
+Every subcommand (render, palette, prune, extractions, ...) goes through
+``run_mcmap``:
+
+- ``--json`` plus the subcommand args, and ``--chown <uid>:<gid>`` of
+  ``owned_by`` when running as root. The owner is stat'ed once per path and
+  cached; data dirs don't change hands while the app runs
+  (``clear_chown_cache`` forgets them).
+- The child is spawned with ``subprocess.Popen`` and reaped with
+  ``os.wait4`` when its pidfd turns readable (or from a helper thread where
+  pidfds are unavailable), because asyncio's child watcher reaps with
+  ``waitpid`` and drops the resource usage.
+- When the context exits, the process is terminated if still running and an
+  ``MCMapInvocation`` (wall/CPU time, peak RSS, JSON event volume) is
+  recorded in ``metrics.mcmap_metrics``.
+"""
+
 import asyncio
 import os
+import signal
+import subprocess
+import threading
+import time
 from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, AsyncIterator, List, Literal, Optional, TypeVar
+from typing import Any, AsyncIterator, Collection, List, Literal, Optional, TypeVar
 
 import aiofiles.os as aioos
 from pydantic import TypeAdapter, ValidationError
@@ -14,36 +37,181 @@ from .events import (
     MCMapGenericEvent,
     MCMapProtocolError,
 )
+from .metrics import MCMapInvocation, mcmap_metrics
 
 TERMINATE_GRACE_SECONDS = 2.0
 MCMAP_STREAM_LIMIT_BYTES = 16 * 1024 * 1024
+MCMAP_READ_CHUNK_BYTES = 256 * 1024
 EventT = TypeVar("EventT")
 
+# mcmap serializes the tag first: {"type":"<name>",...}
+_TYPE_TAG_PREFIX = b'{"type":"'
+
+
+def event_type_tag(line: bytes) -> Optional[bytes]:
+    """The event's ``type`` if the line starts with it, else None (unknown)."""
+    if not line.startswith(_TYPE_TAG_PREFIX):
+        return None
+    end = line.find(b'"', len(_TYPE_TAG_PREFIX))
+    if end < 0:
+        return None
+    return line[len(_TYPE_TAG_PREFIX) : end]
+
+
+class _ReapedProcess:
+    """The parts of ``asyncio.subprocess.Process`` mcmap needs, reaped by us."""
+
+    def __init__(self, popen: subprocess.Popen) -> None:
+        self._popen = popen
+        self.pid = popen.pid
+        self.returncode: Optional[int] = None
+        self.rusage: Optional[Any] = None
+        self.stdout: Optional[asyncio.StreamReader] = None
+        self.stderr: Optional[asyncio.StreamReader] = None
+        self._transports: list[asyncio.BaseTransport] = []
+        self._loop = asyncio.get_running_loop()
+        self._exited: asyncio.Future[int] = self._loop.create_future()
+
+    @classmethod
+    async def spawn(cls, argv: List[str]) -> "_ReapedProcess":
+        popen = subprocess.Popen(
+            argv,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        proc = cls(popen)
+        proc._watch_exit()
+        assert popen.stdout is not None and popen.stderr is not None
+        proc.stdout = await proc._connect(popen.stdout)
+        proc.stderr = await proc._connect(popen.stderr)
+        return proc
+
+    async def _connect(self, pipe) -> asyncio.StreamReader:
+        reader = asyncio.StreamReader(limit=MCMAP_STREAM_LIMIT_BYTES, loop=self._loop)
+        transport, _ = await self._loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader, loop=self._loop), pipe
+        )
+        self._transports.append(transport)
+        return reader
+
+    def _watch_exit(self) -> None:
+        try:
+            pidfd = os.pidfd_open(self.pid)
+        except (AttributeError, OSError):
+            threading.Thread(
+                target=self._wait_in_thread, name=f"mcmap-wait-{self.pid}", daemon=True
+            ).start()
+            return
+
+        def on_exit() -> None:
+            self._loop.remove_reader(pidfd)
+            os.close(pidfd)
+            self._reaped(os.wait4(self.pid, 0))
+
+        self._loop.add_reader(pidfd, on_exit)
+
+    def _wait_in_thread(self) -> None:
+        result = os.wait4(self.pid, 0)
+        self._loop.call_soon_threadsafe(self._reaped, result)
+
+    def _reaped(self, result: tuple[int, int, Any]) -> None:
+        _, status, rusage = result
+        self.returncode = os.waitstatus_to_exitcode(status)
+        self.rusage = rusage
+        # Popen must never waitpid() this pid again: it may be reused by now.
+        self._popen.returncode = self.returncode
+        if not self._exited.done():
+            self._exited.set_result(self.returncode)
+
+    async def wait(self) -> int:
+        return await asyncio.shield(self._exited)
+
+    def terminate(self) -> None:
+        self._send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self._send_signal(signal.SIGKILL)
+
+    def _send_signal(self, sig: int) -> None:
+        if self.returncode is not None:
+            raise ProcessLookupError(self.pid)
+        os.kill(self.pid, sig)
+
+    def close_pipes(self) -> None:
+        for transport in self._transports:
+            transport.close()
+
 
 class MCMapProcess:
-    def __init__(self, proc: asyncio.subprocess.Process):
+    def __init__(self, proc: _ReapedProcess):
         self._proc = proc
         self._terminated = False
+        self.event_count = 0
+        self.event_bytes = 0
 
     def __aiter__(self) -> AsyncIterator[MCMapGenericEvent]:
         return self.events(MCMAP_GENERIC_EVENT_ADAPTER)
 
-    def events(self, adapter: TypeAdapter[EventT]) -> AsyncIterator[EventT]:
-        return self._read_events(adapter)
+    def events(
+        self,
+        adapter: TypeAdapter[EventT],
+        types: Optional[Collection[str]] = None,
+    ) -> AsyncIterator[EventT]:
+        """Validated events; with ``types``, other event types are skipped unparsed."""
+        return self._read_events(adapter, types)
 
     async def _read_events(
-        self, adapter: TypeAdapter[EventT]
+        self, adapter: TypeAdapter[EventT], types: Optional[Collection[str]]
     ) -> AsyncIterator[EventT]:
+        wanted = None if types is None else {t.encode() for t in types}
+        async for lines in self._read_line_batches():
+            for raw in lines:
+                line = raw.strip()
+                if not line:
+                    continue
+                self.event_count += 1
+                if wanted is not None:
+                    tag = event_type_tag(line)
+                    if tag is not None and tag not in wanted:
+                        continue
+                try:
+                    event = adapter.validate_json(line)
+                except ValidationError as e:
+                    logger.warning("mcmap: invalid JSON event: %r (%s)", line, e)
+                    raise MCMapProtocolError(
+                        "mcmap emitted an invalid JSON event"
+                    ) from e
+                yield event
+
+    async def _read_line_batches(self) -> AsyncIterator[list[bytes]]:
+        """Complete stdout lines, a batch per ``MCMAP_READ_CHUNK_BYTES`` read."""
         assert self._proc.stdout is not None
-        async for raw in self._proc.stdout:
-            line = raw.strip()
-            if not line:
+        # Pieces of a line longer than one read, joined once it completes.
+        partial: list[bytes] = []
+        partial_bytes = 0
+        while True:
+            chunk = await self._proc.stdout.read(MCMAP_READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            self.event_bytes += len(chunk)
+            end = chunk.rfind(b"\n")
+            if end < 0:
+                partial.append(chunk)
+                partial_bytes += len(chunk)
+                if partial_bytes > MCMAP_STREAM_LIMIT_BYTES:
+                    raise MCMapProtocolError("mcmap emitted an oversized JSON event")
                 continue
-            try:
-                yield adapter.validate_json(line)
-            except ValidationError as e:
-                logger.warning("mcmap: invalid JSON event: %r (%s)", line, e)
-                raise MCMapProtocolError("mcmap emitted an invalid JSON event") from e
+            head = chunk[:end]
+            if partial:
+                partial.append(head)
+                head = b"".join(partial)
+            partial = [chunk[end + 1 :]]
+            partial_bytes = len(partial[0])
+            yield head.split(b"\n")
+        tail = b"".join(partial)
+        if tail:
+            yield [tail]
 
     async def terminate(self) -> None:
         if self._terminated or self._proc.returncode is not None:
@@ -73,9 +241,19 @@ class MCMapProcess:
         return self._proc.returncode
 
 
+_chown_args_cache: dict[Path, List[str]] = {}
+
+
+def clear_chown_cache() -> None:
+    _chown_args_cache.clear()
+
+
 async def _chown_args_for(owned_by: Path) -> List[str]:
     if os.geteuid() != 0:
         return []
+    cached = _chown_args_cache.get(owned_by)
+    if cached is not None:
+        return cached
     try:
         st = await aioos.stat(owned_by)
     except FileNotFoundError:
@@ -83,35 +261,74 @@ async def _chown_args_for(owned_by: Path) -> List[str]:
             "mcmap: owned_by path %s does not exist; skipping --chown", owned_by
         )
         return []
-    return ["--chown", f"{st.st_uid}:{st.st_gid}"]
-
-
-async def _spawn(args: List[str], owned_by: Path) -> asyncio.subprocess.Process:
-    full_args: List[str] = ["--json", *args, *await _chown_args_for(owned_by)]
-    return await asyncio.create_subprocess_exec(
-        str(settings.mcmap_binary_path),
-        *full_args,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-        limit=MCMAP_STREAM_LIMIT_BYTES,
+    args = ["--chown", f"{st.st_uid}:{st.st_gid}"]
+    _chown_args_cache[owned_by] = args
+    return args
+
+
+def _record_invocation(
+    subcommand: str,
+    started_at: datetime,
+    wall_seconds: float,
+    proc: _ReapedProcess,
+    wrapper: MCMapProcess,
+) -> None:
+    rusage = proc.rusage
+    invocation = MCMapInvocation(
+        subcommand=subcommand,
+        started_at=started_at,
+        wall_seconds=wall_seconds,
+        user_cpu_seconds=rusage.ru_utime if rusage is not None else None,
+        system_cpu_seconds=rusage.ru_stime if rusage is not None else None,
+        # ru_maxrss is in KiB on Linux.
+        peak_rss_bytes=rusage.ru_maxrss * 1024 if rusage is not None else None,
+        event_count=wrapper.event_count,
+        event_bytes=wrapper.event_bytes,
+        returncode=proc.returncode,
+    )
+    mcmap_metrics.record(invocation)
+    logger.debug(
+        "mcmap %s: %.2fs wall, %.2fs cpu, %s bytes peak RSS, %d events (%d bytes)",
+        subcommand,
+        wall_seconds,
+        (invocation.user_cpu_seconds or 0.0) + (invocation.system_cpu_seconds or 0.0),
+        invocation.peak_rss_bytes,
+        invocation.event_count,
+        invocation.event_bytes,
     )
 
 
 @asynccontextmanager
-async def _run(args: List[str], owned_by: Path) -> AsyncIterator[MCMapProcess]:
-    proc = await _spawn(args, owned_by=owned_by)
+async def run_mcmap(args: List[str], owned_by: Path) -> AsyncIterator[MCMapProcess]:
+    """Run ``mcmap --json <args>``; terminated and recorded on exit."""
+    argv = [
+        str(settings.mcmap_binary_path),
+        "--json",
+        *args,
+        *await _chown_args_for(owned_by),
+    ]
+    started_at = datetime.now(timezone.utc)
+    started = time.monotonic()
+    proc = await _ReapedProcess.spawn(argv)
     wrapper = MCMapProcess(proc)
     try:
         yield wrapper
     finally:
-        await wrapper.terminate()
+        try:
+            await wrapper.terminate()
+            await proc.wait()
+        finally:
+            proc.close_pipes()
+            _record_invocation(
+                args[0], started_at, time.monotonic() - started, proc, wrapper
+            )
 
 
 @asynccontextmanager
 async def download_client(
     version: str, target: Path, *, owned_by: Path
 ) -> AsyncIterator[MCMapProcess]:
-    async with _run(["download-client", version, str(target)], owned_by) as p:
+    async with run_mcmap(["download-client", version, str(target)], owned_by) as p:
         yield p
 
 
@@ -128,7 +345,7 @@ async def gen_palette(
         args.extend(["--level-dat", str(level_dat)])
     for pack in packs:
         args.extend(["-p", str(pack)])
-    async with _run(args, owned_by) as p:
+    async with run_mcmap(args, owned_by) as p:
         yield p
 
 
@@ -154,7 +371,7 @@ async def render(
     ]
     for mca in mcas:
         args.extend(["-r", str(mca)])
-    async with _run(args, owned_by) as p:
+    async with run_mcmap(args, owned_by) as p:
         yield p
 
 
@@ -181,7 +398,7 @@ async def replace_chunks(
         "-c",
         _serialize_chunks(chunks),
     ]
-    async with _run(args, owned_by) as p:
+    async with run_mcmap(args, owned_by) as p:
         yield p
 
 
@@ -201,7 +418,7 @@ async def remove_chunks(
         "-c",
         _serialize_chunks(chunks),
     ]
-    async with _run(args, owned_by) as p:
+    async with run_mcmap(args, owned_by) as p:
         yield p
 
 
@@ -227,7 +444,7 @@ async def prune_inhabited(
         args.append("--dry-run")
     if exclude_ftb_claims is not None:
         args.extend(["--exclude-ftb-claims", str(exclude_ftb_claims)])
-    async with _run(args, owned_by) as p:
+    async with run_mcmap(args, owned_by) as p:
         yield p
 
 
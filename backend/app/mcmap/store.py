@@ -0,0 +1,82 @@
+"""Cross-server store for map prerequisites.
+
+``client.jar`` depends only on the game version and, from 1.13 on,
+``palette.json`` only on the palette fingerprint (version + mod jar
+contents), so servers sharing a version or modpack can share one copy.
+Pre-1.13 palettes also depend on the world's numeric block registry in
+``level.dat`` and are never shared. The store lives at
+``settings.mcmap_store_path``:
+
+    clients/<version>.jar
+    palettes/<palette hash>.json
+
+Artifacts are hard-linked into each server's ``.mcmap/`` when the store and
+the server data are on the same filesystem, and copied otherwise. Both are
+only ever replaced by rename (never rewritten in place), and published
+files are made read-only (``STORE_FILE_MODE``) so that a writer opening a
+linked copy in place — mcmap runs as the data owner — fails instead of
+corrupting every other server's copy.
+"""
+
+import re
+from pathlib import Path
+from typing import Optional
+
+import aiofiles.os as aioos
+
+from ..config import settings
+from ..logger import logger
+from ..utils import async_fs
+from .palette import supports_partial_palettes
+
+_SAFE_VERSION_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+# Resolved by mcmap at download time and move over time, so never shared.
+_MOVING_VERSIONS = frozenset({"LATEST", "SNAPSHOT"})
+STORE_FILE_MODE = 0o444
+
+
+class SharedArtifactStore:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def client_jar_path(self, version: str) -> Optional[Path]:
+        """Store path for ``version``'s client jar, or None if it can't be shared."""
+        if version.upper() in _MOVING_VERSIONS or not _SAFE_VERSION_RE.match(version):
+            return None
+        return self.root / "clients" / f"{version}.jar"
+
+    def palette_path(self, version: str, palette_hash: str) -> Optional[Path]:
+        """Store path for a palette, or None if it can't be shared."""
+        if version.upper() in _MOVING_VERSIONS or not supports_partial_palettes(
+            version
+        ):
+            return None
+        return self.root / "palettes" / f"{palette_hash}.json"
+
+    async def fetch(self, stored: Optional[Path], target: Path) -> Optional[bool]:
+        """Materialise ``stored`` at ``target``.
+
+        Returns None when the store has no such artifact (or fetching
+        failed), otherwise whether ``target`` is a hard link into the store.
+        """
+        if stored is None or not await aioos.path.isfile(stored):
+            return None
+        try:
+            return await async_fs.link_or_copy(stored, target)
+        except OSError as e:
+            logger.warning("mcmap store: failed to fetch %s: %s", stored, e)
+            return None
+
+    async def publish(self, source: Path, stored: Optional[Path]) -> None:
+        """Make ``source`` available to other servers; failures only log."""
+        if stored is None:
+            return
+        try:
+            await async_fs.link_or_copy(source, stored)
+            # A hard link shares the inode, so this covers ``source`` too.
+            await async_fs.chmod(stored, STORE_FILE_MODE)
+        except OSError as e:
+            logger.warning("mcmap store: failed to publish %s: %s", source, e)
+
+
+shared_store = SharedArtifactStore(settings.mcmap_store_path)
@@ -1,10 +1,25 @@
 """Pydantic models for the mcmap module."""
 
+from datetime import datetime
 from typing import Literal, Optional
 
 from pydantic import BaseModel
 
 
+class TileCacheStatus(BaseModel):
+    """Tile-cache size (as of the last scan) and in-process hit counters."""
+
+    tiles: int
+    bytes: int
+    hits: int
+    misses: int
+    hit_ratio: Optional[float] = None
+    budget_bytes: Optional[int] = None
+    evicted_tiles: int = 0
+    evicted_bytes: int = 0
+    scanned_at: Optional[datetime] = None
+
+
 class MapStatus(BaseModel):
     """Per-server map initialization state."""
 
@@ -12,6 +27,7 @@ class MapStatus(BaseModel):
     palette_present: bool
     palette_current: bool
     version: Optional[str] = None
+    tile_cache: Optional[TileCacheStatus] = None
 
 
 class InitEvent(BaseModel):
@@ -32,6 +48,7 @@ class InitEvent(BaseModel):
     percent: Optional[float] = None
     message: Optional[str] = None
     cached: Optional[bool] = None
+    shared: Optional[bool] = None
 
 
 class MCMapError(Exception):
@@ -1,8 +1,11 @@
 import asyncio
+import json
 import re
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable
 
 import aiofiles
 import aiofiles.os as aioos
@@ -25,8 +28,13 @@ from .docker.compose_file import ComposeFile
 from .docker.manager import ComposeManager
 from .docker.network import NetworkStats, read_container_network_stats
 from .properties import ServerProperties
+from .rcon import RconClient, RconError
 
 ANSI_ESCAPE_PATTERN = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+# ``save-all flush`` replies only once every dirty chunk is on disk.
+SAVE_FLUSH_TIMEOUT_SECONDS = 300
+# The RCON port inside the container; compose publishes it elsewhere.
+RCON_CONTAINER_PORT = 25575
 
 
 class MCServerStatus(str, Enum):
@@ -381,6 +389,125 @@ class MCInstance:
         result = await self._compose_manager.exec("mc", "rcon-cli", command)
         return ANSI_ESCAPE_PATTERN.sub("", result).strip()
 
+    async def get_container_addresses(self) -> list[str]:
+        """IP addresses of the ``mc`` container, one per Docker network it is on."""
+        container_id = await self.get_container_id()
+        output = await exec_command(
+            "docker",
+            "inspect",
+            "--format",
+            "{{json .NetworkSettings.Networks}}",
+            container_id,
+        )
+        networks = json.loads(output) or {}
+        return [
+            network["IPAddress"]
+            for network in networks.values()
+            if network.get("IPAddress")
+        ]
+
+    async def open_rcon(self, *, timeout: float = 5.0) -> RconClient:
+        """Open a persistent RCON connection to the server container.
+
+        Tries the container's own addresses on the container-side
+        ``rcon.port`` first, which works from the host and from a backend
+        container sharing a network with it, then the compose-published port
+        on loopback for a backend running on the host.
+
+        Raises ``RuntimeError`` when RCON is disabled or has no password, and
+        ``RconError`` when no address connects and authenticates.
+        """
+        server_properties = await self.get_server_properties()
+        if server_properties.enable_rcon is False:
+            raise RuntimeError("RCON is not enabled in server.properties")
+        if not server_properties.rcon_password:
+            raise RuntimeError("RCON password is not configured in server.properties")
+        container_port = server_properties.rcon_port or RCON_CONTAINER_PORT
+        try:
+            addresses = await self.get_container_addresses()
+        except (RuntimeError, ValueError) as e:
+            logger.debug(f"Could not inspect container of server {self._name}: {e}")
+            addresses = []
+        candidates = [(address, container_port) for address in addresses]
+        candidates.append(("127.0.0.1", (await self.get_compose_obj()).get_rcon_port()))
+        errors: list[str] = []
+        for host, port in candidates:
+            client = RconClient(
+                host, port, server_properties.rcon_password, timeout=timeout
+            )
+            try:
+                await client.connect()
+            except RconError as e:
+                errors.append(str(e))
+                continue
+            return client
+        raise RconError("; ".join(errors))
+
+    @asynccontextmanager
+    async def saves_flushed(self) -> AsyncIterator[bool]:
+        """Pause autosave and flush the world so a backup sees consistent region files.
+
+        ``save-off``, ``save-all flush`` and ``save-on`` go over one RCON
+        connection from ``open_rcon``; if that can't be opened they fall back
+        to ``rcon-cli`` in the container.
+
+        Yields ``True`` while ``save-off`` is in effect; ``False`` when the
+        server isn't healthy or RCON failed, in which case the caller gets a
+        best-effort copy as before. ``save-on`` is always sent afterwards
+        once ``save-off`` succeeded.
+        """
+        if not await self.healthy():
+            yield False
+            return
+        client: RconClient | None = None
+        send: Callable[[str], Awaitable[str]] = self.send_command_rcon
+        try:
+            client = await self.open_rcon()
+            # save-all flush blocks until every region is written.
+            client.timeout = SAVE_FLUSH_TIMEOUT_SECONDS
+            send = client.command
+        except Exception as e:
+            logger.debug(f"RCON unavailable for server {self._name}, using rcon-cli: {e}")
+
+        try:
+            paused = False
+            try:
+                await send("save-off")
+                paused = True
+            except Exception as e:
+                logger.warning(f"save-off failed for server {self._name}: {e}")
+            if not paused:
+                yield False
+                return
+
+            try:
+                try:
+                    await asyncio.wait_for(
+                        send("save-all flush"), timeout=SAVE_FLUSH_TIMEOUT_SECONDS
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"save-all flush failed for server {self._name}: {e}"
+                    )
+                yield True
+            finally:
+                try:
+                    await send("save-on")
+                except Exception as e:
+                    if client is None:
+                        logger.error(f"save-on failed for server {self._name}: {e}")
+                    else:
+                        # The connection may have dropped during the backup.
+                        try:
+                            await self.send_command_rcon("save-on")
+                        except Exception as retry_error:
+                            logger.error(
+                                f"save-on failed for server {self._name}: {retry_error}"
+                            )
+        finally:
+            if client is not None:
+                await client.close()
+
     async def get_container_id(self) -> str:
         if not await self.created():
             raise RuntimeError(f"Server {self._name} is not created")
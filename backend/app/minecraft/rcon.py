@@ -0,0 +1,119 @@
+"""Minimal asyncio client for the Source RCON protocol spoken by Minecraft.
+
+``MCInstance.send_command_rcon`` execs ``rcon-cli`` in the container, which
+costs a process and a TCP handshake per command. Pollers that send many
+small commands keep one ``RconClient`` connected to the published RCON port
+instead. Commands on one client are serialized; the server answers them in
+order with a single response packet each. Responses longer than one packet
+(4096 bytes) are split by the server and only the first part is returned,
+which is fine for the short ``data get`` / ``list`` replies this is used for.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import struct
+from typing import Optional
+
+SERVERDATA_AUTH = 3
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_RESPONSE_VALUE = 0
+
+_HEADER = struct.Struct("<iii")
+_AUTH_FAILED_ID = -1
+
+
+class RconError(Exception):
+    pass
+
+
+def encode_packet(request_id: int, packet_type: int, body: str) -> bytes:
+    payload = body.encode("utf-8") + b"\x00\x00"
+    return _HEADER.pack(8 + len(payload), request_id, packet_type) + payload
+
+
+class RconClient:
+    def __init__(
+        self, host: str, port: int, password: str, *, timeout: float = 5.0
+    ) -> None:
+        self.host = host
+        self.port = port
+        self._password = password
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+        self._next_id = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._writer is None
+
+    async def connect(self) -> None:
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise RconError(f"cannot connect to {self.host}:{self.port}: {e}") from e
+        async with self._lock:
+            request_id, _ = await self._exchange(SERVERDATA_AUTH, self._password)
+        if request_id == _AUTH_FAILED_ID:
+            await self.close()
+            raise RconError("RCON authentication failed")
+
+    async def command(self, command: str) -> str:
+        if self.closed:
+            raise RconError("RCON connection is closed")
+        async with self._lock:
+            _, body = await self._exchange(SERVERDATA_EXECCOMMAND, command)
+        return body
+
+    async def close(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    async def _exchange(self, packet_type: int, body: str) -> tuple[int, str]:
+        """Send one packet and return ``(id, body)`` of the reply to it."""
+        assert self._reader is not None and self._writer is not None
+        self._next_id = self._next_id % 0x7FFFFFFF + 1
+        request_id = self._next_id
+        try:
+            self._writer.write(encode_packet(request_id, packet_type, body))
+            await self._writer.drain()
+            while True:
+                reply_id, reply_type, reply_body = await asyncio.wait_for(
+                    self._read_packet(), self.timeout
+                )
+                # Auth replies with an empty RESPONSE_VALUE first on some servers.
+                if (
+                    packet_type == SERVERDATA_AUTH
+                    and reply_type != SERVERDATA_AUTH_RESPONSE
+                ):
+                    continue
+                if reply_id in (request_id, _AUTH_FAILED_ID):
+                    return reply_id, reply_body
+        except (
+            OSError,
+            ValueError,
+            asyncio.IncompleteReadError,
+            asyncio.TimeoutError,
+        ) as e:
+            await self.close()
+            raise RconError(f"RCON exchange failed: {e!r}") from e
+
+    async def _read_packet(self) -> tuple[int, int, str]:
+        assert self._reader is not None
+        (length,) = struct.unpack("<i", await self._reader.readexactly(4))
+        if length < 10:
+            raise ValueError(f"malformed RCON packet length {length}")
+        data = await self._reader.readexactly(length)
+        request_id, packet_type = struct.unpack_from("<ii", data)
+        return request_id, packet_type, data[8:-2].decode("utf-8", "replace")
@@ -2,7 +2,9 @@ from .extract import (
     PlayerLocationExtractError,
     extract_player_locations_for_server,
     normalize_uuid,
+    player_locations_cache,
 )
+from .live import LivePositionPoller, live_position_poller, overlay_live_positions
 from .models import (
     PlayerIdKind,
     PlayerLocationDimensionEntry,
@@ -15,6 +17,7 @@ from .models import (
 )
 
 __all__ = [
+    "LivePositionPoller",
     "PlayerIdKind",
     "PlayerLocationDimensionEntry",
     "PlayerLocationEntry",
@@ -25,5 +28,8 @@ __all__ = [
     "PlayerSkipReason",
     "PlayerStorageKind",
     "extract_player_locations_for_server",
+    "live_position_poller",
     "normalize_uuid",
+    "overlay_live_positions",
+    "player_locations_cache",
 ]
@@ -0,0 +1,203 @@
+"""Incremental cache of extracted player locations.
+
+``mcmap extract-players`` parses every player file of the world, which on a
+server with tens of thousands of historical players is slow, and the map
+used to run it on every open. The cache keeps mcmap's records grouped by
+``source`` (the player file, relative to the world root) together with each
+tracked file's ``(mtime_ns, size)``. A lookup scans the player directories
+(``PLAYER_FILE_DIRS``) and:
+
+- returns the cached response when nothing changed (a directory scan only);
+- otherwise re-extracts just the new or changed files by running mcmap on a
+  scratch world under ``data/.mcmap/player-scan/`` holding hard links to them
+  at the same relative paths, and drops records of deleted files;
+- falls back to a full extraction on first use or when more than
+  ``FULL_EXTRACT_CHANGED_RATIO`` of the files changed.
+
+Records whose source is not a tracked file (e.g. a singleplayer position in
+``level.dat``) are only refreshed by full extractions. Dimensions reported by
+a scratch run are only added, never replace the full run's entries, since
+mcmap cannot see the real world's folders from the scratch dir.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import secrets
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from ..logger import logger
+from ..mcmap.cache import ServerMapCache
+from ..mcmap.events import (
+    MCMapDimensionEntry,
+    MCMapPlayerRecord,
+    MCMapPlayersPayload,
+    MCMapSkippedPlayerFile,
+)
+from ..utils import async_fs
+from ..world.layout import WorldRootPath
+from .models import PlayerLocationsResponse
+
+PLAYER_FILE_DIRS = ("playerdata", "players", "players/data")
+FULL_EXTRACT_CHANGED_RATIO = 0.5
+# Under data/.mcmap/ so scratch worlds hard-link player files instead of
+# copying them across filesystems.
+SCRATCH_DIR_NAME = "player-scan"
+
+CacheKey = tuple[Path, Path]
+# (mtime_ns, size) per player file relpath.
+FileStats = dict[str, tuple[int, int]]
+ExtractRunner = Callable[[Path, Path], Awaitable[MCMapPlayersPayload]]
+ResponseShaper = Callable[
+    [MCMapPlayersPayload, WorldRootPath, Path], PlayerLocationsResponse
+]
+
+
+def scan_player_files_sync(world_dir: Path) -> FileStats:
+    stats: FileStats = {}
+    for sub in PLAYER_FILE_DIRS:
+        try:
+            entries = list(os.scandir(world_dir / sub))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.name.endswith(".dat"):
+                continue
+            try:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            stats[f"{sub}/{entry.name}"] = (st.st_mtime_ns, st.st_size)
+    return stats
+
+
+@dataclass
+class _WorldPlayers:
+    version: int
+    files: FileStats
+    dimensions: dict[str, MCMapDimensionEntry]
+    players: dict[str, list[MCMapPlayerRecord]] = field(default_factory=dict)
+    skipped: dict[str, list[MCMapSkippedPlayerFile]] = field(default_factory=dict)
+    response: Optional[PlayerLocationsResponse] = None
+
+    def add(self, payload: MCMapPlayersPayload, sources: Optional[set[str]]) -> None:
+        """Merge ``payload`` records, keeping only ``sources`` unless None."""
+        for record in payload.players:
+            if sources is None or record.source in sources:
+                self.players.setdefault(record.source, []).append(record)
+        for skip in payload.skipped:
+            if sources is None or skip.source in sources:
+                self.skipped.setdefault(skip.source, []).append(skip)
+
+    def drop(self, sources: set[str]) -> None:
+        for source in sources:
+            self.players.pop(source, None)
+            self.skipped.pop(source, None)
+
+    def payload(self, world_dir: Path) -> MCMapPlayersPayload:
+        return MCMapPlayersPayload(
+            mcmap_extract_players_version=self.version,
+            world_dir=str(world_dir),
+            dimensions=list(self.dimensions.values()),
+            players=[r for records in self.players.values() for r in records],
+            skipped=[s for skips in self.skipped.values() for s in skips],
+        )
+
+
+class PlayerLocationsCache:
+    def __init__(
+        self,
+        run_extract: ExtractRunner,
+        shape_response: ResponseShaper,
+    ) -> None:
+        self._run_extract = run_extract
+        self._shape_response = shape_response
+        self._worlds: dict[CacheKey, _WorldPlayers] = {}
+        self._locks: dict[CacheKey, asyncio.Lock] = {}
+        self.hits = 0
+        self.full_extracts = 0
+        self.partial_extracts = 0
+
+    async def get(
+        self, data_path: Path, world_root: WorldRootPath
+    ) -> PlayerLocationsResponse:
+        key = (data_path, world_root.path)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            files = await asyncio.to_thread(scan_player_files_sync, world_root.path)
+            state = self._worlds.get(key)
+            if state is None:
+                state = await self._extract_full(data_path, world_root, files)
+            else:
+                changed = {rel for rel, st in files.items() if state.files.get(rel) != st}
+                removed = state.files.keys() - files.keys()
+                if not changed and not removed and state.response is not None:
+                    self.hits += 1
+                    return state.response
+                if len(changed) > len(files) * FULL_EXTRACT_CHANGED_RATIO:
+                    state = await self._extract_full(data_path, world_root, files)
+                else:
+                    await self._extract_changed(
+                        state, data_path, world_root, files, changed, removed
+                    )
+            self._worlds[key] = state
+            state.response = self._shape_response(
+                state.payload(world_root.path), world_root, data_path
+            )
+            return state.response
+
+    async def _extract_full(
+        self, data_path: Path, world_root: WorldRootPath, files: FileStats
+    ) -> _WorldPlayers:
+        self.full_extracts += 1
+        payload = await self._run_extract(world_root.path, data_path)
+        state = _WorldPlayers(
+            version=payload.mcmap_extract_players_version,
+            files=files,
+            dimensions={dim.id: dim for dim in payload.dimensions},
+        )
+        state.add(payload, None)
+        return state
+
+    async def _extract_changed(
+        self,
+        state: _WorldPlayers,
+        data_path: Path,
+        world_root: WorldRootPath,
+        files: FileStats,
+        changed: set[str],
+        removed: set[str],
+    ) -> None:
+        payload: Optional[MCMapPlayersPayload] = None
+        if changed:
+            self.partial_extracts += 1
+            payload = await self._extract_subset(data_path, world_root, changed)
+        state.drop(changed | removed)
+        if payload is not None:
+            state.add(payload, changed)
+            for dim in payload.dimensions:
+                state.dimensions.setdefault(dim.id, dim)
+        state.files = files
+
+    async def _extract_subset(
+        self, data_path: Path, world_root: WorldRootPath, relpaths: set[str]
+    ) -> MCMapPlayersPayload:
+        cache = ServerMapCache(data_path)
+        scratch_root = cache.cache_dir / SCRATCH_DIR_NAME
+        await cache.ensure_dir(scratch_root)
+        scratch = scratch_root / secrets.token_hex(8)
+        try:
+            # level.dat so mcmap sees a world; its records are filtered out.
+            for rel in sorted(relpaths | {"level.dat"}):
+                try:
+                    await async_fs.link_or_copy(world_root.path / rel, scratch / rel)
+                except FileNotFoundError:
+                    logger.debug("player-locations: %s vanished before linking", rel)
+            return await self._run_extract(scratch, data_path)
+        finally:
+            await async_fs.rmtree(scratch, ignore_errors=True)
@@ -17,6 +17,7 @@ from ..world.layout import (
     discover_world_root_paths,
     resolve_dimension_folder,
 )
+from .cache import PlayerLocationsCache
 from .models import (
     PlayerLocationDimensionEntry,
     PlayerLocationEntry,
@@ -136,6 +137,9 @@ def _shape_response(
     )
 
 
+player_locations_cache = PlayerLocationsCache(_run_extract, _shape_response)
+
+
 async def extract_player_locations_for_server(
     data_path: Path, world_root: Optional[WorldRootPath] = None
 ) -> PlayerLocationsResponse:
@@ -145,10 +149,9 @@ async def extract_player_locations_for_server(
     if world_root is None:
         return PlayerLocationsResponse()
     try:
-        data = await _run_extract(world_root.path, data_path)
+        return await player_locations_cache.get(data_path, world_root)
     except PlayerLocationExtractError:
         logger.exception(
             "player-locations: mcmap extract failed for world=%s", world_root.path
         )
         raise
-    return _shape_response(data, world_root, data_path)
@@ -0,0 +1,301 @@
+"""Live player positions from RCON polling.
+
+Saved player files only change on autosave, so the map's player markers lag
+minutes behind. When ``players.live_positions.enabled`` is set, the poller
+asks every server with online players (per the session table) for each
+player's ``Pos`` and ``Dimension`` with ``data get entity`` over one
+persistent ``RconClient`` per server, every ``poll_interval_seconds``.
+
+The latest positions are kept in memory and:
+
+- overlaid on ``PlayerLocationsResponse`` by ``overlay_live_positions``
+  (entries get ``live = True``; online players without a saved file are
+  appended with ``storage = "live"``);
+- published as a ``player_positions`` frame on the event WebSocket whenever
+  a server's snapshot changes, including the empty snapshot once its last
+  player leaves or polling stops.
+
+When the RCON port can't be reached — the backend container is not on the
+server's Docker network — the server is polled through ``rcon-cli`` in its
+container instead until it next goes offline. A failed command drops the
+connection; it is reopened on the next round. Failures are logged as a
+warning once per server until it polls successfully again. ``data get``
+needs 1.13+; older servers simply report no live positions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+from ..db.database import get_async_session
+from ..dynamic_config import config
+from ..events import EventPlayer, EventPlayerPosition, PlayerPositionsEvent, event_bus
+from ..logger import log_exception, logger
+from ..minecraft import docker_mc_manager
+from ..minecraft.rcon import RconClient, RconError
+from ..players.crud.query.session_query import (
+    OnlinePlayerLite,
+    get_online_players_grouped_by_server,
+)
+from .models import PlayerLocationEntry, PlayerLocationPosition, PlayerLocationsResponse
+
+RconConnector = Callable[[str, float], Awaitable[RconClient]]
+CommandSender = Callable[[str], Awaitable[str]]
+
+_NUMBER = r"(-?\d+(?:\.\d+)?(?:E-?\d+)?)"
+_POS_PATTERN = re.compile(rf"\[\s*{_NUMBER}d,\s*{_NUMBER}d,\s*{_NUMBER}d\s*\]")
+_DIMENSION_PATTERN = re.compile(r'entity data: "([^"]+)"')
+_LEGACY_DIMENSION_PATTERN = re.compile(r"entity data: (-?\d+)\s*$")
+# 1.13-1.15 store the dimension as an int.
+LEGACY_DIMENSION_IDS = {
+    0: "minecraft:overworld",
+    -1: "minecraft:the_nether",
+    1: "minecraft:the_end",
+}
+
+
+def parse_pos(body: str) -> Optional[tuple[float, float, float]]:
+    match = _POS_PATTERN.search(body)
+    if match is None:
+        return None
+    x, y, z = (float(v) for v in match.groups())
+    return x, y, z
+
+
+def parse_dimension(body: str) -> Optional[str]:
+    match = _DIMENSION_PATTERN.search(body)
+    if match is not None:
+        return match.group(1)
+    match = _LEGACY_DIMENSION_PATTERN.search(body)
+    if match is not None:
+        return LEGACY_DIMENSION_IDS.get(int(match.group(1)))
+    return None
+
+
+async def query_player_position(
+    send: CommandSender, player: OnlinePlayerLite
+) -> Optional[EventPlayerPosition]:
+    """Ask the server for one player's position; None when it has none."""
+    pos = parse_pos(await send(f"data get entity {player.name} Pos"))
+    if pos is None:
+        return None
+    dimension_id = parse_dimension(
+        await send(f"data get entity {player.name} Dimension")
+    )
+    if dimension_id is None:
+        return None
+    return EventPlayerPosition(
+        player=EventPlayer(
+            name=player.name, uuid=player.uuid, player_db_id=player.player_db_id
+        ),
+        dimension_id=dimension_id,
+        x=pos[0],
+        y=pos[1],
+        z=pos[2],
+    )
+
+
+async def _open_instance_rcon(server_id: str, timeout: float) -> RconClient:
+    instance = docker_mc_manager.get_instance(server_id)
+    return await instance.open_rcon(timeout=timeout)
+
+
+def _instance_rcon_cli(server_id: str) -> CommandSender:
+    return docker_mc_manager.get_instance(server_id).send_command_rcon
+
+
+class LivePositionPoller:
+    """Polls online players' positions over persistent RCON connections."""
+
+    def __init__(
+        self,
+        connect: RconConnector = _open_instance_rcon,
+        rcon_cli: Callable[[str], CommandSender] = _instance_rcon_cli,
+    ) -> None:
+        self._connect = connect
+        self._rcon_cli = rcon_cli
+        self._clients: dict[str, RconClient] = {}
+        # Servers whose RCON port was unreachable; polled via rcon-cli until
+        # they go offline.
+        self._via_rcon_cli: set[str] = set()
+        self._failing: set[str] = set()
+        self._positions: dict[str, list[EventPlayerPosition]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stop_flag = False
+
+    async def start(self) -> None:
+        logger.info("Starting live player-position poller...")
+        self._stop_flag = False
+        self._task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self) -> None:
+        logger.info("Stopping live player-position poller...")
+        self._stop_flag = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        await self._reset()
+
+    def positions(self, server_id: str) -> list[EventPlayerPosition]:
+        return list(self._positions.get(server_id, ()))
+
+    async def _poll_loop(self) -> None:
+        while not self._stop_flag:
+            settings = config.players.live_positions
+            if settings.enabled:
+                await self.poll_all()
+            else:
+                await self._reset()
+            await asyncio.sleep(settings.poll_interval_seconds)
+
+    @log_exception("Error polling live player positions: ")
+    async def poll_all(self) -> None:
+        async with get_async_session() as session:
+            online = await get_online_players_grouped_by_server(session)
+        for server_id in list(self._positions.keys() | self._clients.keys()):
+            if server_id not in online:
+                await self._drop_server(server_id)
+        # A server that went offline may come back with a reachable RCON port.
+        self._via_rcon_cli.intersection_update(online)
+        self._failing.intersection_update(online)
+        for server_id, players in online.items():
+            if self._stop_flag:
+                break
+            try:
+                await self.poll_server(server_id, players)
+            except Exception:
+                # One broken server must not stall the round for the rest.
+                logger.exception(f"Error polling live positions for {server_id}")
+                await self._drop_server(server_id)
+
+    async def poll_server(self, server_id: str, players: list[OnlinePlayerLite]) -> None:
+        timeout = config.players.live_positions.command_timeout_seconds
+        positions: list[EventPlayerPosition] = []
+        try:
+            send = await self._sender(server_id, timeout)
+            for player in players:
+                position = await query_player_position(send, player)
+                if position is not None:
+                    positions.append(position)
+        except (RconError, RuntimeError, ValueError, OSError) as e:
+            if server_id in self._failing:
+                logger.debug(f"Live positions still unavailable for {server_id}: {e}")
+            else:
+                logger.warning(f"Live positions unavailable for {server_id}: {e}")
+                self._failing.add(server_id)
+            await self._drop_server(server_id)
+            return
+        self._failing.discard(server_id)
+        self._update(server_id, positions)
+
+    async def _sender(self, server_id: str, timeout: float) -> CommandSender:
+        if server_id in self._via_rcon_cli:
+            return self._timed_rcon_cli(server_id, timeout)
+        client = self._clients.get(server_id)
+        if client is None or client.closed:
+            try:
+                client = await self._connect(server_id, timeout)
+            except RconError as e:
+                logger.warning(
+                    f"RCON unreachable for {server_id}, polling via rcon-cli: {e}"
+                )
+                self._via_rcon_cli.add(server_id)
+                return self._timed_rcon_cli(server_id, timeout)
+            self._clients[server_id] = client
+        return client.command
+
+    def _timed_rcon_cli(self, server_id: str, timeout: float) -> CommandSender:
+        send = self._rcon_cli(server_id)
+
+        async def command(command: str) -> str:
+            # TimeoutError is an OSError, so poll_server handles it like the others.
+            return await asyncio.wait_for(send(command), timeout)
+
+        return command
+
+    def _update(self, server_id: str, positions: list[EventPlayerPosition]) -> None:
+        if self._positions.get(server_id, []) == positions:
+            return
+        if positions:
+            self._positions[server_id] = positions
+        else:
+            self._positions.pop(server_id, None)
+        event_bus.publish(
+            PlayerPositionsEvent(
+                server_id=server_id,
+                timestamp=datetime.now(timezone.utc),
+                positions=positions,
+            )
+        )
+
+    async def _drop_server(self, server_id: str) -> None:
+        client = self._clients.pop(server_id, None)
+        if client is not None:
+            await client.close()
+        self._update(server_id, [])
+
+    async def _reset(self) -> None:
+        for server_id in list(self._positions.keys() | self._clients.keys()):
+            await self._drop_server(server_id)
+        self._via_rcon_cli.clear()
+        self._failing.clear()
+
+
+def overlay_live_positions(
+    response: PlayerLocationsResponse, positions: list[EventPlayerPosition]
+) -> PlayerLocationsResponse:
+    """Return a copy of ``response`` with saved positions replaced by live ones."""
+    if not positions:
+        return response
+    relpath_by_dim_id = {
+        dim.dimension_id: dim.region_dir_relpath for dim in response.dimensions
+    }
+    by_uuid = {p.player.uuid: p for p in positions}
+    by_name = {p.player.name.lower(): p for p in positions}
+    matched: set[str] = set()
+    players: list[PlayerLocationEntry] = []
+    for entry in response.players:
+        live = by_uuid.get(entry.uuid) if entry.uuid else None
+        if live is None and entry.id_kind == "name":
+            live = by_name.get(entry.id.lower())
+        if live is None:
+            players.append(entry)
+            continue
+        matched.add(live.player.uuid)
+        players.append(
+            entry.model_copy(
+                update={
+                    "dimension_id": live.dimension_id,
+                    "region_dir_relpath": relpath_by_dim_id.get(live.dimension_id),
+                    "pos": PlayerLocationPosition(x=live.x, y=live.y, z=live.z),
+                    "live": True,
+                }
+            )
+        )
+    for live in positions:
+        if live.player.uuid in matched:
+            continue
+        players.append(
+            PlayerLocationEntry(
+                id=live.player.uuid,
+                id_kind="uuid",
+                uuid=live.player.uuid,
+                source="rcon",
+                storage="live",
+                dimension_id=live.dimension_id,
+                region_dir_relpath=relpath_by_dim_id.get(live.dimension_id),
+                pos=PlayerLocationPosition(x=live.x, y=live.y, z=live.z),
+                live=True,
+            )
+        )
+    players.sort(key=lambda p: (p.region_dir_relpath or "", p.id.lower(), p.source))
+    return response.model_copy(update={"players": players})
+
+
+live_position_poller = LivePositionPoller()
@@ -3,7 +3,8 @@ from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 
 PlayerIdKind = Literal["uuid", "name"]
-PlayerStorageKind = Literal["playerdata", "players_data", "legacy_players"]
+# ``live`` marks online players that have no saved player file yet.
+PlayerStorageKind = Literal["playerdata", "players_data", "legacy_players", "live"]
 PlayerSkipReason = Literal[
     "parse_error",
     "missing_pos",
@@ -36,6 +37,8 @@ class PlayerLocationEntry(BaseModel):
     dimension_id: str
     region_dir_relpath: Optional[str] = None
     pos: PlayerLocationPosition
+    # Position comes from RCON polling rather than the saved player file.
+    live: bool = False
 
 
 class PlayerLocationSkippedFile(BaseModel):
@@ -1,28 +1,8 @@
-import asyncio
-import os
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import AsyncIterator, List
+from typing import AsyncIterator
 
-import aiofiles.os as aioos
-
-from ..config import settings
-from ..logger import logger
-from ..mcmap.runner import MCMapProcess, MCMAP_STREAM_LIMIT_BYTES
-
-
-async def _chown_args_for(owned_by: Path) -> List[str]:
-    if os.geteuid() != 0:
-        return []
-    try:
-        st = await aioos.stat(owned_by)
-    except FileNotFoundError:
-        logger.warning(
-            "player-locations: owned_by path %s does not exist; skipping --chown",
-            owned_by,
-        )
-        return []
-    return ["--chown", f"{st.st_uid}:{st.st_gid}"]
+from ..mcmap.runner import MCMapProcess, run_mcmap
 
 
 @asynccontextmanager
@@ -31,22 +11,6 @@ async def extract_players(
     *,
     owned_by: Path,
 ) -> AsyncIterator[MCMapProcess]:
-    args: List[str] = [
-        "--json",
-        "extract-players",
-        "--world",
-        str(world_dir),
-        *await _chown_args_for(owned_by),
-    ]
-    proc = await asyncio.create_subprocess_exec(
-        str(settings.mcmap_binary_path),
-        *args,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-        limit=MCMAP_STREAM_LIMIT_BYTES,
-    )
-    wrapper = MCMapProcess(proc)
-    try:
-        yield wrapper
-    finally:
-        await wrapper.terminate()
+    args = ["extract-players", "--world", str(world_dir)]
+    async with run_mcmap(args, owned_by) as proc:
+        yield proc
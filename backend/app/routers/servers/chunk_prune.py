@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from ...background_tasks import TaskType, task_manager
@@ -15,10 +20,12 @@ from ...chunk_prune import (
     ChunkPruneValidationError,
     chunk_prune_service,
 )
+from ...chunk_prune.geometry_stream import MAX_SIMPLIFY_LEVEL, iter_geometry_events
 from ...dependencies import get_current_user
 from ...dynamic_config import config
 from ...minecraft import docker_mc_manager
 from ...models import UserPublic
+from ...utils.sse import sse_response
 from ..tasks import BackgroundTaskResponse
 
 router = APIRouter(prefix="/servers", tags=["chunk-prune"])
@@ -107,7 +114,9 @@ async def get_chunk_prune_preview_geometry(
     _: UserPublic = Depends(get_current_user),
 ) -> ChunkPrunePreviewGeometryResponse:
     try:
-        return chunk_prune_service.get_preview_geometry(
+        # Traces every dimension's shapes; keep it off the event loop.
+        return await asyncio.to_thread(
+            chunk_prune_service.get_preview_geometry,
             server_id=server_id,
             preview_task_id=preview_task_id,
         )
@@ -117,6 +126,44 @@ async def get_chunk_prune_preview_geometry(
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
+@router.get("/{server_id}/chunk-prune/previews/{preview_task_id}/geometry/stream")
+async def stream_chunk_prune_preview_geometry(
+    server_id: str,
+    preview_task_id: str,
+    simplify: int = Query(
+        0,
+        ge=0,
+        le=MAX_SIMPLIFY_LEVEL,
+        description="Ring simplification level; 0 keeps rings exact",
+    ),
+    region: Optional[str] = Query(
+        None, description="Only stream this region folder relative to data/"
+    ),
+    _: UserPublic = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream completed preview geometry as SSE, in batches of shapes."""
+    try:
+        metadata = chunk_prune_service.get_completed_preview(
+            server_id=server_id,
+            preview_task_id=preview_task_id,
+        )
+    except ChunkPruneTaskNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ChunkPruneValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    async def event_gen() -> AsyncIterator[dict]:
+        events = iter_geometry_events(
+            metadata, simplify=simplify, region_dir_relpath=region
+        )
+        # Each step traces at most one dimension or builds one batch; run it
+        # in a worker so a large preview never holds the event loop.
+        while (event := await asyncio.to_thread(next, events, None)) is not None:
+            yield event
+
+    return sse_response(event_gen())
+
+
 @router.post(
     "/{server_id}/chunk-prune/preview",
     response_model=ChunkPruneStartResponse,
@@ -1,23 +1,28 @@
 import asyncio
+import stat
 from pathlib import Path
 from typing import AsyncGenerator, List, Optional, Tuple
 
 import aiofiles.os as aioos
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse, Response, StreamingResponse
 
 from ...dependencies import get_current_user
 from ...dynamic_config import config
+from ...dynamic_config.configs.mcmap import TileFormat
 from ...logger import logger
 from ...mcmap import (
     MapStatus,
     ServerMapCache,
+    compute_palette_hash,
     discover_level_dat,
     discover_mods_dir,
     mcmap_manager,
     palette_is_current,
+    tile_cache_quota,
     write_palette_hash,
 )
+from ...mcmap import encoding as mcmap_encoding
 from ...mcmap import runner as mcmap_runner
 from ...mcmap.events import (
     MCMAP_DOWNLOAD_CLIENT_EVENT_ADAPTER,
@@ -27,6 +32,19 @@ from ...mcmap.events import (
     MCMapGenPaletteResultEvent,
     MCMapProgressEvent,
 )
+from ...mcmap.palette import (
+    PaletteMergeError,
+    jar_digest,
+    merge_partial_palettes,
+    mod_jar_digests,
+    mods_set_digest,
+    partial_palette_path,
+    partial_palette_usable,
+    prune_partial_palettes,
+    supports_partial_palettes,
+)
+from ...mcmap.store import shared_store
+from ...mcmap.types import MCMapError
 from ...minecraft import docker_mc_manager
 from ...models import UserPublic
 from ...utils import async_fs
@@ -35,6 +53,10 @@ from ...world.region_manifest import list_region_manifest
 
 router = APIRouter(prefix="/servers", tags=["map"])
 
+# Short enough that browsers come back (usually for a 304) and the tile's
+# atime — the tile-cache LRU key — tracks what is actually being viewed.
+TILE_MAX_AGE_SECONDS = 3600
+
 
 async def _get_data_path(server_id: str) -> Path:
     instance = docker_mc_manager.get_instance(server_id)
@@ -94,6 +116,7 @@ async def get_status(
         palette_present=await aioos.path.exists(cache.palette_json),
         palette_current=palette_current,
         version=version,
+        tile_cache=await tile_cache_quota.status(server_id, data_path),
     )
 
 
@@ -114,6 +137,147 @@ async def _clear_prerequisite_cache(cache: ServerMapCache) -> None:
             await aioos.unlink(path)
         except FileNotFoundError:
             pass
+    await async_fs.rmtree(cache.palettes_dir, ignore_errors=True)
+
+
+async def _fetch_shared(
+    cache: ServerMapCache, stored: Optional[Path], target: Path
+) -> bool:
+    linked = await shared_store.fetch(stored, target)
+    if linked is None:
+        return False
+    if not linked:
+        # A hard link shares the store's inode; only chown private copies.
+        await cache.chown_to_data_owner(target)
+    return True
+
+
+async def _unlink_if_shared(path: Path) -> None:
+    """Detach ``path`` from the shared store before mcmap overwrites it.
+
+    Store files are read-only, so a copy fetched from the store (or a link
+    whose store entry was since deleted) is removed as well.
+    """
+    try:
+        st = await aioos.stat(path)
+    except FileNotFoundError:
+        return
+    if st.st_nlink > 1 or not st.st_mode & stat.S_IWUSR:
+        await aioos.unlink(path)
+
+
+async def _gen_partial_palette(
+    packs: List[Path], output: Path, *, owned_by: Path
+) -> int:
+    """Run ``gen-palette`` into ``output``; return mcmap's unresolved-block count."""
+    tmp = output.with_name(f".{output.name}.tmp")
+    failed = 0
+    async with mcmap_runner.gen_palette(
+        packs, tmp, level_dat=None, owned_by=owned_by
+    ) as proc:
+        async for event in proc.events(MCMAP_GEN_PALETTE_EVENT_ADAPTER):
+            if isinstance(event, MCMapErrorEvent):
+                raise MCMapError(event.message)
+            if isinstance(event, MCMapGenPaletteResultEvent):
+                failed = event.failed or 0
+    if proc.returncode not in (0, None):
+        stderr_text = await proc.stderr()
+        raise MCMapError(stderr_text.strip() or "gen-palette failed")
+    await aioos.replace(tmp, output)
+    return failed
+
+
+async def _incremental_palette_stream(
+    cache: ServerMapCache, mods_dir: Path, *, owned_by: Path
+) -> AsyncGenerator[bytes, None]:
+    """Build ``palette.json`` from cached per-jar partials, extracting only new jars.
+
+    Each missing partial is one ``gen-palette -p <jar> -p client.jar`` run,
+    ``palette_parallel_jobs`` at a time. A jar whose blocks don't fully
+    resolve on its own is regenerated with the whole mods dir on the pack
+    path (a "linked" partial). Merge order is client, linked, then
+    self-contained partials, so each mod's own extraction wins over copies
+    of its blocks picked up by another jar's linked run.
+    """
+    client_digest = await jar_digest(cache.client_jar)
+    jars = await mod_jar_digests(mods_dir)
+    mods_digest = mods_set_digest(jars)
+
+    client_partial = partial_palette_path(cache, client_digest, None)
+    standalone: List[Path] = []
+    linked: List[Path] = []
+    jobs: List[Tuple[Path, str]] = []
+    for jar, digest in jars:
+        own = partial_palette_path(cache, client_digest, digest)
+        shared = partial_palette_path(
+            cache, client_digest, digest, mods_digest=mods_digest
+        )
+        if await partial_palette_usable(own):
+            standalone.append(own)
+        elif await partial_palette_usable(shared):
+            linked.append(shared)
+        else:
+            jobs.append((jar, digest))
+
+    await cache.ensure_dir(cache.palettes_dir)
+    total = len(jobs) + (0 if await partial_palette_usable(client_partial) else 1)
+    if total < len(jars) + 1:
+        yield sse_encode(
+            {
+                "stage": "palette",
+                "phase": "pack_loaded",
+                "percent": 0,
+                "message": f"Reusing {len(jars) + 1 - total} cached pack palettes",
+            }
+        )
+    if total > len(jobs):
+        await _gen_partial_palette(
+            [cache.client_jar], client_partial, owned_by=owned_by
+        )
+
+    semaphore = asyncio.Semaphore(config.mcmap.palette_parallel_jobs)
+
+    async def extract(jar: Path, digest: str) -> Tuple[Path, Path, bool]:
+        async with semaphore:
+            own = partial_palette_path(cache, client_digest, digest)
+            failed = await _gen_partial_palette(
+                [jar, cache.client_jar], own, owned_by=owned_by
+            )
+            if not failed:
+                return jar, own, False
+            shared = partial_palette_path(
+                cache, client_digest, digest, mods_digest=mods_digest
+            )
+            await _gen_partial_palette(
+                [jar, mods_dir, cache.client_jar], shared, owned_by=owned_by
+            )
+            await aioos.unlink(own)
+            return jar, shared, True
+
+    tasks = [asyncio.create_task(extract(jar, digest)) for jar, digest in jobs]
+    try:
+        done = total - len(jobs)
+        for next_done in asyncio.as_completed(tasks):
+            jar, partial, is_linked = await next_done
+            (linked if is_linked else standalone).append(partial)
+            done += 1
+            yield sse_encode(
+                {
+                    "stage": "palette",
+                    "phase": "pack_loaded",
+                    "percent": done / total * 100,
+                    "message": f"Loaded {jar.name} ({done} of {total})",
+                }
+            )
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    yield sse_encode({"stage": "palette", "phase": "resolving", "percent": 100})
+    partials = [client_partial, *sorted(linked), *sorted(standalone)]
+    await merge_partial_palettes(partials, cache.palette_json)
+    await cache.chown_to_data_owner(cache.palette_json)
+    await prune_partial_palettes(cache, partials)
 
 
 async def _initialize_stream(
@@ -153,10 +317,24 @@ async def _initialize_stream(
         return
 
     # Stage 1: client jar
+    use_store = config.mcmap.shared_store_enabled
+    client_key = shared_store.client_jar_path(version)
     if await aioos.path.exists(cache.client_jar):
         yield sse_encode(
             {"stage": "client", "phase": "done", "percent": 100, "cached": True}
         )
+    elif use_store and not force and await _fetch_shared(
+        cache, client_key, cache.client_jar
+    ):
+        yield sse_encode(
+            {
+                "stage": "client",
+                "phase": "done",
+                "percent": 100,
+                "cached": True,
+                "shared": True,
+            }
+        )
     else:
         yield sse_encode({"stage": "client", "phase": "starting", "percent": 0})
         try:
@@ -217,6 +395,8 @@ async def _initialize_stream(
             logger.exception("mcmap download-client failed")
             yield sse_encode({"stage": "client", "phase": "error", "message": str(e)})
             return
+        if use_store:
+            await shared_store.publish(cache.client_jar, client_key)
 
     # Stage 2: palette
     mods_dir = await discover_mods_dir(data_path)
@@ -227,7 +407,52 @@ async def _initialize_stream(
         yield sse_encode({"stage": "complete"})
         return
 
+    palette_key = shared_store.palette_path(
+        version, await compute_palette_hash(version, mods_dir)
+    )
+    if use_store and not force and await _fetch_shared(
+        cache, palette_key, cache.palette_json
+    ):
+        await write_palette_hash(cache, version, mods_dir)
+        yield sse_encode(
+            {
+                "stage": "palette",
+                "phase": "done",
+                "percent": 100,
+                "cached": True,
+                "shared": True,
+            }
+        )
+        yield sse_encode({"stage": "complete"})
+        return
+
     yield sse_encode({"stage": "palette", "phase": "starting", "percent": 0})
+    await _unlink_if_shared(cache.palette_json)
+    if mods_dir is not None and supports_partial_palettes(version):
+        try:
+            async for chunk in _incremental_palette_stream(
+                cache, mods_dir, owned_by=data_path
+            ):
+                yield chunk
+        except PaletteMergeError as e:
+            logger.warning(
+                "mcmap: partial palettes not mergeable (%s); running full gen-palette",
+                e,
+            )
+        except Exception as e:
+            logger.exception("mcmap incremental gen-palette failed")
+            yield sse_encode({"stage": "palette", "phase": "error", "message": str(e)})
+            return
+        else:
+            await write_palette_hash(cache, version, mods_dir)
+            if use_store:
+                await shared_store.publish(cache.palette_json, palette_key)
+            yield sse_encode(
+                {"stage": "palette", "phase": "done", "percent": 100, "cached": False}
+            )
+            yield sse_encode({"stage": "complete"})
+            return
+
     packs: List[Path] = []
     if mods_dir is not None:
         packs.append(mods_dir)
@@ -266,6 +491,8 @@ async def _initialize_stream(
                         )
                 elif isinstance(event, MCMapGenPaletteResultEvent):
                     await write_palette_hash(cache, version, mods_dir)
+                    if use_store:
+                        await shared_store.publish(cache.palette_json, palette_key)
                     yield sse_encode(
                         {
                             "stage": "palette",
@@ -320,8 +547,10 @@ async def get_tile(
     x: int,
     z: int,
     region: str = Query(..., description="Region folder relative to data/"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
     _: UserPublic = Depends(get_current_user),
-) -> FileResponse:
+) -> Response:
     instance = docker_mc_manager.get_instance(server_id)
     if not await instance.exists():
         raise HTTPException(status_code=404, detail=f"Server '{server_id}' not found")
@@ -336,13 +565,18 @@ async def get_tile(
 
     await _resolve_region_path(data_path, region)
     cfg = config.mcmap
+    fmt = cfg.tile_format
 
-    state = await cache.is_fresh(region, x, z)
+    state = await cache.is_fresh(region, x, z, fmt)
     if state == "missing_mca":
         raise HTTPException(status_code=404, detail="Region not present")
     if state == "fresh":
-        return await _png_response(cache.png_path(region, x, z))
+        tile_cache_quota.record_hit(server_id)
+        return await _tile_response(
+            server_id, cache.tile_path(region, x, z, fmt), fmt, accept, if_none_match
+        )
 
+    tile_cache_quota.record_miss(server_id)
     queue = mcmap_manager.get_queue(server_id, region, cache)
     try:
         png = await asyncio.wait_for(
@@ -352,17 +586,76 @@ async def get_tile(
         raise HTTPException(status_code=503, detail="Render timed out, retry")
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Region not present")
-    return await _png_response(png)
+    return await _tile_response(
+        server_id, png, _stored_format(png), accept, if_none_match
+    )
 
 
-async def _png_response(png: Path) -> FileResponse:
+def _stored_format(tile: Path) -> TileFormat:
+    # The queue may have rendered under a format that changed since we read
+    # the config; trust the path it handed back.
+    if tile.name.endswith(".webp"):
+        return "webp"
+    if tile.name.endswith(".q.png"):
+        return "png_quantized"
+    return "png"
+
+
+def _accepts_webp(accept: Optional[str]) -> bool:
+    """True when ``Accept`` names ``image/webp`` explicitly with a non-zero q.
+
+    Wildcards are not trusted: older browsers send ``image/*`` without being
+    able to decode WebP.
+    """
+    for part in (accept or "").split(","):
+        media, *params = (p.strip() for p in part.split(";"))
+        if media.lower() != "image/webp":
+            continue
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+async def _tile_response(
+    server_id: str,
+    tile: Path,
+    fmt: TileFormat,
+    accept: Optional[str],
+    if_none_match: Optional[str],
+) -> Response:
     # Tile URL carries mtime as `?mt=`; see docs/server-map.md for cache rationale.
-    st = await aioos.stat(png)
+    st = await aioos.stat(tile)
+    await tile_cache_quota.touch(server_id, tile, st)
+    fallback = fmt == "webp" and not _accepts_webp(accept)
+    headers = {
+        "Cache-Control": f"private, max-age={TILE_MAX_AGE_SECONDS}",
+        "ETag": f'"{int(st.st_mtime)}-{"png" if fallback else fmt}"',
+        "Vary": "Accept",
+    }
+    if _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    if fallback:
+        png = await mcmap_encoding.png_fallback(tile)
+        if png is None:
+            body = await mcmap_encoding.transcode_to_png(tile)
+            return Response(content=body, media_type="image/png", headers=headers)
+        tile_cache_quota.record_write(server_id, png, await aioos.stat(png))
+        return FileResponse(str(png), media_type="image/png", headers=headers)
     return FileResponse(
-        str(png),
-        media_type="image/png",
-        headers={
-            "Cache-Control": "private, max-age=31536000",
-            "ETag": f'"{int(st.st_mtime)}"',
-        },
+        str(tile),
+        media_type=mcmap_encoding.TILE_MEDIA_TYPES[fmt],
+        headers=headers,
     )
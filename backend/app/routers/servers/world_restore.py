@@ -30,6 +30,8 @@ from ...player_locations import (
     PlayerLocationExtractError,
     PlayerLocationsResponse,
     extract_player_locations_for_server,
+    live_position_poller,
+    overlay_live_positions,
 )
 from ...snapshots import ResticSnapshot, ResticSnapshotWithSummary, snapshot_service
 from ...self_check.constants import WORLD_RESTORED_TRIGGER, WORLD_ROLLED_BACK_TRIGGER
@@ -44,6 +46,7 @@ from ...world import (
     discover_world_roots,
 )
 from ...world.preview import PreviewDiskGuardError, PreviewSessionNotFoundError
+from ...world.region_diff import DimensionRegionDiff
 
 router = APIRouter(
     prefix="/servers",
@@ -139,6 +142,13 @@ class PreviewRequest(BaseModel):
 class RestoreRequest(BaseModel):
     source_snapshot_id: str
     selection: RestorationSelection
+    # Drop REGIONS/CHUNKS selection regions identical to the snapshot first.
+    only_differing: bool = False
+
+
+class RegionDiffResponse(BaseModel):
+    snapshot_id: str
+    dimensions: List[DimensionRegionDiff]
 
 
 class RestorationResponse(BaseModel):
@@ -272,6 +282,7 @@ async def get_ftb_claims(
         return await extract_claims_for_server(
             data_path,
             world_root=roots[0],
+            allow_stale=True,
         )
     except FtbExtractError as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -299,12 +310,15 @@ async def get_player_locations(
     if not roots:
         return PlayerLocationsResponse()
     try:
-        return await extract_player_locations_for_server(
+        response = await extract_player_locations_for_server(
             data_path,
             world_root=roots[0],
         )
     except PlayerLocationExtractError as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return overlay_live_positions(
+        response, live_position_poller.positions(server_id)
+    )
 
 
 # --- Eligible snapshots ----------------------------------------------------
@@ -328,6 +342,30 @@ async def eligible_snapshots(
     return ListEligibleSnapshotsResponse(snapshots=snapshots)
 
 
+# --- Region diff -----------------------------------------------------------
+
+
+@router.get(
+    "/{server_id}/world-restore/region-diff",
+    response_model=RegionDiffResponse,
+)
+async def region_diff(
+    server_id: str,
+    snapshot_id: str = Query(...),
+    region_dir_relpath: Optional[str] = Query(default=None),
+    _: UserPublic = Depends(get_current_user),
+) -> RegionDiffResponse:
+    await _ensure_server_exists(server_id)
+    orch = _get_orchestrator()
+    try:
+        dimensions = await orch.diff_regions(server_id, snapshot_id, region_dir_relpath)
+    except SelectionResolutionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorldLayoutDiscoveryError as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    return RegionDiffResponse(snapshot_id=snapshot_id, dimensions=dimensions)
+
+
 # --- Snapshot creation -----------------------------------------------------
 
 
@@ -506,10 +544,15 @@ async def begin_restore(
 
     async def event_gen() -> AsyncGenerator[bytes, None]:
         try:
+            selection = body.selection
+            if body.only_differing:
+                selection = await orch.narrow_to_differing(
+                    server_id, body.source_snapshot_id, selection
+                )
             async for event in orch.begin_restore(
                 server_id=server_id,
                 source_snapshot_id=body.source_snapshot_id,
-                selection=body.selection,
+                selection=selection,
                 user_id=user.id,
             ):
                 if event.event_type == "complete":
@@ -5,6 +5,7 @@ from pydantic import BaseModel
 
 from ..config import settings
 from ..dependencies import get_current_user
+from ..mcmap.metrics import MCMapMetrics, mcmap_metrics
 from ..system.resources import (
     get_cpu_load,
     get_cpu_percent,
@@ -89,6 +90,16 @@ async def get_cpu_percent_endpoint():
     )
 
 
+@router.get(
+    "/mcmap-metrics",
+    dependencies=[Depends(get_current_user)],
+    response_model=MCMapMetrics,
+)
+async def get_mcmap_metrics():
+    """Get per-subcommand resource usage of mcmap runs since startup"""
+    return mcmap_metrics.snapshot()
+
+
 @router.get("/health", response_model=HealthCheck)
 async def get_health():
     """Simple healthcheck endpoint for Docker"""
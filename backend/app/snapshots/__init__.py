@@ -8,6 +8,8 @@ from ..config import settings
 from ..minecraft import docker_mc_manager
 from .models import (
     NodeKind,
+    ResticBackupEvent,
+    ResticNode,
     ResticRestoreAction,
     ResticRestoreEvent,
     ResticSnapshot,
@@ -31,7 +33,9 @@ if settings.restic:
 
 __all__ = [
     "NodeKind",
+    "ResticBackupEvent",
     "ResticClient",
+    "ResticNode",
     "ResticRestoreAction",
     "ResticRestoreEvent",
     "ResticSnapshot",
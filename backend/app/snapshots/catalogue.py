@@ -0,0 +1,187 @@
+"""In-process snapshot catalogue with pre-resolved coverage paths.
+
+Listing and coverage queries used to run ``restic snapshots --json`` and
+re-resolve every recorded path of every snapshot per call. The catalogue
+keeps the parsed snapshots, their resolved ``paths`` / ``excludes``, and an
+index from resolved recorded path to snapshot ids, so "which snapshots
+cover X" walks X's ancestors instead of every snapshot.
+
+Freshness:
+
+- Our own ``backup`` / ``forget`` calls update it directly (via
+  ``SnapshotService``).
+- For local repositories, every read lists ``<repo>/snapshots/`` (file
+  names are snapshot ids) and fetches only ids it hasn't seen, so
+  snapshots written by other restic clients appear immediately.
+- Otherwise the whole catalogue reloads once ``catalogue_refresh_seconds``
+  has elapsed (also the fallback when the local listing fails).
+"""
+
+import asyncio
+import os
+import re
+import time
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from ..dynamic_config import config
+from .coverage import covers
+from .models import ResticSnapshot
+from .restic import ResticClient
+
+# restic backends are addressed as "<scheme>:<location>"; bare paths are local.
+_REMOTE_REPOSITORY_RE = re.compile(r"^[a-z0-9]+:", re.IGNORECASE)
+# Beyond this many unseen ids one full listing beats a huge argv.
+INCREMENTAL_FETCH_LIMIT = 256
+
+
+@dataclass(frozen=True)
+class CatalogueEntry:
+    snapshot: ResticSnapshot
+    paths: tuple[Path, ...]
+    excludes: tuple[Path, ...]
+
+
+def _resolve_entries_sync(
+    snapshots: Iterable[ResticSnapshot],
+) -> List[CatalogueEntry]:
+    return [
+        CatalogueEntry(
+            snapshot=s,
+            paths=tuple(Path(p).resolve() for p in s.paths),
+            excludes=tuple(Path(e).resolve() for e in s.excludes),
+        )
+        for s in snapshots
+    ]
+
+
+def local_snapshots_dir(repository_path: str) -> Optional[Path]:
+    if _REMOTE_REPOSITORY_RE.match(repository_path):
+        return None
+    return Path(repository_path) / "snapshots"
+
+
+def _list_snapshot_ids_sync(snapshots_dir: Path) -> Optional[Set[str]]:
+    try:
+        return {
+            name for name in os.listdir(snapshots_dir) if not name.startswith(".")
+        }
+    except OSError:
+        return None
+
+
+class SnapshotCatalogue:
+    def __init__(self, client: ResticClient) -> None:
+        self._client = client
+        self._snapshots_dir = local_snapshots_dir(client.repository_path)
+        self._entries: Dict[str, CatalogueEntry] = {}
+        self._by_path: Dict[Path, Set[str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """Force a full reload on the next read."""
+        self._loaded_at = None
+
+    async def add(self, snapshots: Sequence[ResticSnapshot]) -> None:
+        """Record snapshots we just created, without asking restic again."""
+        if self._loaded_at is None:
+            return
+        self._insert(await asyncio.to_thread(_resolve_entries_sync, snapshots))
+
+    def discard(self, snapshot_id: str) -> None:
+        """Drop a forgotten snapshot; accepts full or short ids."""
+        for full_id, entry in list(self._entries.items()):
+            if snapshot_id in (full_id, entry.snapshot.short_id):
+                self._remove(full_id)
+
+    async def snapshots(self) -> List[ResticSnapshot]:
+        """Every snapshot, oldest first (restic's order)."""
+        await self._refresh()
+        return [entry.snapshot for entry in self._sorted_entries()]
+
+    async def covering(self, targets: Sequence[Path]) -> List[ResticSnapshot]:
+        """Snapshots covering every (already resolved) target, oldest first."""
+        await self._refresh()
+        candidates: Optional[Set[str]] = None
+        for target in targets:
+            ids: Set[str] = set()
+            for ancestor in (target, *target.parents):
+                ids |= self._by_path.get(ancestor, set())
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        if candidates is None:
+            return []
+        matching = [
+            entry
+            for entry in map(self._entries.__getitem__, candidates)
+            if all(covers(target, entry.paths, entry.excludes) for target in targets)
+        ]
+        matching.sort(key=lambda entry: entry.snapshot.time)
+        return [entry.snapshot for entry in matching]
+
+    def _sorted_entries(self) -> List[CatalogueEntry]:
+        return sorted(self._entries.values(), key=lambda entry: entry.snapshot.time)
+
+    def _insert(self, entries: Iterable[CatalogueEntry]) -> None:
+        for entry in entries:
+            snapshot_id = entry.snapshot.id
+            if snapshot_id in self._entries:
+                self._remove(snapshot_id)
+            self._entries[snapshot_id] = entry
+            for path in entry.paths:
+                self._by_path.setdefault(path, set()).add(snapshot_id)
+
+    def _remove(self, snapshot_id: str) -> None:
+        entry = self._entries.pop(snapshot_id, None)
+        if entry is None:
+            return
+        for path in entry.paths:
+            ids = self._by_path.get(path)
+            if ids is None:
+                continue
+            ids.discard(snapshot_id)
+            if not ids:
+                del self._by_path[path]
+
+    async def _refresh(self) -> None:
+        async with self._lock:
+            if self._loaded_at is None:
+                await self._reload()
+            elif await self._sync_with_repository():
+                return
+            elif self._expired():
+                await self._reload()
+
+    def _expired(self) -> bool:
+        assert self._loaded_at is not None
+        ttl = config.snapshots.catalogue_refresh_seconds
+        return time.monotonic() - self._loaded_at >= ttl
+
+    async def _reload(self) -> None:
+        snapshots = await self._client.list_snapshots()
+        entries = await asyncio.to_thread(_resolve_entries_sync, snapshots)
+        self._entries.clear()
+        self._by_path.clear()
+        self._insert(entries)
+        self._loaded_at = time.monotonic()
+
+    async def _sync_with_repository(self) -> bool:
+        """Diff against a local repo's snapshot files; False if not possible."""
+        if self._snapshots_dir is None:
+            return False
+        ids = await asyncio.to_thread(_list_snapshot_ids_sync, self._snapshots_dir)
+        if ids is None:
+            return False
+        for snapshot_id in set(self._entries) - ids:
+            self._remove(snapshot_id)
+        new_ids = ids - set(self._entries)
+        if len(new_ids) > INCREMENTAL_FETCH_LIMIT:
+            await self._reload()
+        elif new_ids:
+            snapshots = await self._client.list_snapshots(sorted(new_ids))
+            self._insert(await asyncio.to_thread(_resolve_entries_sync, snapshots))
+        return True
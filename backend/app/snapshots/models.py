@@ -14,6 +14,15 @@ class NodeKind(StrEnum):
     FILE = "file"
 
 
+class ResticNode(BaseModel):
+    """One ``restic ls --json`` node with the metadata restic recorded."""
+
+    path: str
+    kind: NodeKind
+    size: int = 0
+    mtime: Optional[datetime] = None
+
+
 class ResticSnapshot(BaseModel):
     time: datetime
     paths: List[str]
@@ -72,3 +81,30 @@ class ResticRestoreEvent(BaseModel):
     action: Optional[ResticRestoreAction] = None
     item: Optional[str] = None
     size: Optional[int] = None
+
+
+class ResticBackupEvent(BaseModel):
+    """One event from a streaming ``restic backup --json``.
+
+    Kinds: ``status`` (periodic ``percent_done`` ∈ [0, 1] plus file/byte
+    counters) and ``summary`` (final tallies). ``SnapshotService`` attaches
+    the created ``snapshot`` to the summary it re-yields.
+    """
+
+    kind: Literal["status", "summary"]
+    percent_done: Optional[float] = None
+    seconds_elapsed: Optional[float] = None
+    total_files: Optional[int] = None
+    files_done: Optional[int] = None
+    total_bytes: Optional[int] = None
+    bytes_done: Optional[int] = None
+    current_files: List[str] = []
+    snapshot_id: Optional[str] = None
+    summary: Optional[ResticSnapshotSummary] = None
+    snapshot: Optional[ResticSnapshotWithSummary] = None
+
+    @property
+    def bytes_per_second(self) -> Optional[float]:
+        if not self.bytes_done or not self.seconds_elapsed:
+            return None
+        return self.bytes_done / self.seconds_elapsed
@@ -9,6 +9,13 @@ intent into two step shapes:
   ``--delete`` then only considers the included names, deleting on-disk files
   the snapshot lacks (speculative includes of nonexistent paths are no-ops).
 
+Every restic invocation reloads the repository index and re-walks the tree,
+so all include-based work is folded into one ``FileStep`` at the deepest
+common ancestor: file groups contribute ``/<rel parent>/<name>`` includes and
+exclude-free ``DirStep``s contribute ``/<rel dir>`` (an included directory
+covers its whole subtree, ``--delete`` included). Only ``DirStep``s that
+carry excludes stay separate, since restic can't mix the two pattern kinds.
+
 Targets whose parent directory is absent from the snapshot are skipped:
 restic can neither restore them nor traverse-delete them there.
 """
@@ -119,4 +126,41 @@ async def build_restore_plan(
         )
         for parent, names in sorted(file_groups.items())
     )
-    return RestorePlan(snapshot_id=snapshot_id, steps=tuple(steps))
+    return RestorePlan(snapshot_id=snapshot_id, steps=merge_steps(steps))
+
+
+def _common_ancestor(paths: Sequence[Path]) -> Path:
+    common = paths[0]
+    for path in paths[1:]:
+        while not path.is_relative_to(common):
+            common = common.parent
+    return common
+
+
+def merge_steps(steps: Sequence[RestoreStep]) -> tuple[RestoreStep, ...]:
+    """Fold every include-expressible step into one ``FileStep``.
+
+    Targets are disjoint, so the merged includes select exactly the union
+    of what the separate steps would have touched.
+    """
+    separate = [s for s in steps if isinstance(s, DirStep) and s.excludes]
+    mergeable = [s for s in steps if not (isinstance(s, DirStep) and s.excludes)]
+    if len(mergeable) < 2:
+        return tuple(steps)
+
+    root = _common_ancestor(
+        [
+            step.source_dir.parent if isinstance(step, DirStep) else step.source_dir
+            for step in mergeable
+        ]
+    )
+    includes: list[str] = []
+    for step in mergeable:
+        if isinstance(step, DirStep):
+            includes.append(f"/{step.source_dir.relative_to(root)}")
+            continue
+        prefix = step.source_dir.relative_to(root)
+        for pattern in step.includes:
+            name = pattern.removeprefix("/")
+            includes.append(f"/{prefix / name}" if prefix.parts else f"/{name}")
+    return (*separate, FileStep(source_dir=root, includes=tuple(sorted(includes))))
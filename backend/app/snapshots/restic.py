@@ -12,20 +12,32 @@ the subtree root, never against original absolute paths.
 import asyncio
 import json
 from collections.abc import AsyncGenerator, Sequence
+from contextlib import aclosing
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
 from ..config import settings
-from ..utils.exec import exec_command
+from ..utils.exec import exec_command, exec_command_stream
 from .models import (
     NodeKind,
+    ResticBackupEvent,
+    ResticNode,
     ResticRestoreEvent,
     ResticSnapshot,
     ResticSnapshotSummary,
     ResticSnapshotWithSummary,
 )
 
+# restic emits JSON status at 60 fps by default; a couple per second is plenty.
+BACKUP_PROGRESS_FPS = "2"
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
 
 def _snapshot_from_json(data: dict) -> ResticSnapshot:
     return ResticSnapshot(
@@ -88,6 +100,50 @@ def _parse_restore_event(
     return None
 
 
+def _parse_backup_event(data: dict) -> Optional[ResticBackupEvent]:
+    """Convert one decoded ``restic backup --json`` line; other kinds are dropped."""
+    mt = data.get("message_type")
+    if mt == "status":
+        return ResticBackupEvent(
+            kind="status",
+            percent_done=data.get("percent_done"),
+            seconds_elapsed=data.get("seconds_elapsed"),
+            total_files=data.get("total_files"),
+            files_done=data.get("files_done"),
+            total_bytes=data.get("total_bytes"),
+            bytes_done=data.get("bytes_done"),
+            current_files=data.get("current_files") or [],
+        )
+    if mt == "summary":
+        return ResticBackupEvent(
+            kind="summary",
+            percent_done=1.0,
+            seconds_elapsed=data.get("total_duration"),
+            total_files=data.get("total_files_processed"),
+            files_done=data.get("total_files_processed"),
+            total_bytes=data.get("total_bytes_processed"),
+            bytes_done=data.get("total_bytes_processed"),
+            snapshot_id=data.get("snapshot_id"),
+            summary=ResticSnapshotSummary(
+                backup_start=_parse_time(data.get("backup_start")),
+                backup_end=_parse_time(data.get("backup_end")),
+                files_new=data.get("files_new"),
+                files_changed=data.get("files_changed"),
+                files_unmodified=data.get("files_unmodified"),
+                dirs_new=data.get("dirs_new"),
+                dirs_changed=data.get("dirs_changed"),
+                dirs_unmodified=data.get("dirs_unmodified"),
+                data_blobs=data.get("data_blobs"),
+                tree_blobs=data.get("tree_blobs"),
+                data_added=data.get("data_added"),
+                data_added_packed=data.get("data_added_packed"),
+                total_files_processed=data.get("total_files_processed"),
+                total_bytes_processed=data.get("total_bytes_processed"),
+            ),
+        )
+    return None
+
+
 class ResticClient:
     def __init__(
         self,
@@ -117,13 +173,13 @@ class ResticClient:
         full = self._build_args(*args)
         return await exec_command(*full, env=self.env)
 
-    async def backup(
+    async def backup_stream(
         self, paths: Sequence[Path], excludes: Sequence[str] = ()
-    ) -> ResticSnapshotWithSummary:
-        """Capture the given absolute paths into one snapshot.
+    ) -> AsyncGenerator[ResticBackupEvent, None]:
+        """Stream ``restic backup --json`` as ``status`` events, then one ``summary``.
 
-        ``excludes`` are absolute path patterns; restic records them in the
-        snapshot metadata, which restore later unions with current config.
+        Closing the generator early kills restic; the partial snapshot is
+        never written, so cancelling is safe at any point.
         """
         if not paths:
             raise ValueError("At least one path must be provided for restic backup")
@@ -135,51 +191,54 @@ class ResticClient:
         for pattern in excludes:
             args.extend(["--exclude", pattern])
         args.append("--json")
-        result = await self._run(*args)
-
-        summary_data = None
-        snapshot_id = None
-        for line in reversed(result.strip().split("\n")):
-            try:
-                data = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if data.get("message_type") == "summary":
-                summary_data = data
-                snapshot_id = data.get("snapshot_id")
-                break
+        summary: Optional[ResticBackupEvent] = None
+        env = {**self.env, "RESTIC_PROGRESS_FPS": BACKUP_PROGRESS_FPS}
+        async with aclosing(
+            exec_command_stream(*self._build_args(*args), env=env)
+        ) as lines:
+            async for line in lines:
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                event = _parse_backup_event(data)
+                if event is None:
+                    continue
+                if event.kind == "summary":
+                    summary = event
+                else:
+                    yield event
 
-        if not summary_data or not snapshot_id:
+        if summary is None or not summary.snapshot_id:
             raise RuntimeError(
                 "Could not parse snapshot data from restic backup output"
             )
+        yield summary
 
-        snapshot = await self.get_snapshot(snapshot_id)
-
-        summary = ResticSnapshotSummary(
-            backup_start=datetime.fromisoformat(
-                summary_data["backup_start"].replace("Z", "+00:00")
-            ),
-            backup_end=datetime.fromisoformat(
-                summary_data["backup_end"].replace("Z", "+00:00")
-            ),
-            files_new=summary_data.get("files_new"),
-            files_changed=summary_data.get("files_changed"),
-            files_unmodified=summary_data.get("files_unmodified"),
-            dirs_new=summary_data.get("dirs_new"),
-            dirs_changed=summary_data.get("dirs_changed"),
-            dirs_unmodified=summary_data.get("dirs_unmodified"),
-            data_blobs=summary_data.get("data_blobs"),
-            tree_blobs=summary_data.get("tree_blobs"),
-            data_added=summary_data.get("data_added"),
-            data_added_packed=summary_data.get("data_added_packed"),
-            total_files_processed=summary_data.get("total_files_processed"),
-            total_bytes_processed=summary_data.get("total_bytes_processed"),
-        )
+    async def backup(
+        self, paths: Sequence[Path], excludes: Sequence[str] = ()
+    ) -> ResticSnapshotWithSummary:
+        """Capture the given absolute paths into one snapshot.
 
+        ``excludes`` are absolute path patterns; restic records them in the
+        snapshot metadata, which restore later unions with current config.
+        """
+        summary: Optional[ResticBackupEvent] = None
+        async for event in self.backup_stream(paths, excludes):
+            if event.kind == "summary":
+                summary = event
+        assert summary is not None and summary.snapshot_id is not None
+        return await self.snapshot_with_summary(summary)
+
+    async def snapshot_with_summary(
+        self, summary: ResticBackupEvent
+    ) -> ResticSnapshotWithSummary:
+        """Resolve a backup ``summary`` event into the snapshot it created."""
+        assert summary.snapshot_id is not None
+        snapshot = await self.get_snapshot(summary.snapshot_id)
         return ResticSnapshotWithSummary(
             **snapshot.model_dump(),
-            summary=summary,
+            summary=summary.summary,
         )
 
     async def get_snapshot(self, snapshot_id: str) -> ResticSnapshot:
@@ -192,8 +251,11 @@ class ResticClient:
             raise RuntimeError(f"Snapshot not found: {snapshot_id}")
         return _snapshot_from_json(snapshots[0])
 
-    async def list_snapshots(self) -> List[ResticSnapshot]:
-        result = await self._run("snapshots", "--json")
+    async def list_snapshots(
+        self, snapshot_ids: Sequence[str] = ()
+    ) -> List[ResticSnapshot]:
+        """All snapshots, or just ``snapshot_ids`` when given."""
+        result = await self._run("snapshots", *snapshot_ids, "--json")
         try:
             snapshots_data = json.loads(result)
         except json.JSONDecodeError as e:
@@ -209,11 +271,16 @@ class ResticClient:
         to node kinds; non-directory nodes all map to ``FILE``. An empty dict
         means the path is not present in the snapshot.
         """
+        nodes = await self.ls_nodes(snapshot_id, path)
+        return {node_path: node.kind for node_path, node in nodes.items()}
+
+    async def ls_nodes(self, snapshot_id: str, path: Path) -> dict[Path, ResticNode]:
+        """Like ``ls`` but keeps each node's recorded size and mtime."""
         if not path.is_absolute():
             raise ValueError("ls path must be absolute")
         result = await self._run("ls", snapshot_id, str(path), "--json")
 
-        nodes: dict[Path, NodeKind] = {}
+        nodes: dict[Path, ResticNode] = {}
         for line in result.strip().split("\n"):
             if not line.strip():
                 continue
@@ -228,7 +295,12 @@ class ResticClient:
             if not node_path or not node_type:
                 continue
             kind = NodeKind.DIR if node_type == "dir" else NodeKind.FILE
-            nodes[Path(node_path)] = kind
+            nodes[Path(node_path)] = ResticNode(
+                path=node_path,
+                kind=kind,
+                size=data.get("size") or 0,
+                mtime=_parse_time(data.get("mtime")),
+            )
         return nodes
 
     async def restore(
@@ -342,8 +414,16 @@ class ResticClient:
         keep_tag: Optional[List[str]] = None,
         keep_within: Optional[str] = None,
         prune: bool = True,
+        group_by: str = "",
+        paths: Sequence[Path] = (),
     ) -> str:
-        """Apply restic ``forget`` retention rules. Raises ``ValueError`` if all are empty."""
+        """Apply restic ``forget`` retention rules. Raises ``ValueError`` if all are empty.
+
+        ``group_by=""`` applies the policy across all snapshots; ``"paths"``
+        applies it per backed-up path set (e.g. per server). ``paths``
+        restricts it to snapshots containing those absolute paths; every
+        other snapshot is left alone.
+        """
         retention_params = [
             keep_last,
             keep_hourly,
@@ -364,7 +444,13 @@ class ResticClient:
                 "At least one retention policy parameter must be specified"
             )
 
-        args = ["forget", "--group-by", ""]
+        for path in paths:
+            if not path.is_absolute():
+                raise ValueError("Path must be absolute for restic forget")
+
+        args = ["forget", "--group-by", group_by]
+        for path in paths:
+            args.extend(["--path", str(path)])
         if keep_last is not None:
             args.extend(["--keep-last", str(keep_last)])
         if keep_hourly is not None:
@@ -8,13 +8,15 @@ snapshot being restored, so snapshots taken under an older ignore config
 stay protected as well.
 """
 
+import asyncio
 from collections.abc import AsyncGenerator, Callable, Sequence
+from contextlib import aclosing
 from pathlib import Path
 from typing import List, Optional
 
 from ..dynamic_config import config
 from ..utils import async_fs
-from .coverage import covers
+from .catalogue import SnapshotCatalogue
 from .ignores import (
     InstanceProvider,
     backup_excludes,
@@ -22,6 +24,9 @@ from .ignores import (
     resolve_all_ignores,
 )
 from .models import (
+    NodeKind,
+    ResticBackupEvent,
+    ResticNode,
     ResticRestoreEvent,
     ResticSnapshot,
     ResticSnapshotWithSummary,
@@ -34,23 +39,29 @@ from .planner import (
     build_restore_plan,
 )
 from .restic import ResticClient
+from .tree_cache import CachedTreeReader
 
 
 class SnapshotService:
     def __init__(self, client: ResticClient, mc_manager: InstanceProvider):
         self._client = client
         self._mc_manager = mc_manager
+        self._catalogue = SnapshotCatalogue(client)
+        self._tree = CachedTreeReader(client)
 
     async def _current_ignores(self) -> list[Path]:
         return await resolve_all_ignores(
             self._mc_manager, config.snapshots.ignored_paths
         )
 
-    async def create_snapshot(
+    async def create_snapshot_stream(
         self, paths: Sequence[Path]
-    ) -> ResticSnapshotWithSummary:
+    ) -> AsyncGenerator[ResticBackupEvent, None]:
         """Snapshot the given absolute paths, excluding configured ignores.
 
+        Yields restic ``status`` events, then a ``summary`` carrying the
+        created ``snapshot``. Closing the generator early kills restic.
+
         Raises ``TargetIgnoredError`` when a requested path itself lies
         under an ignored path — such a snapshot would be empty by definition.
         """
@@ -60,16 +71,69 @@ class SnapshotService:
                 raise TargetIgnoredError(
                     f"路径在忽略列表中，无法创建快照: {path}"
                 )
-        return await self._client.backup(paths, backup_excludes(paths, ignored))
+        async with aclosing(
+            self._client.backup_stream(paths, backup_excludes(paths, ignored))
+        ) as events:
+            async for event in events:
+                if event.kind != "summary":
+                    yield event
+                    continue
+                snapshot = await self._client.snapshot_with_summary(event)
+                await self._catalogue.add(
+                    [
+                        ResticSnapshot.model_validate(
+                            snapshot.model_dump(exclude={"summary"})
+                        )
+                    ]
+                )
+                yield event.model_copy(update={"snapshot": snapshot})
+
+    async def create_snapshot(
+        self, paths: Sequence[Path]
+    ) -> ResticSnapshotWithSummary:
+        """Non-streaming ``create_snapshot_stream``; returns the new snapshot."""
+        snapshot: Optional[ResticSnapshotWithSummary] = None
+        async for event in self.create_snapshot_stream(paths):
+            if event.snapshot is not None:
+                snapshot = event.snapshot
+        assert snapshot is not None
+        return snapshot
+
+    async def list_directory(
+        self, snapshot_id: str, path: Path
+    ) -> dict[Path, NodeKind]:
+        """Direct children of ``path`` in the snapshot (empty if absent).
+
+        Served from the same ``ls`` cache as restore planning, so a listing
+        taken here is reused when the plan probes the same directory.
+        """
+        self._tree.max_nodes = config.snapshots.ls_cache_max_nodes
+        return await self._tree.ls(snapshot_id, path)
+
+    async def list_directory_nodes(
+        self, snapshot_id: str, path: Path
+    ) -> dict[Path, ResticNode]:
+        """``list_directory`` with recorded sizes/mtimes; always asks restic.
+
+        The kinds are fed into the ``ls`` cache so a following plan or
+        ``list_directory`` of the same directory doesn't list it again.
+        """
+        nodes = await self._client.ls_nodes(snapshot_id, path)
+        self._tree.max_nodes = config.snapshots.ls_cache_max_nodes
+        self._tree.put(
+            snapshot_id, path, {node_path: n.kind for node_path, n in nodes.items()}
+        )
+        return nodes
 
     async def build_plan(
         self, snapshot_id: str, targets: Sequence[Path]
     ) -> RestorePlan:
         snapshot = await self._client.get_snapshot(snapshot_id)
+        self._tree.max_nodes = config.snapshots.ls_cache_max_nodes
         ignored = await self._current_ignores()
         for exclude in snapshot.excludes:
             ignored.append(await async_fs.resolve(Path(exclude)))
-        return await build_restore_plan(self._client, snapshot_id, targets, ignored)
+        return await build_restore_plan(self._tree, snapshot_id, targets, ignored)
 
     async def restore(
         self,
@@ -144,7 +208,12 @@ class SnapshotService:
         delete: bool,
         dry_run: bool,
     ) -> AsyncGenerator[ResticRestoreEvent, None]:
-        total_steps = len(plan.steps)
+        """Run plan steps concurrently, bounded by ``restore_parallel_steps``.
+
+        Steps touch disjoint subtrees, so their order doesn't matter. Status
+        percents are weighted by each step's ``total_bytes`` and clamped to
+        stay monotonic while late-starting steps report their sizes.
+        """
         summary = ResticRestoreEvent(
             kind="summary",
             total_files=0,
@@ -155,24 +224,57 @@ class SnapshotService:
             bytes_restored=0,
             bytes_skipped=0,
         )
-        for index, step in enumerate(plan.steps):
-            async for event in self._restore_step(
-                plan.snapshot_id,
-                step,
-                target_dir=target_for(step),
-                delete=delete,
-                dry_run=dry_run,
-            ):
-                if event.kind == "status":
-                    if event.percent_done is not None:
-                        event.percent_done = (
-                            index + event.percent_done
-                        ) / total_steps
-                    yield event
-                elif event.kind == "file":
-                    yield event
+        progress = _PlanProgress(len(plan.steps))
+        semaphore = asyncio.Semaphore(config.snapshots.restore_parallel_steps)
+        # (step index, event | failure | None when the step finished)
+        queue: asyncio.Queue[tuple[int, ResticRestoreEvent | Exception | None]] = (
+            asyncio.Queue(maxsize=256)
+        )
+
+        async def run(index: int, step: RestoreStep) -> None:
+            try:
+                async with semaphore:
+                    async for event in self._restore_step(
+                        plan.snapshot_id,
+                        step,
+                        target_dir=target_for(step),
+                        delete=delete,
+                        dry_run=dry_run,
+                    ):
+                        await queue.put((index, event))
+            except Exception as exc:
+                await queue.put((index, exc))
+            else:
+                await queue.put((index, None))
+
+        tasks = [
+            asyncio.create_task(run(index, step))
+            for index, step in enumerate(plan.steps)
+        ]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                index, item = await queue.get()
+                if item is None:
+                    remaining -= 1
+                    progress.finish(index)
+                elif isinstance(item, Exception):
+                    raise item
+                elif item.kind == "status":
+                    if item.percent_done is not None:
+                        item.percent_done = progress.update(
+                            index, item.percent_done, item.total_bytes
+                        )
+                    yield item
+                elif item.kind == "file":
+                    yield item
                 else:
-                    _accumulate_summary(summary, event)
+                    progress.update(index, 1.0, item.total_bytes)
+                    _accumulate_summary(summary, item)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
         yield summary
 
     def _restore_step(
@@ -210,17 +312,9 @@ class SnapshotService:
     ) -> List[ResticSnapshot]:
         """All snapshots; with ``path_filter`` keep those whose recorded paths
         cover it and whose recorded excludes don't disqualify it."""
-        snapshots = await self._client.list_snapshots()
         if path_filter is None:
-            return snapshots
-
-        resolved_filter = await async_fs.resolve(path_filter)
-        filtered: List[ResticSnapshot] = []
-        for snapshot in snapshots:
-            paths, excludes = await self._resolved_coverage_paths(snapshot)
-            if covers(resolved_filter, paths, excludes):
-                filtered.append(snapshot)
-        return filtered
+            return await self._catalogue.snapshots()
+        return await self._catalogue.covering([await async_fs.resolve(path_filter)])
 
     async def find_snapshots_covering(
         self, paths: Sequence[Path]
@@ -236,30 +330,19 @@ class SnapshotService:
             if not path.is_absolute():
                 raise ValueError("Paths must be absolute")
 
-        all_snapshots = await self._client.list_snapshots()
-        resolved_targets = [await async_fs.resolve(p) for p in paths]
-
-        matching: List[ResticSnapshot] = []
-        for snapshot in all_snapshots:
-            snap_paths, snap_excludes = await self._resolved_coverage_paths(snapshot)
-            if all(
-                covers(target, snap_paths, snap_excludes)
-                for target in resolved_targets
-            ):
-                matching.append(snapshot)
-        matching.sort(key=lambda s: s.time, reverse=True)
+        resolved_targets = await asyncio.to_thread(
+            lambda: [p.resolve() for p in paths]
+        )
+        matching = await self._catalogue.covering(resolved_targets)
+        matching.reverse()
         return matching
 
-    @staticmethod
-    async def _resolved_coverage_paths(
-        snapshot: ResticSnapshot,
-    ) -> tuple[list[Path], list[Path]]:
-        paths = [await async_fs.resolve(Path(p)) for p in snapshot.paths]
-        excludes = [await async_fs.resolve(Path(e)) for e in snapshot.excludes]
-        return paths, excludes
-
     async def forget_id(self, snapshot_id: str, prune: bool = True) -> str:
-        return await self._client.forget_id(snapshot_id, prune=prune)
+        try:
+            return await self._client.forget_id(snapshot_id, prune=prune)
+        finally:
+            self._catalogue.discard(snapshot_id)
+            self._tree.discard_snapshot(snapshot_id)
 
     async def forget(
         self,
@@ -272,18 +355,26 @@ class SnapshotService:
         keep_tag: Optional[List[str]] = None,
         keep_within: Optional[str] = None,
         prune: bool = True,
+        group_by: str = "",
+        paths: Sequence[Path] = (),
     ) -> str:
-        return await self._client.forget(
-            keep_last=keep_last,
-            keep_hourly=keep_hourly,
-            keep_daily=keep_daily,
-            keep_weekly=keep_weekly,
-            keep_monthly=keep_monthly,
-            keep_yearly=keep_yearly,
-            keep_tag=keep_tag,
-            keep_within=keep_within,
-            prune=prune,
-        )
+        try:
+            return await self._client.forget(
+                keep_last=keep_last,
+                keep_hourly=keep_hourly,
+                keep_daily=keep_daily,
+                keep_weekly=keep_weekly,
+                keep_monthly=keep_monthly,
+                keep_yearly=keep_yearly,
+                keep_tag=keep_tag,
+                keep_within=keep_within,
+                prune=prune,
+                group_by=group_by,
+                paths=paths,
+            )
+        finally:
+            # Listings of snapshots the policy removed simply age out of the LRU.
+            self._catalogue.invalidate()
 
     async def list_locks(self) -> str:
         return await self._client.list_locks()
@@ -292,6 +383,32 @@ class SnapshotService:
         return await self._client.unlock()
 
 
+class _PlanProgress:
+    """Byte-weighted, monotonic progress across concurrently running steps."""
+
+    def __init__(self, steps: int) -> None:
+        self._fractions = [0.0] * steps
+        self._bytes: list[Optional[int]] = [None] * steps
+        self._reported = 0.0
+
+    def update(
+        self, index: int, fraction: float, total_bytes: Optional[int]
+    ) -> float:
+        self._fractions[index] = max(self._fractions[index], fraction)
+        if total_bytes is not None:
+            self._bytes[index] = total_bytes
+        known = [b for b in self._bytes if b is not None]
+        # Steps that haven't reported a size yet weigh as much as an average one.
+        default = max(sum(known) / len(known), 1.0) if known else 1.0
+        weights = [max(b, 1) if b is not None else default for b in self._bytes]
+        overall = sum(f * w for f, w in zip(self._fractions, weights)) / sum(weights)
+        self._reported = max(self._reported, min(overall, 1.0))
+        return self._reported
+
+    def finish(self, index: int) -> None:
+        self._fractions[index] = 1.0
+
+
 def _accumulate_summary(
     total: ResticRestoreEvent, part: ResticRestoreEvent
 ) -> None:
@@ -0,0 +1,57 @@
+"""Background-task adapter for snapshot creation.
+
+``backup_task`` turns ``SnapshotService.create_snapshot_stream`` into the
+``TaskProgress`` stream ``task_manager.submit`` expects. Cancelling the task
+closes the generator, which kills restic before it writes the snapshot.
+"""
+
+from collections.abc import AsyncGenerator, Sequence
+from contextlib import aclosing
+from pathlib import Path
+
+from ..background_tasks.types import TaskProgress
+from .models import ResticBackupEvent, ResticSnapshotSummary
+from .service import SnapshotService
+
+
+def _mib(value: int) -> str:
+    return f"{value / (1024 * 1024):.1f} MiB"
+
+
+def describe_backup_status(event: ResticBackupEvent) -> str:
+    """Short Chinese progress line, e.g. ``12/340 个文件，80.0/900.0 MiB，35.2 MiB/s``."""
+    parts: list[str] = []
+    if event.total_files:
+        parts.append(f"{event.files_done or 0}/{event.total_files} 个文件")
+    if event.total_bytes:
+        parts.append(f"{_mib(event.bytes_done or 0)}/{_mib(event.total_bytes)}")
+    rate = event.bytes_per_second
+    if rate is not None:
+        parts.append(f"{_mib(int(rate))}/s")
+    return "，".join(parts) or "正在扫描文件"
+
+
+async def backup_task(
+    service: SnapshotService, paths: Sequence[Path]
+) -> AsyncGenerator[TaskProgress, None]:
+    yield TaskProgress(progress=0, message="正在准备快照")
+    async with aclosing(service.create_snapshot_stream(paths)) as events:
+        async for event in events:
+            snapshot = event.snapshot
+            if snapshot is not None:
+                summary = snapshot.summary or ResticSnapshotSummary()
+                yield TaskProgress(
+                    progress=100,
+                    message=f"快照 {snapshot.short_id} 已创建",
+                    result={
+                        "snapshot_id": snapshot.id,
+                        "short_id": snapshot.short_id,
+                        "total_files_processed": summary.total_files_processed,
+                        "total_bytes_processed": summary.total_bytes_processed,
+                    },
+                )
+            elif event.percent_done is not None:
+                yield TaskProgress(
+                    progress=event.percent_done * 100,
+                    message=describe_backup_status(event),
+                )
@@ -0,0 +1,87 @@
+"""Bounded LRU cache of ``restic ls`` listings shared by restore planning.
+
+Snapshots are immutable, so a one-level listing of ``path`` in a snapshot
+never changes; only ``latest`` (a moving alias) bypasses the cache. A
+preview followed by the real restore of the same selection plans against
+the cache instead of re-running every ``restic ls``. Size is accounted in
+listed nodes; ``SnapshotService`` sets ``max_nodes`` from
+``dynamic_config.snapshots.ls_cache_max_nodes`` before each plan.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+
+from .models import NodeKind
+from .planner import SnapshotTreeReader
+
+UNCACHEABLE_SNAPSHOT_IDS = frozenset({"latest"})
+
+Listing = dict[Path, NodeKind]
+
+
+def _cost(listing: Listing) -> int:
+    # An empty listing (path absent from the snapshot) still takes a slot.
+    return max(len(listing), 1)
+
+
+class CachedTreeReader:
+    def __init__(self, reader: SnapshotTreeReader, max_nodes: int = 0) -> None:
+        self._reader = reader
+        self.max_nodes = max_nodes
+        self._entries: OrderedDict[tuple[str, Path], Listing] = OrderedDict()
+        self.nodes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def ls(self, snapshot_id: str, path: Path) -> Listing:
+        if snapshot_id in UNCACHEABLE_SNAPSHOT_IDS:
+            return await self._reader.ls(snapshot_id, path)
+        key = (snapshot_id, path)
+        listing = self._entries.get(key)
+        if listing is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(listing)
+        self.misses += 1
+        listing = await self._reader.ls(snapshot_id, path)
+        self._store(key, listing)
+        return dict(listing)
+
+    def put(self, snapshot_id: str, path: Path, listing: Listing) -> None:
+        """Record a listing fetched elsewhere (e.g. with node metadata)."""
+        if snapshot_id not in UNCACHEABLE_SNAPSHOT_IDS:
+            self._store((snapshot_id, path), listing)
+
+    def discard_snapshot(self, snapshot_id: str) -> None:
+        """Drop listings of a forgotten snapshot, cached under its full or short id."""
+        stale = [
+            key
+            for key in self._entries
+            if key[0].startswith(snapshot_id) or snapshot_id.startswith(key[0])
+        ]
+        for key in stale:
+            self.nodes -= _cost(self._entries.pop(key))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.nodes = 0
+
+    def _store(self, key: tuple[str, Path], listing: Listing) -> None:
+        budget = self.max_nodes
+        cost = _cost(listing)
+        if cost > budget:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.nodes -= _cost(previous)
+        self._entries[key] = dict(listing)
+        self.nodes += cost
+        self._shrink(budget)
+
+    def _shrink(self, budget: int) -> None:
+        while self.nodes > budget:
+            _, evicted = self._entries.popitem(last=False)
+            self.nodes -= _cost(evicted)
@@ -8,6 +8,8 @@ otherwise stall the event loop.
 from __future__ import annotations
 
 import asyncio
+import errno
+import fcntl
 import io
 import os
 import shutil
@@ -16,6 +18,12 @@ from typing import IO, Optional
 
 from PIL import Image
 
+# linux/fs.h: _IOW(0x94, 9, int). Shares extents on btrfs/XFS/bcachefs.
+FICLONE = 0x40049409
+_CLONE_UNSUPPORTED = frozenset(
+    {errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.EPERM}
+)
+
 
 async def iterdir(path: Path) -> list[Path]:
     return await asyncio.to_thread(_iterdir_sync, path)
@@ -78,6 +86,60 @@ def _copytree_sync(src, dst, dirs_exist_ok: bool):
     return shutil.copytree(src, dst, dirs_exist_ok=dirs_exist_ok)
 
 
+async def clone_or_copy(src: Path, dst: Path) -> bool:
+    """Copy ``src`` to ``dst`` as a reflink; return True if it was cloned.
+
+    Unlike a hard link the clone is copy-on-write, so writes to ``dst``
+    never reach ``src``. Falls back to ``shutil.copy2`` where the
+    filesystem can't clone.
+    """
+    return await asyncio.to_thread(_clone_or_copy_sync, src, dst)
+
+
+def _clone_or_copy_sync(src: Path, dst: Path) -> bool:
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    except OSError as e:
+        if e.errno not in _CLONE_UNSUPPORTED:
+            raise
+        shutil.copy2(src, dst)
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+async def link_or_copy(src: Path, dst: Path) -> bool:
+    """Atomically place ``src`` at ``dst``; return True if it was hard-linked.
+
+    Falls back to a copy across filesystems or where links aren't allowed.
+    """
+    return await asyncio.to_thread(_link_or_copy_sync, src, dst)
+
+
+def _link_or_copy_sync(src: Path, dst: Path) -> bool:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+    try:
+        os.unlink(tmp)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(src, tmp)
+        linked = True
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+            raise
+        shutil.copy2(src, tmp)
+        linked = False
+    try:
+        os.replace(tmp, dst)
+    except OSError:
+        os.unlink(tmp)
+        raise
+    return linked
+
+
 async def move(src: Path | str, dst: Path | str) -> Path | str:
     return await asyncio.to_thread(shutil.move, src, dst)
 
@@ -79,6 +79,7 @@ async def exec_command(
 async def exec_command_stream(
     command: str,
     *args: str,
+    env: dict[str, str] | None = None,
     cwd: str | None = None,
     delimiters: set[int] | None = None,
 ) -> AsyncGenerator[str, None]:
@@ -86,42 +87,50 @@ async def exec_command_stream(
 
     ``delimiters=None`` yields whole lines. Pass a set of byte values (e.g.
     ``{ord('\\r'), ord('\\n'), ord('\\x08')}`` for 7z progress) to split on
-    arbitrary control bytes. Raises ``RuntimeError`` on non-zero exit.
+    arbitrary control bytes. ``env=None`` inherits the current environment.
+    Raises ``RuntimeError`` on non-zero exit. Closing the generator early
+    (consumer cancelled or stopped iterating) kills the subprocess.
     """
     process = await asyncio.create_subprocess_exec(
         command,
         *args,
+        env=env,
         cwd=cwd,
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
     )
 
-    if process.stdout is None:
+    if process.stdout is None or process.stderr is None:
         raise RuntimeError("Failed to capture stdout")
 
-    if delimiters is None:
-        async for line in process.stdout:
-            yield line.decode()
-    else:
-        buffer = b""
-        while True:
-            byte = await process.stdout.read(1)
-            if not byte:
-                break
-
-            if byte[0] in delimiters:
-                if buffer:
-                    yield buffer.decode(errors="replace")
-                    buffer = b""
-            else:
-                buffer += byte
-
-        if buffer:
-            yield buffer.decode(errors="replace")
-
-    await process.wait()
-    if process.returncode != 0:
-        stderr_content = b""
-        if process.stderr:
-            stderr_content = await process.stderr.read()
-        raise RuntimeError(f"Command failed: {stderr_content.decode()}")
+    # Drain stderr concurrently so a chatty child can't block on a full pipe.
+    stderr_task = asyncio.create_task(process.stderr.read())
+    try:
+        if delimiters is None:
+            async for line in process.stdout:
+                yield line.decode()
+        else:
+            buffer = b""
+            while True:
+                byte = await process.stdout.read(1)
+                if not byte:
+                    break
+
+                if byte[0] in delimiters:
+                    if buffer:
+                        yield buffer.decode(errors="replace")
+                        buffer = b""
+                else:
+                    buffer += byte
+
+            if buffer:
+                yield buffer.decode(errors="replace")
+
+        await process.wait()
+        stderr_content = await stderr_task
+        if process.returncode != 0:
+            raise RuntimeError(f"Command failed: {stderr_content.decode()}")
+    finally:
+        await _kill_process(process)
+        if not stderr_task.done():
+            stderr_task.cancel()
@@ -1,5 +1,8 @@
 import asyncio
 import os
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path, PurePosixPath
 from typing import Optional
@@ -157,45 +160,172 @@ def resolve_dimension_folder(
     )
 
 
-def _dimensions_from_region_dirs_sync(
-    world_root: Path, region_dirs: list[Path]
-) -> list[DimensionInfo]:
-    dimensions_by_dir: dict[Path, DimensionInfo] = {}
-    for region_dir in region_dirs:
-        if region_dir.name != "region":
-            continue
+# A directory modified this close to when its mtime was read may change again
+# within the same timestamp tick unnoticed; it is re-listed on the next lookup.
+_RACY_MTIME_NS = 1_000_000_000
+
+
+@dataclass(frozen=True)
+class _DirState:
+    # None: not trusted yet, re-list on the next lookup.
+    mtime_ns: Optional[int]
+    # Names of subdirectories; None at the walk depth, where they don't matter.
+    subdirs: Optional[frozenset[str]]
+
+
+@dataclass(frozen=True)
+class _RootLayout:
+    max_depth: int
+    # Every directory the walk covered, the world root included.
+    dirs: dict[Path, _DirState]
+    # Parent of every ``region`` dir found -> its info (None: no MCA yet).
+    dimensions: dict[Path, Optional[DimensionInfo]]
+
+    def sorted_dimensions(self, world_root: Path) -> list[DimensionInfo]:
+        dimensions = [info for info in self.dimensions.values() if info is not None]
+        dimensions.sort(
+            key=lambda d: (
+                d.region_dir.parent != world_root,
+                d.region_dir.parent.relative_to(world_root).as_posix(),
+            )
+        )
+        return dimensions
+
+
+def _map_parallel(fn, items: list, workers: int) -> list:
+    workers = min(workers, len(items))
+    if workers <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, items))
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        st = os.stat(path, follow_symlinks=False)
+    except OSError:
+        return None
+    return st.st_mtime_ns if stat.S_ISDIR(st.st_mode) else None
+
+
+def _subdir_names(directory: Path) -> Optional[frozenset[str]]:
+    names: set[str] = set()
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        names.add(entry.name)
+                except OSError:
+                    continue
+    except OSError:
+        return None
+    return frozenset(names)
+
+
+def _trusted(mtime_ns: Optional[int], now_ns: int) -> Optional[int]:
+    if mtime_ns is None or now_ns - mtime_ns < _RACY_MTIME_NS:
+        return None
+    return mtime_ns
+
+
+def _probe_dimensions(
+    world_root: Path, dimension_dirs: list[Path], workers: int
+) -> dict[Path, Optional[DimensionInfo]]:
+    infos = _map_parallel(
+        lambda directory: _dimension_info(world_root, directory),
+        dimension_dirs,
+        workers,
+    )
+    return dict(zip(dimension_dirs, infos))
+
+
+def _scan_root_sync(
+    world_root: Path,
+    dir_paths: list[Path],
+    max_depth: int,
+    started_ns: int,
+    workers: int,
+) -> _RootLayout:
+    """Layout from a full walk: every directory up to ``max_depth`` below the root."""
+    children: dict[Path, set[str]] = {world_root: set()}
+    for path in dir_paths:
         try:
-            region_dir.relative_to(world_root)
+            path.relative_to(world_root)
         except ValueError:
             continue
-        dimension_dir = region_dir.parent
-        info = _dimension_info(world_root, dimension_dir)
-        if info is not None:
-            dimensions_by_dir[dimension_dir] = info
-
-    dimensions = list(dimensions_by_dir.values())
-    dimensions.sort(
-        key=lambda d: (
-            d.region_dir.parent != world_root,
-            d.region_dir.parent.relative_to(world_root).as_posix(),
+        children.setdefault(path, set())
+        children.setdefault(path.parent, set()).add(path.name)
+
+    paths = list(children)
+    mtimes = _map_parallel(_mtime_ns, paths, workers)
+    dirs: dict[Path, _DirState] = {}
+    for path, mtime_ns in zip(paths, mtimes):
+        depth = len(path.relative_to(world_root).parts)
+        # Read after the walk, so a change during it must not be trusted.
+        if mtime_ns is not None and mtime_ns >= started_ns - _RACY_MTIME_NS:
+            mtime_ns = None
+        dirs[path] = _DirState(
+            mtime_ns=mtime_ns,
+            subdirs=frozenset(children[path]) if depth < max_depth else None,
         )
+
+    dimension_dirs = [path.parent for path in paths if path.name == "region"]
+    return _RootLayout(
+        max_depth=max_depth,
+        dirs=dirs,
+        dimensions=_probe_dimensions(world_root, dimension_dirs, workers),
     )
-    return dimensions
 
 
-async def _discover_region_dirs_with_fd(world_root: Path) -> list[Path]:
-    region_dir_max_depth = config.world.dimension_max_depth_from_world_root + 1
+def _revalidate_root_sync(
+    world_root: Path, layout: _RootLayout, workers: int
+) -> Optional[_RootLayout]:
+    """``layout`` brought up to date, or None when the tree needs a new walk.
+
+    Stats every known directory. One whose mtime changed is re-listed: new or
+    removed subdirectories mean a new walk; otherwise only files changed, and
+    the dimension it belongs to (as the ``region`` dir or the dimension dir,
+    for ``entities``/``poi``) is probed again.
+    """
+    now_ns = time.time_ns()
+    paths = list(layout.dirs)
+    mtimes = _map_parallel(_mtime_ns, paths, workers)
+    changed: dict[Path, int] = {}
+    for path, mtime_ns in zip(paths, mtimes):
+        if mtime_ns is None:
+            return None
+        if mtime_ns != layout.dirs[path].mtime_ns:
+            changed[path] = mtime_ns
+    if not changed:
+        return layout
+
+    dirs = dict(layout.dirs)
+    for path, mtime_ns in changed.items():
+        state = layout.dirs[path]
+        if state.subdirs is not None and _subdir_names(path) != state.subdirs:
+            return None
+        dirs[path] = _DirState(_trusted(mtime_ns, now_ns), state.subdirs)
+
+    stale = {
+        path.parent if path.name == "region" else path for path in changed
+    } & layout.dimensions.keys()
+    dimensions = dict(layout.dimensions)
+    dimensions.update(_probe_dimensions(world_root, sorted(stale), workers))
+    return _RootLayout(max_depth=layout.max_depth, dirs=dirs, dimensions=dimensions)
+
+
+async def _list_dirs_with_fd(world_root: Path, max_depth: int) -> list[Path]:
     cmd = [
         str(settings.fd_binary_path),
         "--unrestricted",
         "--absolute-path",
         "--print0",
-        "--case-sensitive",
         "--type",
         "directory",
         "--max-depth",
-        str(region_dir_max_depth),
-        "^region$",
+        str(max_depth),
+        ".",
         str(world_root),
     ]
     try:
@@ -217,26 +347,69 @@ async def _discover_region_dirs_with_fd(world_root: Path) -> list[Path]:
             f"fd failed while discovering world layout under {world_root}: {detail}"
         )
 
-    region_dirs: list[Path] = []
+    dirs: list[Path] = []
     for raw in stdout.split(b"\0"):
         if not raw:
             continue
         path = Path(os.fsdecode(raw))
         if not path.is_absolute():
             path = world_root / path
-        region_dirs.append(path)
-    return region_dirs
+        dirs.append(path)
+    return dirs
+
+
+class WorldLayoutCache:
+    """Dimensions per world root, revalidated by directory mtimes.
+
+    The first lookup walks the root with fd, as deep as a ``region`` dir may
+    be, and records every directory's mtime and subdirectories. Later lookups
+    only stat those directories (in parallel) and re-list the changed ones,
+    so a world whose layout didn't change costs no walk and no region-dir
+    probing. Changes that add or remove directories trigger a new walk.
+    """
+
+    def __init__(self) -> None:
+        self._roots: dict[Path, _RootLayout] = {}
+
+    async def dimensions(self, world_root: Path) -> list[DimensionInfo]:
+        max_depth = config.world.dimension_max_depth_from_world_root + 1
+        workers = config.world.layout_probe_workers
+        layout: Optional[_RootLayout] = None
+        cached = self._roots.get(world_root)
+        if cached is not None and cached.max_depth == max_depth:
+            layout = await asyncio.to_thread(
+                _revalidate_root_sync, world_root, cached, workers
+            )
+        if layout is None:
+            started_ns = time.time_ns()
+            dir_paths = await _list_dirs_with_fd(world_root, max_depth)
+            layout = await asyncio.to_thread(
+                _scan_root_sync, world_root, dir_paths, max_depth, started_ns, workers
+            )
+        self._roots[world_root] = layout
+        return layout.sorted_dimensions(world_root)
+
+    def retain(self, data_path: Path, world_roots: list[Path]) -> None:
+        """Forget roots under ``data_path`` other than ``world_roots``."""
+        keep = set(world_roots)
+        for root in list(self._roots):
+            if root.parent == data_path and root not in keep:
+                del self._roots[root]
+
+    def clear(self) -> None:
+        self._roots.clear()
+
+
+world_layout_cache = WorldLayoutCache()
 
 
 async def discover_world_roots(data_path: Path) -> list[WorldRoot]:
     candidates = await discover_world_root_paths(data_path)
+    world_layout_cache.retain(data_path, [candidate.path for candidate in candidates])
     roots: list[WorldRoot] = []
 
     for candidate in candidates:
-        region_dirs = await _discover_region_dirs_with_fd(candidate.path)
-        dimensions = await asyncio.to_thread(
-            _dimensions_from_region_dirs_sync, candidate.path, region_dirs
-        )
+        dimensions = await world_layout_cache.dimensions(candidate.path)
         if not dimensions:
             continue
         roots.append(
@@ -2,7 +2,8 @@
 
 Two entry points: ``pngs_for_restic_items`` (from restic verbose_status item
 paths) and ``pngs_for_regions`` (from explicit ``(rx, rz)`` coords). Only
-``region/`` MCAs map to PNGs; entities/POI MCAs are skipped.
+``region/`` MCAs map to PNGs; entities/POI MCAs are skipped. Deletion also
+removes any re-encoded siblings (``.q.png``/``.webp``) of each PNG.
 """
 
 from __future__ import annotations
@@ -14,7 +15,7 @@ from typing import Iterable
 import aiofiles.os as aioos
 
 from ..logger import logger
-from ..mcmap.cache import ServerMapCache
+from ..mcmap.cache import ServerMapCache, tile_variants
 
 _MCA_RE = re.compile(r"^r\.(-?\d+)\.(-?\d+)\.mca$")
 
@@ -58,15 +59,19 @@ def pngs_for_regions(
 
 
 async def delete_pngs(pngs: Iterable[Path]) -> int:
-    """Best-effort delete the given PNG files. Returns count actually removed."""
+    """Best-effort delete the given tiles in every encoding. Returns count of tiles removed."""
     removed = 0
     for png in pngs:
-        try:
-            await aioos.unlink(png)
+        hit = False
+        for tile in tile_variants(png):
+            try:
+                await aioos.unlink(tile)
+                hit = True
+            except FileNotFoundError:
+                continue
+            except OSError:
+                logger.warning("failed to delete tile %s", tile, exc_info=True)
+                continue
+        if hit:
             removed += 1
-        except FileNotFoundError:
-            continue
-        except OSError:
-            logger.warning("failed to delete tile %s", png, exc_info=True)
-            continue
     return removed
@@ -0,0 +1,143 @@
+"""Region-level diff between a snapshot and the live world.
+
+Compares the size and mtime restic recorded for every ``r.X.Z.mca`` of a
+dimension (``region/`` plus the ``entities/`` and ``poi/`` sidecars) with a
+live stat manifest, without restoring anything: one ``restic ls`` and one
+``scandir`` per directory. Restic restores mtimes, so a region restored
+from the snapshot and untouched since compares equal. A region whose file
+differs in any of the three directories counts as changed.
+
+Only dimensions that exist live are diffed; restic's mtimes are compared at
+microsecond precision (what ``datetime`` keeps of restic's nanoseconds).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+from ..snapshots import NodeKind, ResticNode, SnapshotService
+from ..utils import async_fs
+from .layout import DimensionInfo
+from .region_files import parse_region_filename
+from .region_manifest import list_region_stats
+
+# Bounds concurrent ``restic ls`` processes across dimensions.
+DIFF_LS_CONCURRENCY = 4
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+Region = tuple[int, int]
+# (size, mtime in µs) per subdir name.
+RegionSignature = dict[str, tuple[int, int]]
+
+
+class DimensionRegionDiff(BaseModel):
+    """Live regions relative to the snapshot for one dimension."""
+
+    region_dir_relpath: str
+    # In both, but size or mtime differ.
+    changed: list[Region] = []
+    # Live only; a region restore would delete them.
+    added: list[Region] = []
+    # Snapshot only; a region restore would bring them back.
+    removed: list[Region] = []
+    unchanged: int = 0
+
+    @property
+    def differing(self) -> list[Region]:
+        """Every region a restore of this dimension would actually touch."""
+        return sorted(self.changed + self.added + self.removed)
+
+
+def _live_signature(st) -> tuple[int, int]:
+    return st.st_size, st.st_mtime_ns // 1000
+
+
+def _snapshot_signature(node: ResticNode) -> Optional[tuple[int, int]]:
+    if node.kind is not NodeKind.FILE or node.size == 0 or node.mtime is None:
+        return None
+    mtime = node.mtime
+    if mtime.tzinfo is None:
+        mtime = mtime.replace(tzinfo=timezone.utc)
+    return node.size, (mtime - _EPOCH) // _MICROSECOND
+
+
+def diff_signatures(
+    region_dir_relpath: str,
+    live: dict[Region, RegionSignature],
+    snapshot: dict[Region, RegionSignature],
+) -> DimensionRegionDiff:
+    diff = DimensionRegionDiff(region_dir_relpath=region_dir_relpath)
+    for region in sorted(live.keys() | snapshot.keys()):
+        if region not in snapshot:
+            diff.added.append(region)
+        elif region not in live:
+            diff.removed.append(region)
+        elif live[region] != snapshot[region]:
+            diff.changed.append(region)
+        else:
+            diff.unchanged += 1
+    return diff
+
+
+async def _live_signatures(
+    subdirs: dict[str, Path], into: dict[Region, RegionSignature]
+) -> None:
+    for sub, live_dir in subdirs.items():
+        for region, st in (await list_region_stats(live_dir)).items():
+            into.setdefault(region, {})[sub] = _live_signature(st)
+
+
+async def _snapshot_signatures(
+    snapshots: SnapshotService,
+    snapshot_id: str,
+    subdirs: dict[str, Path],
+    semaphore: asyncio.Semaphore,
+    into: dict[Region, RegionSignature],
+) -> None:
+    for sub, live_dir in subdirs.items():
+        # Snapshots record resolved paths.
+        snapshot_dir = await async_fs.resolve(live_dir)
+        async with semaphore:
+            nodes = await snapshots.list_directory_nodes(snapshot_id, snapshot_dir)
+        for node_path, node in nodes.items():
+            if node_path.parent != snapshot_dir:
+                continue
+            region = parse_region_filename(node_path.name)
+            signature = _snapshot_signature(node)
+            if region is None or signature is None:
+                continue
+            into.setdefault(region, {})[sub] = signature
+
+
+async def diff_dimension(
+    snapshots: SnapshotService,
+    snapshot_id: str,
+    data_path: Path,
+    dim: DimensionInfo,
+    semaphore: asyncio.Semaphore,
+) -> DimensionRegionDiff:
+    subdirs = {
+        sub: live_dir
+        for sub, live_dir in (
+            ("region", dim.region_dir),
+            ("entities", dim.entities_dir),
+            ("poi", dim.poi_dir),
+        )
+        if live_dir is not None
+    }
+    live: dict[Region, RegionSignature] = {}
+    snapshot: dict[Region, RegionSignature] = {}
+    await asyncio.gather(
+        _live_signatures(subdirs, live),
+        _snapshot_signatures(snapshots, snapshot_id, subdirs, semaphore, snapshot),
+    )
+    return diff_signatures(
+        str(dim.region_dir.relative_to(data_path)), live, snapshot
+    )
@@ -1,7 +1,9 @@
 import re
-from typing import Optional, Tuple
+from typing import Collection, Iterable, Optional, Tuple
 
 REGION_FILE_RE = re.compile(r"^r\.(-?\d+)\.(-?\d+)\.mca$")
+MCC_FILE_RE = re.compile(r"^c\.(-?\d+)\.(-?\d+)\.mcc$")
+CHUNKS_PER_REGION_AXIS = 32
 
 
 def parse_region_filename(name: str) -> Optional[Tuple[int, int]]:
@@ -9,3 +11,26 @@ def parse_region_filename(name: str) -> Optional[Tuple[int, int]]:
     if match is None:
         return None
     return int(match.group(1)), int(match.group(2))
+
+
+def parse_mcc_filename(name: str) -> Optional[Tuple[int, int]]:
+    """Absolute chunk coords of a ``c.<absX>.<absZ>.mcc`` sidecar."""
+    match = MCC_FILE_RE.match(name)
+    if match is None:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def mcc_names_in_regions(
+    names: Iterable[str], regions: Collection[Tuple[int, int]]
+) -> list[str]:
+    """``c.<absX>.<absZ>.mcc`` sidecar names whose chunk lies in ``regions``."""
+    matched: list[str] = []
+    for name in names:
+        chunk = parse_mcc_filename(name)
+        if chunk is None:
+            continue
+        cx, cz = chunk
+        if (cx // CHUNKS_PER_REGION_AXIS, cz // CHUNKS_PER_REGION_AXIS) in regions:
+            matched.append(name)
+    return sorted(matched)
@@ -3,7 +3,7 @@ import os
 import stat as _stat
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from ..dynamic_config import config
 from .region_files import parse_region_filename
@@ -15,6 +15,25 @@ async def list_region_manifest(region_dir: Path) -> List[Tuple[int, int, int]]:
 
 def list_region_manifest_sync(region_dir: Path) -> List[Tuple[int, int, int]]:
     # (x, z, mtime); mtime feeds tile URL `?mt=` for cache busting.
+    return sorted(
+        (x, z, int(st.st_mtime)) for x, z, st in _stat_region_files_sync(region_dir)
+    )
+
+
+async def list_region_stats(
+    region_dir: Path,
+) -> Dict[Tuple[int, int], os.stat_result]:
+    """Non-empty ``r.X.Z.mca`` files of ``region_dir`` keyed by region coords."""
+    return await asyncio.to_thread(list_region_stats_sync, region_dir)
+
+
+def list_region_stats_sync(region_dir: Path) -> Dict[Tuple[int, int], os.stat_result]:
+    return {(x, z): st for x, z, st in _stat_region_files_sync(region_dir)}
+
+
+def _stat_region_files_sync(
+    region_dir: Path,
+) -> List[Tuple[int, int, os.stat_result]]:
     candidates: List[Tuple[str, int, int]] = []
     try:
         entries = os.scandir(region_dir)
@@ -28,25 +47,24 @@ def list_region_manifest_sync(region_dir: Path) -> List[Tuple[int, int, int]]:
             x, z = parsed
             candidates.append((entry.path, x, z))
 
-    rows: List[Tuple[int, int, int]] = []
+    rows: List[Tuple[int, int, os.stat_result]] = []
     workers = min(config.world.region_stat_workers, len(candidates))
     if workers <= 1:
         for candidate in candidates:
-            coord = _stat_region_candidate(candidate)
-            if coord is not None:
-                rows.append(coord)
+            row = _stat_region_candidate(candidate)
+            if row is not None:
+                rows.append(row)
     else:
         with ThreadPoolExecutor(max_workers=workers) as pool:
-            for coord in pool.map(_stat_region_candidate, candidates):
-                if coord is not None:
-                    rows.append(coord)
-    rows.sort()
+            for row in pool.map(_stat_region_candidate, candidates):
+                if row is not None:
+                    rows.append(row)
     return rows
 
 
 def _stat_region_candidate(
     candidate: Tuple[str, int, int],
-) -> Optional[Tuple[int, int, int]]:
+) -> Optional[Tuple[int, int, os.stat_result]]:
     path, x, z = candidate
     try:
         st = os.stat(path, follow_symlinks=False)
@@ -54,4 +72,4 @@ def _stat_region_candidate(
         return None
     if not _stat.S_ISREG(st.st_mode) or st.st_size == 0:
         return None
-    return (x, z, int(st.st_mtime))
+    return (x, z, st)
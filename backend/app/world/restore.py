@@ -10,7 +10,7 @@ from __future__ import annotations
 import asyncio
 import secrets
 import tempfile
-from contextlib import AsyncExitStack
+from contextlib import AsyncExitStack, aclosing
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import (
@@ -18,9 +18,11 @@ from typing import (
     AsyncContextManager,
     AsyncGenerator,
     Callable,
+    Collection,
     Iterable,
     Literal,
     Optional,
+    Sequence,
 )
 
 import aiofiles
@@ -51,10 +53,13 @@ from ..models import (
     RestorationType,
 )
 from ..snapshots import (
+    NodeKind,
+    ResticRestoreEvent,
     ResticSnapshot,
     ResticSnapshotWithSummary,
     SnapshotService,
 )
+from ..snapshots.tasks import describe_backup_status
 from .layout import DimensionInfo, WorldRoot, discover_world_roots
 from .locks import (
     LockHolder,
@@ -62,12 +67,17 @@ from .locks import (
     ServerOperationLock,
 )
 from .preview import PreviewMapCache, PreviewSessionManager, PreviewSessionNotFoundError
+from .region_diff import DIFF_LS_CONCURRENCY, DimensionRegionDiff, diff_dimension
+from .region_files import mcc_names_in_regions
+from .stage_cache import StagingCache
 
 SessionFactory = Callable[[], AsyncContextManager[AsyncSession]]
 
 CHUNKS_PER_REGION_AXIS = 32
 SUBDIR_KINDS = ("region", "entities", "poi")
 PREVIEW_BASE_DIR = Path(tempfile.gettempdir()) / "mc-admin-world-restore"
+# Not under PREVIEW_BASE_DIR: the preview janitor reaps unknown dirs there.
+STAGE_CACHE_DIR = Path(tempfile.gettempdir()) / "mc-admin-stage-cache"
 RESTORATION_TYPE_LABELS = {
     RestorationType.WORLD: "整个世界",
     RestorationType.DIMENSION: "维度",
@@ -148,19 +158,6 @@ def _group_chunks_by_region(
     return grouped
 
 
-def _mcc_paths_for_region(
-    region_dir: Path, rx: int, rz: int
-) -> list[Path]:
-    """Speculative ``c.<absX>.<absZ>.mcc`` paths; restic ignores ones that don't exist."""
-    paths: list[Path] = []
-    base_x = rx * CHUNKS_PER_REGION_AXIS
-    base_z = rz * CHUNKS_PER_REGION_AXIS
-    for dx in range(CHUNKS_PER_REGION_AXIS):
-        for dz in range(CHUNKS_PER_REGION_AXIS):
-            paths.append(region_dir / f"c.{base_x + dx}.{base_z + dz}.mcc")
-    return paths
-
-
 async def _stage_destination(stage_dir: Path, live_path: Path) -> Path:
     """Where ``live_path`` will land under ``stage_dir`` after a staged restore."""
     return SnapshotService.stage_destination(
@@ -191,6 +188,7 @@ class WorldRestoreOrchestrator:
         self._preview_manager = PreviewSessionManager(
             base_dir=PREVIEW_BASE_DIR,
         )
+        self._stage_cache = StagingCache(STAGE_CACHE_DIR)
 
     async def create_snapshot(
         self,
@@ -233,6 +231,78 @@ class WorldRestoreOrchestrator:
             return []
         return await self._snapshots.find_snapshots_covering(paths)
 
+    async def diff_regions(
+        self,
+        server_id: str,
+        snapshot_id: str,
+        region_dir_relpath: Optional[str] = None,
+    ) -> list[DimensionRegionDiff]:
+        """Per-dimension region diff of the live world against ``snapshot_id``.
+
+        Limited to one dimension when ``region_dir_relpath`` is given. See
+        ``region_diff`` for what counts as changed.
+        """
+        data_path = self._docker.get_instance(server_id).get_data_path()
+        roots = await discover_world_roots(data_path)
+        if region_dir_relpath is not None:
+            dims = [_find_dimension(data_path, roots, region_dir_relpath)]
+        else:
+            dims = [dim for root in roots for dim in root.dimensions]
+        semaphore = asyncio.Semaphore(DIFF_LS_CONCURRENCY)
+        return list(
+            await asyncio.gather(
+                *(
+                    diff_dimension(
+                        self._snapshots, snapshot_id, data_path, dim, semaphore
+                    )
+                    for dim in dims
+                )
+            )
+        )
+
+    async def narrow_to_differing(
+        self,
+        server_id: str,
+        snapshot_id: str,
+        selection: RestorationSelection,
+    ) -> RestorationSelection:
+        """Drop regions (or chunks of regions) identical to the snapshot.
+
+        Only REGIONS and CHUNKS selections are narrowed; raises
+        ``SelectionResolutionError`` when nothing is left to restore.
+        """
+        if selection.type not in (RestorationType.REGIONS, RestorationType.CHUNKS):
+            return selection
+        if selection.region_dir_relpath is None:
+            raise SelectionResolutionError("区域/区块恢复选择范围需要指定维度路径")
+        (diff,) = await self.diff_regions(
+            server_id, snapshot_id, selection.region_dir_relpath
+        )
+        differing = set(diff.differing)
+        if selection.type is RestorationType.REGIONS:
+            narrowed = selection.model_copy(
+                update={"regions": [r for r in selection.regions if r in differing]}
+            )
+            remaining = narrowed.regions
+        else:
+            narrowed = selection.model_copy(
+                update={
+                    "chunks": [
+                        c
+                        for c in selection.chunks
+                        if (
+                            c[0] // CHUNKS_PER_REGION_AXIS,
+                            c[1] // CHUNKS_PER_REGION_AXIS,
+                        )
+                        in differing
+                    ]
+                }
+            )
+            remaining = narrowed.chunks
+        if not remaining:
+            raise SelectionResolutionError("所选范围与快照一致，无需恢复")
+        return narrowed
+
     async def begin_restore(
         self,
         server_id: str,
@@ -254,7 +324,9 @@ class WorldRestoreOrchestrator:
 
         async with self._lock.acquire(server_id, holder):
             await self._ensure_server_stopped(server_id)
-            paths = await self._resolve_paths_for_selection(server_id, selection)
+            paths = await self._resolve_paths_for_selection(
+                server_id, selection, source_snapshot_id
+            )
             if not paths:
                 raise SelectionResolutionError(
                     f"选择范围没有解析到任何文件路径: {selection.model_dump()}"
@@ -271,7 +343,21 @@ class WorldRestoreOrchestrator:
                 restoration_id=restoration_id,
                 message="正在创建安全快照",
             )
-            safety = await self._snapshots.create_snapshot(paths)
+            safety: Optional[ResticSnapshotWithSummary] = None
+            async with aclosing(
+                self._snapshots.create_snapshot_stream(paths)
+            ) as backup_events:
+                async for backup_ev in backup_events:
+                    if backup_ev.snapshot is not None:
+                        safety = backup_ev.snapshot
+                    elif backup_ev.percent_done is not None:
+                        yield RestoreEvent(
+                            event_type="safety_snapshot",
+                            restoration_id=restoration_id,
+                            message=describe_backup_status(backup_ev),
+                            percent=backup_ev.percent_done * 100.0,
+                        )
+            assert safety is not None
             safety_snapshot_id = safety.id
             yield RestoreEvent(
                 event_type="safety_snapshot",
@@ -383,7 +469,9 @@ class WorldRestoreOrchestrator:
         that reuses the live world's palette. Missing palette surfaces as an
         ``error`` event prompting the user to initialize the live map first.
         """
-        paths = await self._resolve_paths_for_selection(server_id, selection)
+        paths = await self._resolve_paths_for_selection(
+            server_id, selection, source_snapshot_id
+        )
         if not paths:
             raise SelectionResolutionError(
                 f"选择范围没有解析到任何文件路径: {selection.model_dump()}"
@@ -402,7 +490,7 @@ class WorldRestoreOrchestrator:
                 message=f"正在从快照 {source_snapshot_id[:8]} 准备预览",
             )
             await aioos.makedirs(session_dir / "source", exist_ok=True)
-            async for _ in self._snapshots.stage(
+            async for _ in self._stage(
                 source_snapshot_id, paths, session_dir / "source"
             ):
                 pass
@@ -443,6 +531,18 @@ class WorldRestoreOrchestrator:
                 message=str(exc),
             )
 
+    def _stage(
+        self, snapshot_id: str, paths: Sequence[Path], stage_root: Path
+    ) -> AsyncGenerator[ResticRestoreEvent, None]:
+        """``SnapshotService.stage`` through the shared staging cache."""
+        return self._stage_cache.stage(
+            self._snapshots,
+            snapshot_id,
+            paths,
+            stage_root,
+            max_bytes=dynamic_config.snapshots.world_restore.stage_cache_max_bytes,
+        )
+
     async def _preview_chunk_merge(
         self,
         *,
@@ -462,53 +562,47 @@ class WorldRestoreOrchestrator:
         dim = _find_dimension(data_path, roots, selection.region_dir_relpath)
 
         grouped = _group_chunks_by_region(selection.chunks)
-        live_subdirs: dict[str, Optional[Path]] = {
-            "region": dim.region_dir,
-            "entities": dim.entities_dir,
-            "poi": dim.poi_dir,
-        }
-
-        preview_dir = session_dir / "preview"
-        total = len(grouped) * sum(1 for v in live_subdirs.values() if v is not None)
+        # Only region MCAs are rendered; entities/poi stay staged in
+        # ``source/`` (and in the staging cache for the commit) but are
+        # neither copied nor merged here.
+        live_dir = dim.region_dir
+        preview_subdir = await _stage_destination(session_dir / "preview", live_dir)
+        await aioos.makedirs(preview_subdir, exist_ok=True)
+
+        total = len(grouped)
         done = 0
         for (rx, rz), local_chunks in grouped.items():
-            for sub, live_dir in live_subdirs.items():
-                if live_dir is None:
-                    continue
-                live_mca = live_dir / f"r.{rx}.{rz}.mca"
-                staged_mca = await _stage_destination(
-                    session_dir / "source", live_mca
+            live_mca = live_dir / f"r.{rx}.{rz}.mca"
+            staged_mca = await _stage_destination(session_dir / "source", live_mca)
+            preview_mca = preview_subdir / f"r.{rx}.{rz}.mca"
+
+            if await aioos.path.exists(live_mca):
+                # Reflink where the FS supports it; mcmap rewrites the copy.
+                await async_fs.clone_or_copy(live_mca, preview_mca)
+            if await aioos.path.exists(staged_mca):
+                if not await aioos.path.exists(preview_mca):
+                    # Snapshot has the region but live doesn't; seed an
+                    # empty MCA so mcmap has a target to splice into.
+                    async with aiofiles.open(preview_mca, "wb") as f:
+                        await f.write(b"\x00" * 8192)
+                await self._merge_replace(
+                    source_mca=staged_mca,
+                    target_mca=preview_mca,
+                    chunks=local_chunks,
+                    owned_by=data_path,
                 )
-                preview_subdir = await _stage_destination(preview_dir, live_dir)
-                await aioos.makedirs(preview_subdir, exist_ok=True)
-                preview_mca = preview_subdir / f"r.{rx}.{rz}.mca"
-
-                if await aioos.path.exists(live_mca):
-                    await async_fs.copy2(live_mca, preview_mca)
-                if await aioos.path.exists(staged_mca):
-                    if not await aioos.path.exists(preview_mca):
-                        # Snapshot has the region but live doesn't; seed an
-                        # empty MCA so mcmap has a target to splice into.
-                        async with aiofiles.open(preview_mca, "wb") as f:
-                            await f.write(b"\x00" * 8192)
-                    await self._merge_replace(
-                        source_mca=staged_mca,
-                        target_mca=preview_mca,
-                        chunks=local_chunks,
-                        owned_by=data_path,
-                    )
-                elif await aioos.path.exists(preview_mca):
-                    await self._merge_remove(
-                        target_mca=preview_mca,
-                        chunks=local_chunks,
-                        owned_by=data_path,
-                    )
-                done += 1
-                yield PreviewEvent(
-                    event_type="merge_region",
-                    session_id=session_id,
-                    percent=(done / total) * 100.0 if total else 100.0,
+            elif await aioos.path.exists(preview_mca):
+                await self._merge_remove(
+                    target_mca=preview_mca,
+                    chunks=local_chunks,
+                    owned_by=data_path,
                 )
+            done += 1
+            yield PreviewEvent(
+                event_type="merge_region",
+                session_id=session_id,
+                percent=(done / total) * 100.0 if total else 100.0,
+            )
 
     async def _attach_preview_render_queue(
         self,
@@ -570,6 +664,7 @@ class WorldRestoreOrchestrator:
             server_name=session_id,
             region_path=selection.region_dir_relpath,
             cache=preview_cache,  # type: ignore[arg-type]
+            tile_format="png",
         )
         self._preview_manager.attach_render_queue(
             session_id, queue=queue, affected_keys=affected_keys
@@ -693,8 +788,13 @@ class WorldRestoreOrchestrator:
                 if live_dir is None:
                     continue
                 include_paths.append(live_dir / f"r.{rx}.{rz}.mca")
-                # MCC sidecars (1024 per region) are speculative; restic ignores nonexistent ones.
-                include_paths.extend(_mcc_paths_for_region(live_dir, rx, rz))
+        include_paths.extend(
+            await self._discover_mcc_paths(
+                [d for d in live_subdirs.values() if d is not None],
+                grouped.keys(),
+                source_snapshot_id,
+            )
+        )
 
         async with AsyncExitStack() as stack:
             stage_root = Path(
@@ -708,7 +808,7 @@ class WorldRestoreOrchestrator:
                 message=f"正在从快照 {source_snapshot_id[:8]} 准备 {len(grouped)} 个区域",
                 percent=0.0,
             )
-            async for ev in self._snapshots.stage(
+            async for ev in self._stage(
                 source_snapshot_id, include_paths, stage_root
             ):
                 if ev.kind == "status" and ev.percent_done is not None:
@@ -718,16 +818,24 @@ class WorldRestoreOrchestrator:
                         percent=ev.percent_done * 100.0,
                     )
 
-            total_jobs = len(grouped) * sum(
-                1 for live in live_subdirs.values() if live is not None
-            )
-            done = 0
+            jobs: list[tuple[int, int, str, Path, list[tuple[int, int]]]] = []
             for (rx, rz), local_chunks in grouped.items():
                 for sub in SUBDIR_KINDS:
                     live_dir = live_subdirs.get(sub)
                     if live_dir is None:
                         continue
-                    live_mca = live_dir / f"r.{rx}.{rz}.mca"
+                    jobs.append(
+                        (rx, rz, sub, live_dir / f"r.{rx}.{rz}.mca", local_chunks)
+                    )
+
+            # Each job writes exactly one MCA, so jobs never contend for a file.
+            semaphore = asyncio.Semaphore(dynamic_config.world.chunk_merge_workers)
+
+            async def merge(
+                job: tuple[int, int, str, Path, list[tuple[int, int]]],
+            ) -> tuple[int, int, str, bool]:
+                rx, rz, sub, live_mca, local_chunks = job
+                async with semaphore:
                     staged_mca = await _stage_destination(stage_root, live_mca)
                     if await aioos.path.exists(staged_mca):
                         await self._merge_replace(
@@ -736,16 +844,25 @@ class WorldRestoreOrchestrator:
                             chunks=local_chunks,
                             owned_by=data_path,
                         )
-                    else:
-                        if not await aioos.path.exists(live_mca):
-                            done += 1
-                            continue
+                    elif await aioos.path.exists(live_mca):
                         await self._merge_remove(
                             target_mca=live_mca,
                             chunks=local_chunks,
                             owned_by=data_path,
                         )
+                    else:
+                        return rx, rz, sub, False
+                return rx, rz, sub, True
+
+            total_jobs = len(jobs)
+            done = 0
+            tasks = [asyncio.create_task(merge(job)) for job in jobs]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    rx, rz, sub, merged = await next_done
                     done += 1
+                    if not merged:
+                        continue
                     yield RestoreEvent(
                         event_type="merge_region",
                         restoration_id=restoration_id,
@@ -754,6 +871,10 @@ class WorldRestoreOrchestrator:
                         sub_dir=sub,
                         percent=(done / total_jobs) * 100.0 if total_jobs else 100.0,
                     )
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
 
     async def _run_chunk_op(
         self,
@@ -765,7 +886,8 @@ class WorldRestoreOrchestrator:
     ) -> None:
         async with ctx_manager as proc:
             completed_count: Optional[int] = None
-            async for event in proc.events(event_adapter):
+            # Per-chunk events are not needed, only the totals.
+            async for event in proc.events(event_adapter, types=("result", "error")):
                 if isinstance(event, MCMapErrorEvent):
                     raise MCMapError(event.message or f"mcmap {op_name} 操作失败")
                 if isinstance(event, MCMapReplaceChunksResultEvent):
@@ -863,6 +985,7 @@ class WorldRestoreOrchestrator:
         selection: RestorationSelection,
         *,
         include_mcc: bool,
+        snapshot_id: Optional[str] = None,
     ) -> list[Path]:
         instance = self._docker.get_instance(server_id)
         data_path = instance.get_data_path()
@@ -887,26 +1010,69 @@ class WorldRestoreOrchestrator:
                 paths.append(dim.poi_dir)
             return paths
 
-        expand = _expand_region_paths if include_mcc else _expand_region_mca_paths
-
         if selection.type is RestorationType.REGIONS:
-            return expand(dim, selection.regions)
+            regions = list(selection.regions)
+        elif selection.type is RestorationType.CHUNKS:
+            regions = list(_group_chunks_by_region(selection.chunks))
+        else:
+            raise SelectionResolutionError(f"不支持的选择范围类型: {selection.type}")
+
+        paths = _expand_region_mca_paths(dim, regions)
+        if include_mcc:
+            region_dirs = [
+                d for d in (dim.region_dir, dim.entities_dir, dim.poi_dir) if d is not None
+            ]
+            paths.extend(
+                await self._discover_mcc_paths(region_dirs, regions, snapshot_id)
+            )
+        return paths
 
-        if selection.type is RestorationType.CHUNKS:
-            grouped = _group_chunks_by_region(selection.chunks)
-            return expand(dim, list(grouped.keys()))
+    async def _discover_mcc_paths(
+        self,
+        region_dirs: list[Path],
+        regions: Collection[tuple[int, int]],
+        snapshot_id: Optional[str],
+    ) -> list[Path]:
+        """MCC sidecars of ``regions`` that exist live or in ``snapshot_id``.
+
+        One listing per region dir on each side instead of 1024 speculative
+        names per region. Live sidecars matter because ``--delete`` must
+        remove ones the snapshot lacks; the snapshot listing goes through
+        the service's ``ls`` cache, which the restore plan then reuses.
+        """
+        wanted = set(regions)
+
+        async def discover(region_dir: Path) -> list[Path]:
+            names: set[str] = set()
+            try:
+                names.update(await aioos.listdir(region_dir))
+            except FileNotFoundError:
+                pass
+            if snapshot_id is not None:
+                nodes = await self._snapshots.list_directory(snapshot_id, region_dir)
+                names.update(
+                    path.name for path, kind in nodes.items() if kind is NodeKind.FILE
+                )
+            return [region_dir / name for name in mcc_names_in_regions(names, wanted)]
 
-        raise SelectionResolutionError(f"不支持的选择范围类型: {selection.type}")
+        found = await asyncio.gather(*(discover(d) for d in region_dirs))
+        return [path for paths in found for path in paths]
 
     async def _resolve_paths_for_selection(
-        self, server_id: str, selection: RestorationSelection
+        self,
+        server_id: str,
+        selection: RestorationSelection,
+        snapshot_id: Optional[str] = None,
     ) -> list[Path]:
-        return await self._resolve_paths_core(server_id, selection, include_mcc=True)
+        """Selection paths; with ``snapshot_id``, MCCs present only there are included too."""
+        return await self._resolve_paths_core(
+            server_id, selection, include_mcc=True, snapshot_id=snapshot_id
+        )
 
     async def _resolve_eligibility_paths(
         self, server_id: str, selection: RestorationSelection
     ) -> list[Path]:
-        """MCA-only path resolution; speculative MCC sidecars excluded for eligibility checks."""
+        """MCA-only path resolution; MCC sidecars excluded for eligibility checks."""
         return await self._resolve_paths_core(server_id, selection, include_mcc=False)
 
     async def _ensure_server_stopped(self, server_id: str) -> None:
@@ -988,24 +1154,10 @@ def _find_dimension(
     )
 
 
-def _expand_region_paths(
-    dim: DimensionInfo, regions: list[tuple[int, int]]
-) -> list[Path]:
-    """Include-path list (MCA + speculative MCCs) for regions/chunks restores."""
-    paths: list[Path] = []
-    for (rx, rz) in regions:
-        for live_dir in (dim.region_dir, dim.entities_dir, dim.poi_dir):
-            if live_dir is None:
-                continue
-            paths.append(live_dir / f"r.{rx}.{rz}.mca")
-            paths.extend(_mcc_paths_for_region(live_dir, rx, rz))
-    return paths
-
-
 def _expand_region_mca_paths(
     dim: DimensionInfo, regions: list[tuple[int, int]]
 ) -> list[Path]:
-    """MCA-only variant; speculative MCC sidecars would over-filter eligibility checks."""
+    """MCA paths (plus entities/poi counterparts) for regions/chunks scopes."""
     paths: list[Path] = []
     for (rx, rz) in regions:
         for live_dir in (dim.region_dir, dim.entities_dir, dim.poi_dir):
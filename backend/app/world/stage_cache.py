@@ -0,0 +1,179 @@
+"""Snapshot staging cache shared by world-restore previews and chunk restores.
+
+Previewing a selection stages its snapshot MCAs, and committing the restore
+(or previewing again) used to stage the very same files once more. Snapshot
+contents are immutable, so a staged file is keyed by ``(snapshot_id, path)``
+and kept under ``root``; later stages only run restic for keys not cached
+yet and hard-link everything else into place (copying across filesystems).
+
+Consumers only ever read staged files — merges write to live or preview
+copies — so links into the cache are safe to hand out. Entries are evicted
+least-recently-used once their total size exceeds ``max_bytes``; evicting an
+entry never affects a stage dir that already links it. Entries a ``stage`` call
+is still working with are pinned and skipped by eviction, so a concurrent
+stage can't evict them between the lookup and the link. Paths absent from the
+snapshot are cached too, at zero size. The index is in-memory, so the first
+use wipes whatever a previous process left behind.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import secrets
+from collections import Counter, OrderedDict
+from collections.abc import AsyncGenerator, Sequence
+from contextlib import aclosing
+from pathlib import Path
+from typing import Optional
+
+import aiofiles.os as aioos
+
+from ..snapshots import ResticRestoreEvent, SnapshotService
+from ..snapshots.tree_cache import UNCACHEABLE_SNAPSHOT_IDS
+from ..utils import async_fs
+
+CacheKey = tuple[str, Path]
+
+
+def _entry_name(key: CacheKey) -> str:
+    snapshot_id, path = key
+    return hashlib.sha256(f"{snapshot_id}\0{path}".encode()).hexdigest()
+
+
+class StagingCache:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        # key -> cached size in bytes, or None when the snapshot lacks the path.
+        self._entries: OrderedDict[CacheKey, Optional[int]] = OrderedDict()
+        # key -> number of in-flight ``stage`` calls that will link it.
+        self._pins: Counter[CacheKey] = Counter()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._initialized = False
+        # Guards the index against eviction racing a concurrent adopt/link.
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def stage(
+        self,
+        snapshots: SnapshotService,
+        snapshot_id: str,
+        include_paths: Sequence[Path],
+        stage_root: Path,
+        *,
+        max_bytes: int,
+    ) -> AsyncGenerator[ResticRestoreEvent, None]:
+        """Drop-in for ``SnapshotService.stage`` that reuses cached files.
+
+        Yields restic events only for the paths that had to be staged.
+        """
+        if max_bytes <= 0 or snapshot_id in UNCACHEABLE_SNAPSHOT_IDS:
+            async with aclosing(
+                snapshots.stage(snapshot_id, include_paths, stage_root)
+            ) as events:
+                async for event in events:
+                    yield event
+            return
+
+        keys = [(snapshot_id, path) for path in dict.fromkeys(include_paths)]
+        async with self._lock:
+            await self._ensure_root()
+            self._pins.update(keys)
+            missing = [key for key in keys if key not in self._entries]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        try:
+            if missing:
+                async with aclosing(
+                    self._fill(snapshots, snapshot_id, missing)
+                ) as events:
+                    async for event in events:
+                        yield event
+
+            async with self._lock:
+                for key in keys:
+                    if key not in self._entries:
+                        # Pinned keys are never evicted; a gap here is a bug,
+                        # and skipping it would read as "absent from snapshot".
+                        raise RuntimeError(
+                            f"staging cache lost {key[1]} of snapshot {snapshot_id}"
+                        )
+                    self._entries.move_to_end(key)
+                    if self._entries[key] is None:
+                        continue
+                    await async_fs.link_or_copy(
+                        self._entry_path(key),
+                        SnapshotService.stage_destination(stage_root, key[1]),
+                    )
+        finally:
+            async with self._lock:
+                self._pins.subtract(keys)
+                for key in keys:
+                    if self._pins[key] <= 0:
+                        del self._pins[key]
+                await self._shrink(max_bytes)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+        await async_fs.rmtree(self.root, ignore_errors=True)
+        await aioos.makedirs(self.root, exist_ok=True)
+
+    def _entry_path(self, key: CacheKey) -> Path:
+        return self.root / _entry_name(key)
+
+    async def _ensure_root(self) -> None:
+        if self._initialized:
+            return
+        self._initialized = True
+        await self.clear()
+
+    async def _fill(
+        self,
+        snapshots: SnapshotService,
+        snapshot_id: str,
+        missing: list[CacheKey],
+    ) -> AsyncGenerator[ResticRestoreEvent, None]:
+        """Stage ``missing`` into a scratch dir under ``root`` and adopt the results."""
+        scratch = self.root / f".incoming-{secrets.token_hex(8)}"
+        try:
+            async with aclosing(
+                snapshots.stage(snapshot_id, [path for _, path in missing], scratch)
+            ) as events:
+                async for event in events:
+                    yield event
+            async with self._lock:
+                for key in missing:
+                    await self._adopt(scratch, key)
+        finally:
+            await async_fs.rmtree(scratch, ignore_errors=True)
+
+    async def _adopt(self, scratch: Path, key: CacheKey) -> None:
+        staged = SnapshotService.stage_destination(scratch, key[1])
+        size: Optional[int] = None
+        if await aioos.path.isfile(staged):
+            size = (await aioos.stat(staged)).st_size
+            await aioos.replace(staged, self._entry_path(key))
+        previous = self._entries.pop(key, None)
+        self.bytes -= previous or 0
+        self._entries[key] = size
+        self.bytes += size or 0
+
+    async def _shrink(self, max_bytes: int) -> None:
+        for key in list(self._entries):
+            if self.bytes <= max_bytes:
+                break
+            if key in self._pins:
+                continue
+            size = self._entries.pop(key)
+            if size is None:
+                continue
+            self.bytes -= size
+            try:
+                await aioos.remove(self._entry_path(key))
+            except FileNotFoundError:
+                pass
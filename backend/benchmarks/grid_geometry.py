@@ -0,0 +1,183 @@
+"""Compare the packed-key grid geometry against the previous set-based one.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.grid_geometry [--cells N] [--seed S]
+
+Generates roughly ``N`` cells (default 2M) shaped like a large prune
+preview: blobs of explored chunks with holes, scattered single chunks and
+diagonal pinches. Times ``build_grid_shapes`` with both implementations and
+checks that their output is identical.
+
+``build_grid_shapes`` used to break ties between components with the same
+``(min z, min x)`` by set iteration order; it now keeps them in ``(x, z)``
+order of their first cell. Rings and everything else match exactly.
+"""
+
+import argparse
+import random
+import time
+from collections import deque
+from typing import Iterable
+
+from app.grid_geometry import (
+    Cell,
+    GridShapeData,
+    Ring,
+    Vertex,
+    _ring_area_abs,
+    _simplify_collinear,
+    build_grid_shapes,
+)
+
+
+def reference_connected_components(cells: Iterable[Cell]) -> list[list[Cell]]:
+    remaining = set(cells)
+    components: list[list[Cell]] = []
+    while remaining:
+        seed = next(iter(remaining))
+        component: list[Cell] = []
+        queue: deque[Cell] = deque([seed])
+        remaining.discard(seed)
+        while queue:
+            x, z = queue.popleft()
+            component.append((x, z))
+            for dx, dz in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                neighbor = (x + dx, z + dz)
+                if neighbor in remaining:
+                    remaining.discard(neighbor)
+                    queue.append(neighbor)
+        component.sort()
+        components.append(component)
+    components.sort(key=lambda comp: (min(z for _, z in comp), min(x for x, _ in comp)))
+    return components
+
+
+def reference_compute_boundary_rings(cells: Iterable[Cell]) -> list[Ring]:
+    cell_set = set(cells)
+    if not cell_set:
+        return []
+
+    def has(x: int, z: int) -> bool:
+        return (x, z) in cell_set
+
+    adj: dict[Vertex, list[Vertex]] = {}
+
+    def push_edge(start: Vertex, end: Vertex) -> None:
+        adj.setdefault(start, []).append(end)
+
+    for x, z in sorted(cell_set):
+        if not has(x, z - 1):
+            push_edge((x + 1, z), (x, z))
+        if not has(x, z + 1):
+            push_edge((x, z + 1), (x + 1, z + 1))
+        if not has(x - 1, z):
+            push_edge((x, z), (x, z + 1))
+        if not has(x + 1, z):
+            push_edge((x + 1, z + 1), (x + 1, z))
+
+    rings: list[Ring] = []
+    while adj:
+        start = next(iter(adj))
+        ring: Ring = [start]
+        cursor = _pop_adj(adj, start)
+        if cursor is None:
+            adj.pop(start, None)
+            continue
+        while cursor != start:
+            ring.append(cursor)
+            next_cursor = _pop_adj(adj, cursor)
+            if next_cursor is None:
+                break
+            cursor = next_cursor
+        if len(ring) >= 3:
+            rings.append(_simplify_collinear(ring))
+    return rings
+
+
+def reference_build_grid_shapes(
+    cells: Iterable[Cell], *, id_prefix: str
+) -> list[GridShapeData]:
+    shapes: list[GridShapeData] = []
+    for idx, component in enumerate(reference_connected_components(cells)):
+        xs = [x for x, _ in component]
+        zs = [z for _, z in component]
+        rings = reference_compute_boundary_rings(component)
+        rings.sort(key=_ring_area_abs, reverse=True)
+        shapes.append(
+            GridShapeData(
+                id=f"{id_prefix}-{idx}",
+                cell_count=len(component),
+                bbox=(min(xs), min(zs), max(xs), max(zs)),
+                rings=rings,
+            )
+        )
+    return shapes
+
+
+def _pop_adj(adj: dict[Vertex, list[Vertex]], key: Vertex) -> Vertex | None:
+    values = adj.get(key)
+    if not values:
+        return None
+    value = values.pop(0)
+    if not values:
+        adj.pop(key, None)
+    return value
+
+
+def synthetic_cells(count: int, seed: int = 0) -> set[Cell]:
+    """Roughly ``count`` cells: holey blobs plus scattered and diagonal cells."""
+    rng = random.Random(seed)
+    cells: set[Cell] = set()
+    extent = int((count * 4) ** 0.5)
+    while len(cells) < count:
+        cx, cz = rng.randrange(-extent, extent), rng.randrange(-extent, extent)
+        radius = rng.randrange(4, 64)
+        for x in range(cx - radius, cx + radius + 1):
+            for z in range(cz - radius, cz + radius + 1):
+                if (x - cx) ** 2 + (z - cz) ** 2 > radius * radius:
+                    continue
+                if rng.random() < 0.03:
+                    continue  # visited chunk inside the blob
+                cells.add((x, z))
+        for _ in range(radius):
+            x, z = rng.randrange(-extent, extent), rng.randrange(-extent, extent)
+            cells.add((x, z))
+            if rng.random() < 0.3:
+                cells.add((x + 1, z + 1))
+    return cells
+
+
+def _canonical(shapes: list[GridShapeData]) -> list[tuple]:
+    # Components tied on (min z, min x) came out in set order before.
+    return sorted((s.cell_count, s.bbox, s.rings) for s in shapes)
+
+
+def _time(label: str, fn, cells: set[Cell]) -> list[GridShapeData]:
+    start = time.perf_counter()
+    shapes = fn(cells, id_prefix="bench")
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12}{elapsed:>9.2f} s{len(shapes):>10} shapes")
+    return shapes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cells", type=int, default=2_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cells = synthetic_cells(args.cells, args.seed)
+    print(f"{len(cells)} cells")
+    packed = _time("packed", build_grid_shapes, cells)
+    reference = _time("set-based", reference_build_grid_shapes, cells)
+    if packed == reference:
+        print("identical")
+    elif _canonical(packed) == _canonical(reference):
+        print("identical up to the order of tied components")
+    else:
+        print("OUTPUT DIFFERS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Compare stored size and encode time of the mcmap tile formats.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.tile_encoding [TILE_DIR] [--limit N]
+
+``TILE_DIR`` is scanned recursively for ``r.X.Z.png`` files (e.g. a
+server's ``data/.mcmap/tiles``). Without it, synthetic 512x512 tiles that
+mimic rendered terrain (blocky palette colours, transparent unloaded
+chunks) are generated instead.
+"""
+
+import argparse
+import io
+import random
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from app.dynamic_config.configs.mcmap import TileFormat
+from app.mcmap.encoding import encode_tile_bytes
+
+FORMATS: tuple[TileFormat, ...] = ("png", "png_quantized", "webp")
+TILE_SIZE = 512
+CHUNK_PIXELS = 16
+
+
+def _synthetic_tiles(count: int) -> list[Image.Image]:
+    rng = random.Random(0)
+    palette = [
+        (rng.randrange(256), rng.randrange(256), rng.randrange(256), 255)
+        for _ in range(48)
+    ]
+    tiles: list[Image.Image] = []
+    for _ in range(count):
+        img = Image.new("RGBA", (TILE_SIZE, TILE_SIZE), (0, 0, 0, 0))
+        px = img.load()
+        assert px is not None
+        for cz in range(0, TILE_SIZE, CHUNK_PIXELS):
+            for cx in range(0, TILE_SIZE, CHUNK_PIXELS):
+                if rng.random() < 0.15:
+                    continue  # ungenerated chunk
+                base = rng.randrange(len(palette))
+                for z in range(cz, cz + CHUNK_PIXELS):
+                    for x in range(cx, cx + CHUNK_PIXELS):
+                        r, g, b, a = palette[(base + (rng.random() < 0.2)) % 48]
+                        shade = rng.randrange(-12, 13)
+                        px[x, z] = (
+                            max(0, min(255, r + shade)),
+                            max(0, min(255, g + shade)),
+                            max(0, min(255, b + shade)),
+                            a,
+                        )
+        tiles.append(img)
+    return tiles
+
+
+def _load_tiles(tile_dir: Path, limit: int) -> list[Image.Image]:
+    tiles: list[Image.Image] = []
+    for path in sorted(tile_dir.rglob("r.*.png")):
+        if path.name.endswith(".q.png"):
+            continue
+        with Image.open(path) as img:
+            tiles.append(img.convert("RGBA"))
+        if len(tiles) >= limit:
+            break
+    return tiles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("tile_dir", nargs="?", type=Path)
+    parser.add_argument("--limit", type=int, default=32)
+    args = parser.parse_args()
+
+    if args.tile_dir is not None:
+        tiles = _load_tiles(args.tile_dir, args.limit)
+        source = str(args.tile_dir)
+    else:
+        tiles = _synthetic_tiles(min(args.limit, 8))
+        source = "synthetic"
+    if not tiles:
+        raise SystemExit("no tiles found")
+
+    print(f"{len(tiles)} tiles from {source}")
+    print(f"{'format':<15}{'total KiB':>12}{'avg KiB':>10}{'vs png':>9}{'ms/tile':>10}")
+    baseline = None
+    for fmt in FORMATS:
+        total = 0
+        start = time.perf_counter()
+        for img in tiles:
+            total += len(encode_tile_bytes(img, fmt))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if baseline is None:
+            baseline = total
+        print(
+            f"{fmt:<15}{total / 1024:>12.1f}{total / len(tiles) / 1024:>10.1f}"
+            f"{total / baseline:>8.0%}{elapsed_ms / len(tiles):>10.1f}"
+        )
+
+    # Decode cost paid by the fallback path for clients without WebP support.
+    webp = [encode_tile_bytes(img, "webp") for img in tiles]
+    start = time.perf_counter()
+    for data in webp:
+        with Image.open(io.BytesIO(data)) as img:
+            encode_tile_bytes(img, "png")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"webp->png transcode: {elapsed_ms / len(tiles):.1f} ms/tile")
+
+
+if __name__ == "__main__":
+    main()
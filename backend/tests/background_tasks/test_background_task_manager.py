@@ -267,6 +267,36 @@ class TestTaskCancellation:
         task = task_manager.get_task(result.task_id)
         assert task.status == TaskStatus.CANCELLED
 
+    async def test_cancel_closes_task_generator(self, task_manager):
+        """Cancelling runs the generator's cleanup (e.g. killing a subprocess)."""
+        cancel_event = asyncio.Event()
+        cleaned_up = False
+
+        async def long_task():
+            nonlocal cleaned_up
+            try:
+                for i in range(100):
+                    yield TaskProgress(progress=i, message=f"Step {i}")
+                    await asyncio.sleep(0.01)
+                    if i == 3:
+                        cancel_event.set()
+            finally:
+                cleaned_up = True
+
+        result = task_manager.submit(
+            task_type=TaskType.SNAPSHOT_BACKUP,
+            name="backup",
+            task_generator=long_task(),
+            cancellable=True,
+        )
+
+        await cancel_event.wait()
+        assert await task_manager.cancel(result.task_id) is True
+        task_result = await result.awaitable
+
+        assert task_result.error == "已取消"
+        assert cleaned_up is True
+
     async def test_cancel_non_cancellable_task_fails(self, task_manager):
         """Test that cancelling a non-cancellable task fails."""
         started = asyncio.Event()
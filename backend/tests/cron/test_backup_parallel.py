@@ -0,0 +1,178 @@
+"""Tests for the parallel per-server mode of backup_cronjob."""
+
+import asyncio
+from datetime import datetime, timezone
+from contextlib import asynccontextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.cron.jobs.backup import BackupJobParams, backup_cronjob
+from app.cron.types import ExecutionContext
+from app.snapshots.models import ResticBackupEvent, ResticSnapshotWithSummary
+from app.world import LockHolder, ServerOperationKind, server_operation_lock
+
+
+class _FakeInstance:
+    def __init__(self, project_path: Path, flushes: list[str]) -> None:
+        self._project_path = project_path
+        self._flushes = flushes
+
+    def get_project_path(self) -> Path:
+        return self._project_path
+
+    @asynccontextmanager
+    async def saves_flushed(self):
+        self._flushes.append(f"off:{self._project_path.name}")
+        try:
+            yield True
+        finally:
+            self._flushes.append(f"on:{self._project_path.name}")
+
+
+class _FakeDockerMC:
+    def __init__(self, root: Path, names: list[str]) -> None:
+        self._root = root
+        self._names = names
+        self.flushes: list[str] = []
+
+    async def get_all_server_names(self) -> list[str]:
+        return list(self._names)
+
+    def get_instance(self, server_id: str) -> _FakeInstance:
+        return _FakeInstance(self._root / server_id, self.flushes)
+
+
+class _FakeService:
+    def __init__(self, fail: frozenset[str] = frozenset()) -> None:
+        self._fail = fail
+        self.running = 0
+        self.peak = 0
+        self.backed_up: list[str] = []
+        self.forget_calls: list[dict] = []
+
+    async def create_snapshot_stream(self, paths):
+        (path,) = paths
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(0.02)
+            if path.name in self._fail:
+                raise RuntimeError("restic backup failed")
+            self.backed_up.append(path.name)
+            snapshot_id = f"{len(self.backed_up):064x}"
+            yield ResticBackupEvent(
+                kind="summary",
+                snapshot_id=snapshot_id,
+                snapshot=ResticSnapshotWithSummary(
+                    time=datetime.now(timezone.utc),
+                    paths=[str(path)],
+                    hostname="h",
+                    username="u",
+                    id=snapshot_id,
+                    short_id=snapshot_id[:8],
+                ),
+            )
+        finally:
+            self.running -= 1
+
+    async def forget(self, **kwargs):
+        self.forget_calls.append(kwargs)
+
+
+@pytest.fixture
+def servers(tmp_path):
+    names = ["alpha", "beta", "gamma", "delta"]
+    for name in names:
+        (tmp_path / name).mkdir()
+    return tmp_path, names
+
+
+def _context(**params) -> ExecutionContext:
+    return ExecutionContext(
+        cronjob_id="cj-test",
+        identifier="backup-test",
+        execution_id="exec-test",
+        params=BackupJobParams(parallel_servers=True, keep_last=3, **params),
+        started_at=datetime.now(timezone.utc),
+    )
+
+
+def _patched(root: Path, docker: _FakeDockerMC, service: _FakeService):
+    return (
+        patch("app.cron.jobs.backup.settings.server_path", root),
+        patch("app.cron.jobs.backup.docker_mc_manager", docker),
+        patch("app.cron.jobs.backup.snapshot_service", service),
+    )
+
+
+async def test_servers_backed_up_concurrently_with_per_server_locks(servers):
+    root, names = servers
+    service = _FakeService()
+    context = _context(max_parallel_backups=2)
+    holder = LockHolder(
+        kind=ServerOperationKind.RESTORE,
+        started_at=datetime.now(timezone.utc),
+        user_id=1,
+        description="restore in progress",
+    )
+
+    docker = _FakeDockerMC(root, names)
+    p1, p2, p3 = _patched(root, docker, service)
+    with p1, p2, p3:
+        async with server_operation_lock.acquire("beta", holder):
+            await backup_cronjob(context)
+
+    assert sorted(service.backed_up) == ["alpha", "delta", "gamma"]
+    assert service.peak == 2
+    # Retention runs once per backed-up server, scoped to its own path, and
+    # only the last run prunes.
+    assert sorted(call["paths"][0].name for call in service.forget_calls) == [
+        "alpha",
+        "delta",
+        "gamma",
+    ]
+    assert all(len(call["paths"]) == 1 for call in service.forget_calls)
+    assert [call["prune"] for call in service.forget_calls] == [False, False, True]
+    joined = "\n".join(context.messages)
+    assert "跳过备份: 服务器 'beta'" in joined
+    assert "3 个服务器已备份, 1 个跳过, 0 个失败" in joined
+    # Each backed-up server is flushed and resumed around its own snapshot.
+    assert sorted(docker.flushes) == sorted(
+        f"{state}:{name}" for name in ("alpha", "gamma", "delta") for state in ("off", "on")
+    )
+
+
+async def test_failed_server_fails_job_after_others_finish(servers):
+    root, names = servers
+    service = _FakeService(fail=frozenset({"gamma"}))
+    context = _context(max_parallel_backups=4)
+
+    docker = _FakeDockerMC(root, names)
+    p1, p2, p3 = _patched(root, docker, service)
+    with p1, p2, p3, pytest.raises(RuntimeError, match="gamma"):
+        await backup_cronjob(context)
+
+    assert sorted(service.backed_up) == ["alpha", "beta", "delta"]
+    assert len(service.forget_calls) == 3
+    # save-on still runs for the server whose backup failed.
+    assert "on:gamma" in docker.flushes
+
+
+async def test_forget_never_touches_other_snapshots(servers):
+    """A snapshot outside the cron job's per-server path sets — a manual
+    backup of the whole servers dir, here — is not in any forget's scope."""
+    root, names = servers
+    service = _FakeService()
+    context = _context(max_parallel_backups=4)
+
+    docker = _FakeDockerMC(root, names)
+    p1, p2, p3 = _patched(root, docker, service)
+    with p1, p2, p3:
+        await backup_cronjob(context)
+
+    scoped = {path for call in service.forget_calls for path in call["paths"]}
+    assert scoped == {root / name for name in names}
+    assert root not in scoped
+    assert all(call["paths"] for call in service.forget_calls)
@@ -0,0 +1,106 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from app.ftb_claims import ClaimsResponse, FtbExtractError
+from app.ftb_claims.cache import FtbClaimsCache, ftb_data_signature_sync
+from app.world.layout import WorldRootPath
+
+
+class _Loader:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.fail = False
+        self.gate: asyncio.Event | None = None
+
+    async def __call__(self, data_path, world_root):
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.fail:
+            raise FtbExtractError("boom")
+        return None, ClaimsResponse(available=self.calls % 2 == 1)
+
+
+@pytest.fixture
+def world(tmp_path: Path) -> WorldRootPath:
+    world_dir = tmp_path / "world"
+    (world_dir / "ftbchunks").mkdir(parents=True)
+    (world_dir / "ftbchunks" / "team.snbt").write_text("a")
+    (world_dir / "region").mkdir()
+    return WorldRootPath(name="world", path=world_dir)
+
+
+def _replace(path: Path, text: str) -> None:
+    st = path.stat()
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text)
+    os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(tmp, path)
+
+
+def test_signature_covers_ftb_entries_only(world: WorldRootPath):
+    (world.path / "data").mkdir()
+    (world.path / "data" / "ftb_lib").mkdir()
+    (world.path / "data" / "ftb_lib" / "universe.dat").write_bytes(b"x")
+    (world.path / "data" / "raids.dat").write_bytes(b"x")
+    (world.path / "region" / "r.0.0.mca").write_bytes(b"x")
+
+    signature = ftb_data_signature_sync(world.path)
+
+    assert [entry[0] for entry in signature] == [
+        os.path.join("data", "ftb_lib", "universe.dat"),
+        os.path.join("ftbchunks", "team.snbt"),
+    ]
+
+
+async def test_hit_until_ftb_data_changes(world: WorldRootPath, tmp_path: Path):
+    loader = _Loader()
+    cache = FtbClaimsCache(loader)
+
+    first = await cache.get(tmp_path, world)
+    assert (await cache.get(tmp_path, world)) is first
+    (world.path / "region" / "r.0.0.mca").write_bytes(b"unrelated")
+    assert (await cache.get(tmp_path, world)) is first
+    assert loader.calls == 1
+
+    # Same mtime and size, but an atomic rewrite changes the inode.
+    _replace(world.path / "ftbchunks" / "team.snbt", "b")
+    second = await cache.get(tmp_path, world)
+    assert second is not first
+    assert loader.calls == 2
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+async def test_stale_read_refreshes_in_background(world: WorldRootPath, tmp_path):
+    loader = _Loader()
+    cache = FtbClaimsCache(loader)
+    first = await cache.get(tmp_path, world)
+    (world.path / "ftbchunks" / "other.snbt").write_text("c")
+    loader.gate = asyncio.Event()
+
+    assert (await cache.get(tmp_path, world, allow_stale=True)) is first
+    # A strict reader joins the refresh already running.
+    strict = asyncio.create_task(cache.get(tmp_path, world))
+    await asyncio.sleep(0.05)
+    loader.gate.set()
+    refreshed = await strict
+
+    assert loader.calls == 2
+    assert refreshed is not first
+    assert (await cache.get(tmp_path, world, allow_stale=True)) is refreshed
+
+
+async def test_failures_are_not_cached(world: WorldRootPath, tmp_path: Path):
+    loader = _Loader()
+    loader.fail = True
+    cache = FtbClaimsCache(loader)
+
+    with pytest.raises(FtbExtractError):
+        await cache.get(tmp_path, world)
+    loader.fail = False
+    await cache.get(tmp_path, world)
+
+    assert loader.calls == 2
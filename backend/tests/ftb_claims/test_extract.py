@@ -8,7 +8,7 @@ from unittest.mock import patch
 import pytest
 
 from app.config import settings
-from app.ftb_claims import extract_claims_for_server, runner
+from app.ftb_claims import extract_claims_for_server
 
 
 def _write_fake_mcmap(payload: dict) -> Path:
@@ -68,7 +68,7 @@ def world_data_path():
 
 async def test_unavailable_when_mcmap_reports_no_data(world_data_path):
     fake = _write_fake_mcmap_error("could not detect FTB claim format in world directory")
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         result = await extract_claims_for_server(world_data_path)
     fake.unlink()
     assert result.available is False
@@ -139,7 +139,7 @@ async def test_extract_resolves_dim_and_groups_clusters(world_data_path):
         ],
     }
     fake = _write_fake_mcmap(payload)
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         result = await extract_claims_for_server(world_data_path)
     fake.unlink()
 
@@ -188,7 +188,7 @@ async def test_extract_does_not_require_full_dimension_scan(world_data_path, mon
     }
     fake = _write_fake_mcmap(payload)
     monkeypatch.setattr(settings, "fd_binary_path", Path("/missing/fd"))
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         result = await extract_claims_for_server(world_data_path)
     fake.unlink()
 
@@ -200,7 +200,7 @@ async def test_extract_error_other_than_no_data_propagates(world_data_path):
     from app.ftb_claims import FtbExtractError
 
     fake = _write_fake_mcmap_error("world directory not found: /nonexistent")
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         with pytest.raises(FtbExtractError):
             await extract_claims_for_server(world_data_path)
     fake.unlink()
@@ -232,7 +232,7 @@ async def test_extract_rejects_malformed_mcmap_payload(world_data_path):
         ],
     }
     fake = _write_fake_mcmap(payload)
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         with pytest.raises(FtbExtractError, match="invalid JSON event"):
             await extract_claims_for_server(world_data_path)
     fake.unlink()
@@ -259,7 +259,7 @@ async def test_display_name_falls_back_to_id_prefix(world_data_path):
         ],
     }
     fake = _write_fake_mcmap(payload)
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         result = await extract_claims_for_server(world_data_path)
     fake.unlink()
     assert result.teams[0].display_name == "12345678"
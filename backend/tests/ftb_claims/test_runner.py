@@ -6,6 +6,7 @@ from unittest.mock import patch
 
 import pytest
 
+from app.config import settings
 from app.ftb_claims import runner
 from app.mcmap.events import MCMAP_FTB_CLAIMS_EVENT_ADAPTER
 
@@ -30,7 +31,7 @@ async def test_extract_yields_result_event(fake_owned_dir):
         "#!/bin/sh\n"
         'echo \'{"type":"result","detected_format":"snbt","teams":0,"claims":0,"dimensions":0,"data":{"mcmap_extract_ftb_claims_version":1,"detected_format":"snbt","world_dir":"/tmp/world","dimensions":[],"teams":[]}}\'\n'
     )
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         async with runner.extract_ftb_claims(
             world_dir=Path("/tmp/world"),
             owned_by=fake_owned_dir,
@@ -71,7 +72,7 @@ async def test_extract_reads_large_result_event(fake_owned_dir):
         "}\n"
         'print(json.dumps(payload, separators=(",", ":")))\n'
     )
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         async with runner.extract_ftb_claims(
             world_dir=Path("/tmp/world"),
             owned_by=fake_owned_dir,
@@ -89,7 +90,7 @@ async def test_extract_yields_error_event(fake_owned_dir):
         "#!/bin/sh\n"
         'echo \'{"type":"error","message":"could not detect FTB claim format in world directory"}\'\n'
     )
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         async with runner.extract_ftb_claims(
             world_dir=Path("/tmp/world"),
             owned_by=fake_owned_dir,
@@ -107,7 +108,7 @@ async def test_extract_passes_world_arg(fake_owned_dir):
         'echo \'{"type":"result","detected_format":"snbt","teams":0,"claims":0,"dimensions":0,"data":{"mcmap_extract_ftb_claims_version":1,"detected_format":"snbt","world_dir":"/tmp/world","dimensions":[],"teams":[]}}\'\n'
     )
     world = fake_owned_dir / "world"
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         async with runner.extract_ftb_claims(
             world_dir=world,
             owned_by=fake_owned_dir,
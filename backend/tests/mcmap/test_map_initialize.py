@@ -1,7 +1,9 @@
+import hashlib
 import json
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import AsyncIterator
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -11,6 +13,7 @@ from app.mcmap.events import (
     MCMapGenPaletteResultEvent,
 )
 from app.mcmap.palette import write_palette_hash
+from app.mcmap.store import SharedArtifactStore
 from app.routers.servers import map as map_router
 
 
@@ -43,7 +46,7 @@ class _FakeProc:
         self._events = events
         self.returncode = 0
 
-    async def events(self, _adapter):
+    async def events(self, _adapter, types=None):
         for event in self._events:
             yield event
 
@@ -125,6 +128,9 @@ async def test_initialize_stream_force_rebuilds_current_prerequisites(
 
     monkeypatch.setattr(map_router.mcmap_runner, "download_client", fake_download_client)
     monkeypatch.setattr(map_router.mcmap_runner, "gen_palette", fake_gen_palette)
+    config_mock = MagicMock()
+    config_mock.mcmap.shared_store_enabled = False
+    monkeypatch.setattr(map_router, "config", config_mock)
 
     chunks = [
         chunk async for chunk in map_router._initialize_stream("server-1", force=True)
@@ -146,3 +152,192 @@ async def test_initialize_stream_force_rebuilds_current_prerequisites(
         "cached": False,
     } in events
     assert events[-1] == {"stage": "complete"}
+
+
+@pytest.mark.asyncio
+async def test_initialize_stream_extracts_only_new_mod_jars(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    data_path = tmp_path / "data"
+    mods = data_path / "mods"
+    mods.mkdir(parents=True)
+    (mods / "create.jar").write_bytes(b"create")
+    (mods / "create_addon.jar").write_bytes(b"addon")
+    cache = ServerMapCache(data_path=data_path)
+    await cache.ensure_dir(cache.cache_dir)
+    cache.client_jar.write_text("client")
+
+    calls: list[list[str]] = []
+    monkeypatch.setattr(
+        map_router, "docker_mc_manager", _FakeDockerMC(_FakeInstance(data_path))
+    )
+
+    @asynccontextmanager
+    async def fake_gen_palette(
+        packs: list[Path],
+        output: Path,
+        *,
+        level_dat: Path | None,
+        owned_by: Path,
+    ) -> AsyncIterator[_FakeProc]:
+        names = [p.name for p in packs]
+        calls.append(names)
+        assert level_dat is None
+        # The addon only resolves when its parent mod is on the pack path.
+        failed = 1 if names == ["create_addon.jar", "client.jar"] else 0
+        # The red channel records how many packs the run saw.
+        output.write_text(json.dumps({f"{names[0]}:block": [len(names), 0, 0]}))
+        yield _FakeProc(
+            [
+                MCMapGenPaletteResultEvent(
+                    type="result",
+                    output=str(output),
+                    entries=1,
+                    counters={},
+                    failed=failed,
+                )
+            ]
+        )
+
+    monkeypatch.setattr(map_router.mcmap_runner, "gen_palette", fake_gen_palette)
+    config_mock = MagicMock()
+    config_mock.mcmap.palette_parallel_jobs = 2
+    config_mock.mcmap.shared_store_enabled = False
+    monkeypatch.setattr(map_router, "config", config_mock)
+
+    chunks = [chunk async for chunk in map_router._initialize_stream("server-1")]
+    events = _parse_sse(chunks)
+
+    assert sorted(calls) == sorted(
+        [
+            ["client.jar"],
+            ["create.jar", "client.jar"],
+            ["create_addon.jar", "client.jar"],
+            ["create_addon.jar", "mods", "client.jar"],
+        ]
+    )
+    assert json.loads(cache.palette_json.read_text()) == {
+        "client.jar:block": [1, 0, 0],
+        "create.jar:block": [2, 0, 0],
+        "create_addon.jar:block": [3, 0, 0],
+    }
+    addon = hashlib.sha256(b"addon").hexdigest()
+    create = hashlib.sha256(b"create").hexdigest()
+    mods_digest = hashlib.sha256("\n".join(sorted([addon, create])).encode())
+    assert {p.name.split("-", 1)[1] for p in cache.palettes_dir.iterdir()} == {
+        "client.json",
+        f"{addon}-{mods_digest.hexdigest()[:16]}.linked.json",
+        f"{create}.json",
+    }
+    assert events[-1] == {"stage": "complete"}
+
+    # Adding a jar extracts it and redoes the linked partial, whose parents
+    # may now come from the new jar; self-contained partials are reused.
+    calls.clear()
+    (mods / "jei.jar").write_bytes(b"jei")
+    chunks = [chunk async for chunk in map_router._initialize_stream("server-1")]
+    events = _parse_sse(chunks)
+
+    assert sorted(calls) == sorted(
+        [
+            ["jei.jar", "client.jar"],
+            ["create_addon.jar", "client.jar"],
+            ["create_addon.jar", "mods", "client.jar"],
+        ]
+    )
+    assert "jei.jar:block" in json.loads(cache.palette_json.read_text())
+    assert {
+        "stage": "palette",
+        "phase": "done",
+        "percent": 100,
+        "cached": False,
+    } in events
+    assert events[-1] == {"stage": "complete"}
+
+    # A corrupt cached partial is a miss: only that jar is re-extracted.
+    calls.clear()
+    cache.palette_hash_file.unlink()
+    own = next(p for p in cache.palettes_dir.iterdir() if create in p.name)
+    own.write_text('{"create.jar:block": [1, 2')
+    chunks = [chunk async for chunk in map_router._initialize_stream("server-1")]
+
+    assert calls == [["create.jar", "client.jar"]]
+    assert json.loads(cache.palette_json.read_text())["create.jar:block"] == [2, 0, 0]
+    assert _parse_sse(chunks)[-1] == {"stage": "complete"}
+
+
+@pytest.mark.asyncio
+async def test_initialize_stream_reuses_shared_store_across_servers(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store = SharedArtifactStore(tmp_path / "store")
+    monkeypatch.setattr(map_router, "shared_store", store)
+    config_mock = MagicMock()
+    config_mock.mcmap.shared_store_enabled = True
+    monkeypatch.setattr(map_router, "config", config_mock)
+
+    calls: list[str] = []
+
+    @asynccontextmanager
+    async def fake_download_client(
+        version: str, target: Path, *, owned_by: Path
+    ) -> AsyncIterator[_FakeProc]:
+        calls.append(f"download:{owned_by.name}")
+        target.write_text("client")
+        yield _FakeProc(
+            [
+                MCMapDownloadClientResultEvent(
+                    type="result",
+                    version=version,
+                    target=str(target),
+                    bytes=6,
+                    sha1="abc",
+                    move_method="rename",
+                )
+            ]
+        )
+
+    @asynccontextmanager
+    async def fake_gen_palette(
+        packs: list[Path],
+        output: Path,
+        *,
+        level_dat: Path | None,
+        owned_by: Path,
+    ) -> AsyncIterator[_FakeProc]:
+        calls.append(f"palette:{owned_by.name}")
+        output.write_text("{}")
+        yield _FakeProc(
+            [
+                MCMapGenPaletteResultEvent(
+                    type="result", output=str(output), entries=0, counters={}
+                )
+            ]
+        )
+
+    monkeypatch.setattr(map_router.mcmap_runner, "download_client", fake_download_client)
+    monkeypatch.setattr(map_router.mcmap_runner, "gen_palette", fake_gen_palette)
+
+    caches = []
+    for name in ("a", "b"):
+        data_path = tmp_path / name
+        monkeypatch.setattr(
+            map_router, "docker_mc_manager", _FakeDockerMC(_FakeInstance(data_path))
+        )
+        chunks = [chunk async for chunk in map_router._initialize_stream(name)]
+        events = _parse_sse(chunks)
+        assert events[-1] == {"stage": "complete"}
+        caches.append(ServerMapCache(data_path=data_path))
+
+    assert calls == ["download:a", "palette:a"]
+    assert {
+        "stage": "palette",
+        "phase": "done",
+        "percent": 100,
+        "cached": True,
+        "shared": True,
+    } in events
+    a, b = caches
+    assert a.client_jar.stat().st_ino == b.client_jar.stat().st_ino
+    assert a.palette_json.stat().st_ino == b.palette_json.stat().st_ino
+    assert b.palette_hash_file.read_text() == a.palette_hash_file.read_text()
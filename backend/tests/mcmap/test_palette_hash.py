@@ -1,14 +1,24 @@
+import json
 import tempfile
+from collections import OrderedDict
 from pathlib import Path
 
 import pytest
 
+from app.mcmap import palette
 from app.mcmap.cache import ServerMapCache
 from app.mcmap.palette import (
+    PaletteMergeError,
     compute_palette_hash,
     discover_level_dat,
     discover_mods_dir,
+    jar_digest,
+    merge_partial_palettes,
     palette_is_current,
+    partial_palette_path,
+    partial_palette_usable,
+    prune_partial_palettes,
+    supports_partial_palettes,
     write_palette_hash,
 )
 
@@ -65,6 +75,18 @@ async def test_hash_changes_when_mod_added():
         assert h1 != h2
 
 
+@pytest.mark.asyncio
+async def test_hash_changes_when_jar_replaced_under_same_name():
+    with tempfile.TemporaryDirectory() as d:
+        mods = Path(d) / "mods"
+        mods.mkdir()
+        (mods / "create.jar").write_bytes(b"v1")
+        h1 = await compute_palette_hash("1.20.1", mods)
+        (mods / "create.jar").write_bytes(b"v2")
+        h2 = await compute_palette_hash("1.20.1", mods)
+        assert h1 != h2
+
+
 @pytest.mark.asyncio
 async def test_hash_ignores_non_jar_files():
     with tempfile.TemporaryDirectory() as d:
@@ -152,3 +174,108 @@ async def test_discover_level_dat_missing_level_name_falls_back():
         # level-name points at a dir that doesn't exist
         (data / "server.properties").write_text("level-name=missing\n")
         assert await discover_level_dat(data) is None
+
+
+def test_supports_partial_palettes():
+    assert supports_partial_palettes("1.20.1") is True
+    assert supports_partial_palettes("1.13") is True
+    assert supports_partial_palettes("LATEST") is True
+    assert supports_partial_palettes("1.12.2") is False
+    assert supports_partial_palettes("1.7.10") is False
+    assert supports_partial_palettes("24w14a") is False
+
+
+@pytest.mark.asyncio
+async def test_merge_partial_palettes_later_wins():
+    with tempfile.TemporaryDirectory() as d:
+        root = Path(d)
+        (root / "client.json").write_text('{"minecraft:stone": [1, 1, 1]}')
+        (root / "mod.json").write_text(
+            '{"minecraft:stone": [2, 2, 2], "create:cog": [3, 3, 3]}'
+        )
+        out = root / "palette.json"
+        count = await merge_partial_palettes(
+            [root / "client.json", root / "mod.json"], out
+        )
+        assert count == 2
+        assert json.loads(out.read_text()) == {
+            "minecraft:stone": [2, 2, 2],
+            "create:cog": [3, 3, 3],
+        }
+
+
+@pytest.mark.asyncio
+async def test_merge_partial_palettes_rejects_non_object():
+    with tempfile.TemporaryDirectory() as d:
+        root = Path(d)
+        (root / "a.json").write_text("[1, 2]")
+        out = root / "palette.json"
+        with pytest.raises(PaletteMergeError):
+            await merge_partial_palettes([root / "a.json"], out)
+        assert not out.exists()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "colour", ['"red"', "[1, 2]", "[1, 2, 300]", "[1.5, 2, 3]", "[true, 0, 0]"]
+)
+async def test_merge_partial_palettes_rejects_bad_colours(colour: str):
+    with tempfile.TemporaryDirectory() as d:
+        root = Path(d)
+        (root / "a.json").write_text(f'{{"minecraft:stone": {colour}}}')
+        with pytest.raises(PaletteMergeError):
+            await merge_partial_palettes([root / "a.json"], root / "palette.json")
+
+
+@pytest.mark.asyncio
+async def test_corrupt_partial_is_a_miss_and_removed():
+    with tempfile.TemporaryDirectory() as d:
+        root = Path(d)
+        good = root / "good.json"
+        good.write_text('{"minecraft:stone": [1, 2, 3, 255]}')
+        truncated = root / "truncated.json"
+        truncated.write_text('{"minecraft:stone": [1, 2')
+        assert await partial_palette_usable(good)
+        assert not await partial_palette_usable(truncated)
+        assert not truncated.exists()
+        assert not await partial_palette_usable(root / "missing.json")
+
+
+def test_linked_partial_key_covers_mod_set():
+    cache = ServerMapCache(data_path=Path("/srv/data"))
+    own = partial_palette_path(cache, "c" * 64, "a" * 64)
+    before = partial_palette_path(cache, "c" * 64, "a" * 64, mods_digest="1" * 64)
+    after = partial_palette_path(cache, "c" * 64, "a" * 64, mods_digest="2" * 64)
+    assert len({own, before, after}) == 3
+    assert before.name.endswith(".linked.json")
+
+
+@pytest.mark.asyncio
+async def test_jar_digest_memo_is_bounded(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(palette, "JAR_DIGEST_MEMO_SIZE", 2)
+    monkeypatch.setattr(palette, "_jar_digest_memo", OrderedDict())
+    with tempfile.TemporaryDirectory() as d:
+        for i in range(4):
+            jar = Path(d) / f"{i}.jar"
+            jar.write_bytes(bytes([i]))
+            await jar_digest(jar)
+        assert [Path(k[0]).name for k in palette._jar_digest_memo] == [
+            "2.jar",
+            "3.jar",
+        ]
+
+
+@pytest.mark.asyncio
+async def test_prune_partial_palettes_keeps_referenced():
+    with tempfile.TemporaryDirectory() as d:
+        cache = ServerMapCache(data_path=Path(d))
+        cache.palettes_dir.mkdir(parents=True)
+        keep = partial_palette_path(cache, "c" * 64, "a" * 64)
+        stale = partial_palette_path(
+            cache, "c" * 64, "b" * 64, mods_digest="d" * 64
+        )
+        keep.write_text("{}")
+        stale.write_text("{}")
+        assert await prune_partial_palettes(cache, [keep]) == 1
+        assert keep.exists()
+        assert not stale.exists()
@@ -7,6 +7,7 @@ from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
+from PIL import Image
 
 from app.mcmap.cache import ServerMapCache
 from app.mcmap.queue import ServerRenderQueue
@@ -29,7 +30,7 @@ class FakeProc:
             await asyncio.sleep(0)  # let other tasks run
             yield ev
 
-    def events(self, adapter):
+    def events(self, adapter, types=None):
         return self._iter_typed(adapter)
 
     async def _iter_typed(self, adapter):
@@ -68,6 +69,8 @@ def _mcmap_cfg(batch_size=4, thread_count=2):
     cfg.batch_size = batch_size
     cfg.thread_count = thread_count
     cfg.request_timeout_seconds = 30
+    cfg.tile_format = "png"
+    cfg.tile_quantize_colors = 256
     return cfg
 
 
@@ -231,3 +234,51 @@ async def test_worker_reads_mcmap_config_for_each_batch(cache_and_queue):
         assert first == cache.png_path("world/region", 0, 0)
         assert second == cache.png_path("world/region", 1, 0)
         assert calls["threads"] == [2, 7]
+
+
+def _write_tile(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGBA", (16, 16), (10, 20, 30, 255)).save(path, format="PNG")
+
+
+async def test_queue_encodes_rendered_tiles():
+    with tempfile.TemporaryDirectory() as d:
+        cache = ServerMapCache(data_path=Path(d))
+        _write_tile(cache.png_path("world/region", 0, 0))
+        queue = ServerRenderQueue("srv", "world/region", cache)
+        fake_render, _ = _patched_runner(
+            [[{"type": "region", "x": 0, "z": 0, "status": "rendered"}]]
+        )
+        cfg = _mcmap_cfg()
+        cfg.tile_format = "webp"
+        with (
+            patch("app.mcmap.queue.runner.render", fake_render),
+            patch("app.mcmap.queue.config") as config_mock,
+        ):
+            config_mock.mcmap = cfg
+            tile = await asyncio.wait_for(queue.request(0, 0), timeout=2.0)
+
+        assert tile == cache.tile_path("world/region", 0, 0, "webp")
+        assert tile.exists()
+        assert not cache.png_path("world/region", 0, 0).exists()
+
+
+async def test_queue_pinned_format_ignores_config():
+    with tempfile.TemporaryDirectory() as d:
+        cache = ServerMapCache(data_path=Path(d))
+        _write_tile(cache.png_path("world/region", 0, 0))
+        queue = ServerRenderQueue("srv", "world/region", cache, tile_format="png")
+        fake_render, _ = _patched_runner(
+            [[{"type": "region", "x": 0, "z": 0, "status": "rendered"}]]
+        )
+        cfg = _mcmap_cfg()
+        cfg.tile_format = "webp"
+        with (
+            patch("app.mcmap.queue.runner.render", fake_render),
+            patch("app.mcmap.queue.config") as config_mock,
+        ):
+            config_mock.mcmap = cfg
+            tile = await asyncio.wait_for(queue.request(0, 0), timeout=2.0)
+
+        assert tile == cache.png_path("world/region", 0, 0)
+        assert tile.exists()
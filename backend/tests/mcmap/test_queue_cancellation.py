@@ -29,7 +29,7 @@ class HangingProc:
         if False:  # pragma: no cover
             yield {}
 
-    def events(self, adapter):
+    def events(self, adapter, types=None):
         return self._iter()
 
     async def terminate(self):
@@ -41,6 +41,8 @@ def _mcmap_cfg(batch_size=4, thread_count=2):
     cfg.batch_size = batch_size
     cfg.thread_count = thread_count
     cfg.request_timeout_seconds = 30
+    cfg.tile_format = "png"
+    cfg.tile_quantize_colors = 256
     return cfg
 
 
@@ -194,7 +196,7 @@ async def test_mid_batch_partial_cancellation_keeps_others_alive(queue_with_cach
             await event_gate.wait()
             yield {"type": "region", "x": 1, "z": 0, "status": "rendered"}
 
-        def events(self, adapter):
+        def events(self, adapter, types=None):
             return self._iter_typed(adapter)
 
         async def _iter_typed(self, adapter):
@@ -1,8 +1,12 @@
+import asyncio
+import json
 import os
+import signal
 import stat
 import sys
 import tempfile
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import patch
 
 import pytest
@@ -250,3 +254,153 @@ async def test_prune_adapter_parses_streaming_events():
 
 # Silence "unused import" for sys; keep available for diagnosing test failures
 _ = sys
+
+
+@pytest.fixture
+def fresh_metrics():
+    runner.mcmap_metrics.reset()
+    yield runner.mcmap_metrics
+    runner.mcmap_metrics.reset()
+
+
+@pytest.mark.parametrize("pidfd", [True, False])
+async def test_invocation_metrics_are_recorded(
+    fake_owned_dir, fresh_metrics, monkeypatch, pidfd
+):
+    if not pidfd:
+        # Reap from the helper thread instead of a pidfd.
+        monkeypatch.delattr(runner.os, "pidfd_open", raising=False)
+    fake = _write_fake_mcmap(
+        "#!/bin/sh\n"
+        "i=0; while [ $i -lt 20000 ]; do i=$((i+1)); done\n"
+        'echo \'{"type":"region","x":0,"z":0,"status":"missing"}\'\n'
+        'echo \'{"type":"result","mode":"split","regions_saved":0,"output":"./t","elapsed_ms":1}\'\n'
+        "exit 3\n"
+    )
+    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+        async with runner.render(
+            palette=Path("/tmp/p.json"),
+            output_dir=Path("/tmp/o"),
+            mcas=[],
+            threads=1,
+            owned_by=fake_owned_dir,
+        ) as proc:
+            events = [e async for e in proc.events(MCMAP_RENDER_EVENT_ADAPTER)]
+    fake.unlink()
+
+    assert len(events) == 2
+    metrics = fresh_metrics.snapshot()
+    [invocation] = metrics.recent
+    assert invocation.subcommand == "render"
+    assert invocation.returncode == 3
+    assert invocation.event_count == 2
+    assert invocation.event_bytes > 100
+    assert invocation.user_cpu_seconds is not None
+    assert invocation.user_cpu_seconds + invocation.system_cpu_seconds > 0
+    assert invocation.peak_rss_bytes > 0
+    assert invocation.wall_seconds > 0
+    [stats] = metrics.subcommands
+    assert (stats.subcommand, stats.invocations, stats.failures) == ("render", 1, 1)
+
+
+async def test_terminated_run_is_recorded_as_signal(fake_owned_dir, fresh_metrics):
+    fake = _write_fake_mcmap("#!/bin/sh\nexec sleep 30\n")
+    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+        async with runner.render(
+            palette=Path("/tmp/p.json"),
+            output_dir=Path("/tmp/o"),
+            mcas=[],
+            threads=1,
+            owned_by=fake_owned_dir,
+        ):
+            pass
+    fake.unlink()
+
+    [invocation] = fresh_metrics.snapshot().recent
+    assert invocation.returncode == -signal.SIGTERM
+    assert fresh_metrics.snapshot().subcommands[0].failures == 0
+
+
+async def test_chown_args_are_cached_per_path(fake_owned_dir, monkeypatch):
+    stats: list[Path] = []
+    real_stat = runner.aioos.stat
+
+    async def counting_stat(path):
+        stats.append(Path(path))
+        return await real_stat(path)
+
+    monkeypatch.setattr(runner.os, "geteuid", lambda: 0)
+    monkeypatch.setattr(runner.aioos, "stat", counting_stat)
+    runner.clear_chown_cache()
+    try:
+        first = await runner._chown_args_for(fake_owned_dir)
+        second = await runner._chown_args_for(fake_owned_dir)
+        missing = await runner._chown_args_for(fake_owned_dir / "missing")
+        await runner._chown_args_for(fake_owned_dir / "missing")
+    finally:
+        runner.clear_chown_cache()
+
+    st = fake_owned_dir.stat()
+    assert first == second == ["--chown", f"{st.st_uid}:{st.st_gid}"]
+    assert missing == []
+    # Missing paths are not cached; existing ones are stat'ed once.
+    assert stats == [fake_owned_dir, fake_owned_dir / "missing", fake_owned_dir / "missing"]
+
+
+def _stdout_proc(data: bytes):
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return runner.MCMapProcess(SimpleNamespace(stdout=reader))  # type: ignore[arg-type]
+
+
+async def test_events_split_lines_across_read_chunks(monkeypatch):
+    monkeypatch.setattr(runner, "MCMAP_READ_CHUNK_BYTES", 7)
+    lines = [
+        json.dumps({"type": "region", "x": i, "z": -i, "status": "missing"}).encode()
+        for i in range(20)
+    ]
+    proc = _stdout_proc(b"\n".join(lines) + b"\n\n")
+
+    events = [e async for e in proc.events(MCMAP_RENDER_EVENT_ADAPTER)]
+
+    assert [
+        (e.x, e.z) for e in events if isinstance(e, MCMapRenderRegionEvent)
+    ] == [(i, -i) for i in range(20)]
+    assert proc.event_count == 20
+    assert proc.event_bytes == sum(len(line) + 1 for line in lines) + 1
+
+
+async def test_events_skip_unsubscribed_types_without_validating():
+    proc = _stdout_proc(
+        b'{"type":"progress","phase":"scan","regions_processed":"bogus"}\n'
+        b'{"type":"region_pruned","region":"r","region_x":0}\n'
+        b'{"type":"chunks_pruned","region":"/w/region/r.0.0.mca","region_x":0,'
+        b'"region_z":0,"chunks":[],"dry_run":true}\n'
+        # No leading tag: validated to be safe, and rejected.
+        b'{"region":"r","type":"region_pruned"}\n'
+    )
+
+    events = proc.events(MCMAP_PRUNE_EVENT_ADAPTER, types=("chunks_pruned", "error"))
+    assert isinstance(await anext(events), MCMapChunksPrunedEvent)
+    with pytest.raises(MCMapProtocolError):
+        await anext(events)
+
+
+async def test_event_without_trailing_newline_and_oversized_lines(monkeypatch):
+    proc = _stdout_proc(b'{"type":"region","x":1,"z":2,"status":"missing"}')
+    [event] = [e async for e in proc.events(MCMAP_RENDER_EVENT_ADAPTER)]
+    assert isinstance(event, MCMapRenderRegionEvent)
+    assert (event.x, event.z) == (1, 2)
+
+    monkeypatch.setattr(runner, "MCMAP_READ_CHUNK_BYTES", 4)
+    monkeypatch.setattr(runner, "MCMAP_STREAM_LIMIT_BYTES", 10)
+    proc = _stdout_proc(b'{"type":"region","x":1}\n')
+    with pytest.raises(MCMapProtocolError, match="oversized"):
+        _ = [e async for e in proc.events(MCMAP_RENDER_EVENT_ADAPTER)]
+
+
+def test_event_type_tag_peek():
+    assert runner.event_type_tag(b'{"type":"result","x":1}') == b"result"
+    assert runner.event_type_tag(b'{"x":1,"type":"result"}') is None
+    assert runner.event_type_tag(b'{"type":"unterminated') is None
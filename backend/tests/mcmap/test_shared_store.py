@@ -0,0 +1,113 @@
+import errno
+import os
+from pathlib import Path
+
+import pytest
+
+from app.mcmap.store import STORE_FILE_MODE, SharedArtifactStore
+from app.routers.servers.map import _unlink_if_shared
+from app.utils import async_fs
+
+
+def test_client_jar_path_rejects_moving_and_unsafe_versions(tmp_path: Path):
+    store = SharedArtifactStore(tmp_path)
+    assert store.client_jar_path("1.20.1") == tmp_path / "clients" / "1.20.1.jar"
+    assert store.client_jar_path("24w14a") == tmp_path / "clients" / "24w14a.jar"
+    assert store.client_jar_path("LATEST") is None
+    assert store.client_jar_path("snapshot") is None
+    assert store.client_jar_path("../1.20.1") is None
+
+
+def test_palette_path_rejects_moving_and_pre_flattening_versions(tmp_path: Path):
+    store = SharedArtifactStore(tmp_path)
+    assert store.palette_path("1.20.1", "abc") == tmp_path / "palettes" / "abc.json"
+    assert store.palette_path("LATEST", "abc") is None
+    assert store.palette_path("snapshot", "abc") is None
+    assert store.palette_path("1.12.2", "abc") is None
+
+
+@pytest.mark.asyncio
+async def test_publish_then_fetch_hard_links(tmp_path: Path):
+    store = SharedArtifactStore(tmp_path / "store")
+    source = tmp_path / "a" / "client.jar"
+    source.parent.mkdir()
+    source.write_bytes(b"jar")
+    stored = store.client_jar_path("1.20.1")
+
+    await store.publish(source, stored)
+    target = tmp_path / "b" / "client.jar"
+    target.parent.mkdir()
+
+    assert await store.fetch(stored, target) is True
+    assert target.read_bytes() == b"jar"
+    assert target.stat().st_ino == source.stat().st_ino
+
+
+@pytest.mark.asyncio
+async def test_published_files_are_read_only_and_only_replaced(tmp_path: Path):
+    store = SharedArtifactStore(tmp_path / "store")
+    stored = store.palette_path("1.20.1", "abc")
+    assert stored is not None
+    a = tmp_path / "a" / "palette.json"
+    a.parent.mkdir()
+    a.write_text("old")
+
+    await store.publish(a, stored)
+    b = tmp_path / "b" / "palette.json"
+    assert await store.fetch(stored, b) is True
+
+    # The mode lives on the shared inode, so every linked copy is read-only.
+    for path in (stored, a, b):
+        assert path.stat().st_mode & 0o777 == STORE_FILE_MODE
+
+    # Regenerating server a detaches its copy first; re-publishing swaps the
+    # store entry by rename. Server b keeps the old inode and content.
+    await _unlink_if_shared(a)
+    assert not a.exists()
+    a.write_text("new")
+    await store.publish(a, stored)
+    assert stored.read_text() == "new"
+    assert b.read_text() == "old"
+    assert b.stat().st_ino != stored.stat().st_ino
+
+
+@pytest.mark.asyncio
+async def test_unlink_if_shared_keeps_private_writable_files(tmp_path: Path):
+    private = tmp_path / "palette.json"
+    private.write_text("{}")
+    await _unlink_if_shared(private)
+    assert private.exists()
+
+    private.chmod(STORE_FILE_MODE)  # a copy fetched across filesystems
+    await _unlink_if_shared(private)
+    assert not private.exists()
+
+
+@pytest.mark.asyncio
+async def test_fetch_missing_returns_none(tmp_path: Path):
+    store = SharedArtifactStore(tmp_path / "store")
+    target = tmp_path / "palette.json"
+    assert await store.fetch(store.palette_path("1.20.1", "abc"), target) is None
+    assert await store.fetch(None, target) is None
+    assert not target.exists()
+
+
+@pytest.mark.asyncio
+async def test_fetch_copies_across_filesystems(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    store = SharedArtifactStore(tmp_path / "store")
+    stored = store.palette_path("1.20.1", "abc")
+    assert stored is not None
+    stored.parent.mkdir(parents=True)
+    stored.write_text("{}")
+
+    def cross_device_link(src, dst):
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+    monkeypatch.setattr(async_fs.os, "link", cross_device_link)
+    target = tmp_path / "palette.json"
+
+    assert await store.fetch(stored, target) is False
+    assert target.read_text() == "{}"
+    assert target.stat().st_ino != stored.stat().st_ino
@@ -0,0 +1,175 @@
+"""Tests for tile-cache budget enforcement and stats."""
+
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app.dynamic_config.configs.mcmap import MCMapConfig
+from app.mcmap.cache import ServerMapCache
+from app.mcmap.quota import MB, TileCacheQuota
+from app.routers.servers.map import TILE_MAX_AGE_SECONDS, _tile_response
+
+
+@pytest.fixture
+def mcmap_config(monkeypatch):
+    def _set(**kwargs) -> None:
+        monkeypatch.setattr(
+            "app.mcmap.quota.config", SimpleNamespace(mcmap=MCMapConfig(**kwargs))
+        )
+
+    _set()
+    return _set
+
+
+def _tile(data_path: Path, x: int, *, size: int, atime: int) -> Path:
+    png = ServerMapCache(data_path=data_path).png_path("world/region", x, 0)
+    png.parent.mkdir(parents=True, exist_ok=True)
+    png.write_bytes(b"\0" * size)
+    os.utime(png, ns=(atime * 1_000_000_000, 1_700_000_000 * 1_000_000_000))
+    return png
+
+
+async def test_server_budget_evicts_least_recently_used(tmp_path, mcmap_config):
+    mcmap_config(tile_cache_server_budget_mb=2)
+    data = tmp_path / "a"
+    old = _tile(data, 0, size=MB, atime=100)
+    mid = _tile(data, 1, size=MB, atime=200)
+    new = _tile(data, 2, size=MB, atime=300)
+
+    quota = TileCacheQuota()
+    evicted = await quota.enforce({"a": data})
+
+    assert evicted == 1
+    assert not old.exists()
+    assert mid.exists() and new.exists()
+    status = await quota.status("a", data)
+    assert status.tiles == 2
+    assert status.bytes == 2 * MB
+    assert status.evicted_tiles == 1
+
+
+async def test_global_budget_evicts_across_servers(tmp_path, mcmap_config):
+    mcmap_config(tile_cache_global_budget_mb=2)
+    a, b = tmp_path / "a", tmp_path / "b"
+    a_old = _tile(a, 0, size=MB, atime=100)
+    b_old = _tile(b, 0, size=MB, atime=150)
+    a_new = _tile(a, 1, size=MB, atime=300)
+    b_new = _tile(b, 1, size=MB, atime=400)
+
+    quota = TileCacheQuota()
+    assert await quota.enforce({"a": a, "b": b}) == 2
+
+    assert not a_old.exists() and not b_old.exists()
+    assert a_new.exists() and b_new.exists()
+
+
+async def test_no_budget_keeps_everything(tmp_path, mcmap_config):
+    data = tmp_path / "a"
+    tiles = [_tile(data, x, size=MB, atime=100 + x) for x in range(3)]
+
+    assert await TileCacheQuota().enforce({"a": data}) == 0
+    assert all(t.exists() for t in tiles)
+
+
+async def test_touch_bumps_atime_and_preserves_mtime(tmp_path):
+    png = _tile(tmp_path, 0, size=10, atime=100)
+    st = png.stat()
+
+    await TileCacheQuota().touch("a", png, st)
+
+    after = png.stat()
+    assert after.st_atime_ns > st.st_atime_ns
+    assert after.st_mtime_ns == st.st_mtime_ns
+
+
+async def test_status_reports_hit_ratio(tmp_path, mcmap_config):
+    mcmap_config(tile_cache_server_budget_mb=5)
+    _tile(tmp_path, 0, size=10, atime=100)
+    quota = TileCacheQuota()
+    quota.record_hit("a")
+    quota.record_hit("a")
+    quota.record_hit("a")
+    quota.record_miss("a")
+
+    status = await quota.status("a", tmp_path)
+
+    assert status.tiles == 1
+    assert status.bytes == 10
+    assert status.hit_ratio == pytest.approx(0.75)
+    assert status.budget_bytes == 5 * MB
+
+
+async def test_enforce_uses_index_until_drift(tmp_path, mcmap_config):
+    mcmap_config(tile_cache_server_budget_mb=2)
+    data = tmp_path / "a"
+    first = _tile(data, 0, size=MB, atime=100)
+    quota = TileCacheQuota()
+    assert await quota.enforce({"a": data}) == 0
+
+    # Written behind the index's back: not seen without a rescan.
+    _tile(data, 1, size=MB, atime=200)
+    _tile(data, 2, size=MB, atime=300)
+    assert await quota.enforce({"a": data}) == 0
+
+    # Recorded writes are.
+    late = _tile(data, 3, size=MB, atime=400)
+    quota.record_write("a", late, late.stat())
+    assert await quota.enforce({"a": data}) == 0
+    assert (await quota.status("a", data)).bytes == 2 * MB
+
+    extra = _tile(data, 4, size=MB, atime=500)
+    quota.record_write("a", extra, extra.stat())
+    assert await quota.enforce({"a": data}) == 1
+    assert not first.exists()
+
+
+async def test_eviction_of_missing_tile_triggers_rescan(tmp_path, mcmap_config):
+    mcmap_config(tile_cache_server_budget_mb=1)
+    data = tmp_path / "a"
+    gone = _tile(data, 0, size=MB, atime=100)
+    quota = TileCacheQuota()
+    await quota.scan("a", data)
+    gone.unlink()  # e.g. restore invalidation
+    kept = _tile(data, 1, size=MB, atime=200)
+    quota.record_write("a", kept, kept.stat())
+    unseen = _tile(data, 2, size=MB, atime=300)
+
+    await quota.enforce({"a": data})
+    assert kept.exists() and unseen.exists()
+
+    # The missing victim marked the index as drifted; the next pass rescans.
+    assert await quota.enforce({"a": data}) == 1
+    assert not kept.exists() and unseen.exists()
+
+
+async def test_touch_updates_index(tmp_path, mcmap_config):
+    mcmap_config(tile_cache_server_budget_mb=1)
+    data = tmp_path / "a"
+    old = _tile(data, 0, size=MB, atime=100)
+    new = _tile(data, 1, size=MB, atime=200)
+    quota = TileCacheQuota()
+    await quota.scan("a", data)
+
+    await quota.touch("a", old, old.stat())
+
+    assert await quota.enforce({"a": data}) == 1
+    assert old.exists() and not new.exists()
+
+
+async def test_tile_revalidation_returns_304_and_touches(tmp_path):
+    png = _tile(tmp_path, 0, size=10, atime=100)
+    etag = f'"{int(png.stat().st_mtime)}-png"'
+
+    response = await _tile_response("a", png, "png", None, etag)
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == (
+        f"private, max-age={TILE_MAX_AGE_SECONDS}"
+    )
+    assert png.stat().st_atime_ns > 100 * 1_000_000_000
+
+    fresh = await _tile_response("a", png, "png", None, '"0-png"')
+    assert fresh.status_code == 200
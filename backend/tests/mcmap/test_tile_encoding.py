@@ -0,0 +1,152 @@
+"""Tests for post-render tile re-encoding and format negotiation."""
+
+import os
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from app.mcmap import encoding
+from app.mcmap.cache import ServerMapCache, tile_variants
+from app.routers.servers.map import _accepts_webp, _stored_format
+from app.world import png_invalidate
+
+
+def _write_tile(path: Path, mtime: float = 1_700_000_000.0) -> Image.Image:
+    img = Image.new("RGBA", (64, 64), (0, 0, 0, 0))
+    for i in range(0, 64, 8):
+        for j in range(0, 64, 8):
+            img.paste((i * 4, j * 4, 90, 255), (i, j, i + 8, j + 8))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    img.save(path, format="PNG")
+    os.utime(path, (mtime, mtime))
+    return img
+
+
+def test_tile_path_tracks_format():
+    cache = ServerMapCache(data_path=Path("/srv/data"))
+    tiles = Path("/srv/data/.mcmap/tiles/world/region")
+    assert cache.tile_path("world/region", 1, -2) == tiles / "r.1.-2.png"
+    assert cache.tile_path("world/region", 1, -2, "webp") == tiles / "r.1.-2.webp"
+    assert (
+        cache.tile_path("world/region", 1, -2, "png_quantized")
+        == tiles / "r.1.-2.q.png"
+    )
+    assert set(tile_variants(tiles / "r.1.-2.png")) == {
+        tiles / "r.1.-2.png",
+        tiles / "r.1.-2.q.png",
+        tiles / "r.1.-2.webp",
+    }
+
+
+@pytest.mark.asyncio
+async def test_webp_encoding_is_lossless_and_keeps_mtime(tmp_path: Path):
+    src = tmp_path / "r.0.0.png"
+    dst = tmp_path / "r.0.0.webp"
+    original = _write_tile(src)
+
+    size = await encoding.encode_tile(src, dst, "webp")
+
+    assert size == dst.stat().st_size
+    assert not src.exists()
+    assert int(dst.stat().st_mtime) == 1_700_000_000
+    with Image.open(dst) as decoded:
+        assert decoded.format == "WEBP"
+        assert decoded.convert("RGBA").tobytes() == original.tobytes()
+
+
+@pytest.mark.asyncio
+async def test_quantized_png_keeps_alpha(tmp_path: Path):
+    src = tmp_path / "r.0.0.png"
+    dst = tmp_path / "r.0.0.q.png"
+    _write_tile(src)
+
+    await encoding.encode_tile(src, dst, "png_quantized", quantize_colors=16)
+
+    with Image.open(dst) as decoded:
+        assert decoded.mode == "P"
+        pixel = decoded.convert("RGBA").getpixel((0, 0))
+        assert isinstance(pixel, tuple) and pixel[3] == 255
+    assert int(dst.stat().st_mtime) == 1_700_000_000
+
+
+@pytest.mark.asyncio
+async def test_fresh_check_uses_format_path(tmp_path: Path):
+    cache = ServerMapCache(data_path=tmp_path)
+    mca = cache.mca_path("world/region", 0, 0)
+    mca.parent.mkdir(parents=True)
+    mca.write_bytes(b"x")
+    os.utime(mca, (1_700_000_000.0, 1_700_000_000.0))
+    _write_tile(cache.png_path("world/region", 0, 0))
+
+    assert await cache.is_fresh("world/region", 0, 0, "webp") == "missing_png"
+    await encoding.encode_tile(
+        cache.png_path("world/region", 0, 0),
+        cache.tile_path("world/region", 0, 0, "webp"),
+        "webp",
+    )
+    assert await cache.is_fresh("world/region", 0, 0, "webp") == "fresh"
+    assert await cache.is_fresh("world/region", 0, 0, "png") == "missing_png"
+
+
+@pytest.mark.asyncio
+async def test_png_fallback_decodes_webp_once(tmp_path: Path):
+    png = tmp_path / "r.0.0.png"
+    webp = tmp_path / "r.0.0.webp"
+    original = _write_tile(png)
+    await encoding.encode_tile(png, webp, "webp")
+
+    assert await encoding.png_fallback(webp) == png
+    first = png.stat()
+    assert int(first.st_mtime) == 1_700_000_000
+    with Image.open(png) as decoded:
+        assert decoded.format == "PNG"
+        assert decoded.convert("RGBA").tobytes() == original.tobytes()
+
+    assert await encoding.png_fallback(webp) == png
+    assert png.stat().st_ino == first.st_ino
+
+
+@pytest.mark.asyncio
+async def test_png_fallback_leaves_newer_render_alone(tmp_path: Path):
+    png = tmp_path / "r.0.0.png"
+    webp = tmp_path / "r.0.0.webp"
+    _write_tile(png)
+    await encoding.encode_tile(png, webp, "webp")
+    _write_tile(png, mtime=1_700_000_100.0)
+
+    assert await encoding.png_fallback(webp) is None
+    assert int(png.stat().st_mtime) == 1_700_000_100
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        (None, False),
+        ("image/png,image/*;q=0.8", False),
+        ("*/*", False),
+        ("image/avif,image/webp,image/apng,image/*,*/*;q=0.8", True),
+        ("image/webp;q=0", False),
+        ("image/webp; q=0.5", True),
+    ],
+)
+def test_accepts_webp(accept, expected):
+    assert _accepts_webp(accept) is expected
+
+
+@pytest.mark.asyncio
+async def test_delete_pngs_removes_encoded_siblings(tmp_path: Path):
+    cache = ServerMapCache(data_path=tmp_path)
+    webp = cache.tile_path("world/region", 0, 0, "webp")
+    quantized = cache.tile_path("world/region", 0, 0, "png_quantized")
+    webp.parent.mkdir(parents=True)
+    webp.write_bytes(b"RIFF")
+    quantized.write_bytes(b"\x89PNG")
+
+    removed = await png_invalidate.delete_pngs(
+        png_invalidate.pngs_for_regions(tmp_path, "world/region", [(0, 0)])
+    )
+
+    assert removed == 1
+    assert not webp.exists()
+    assert not quantized.exists()
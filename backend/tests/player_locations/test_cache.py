@@ -0,0 +1,170 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from app.mcmap.events import (
+    MCMapDimensionEntry,
+    MCMapPlayerPosition,
+    MCMapPlayerRecord,
+    MCMapPlayersPayload,
+    MCMapSkippedPlayerFile,
+)
+from app.player_locations import PlayerLocationExtractError
+from app.player_locations.cache import PlayerLocationsCache, scan_player_files_sync
+from app.player_locations.extract import _shape_response
+from app.world.layout import WorldRootPath
+
+
+class _Extractor:
+    """Parses ``playerdata/*.dat`` files holding ``"<dim> <x>"`` or junk."""
+
+    def __init__(self) -> None:
+        self.world_dirs: list[Path] = []
+        self.seen: list[list[str]] = []
+        self.fail = False
+
+    async def __call__(self, world_dir: Path, data_path: Path) -> MCMapPlayersPayload:
+        self.world_dirs.append(world_dir)
+        if self.fail:
+            raise PlayerLocationExtractError("boom")
+        players, skipped, seen = [], [], []
+        dims = {"minecraft:overworld": "."}
+        for path in sorted((world_dir / "playerdata").glob("*.dat")):
+            source = f"playerdata/{path.name}"
+            seen.append(source)
+            parts = path.read_text().split()
+            if len(parts) != 2:
+                skipped.append(
+                    MCMapSkippedPlayerFile(
+                        source=source, storage="playerdata", reason="parse_error"
+                    )
+                )
+                continue
+            dims.setdefault(parts[0], parts[0].split(":")[1])
+            players.append(
+                MCMapPlayerRecord(
+                    id=path.stem,
+                    id_kind="name",
+                    source=source,
+                    storage="playerdata",
+                    dim=parts[0],
+                    pos=MCMapPlayerPosition(x=float(parts[1]), y=64, z=0),
+                )
+            )
+        self.seen.append(seen)
+        return MCMapPlayersPayload(
+            mcmap_extract_players_version=1,
+            world_dir=str(world_dir),
+            dimensions=[
+                MCMapDimensionEntry(id=dim_id, folder=folder, exists=True)
+                for dim_id, folder in dims.items()
+            ],
+            players=players,
+            skipped=skipped,
+        )
+
+
+@pytest.fixture
+def world(tmp_path: Path) -> WorldRootPath:
+    world_dir = tmp_path / "data" / "world"
+    (world_dir / "playerdata").mkdir(parents=True)
+    (world_dir / "level.dat").write_bytes(b"level")
+    for name in ("alice", "bob", "carol", "dave"):
+        (world_dir / "playerdata" / f"{name}.dat").write_text("minecraft:overworld 1")
+    return WorldRootPath(name="world", path=world_dir)
+
+
+@pytest.fixture
+def cache() -> PlayerLocationsCache:
+    return PlayerLocationsCache(_Extractor(), _shape_response)
+
+
+def _bump(path: Path, text: str) -> None:
+    path.write_text(text)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_scan_tracks_player_dirs_only(world: WorldRootPath):
+    (world.path / "players" / "data").mkdir(parents=True)
+    (world.path / "players" / "Legacy.dat").write_bytes(b"x")
+    (world.path / "players" / "data" / "x.dat").write_bytes(b"x")
+    (world.path / "playerdata" / "alice.dat_old").write_bytes(b"x")
+
+    stats = scan_player_files_sync(world.path)
+
+    assert sorted(stats) == [
+        "playerdata/alice.dat",
+        "playerdata/bob.dat",
+        "playerdata/carol.dat",
+        "playerdata/dave.dat",
+        "players/Legacy.dat",
+        "players/data/x.dat",
+    ]
+
+
+async def test_unchanged_world_is_a_hit(cache, world: WorldRootPath, tmp_path):
+    data_path = tmp_path / "data"
+    first = await cache.get(data_path, world)
+    assert (await cache.get(data_path, world)) is first
+    assert (cache.full_extracts, cache.partial_extracts, cache.hits) == (1, 0, 1)
+    assert [p.id for p in first.players] == ["alice", "bob", "carol", "dave"]
+
+
+async def test_changed_files_are_extracted_alone(cache, world: WorldRootPath, tmp_path):
+    data_path = tmp_path / "data"
+    extractor = cache._run_extract
+    await cache.get(data_path, world)
+
+    _bump(world.path / "playerdata" / "bob.dat", "minecraft:the_nether 7")
+    (world.path / "playerdata" / "dave.dat").unlink()
+    response = await cache.get(data_path, world)
+
+    assert (cache.full_extracts, cache.partial_extracts) == (1, 1)
+    assert extractor.seen[-1] == ["playerdata/bob.dat"]
+    assert extractor.world_dirs[-1].parent == data_path / ".mcmap" / "player-scan"
+    assert not extractor.world_dirs[-1].exists()
+    by_id = {p.id: p for p in response.players}
+    assert sorted(by_id) == ["alice", "bob", "carol"]
+    assert by_id["bob"].dimension_id == "minecraft:the_nether"
+    assert by_id["bob"].pos.x == 7
+    assert "minecraft:the_nether" in {d.dimension_id for d in response.dimensions}
+
+    # A file turning unreadable moves from players to skipped.
+    _bump(world.path / "playerdata" / "alice.dat", "garbage")
+    response = await cache.get(data_path, world)
+    assert [p.id for p in response.players] == ["bob", "carol"]
+    assert [s.source for s in response.skipped] == ["playerdata/alice.dat"]
+
+
+async def test_many_changes_fall_back_to_full_extract(
+    cache, world: WorldRootPath, tmp_path
+):
+    data_path = tmp_path / "data"
+    await cache.get(data_path, world)
+    for name in ("alice", "bob", "carol"):
+        _bump(world.path / "playerdata" / f"{name}.dat", "minecraft:overworld 2")
+
+    await cache.get(data_path, world)
+
+    assert (cache.full_extracts, cache.partial_extracts) == (2, 0)
+    assert cache._run_extract.world_dirs[-1] == world.path
+
+
+async def test_failed_refresh_keeps_previous_entry(
+    cache, world: WorldRootPath, tmp_path
+):
+    data_path = tmp_path / "data"
+    first = await cache.get(data_path, world)
+    _bump(world.path / "playerdata" / "bob.dat", "minecraft:overworld 3")
+    cache._run_extract.fail = True
+
+    with pytest.raises(PlayerLocationExtractError):
+        await cache.get(data_path, world)
+    assert not any((data_path / ".mcmap" / "player-scan").iterdir())
+
+    cache._run_extract.fail = False
+    response = await cache.get(data_path, world)
+    assert response is not first
+    assert cache._run_extract.seen[-1] == ["playerdata/bob.dat"]
@@ -14,7 +14,6 @@ from app.player_locations import (
     PlayerLocationExtractError,
     extract_player_locations_for_server,
     normalize_uuid,
-    runner,
 )
 from app.routers.servers import world_restore
 
@@ -136,7 +135,7 @@ async def test_extract_resolves_dimensions_and_keeps_skipped(world_data_path):
         ],
     }
     fake = _write_fake_mcmap(payload)
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         result = await extract_player_locations_for_server(world_data_path)
     fake.unlink()
 
@@ -171,7 +170,7 @@ async def test_extract_does_not_require_full_dimension_scan(world_data_path, mon
     }
     fake = _write_fake_mcmap(payload)
     monkeypatch.setattr(settings, "fd_binary_path", Path("/missing/fd"))
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         result = await extract_player_locations_for_server(world_data_path)
     fake.unlink()
 
@@ -180,7 +179,7 @@ async def test_extract_does_not_require_full_dimension_scan(world_data_path, mon
 
 async def test_extract_error_propagates(world_data_path):
     fake = _write_fake_mcmap_error("world directory not found: /nonexistent")
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         with pytest.raises(PlayerLocationExtractError):
             await extract_player_locations_for_server(world_data_path)
     fake.unlink()
@@ -203,7 +202,7 @@ async def test_extract_rejects_malformed_mcmap_payload(world_data_path):
         "skipped": [],
     }
     fake = _write_fake_mcmap(payload)
-    with patch.object(runner.settings, "mcmap_binary_path", str(fake)):
+    with patch.object(settings, "mcmap_binary_path", str(fake)):
         with pytest.raises(PlayerLocationExtractError, match="invalid JSON event"):
             await extract_player_locations_for_server(world_data_path)
     fake.unlink()
@@ -237,7 +236,7 @@ async def test_endpoint_returns_player_locations(world_data_path):
     }
     fake = _write_fake_mcmap(payload)
     with (
-        patch.object(runner.settings, "mcmap_binary_path", str(fake)),
+        patch.object(settings, "mcmap_binary_path", str(fake)),
         patch.object(world_restore, "docker_mc_manager", FakeDocker()),
     ):
         result = await world_restore.get_player_locations("srv1", _=_test_user())
@@ -0,0 +1,254 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.events import EventPlayer, EventPlayerPosition, PlayerPositionsEvent, event_bus
+from app.minecraft.rcon import RconError
+from app.player_locations import live
+from app.player_locations.live import (
+    LivePositionPoller,
+    overlay_live_positions,
+    parse_dimension,
+    parse_pos,
+)
+from app.player_locations.models import (
+    PlayerLocationDimensionEntry,
+    PlayerLocationEntry,
+    PlayerLocationPosition,
+    PlayerLocationsResponse,
+)
+from app.players.crud.query.session_query import OnlinePlayerLite
+
+ALEX = OnlinePlayerLite(name="Alex", uuid="a" * 32, player_db_id=1)
+STEVE = OnlinePlayerLite(name="Steve", uuid="b" * 32, player_db_id=2)
+
+
+class _FakeRcon:
+    def __init__(self, replies: dict[str, str]) -> None:
+        self.replies = replies
+        self.closed = False
+        self.commands: list[str] = []
+
+    async def command(self, command: str) -> str:
+        self.commands.append(command)
+        if command not in self.replies:
+            raise RconError("connection reset")
+        return self.replies[command]
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def _replies(name: str, pos: str, dim: str) -> dict[str, str]:
+    prefix = f"{name} has the following entity data: "
+    return {
+        f"data get entity {name} Pos": prefix + pos,
+        f"data get entity {name} Dimension": prefix + dim,
+    }
+
+
+@pytest.fixture(autouse=True)
+def live_config(monkeypatch):
+    monkeypatch.setattr(
+        live,
+        "config",
+        SimpleNamespace(
+            players=SimpleNamespace(
+                live_positions=SimpleNamespace(
+                    enabled=True, poll_interval_seconds=1, command_timeout_seconds=1
+                )
+            )
+        ),
+    )
+
+
+@pytest.fixture
+def subscription():
+    subscription = event_bus.subscribe()
+    yield subscription
+    event_bus.unsubscribe(subscription)
+
+
+def _drain(subscription) -> list[PlayerPositionsEvent]:
+    out = []
+    while not subscription.queue.empty():
+        out.append(subscription.queue.get_nowait())
+    return out
+
+
+def test_parse_replies():
+    assert parse_pos("Alex has the following entity data: [1.5d, 64.0d, -2.25E-4d]") == (
+        1.5,
+        64.0,
+        -0.000225,
+    )
+    assert parse_pos("No entity was found") is None
+    assert (
+        parse_dimension('Alex has the following entity data: "minecraft:the_nether"')
+        == "minecraft:the_nether"
+    )
+    assert parse_dimension("Alex has the following entity data: 1") == "minecraft:the_end"
+    assert parse_dimension("Alex has the following entity data: 7") is None
+
+
+async def test_poll_publishes_changed_snapshots(subscription):
+    client = _FakeRcon(
+        {
+            **_replies("Alex", "[1.0d, 70.0d, 2.0d]", '"minecraft:overworld"'),
+            # Steve is in the session table but already gone from the server.
+            "data get entity Steve Pos": "No entity was found",
+        }
+    )
+    connects: list[str] = []
+
+    async def connect(server_id: str, timeout: float):
+        connects.append(server_id)
+        return client
+
+    poller = LivePositionPoller(connect)  # type: ignore[arg-type]
+    await poller.poll_server("vanilla", [ALEX, STEVE])
+    await poller.poll_server("vanilla", [ALEX, STEVE])
+
+    assert connects == ["vanilla"]
+    [frame] = _drain(subscription)
+    assert frame.server_id == "vanilla"
+    assert [(p.player.name, p.dimension_id, p.x) for p in frame.positions] == [
+        ("Alex", "minecraft:overworld", 1.0)
+    ]
+    assert poller.positions("vanilla") == frame.positions
+
+    # A broken connection clears the server and reconnects next round.
+    client.replies = {}
+    await poller.poll_server("vanilla", [ALEX])
+    [cleared] = _drain(subscription)
+    assert cleared.positions == []
+    assert client.closed
+    assert poller.positions("vanilla") == []
+
+    client.closed = False
+    client.replies = _replies("Alex", "[3.0d, 70.0d, 2.0d]", '"minecraft:overworld"')
+    await poller.poll_server("vanilla", [ALEX])
+    assert connects == ["vanilla", "vanilla"]
+    assert [p.x for p in _drain(subscription)[0].positions] == [3.0]
+
+
+async def test_poll_all_isolates_failing_servers(subscription, monkeypatch):
+    client = _FakeRcon(_replies("Alex", "[1.0d, 70.0d, 2.0d]", '"minecraft:overworld"'))
+
+    async def connect(server_id: str, timeout: float):
+        if server_id == "missing-properties":
+            raise FileNotFoundError("server.properties")
+        if server_id == "buggy":
+            raise KeyError(server_id)
+        return client
+
+    @asynccontextmanager
+    async def fake_session():
+        yield None
+
+    async def fake_online(_session):
+        return {"missing-properties": [ALEX], "buggy": [ALEX], "vanilla": [ALEX]}
+
+    monkeypatch.setattr(live, "get_async_session", fake_session)
+    monkeypatch.setattr(live, "get_online_players_grouped_by_server", fake_online)
+    poller = LivePositionPoller(connect)  # type: ignore[arg-type]
+
+    await poller.poll_all()
+
+    assert [frame.server_id for frame in _drain(subscription)] == ["vanilla"]
+    assert [p.x for p in poller.positions("vanilla")] == [1.0]
+
+
+def test_overlay_replaces_saved_positions():
+    response = PlayerLocationsResponse(
+        dimensions=[
+            PlayerLocationDimensionEntry(
+                dimension_id="minecraft:overworld",
+                folder=".",
+                region_dir_relpath="world/region",
+                exists_on_disk=True,
+            ),
+            PlayerLocationDimensionEntry(
+                dimension_id="minecraft:the_nether",
+                folder="DIM-1",
+                region_dir_relpath="world/DIM-1/region",
+                exists_on_disk=True,
+            ),
+        ],
+        players=[
+            PlayerLocationEntry(
+                id=ALEX.uuid,
+                id_kind="uuid",
+                uuid=ALEX.uuid,
+                source=f"playerdata/{ALEX.uuid}.dat",
+                storage="playerdata",
+                dimension_id="minecraft:overworld",
+                region_dir_relpath="world/region",
+                pos=PlayerLocationPosition(x=0, y=0, z=0),
+            ),
+            PlayerLocationEntry(
+                id="Offline",
+                id_kind="name",
+                source="players/Offline.dat",
+                storage="legacy_players",
+                dimension_id="minecraft:overworld",
+                region_dir_relpath="world/region",
+                pos=PlayerLocationPosition(x=5, y=5, z=5),
+            ),
+        ],
+    )
+
+    def position(player: OnlinePlayerLite, x: float) -> EventPlayerPosition:
+        return EventPlayerPosition(
+            player=EventPlayer(
+                name=player.name, uuid=player.uuid, player_db_id=player.player_db_id
+            ),
+            dimension_id="minecraft:the_nether",
+            x=x,
+            y=64,
+            z=0,
+        )
+
+    merged = overlay_live_positions(response, [position(ALEX, 8), position(STEVE, 9)])
+
+    by_id = {p.id: p for p in merged.players}
+    assert by_id[ALEX.uuid].live
+    assert by_id[ALEX.uuid].region_dir_relpath == "world/DIM-1/region"
+    assert by_id[ALEX.uuid].pos.x == 8
+    assert by_id[ALEX.uuid].storage == "playerdata"
+    assert by_id[STEVE.uuid].storage == "live"
+    assert by_id[STEVE.uuid].pos.x == 9
+    assert not by_id["Offline"].live
+    # The cached response is left untouched.
+    assert response.players[0].pos.x == 0
+    assert overlay_live_positions(response, []) is response
+
+
+async def test_poll_falls_back_to_rcon_cli_when_port_unreachable(subscription):
+    connects: list[str] = []
+    sent: list[str] = []
+    replies = _replies("Alex", "[5.0d, 64.0d, 9.0d]", '"minecraft:the_nether"')
+
+    async def connect(server_id: str, timeout: float):
+        connects.append(server_id)
+        raise RconError("cannot connect to 127.0.0.1:25575: refused")
+
+    def rcon_cli(server_id: str):
+        async def send(command: str) -> str:
+            sent.append(command)
+            return replies[command]
+
+        return send
+
+    poller = LivePositionPoller(connect, rcon_cli)  # type: ignore[arg-type]
+    await poller.poll_server("vanilla", [ALEX])
+    await poller.poll_server("vanilla", [ALEX])
+
+    # The unreachable port is only tried once; rcon-cli serves every round.
+    assert connects == ["vanilla"]
+    assert sent == list(replies) * 2
+    [frame] = _drain(subscription)
+    assert [(p.player.name, p.dimension_id, p.x) for p in frame.positions] == [
+        ("Alex", "minecraft:the_nether", 5.0)
+    ]
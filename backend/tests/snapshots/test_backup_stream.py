@@ -0,0 +1,134 @@
+"""Unit tests for streaming restic backups against a scripted fake binary."""
+
+import asyncio
+import json
+import os
+import stat
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from app.snapshots.models import ResticBackupEvent, ResticSnapshotWithSummary
+from app.snapshots.restic import ResticClient
+from app.snapshots.tasks import backup_task, describe_backup_status
+
+SNAPSHOT_ID = "ab" * 32
+
+STATUS_LINES = [
+    {
+        "message_type": "status",
+        "percent_done": 0.25,
+        "seconds_elapsed": 2,
+        "total_files": 4,
+        "files_done": 1,
+        "total_bytes": 4 * 1024 * 1024,
+        "bytes_done": 1024 * 1024,
+        "current_files": ["/data/a"],
+    },
+    {"message_type": "verbose_status", "action": "new", "item": "/data/a"},
+    {
+        "message_type": "summary",
+        "files_new": 4,
+        "total_files_processed": 4,
+        "total_bytes_processed": 4 * 1024 * 1024,
+        "total_duration": 3.5,
+        "backup_start": "2026-01-01T00:00:00Z",
+        "backup_end": "2026-01-01T00:00:03Z",
+        "snapshot_id": SNAPSHOT_ID,
+    },
+]
+
+
+def _fake_restic(tmp_path: Path, body: str) -> Path:
+    script = tmp_path / "restic"
+    script.write_text(f"#!/bin/sh\n{body}\n")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return script
+
+
+def _echo_lines(lines: list[dict]) -> str:
+    return "\n".join(f"echo '{json.dumps(line)}'" for line in lines)
+
+
+async def test_backup_stream_yields_status_then_summary(tmp_path):
+    env_dump = tmp_path / "env"
+    script = _fake_restic(
+        tmp_path, f'echo "$RESTIC_PROGRESS_FPS" > {env_dump}\n' + _echo_lines(STATUS_LINES)
+    )
+    client = ResticClient(str(tmp_path / "repo"), binary_path=script)
+
+    events = [e async for e in client.backup_stream([tmp_path])]
+
+    assert [e.kind for e in events] == ["status", "summary"]
+    status, summary = events
+    assert status.percent_done == 0.25
+    assert status.bytes_per_second == 512 * 1024
+    assert status.current_files == ["/data/a"]
+    assert summary.snapshot_id == SNAPSHOT_ID
+    assert summary.summary is not None and summary.summary.files_new == 4
+    assert env_dump.read_text().strip() == "2"
+
+
+async def test_backup_stream_requires_summary(tmp_path):
+    script = _fake_restic(tmp_path, _echo_lines(STATUS_LINES[:1]))
+    client = ResticClient(str(tmp_path / "repo"), binary_path=script)
+
+    with pytest.raises(RuntimeError, match="Could not parse snapshot data"):
+        async for _ in client.backup_stream([tmp_path]):
+            pass
+
+
+async def test_closing_backup_stream_kills_restic(tmp_path):
+    pid_file = tmp_path / "pid"
+    script = _fake_restic(
+        tmp_path,
+        f"echo $$ > {pid_file}\n" + _echo_lines(STATUS_LINES[:1]) + "\nexec sleep 30",
+    )
+    client = ResticClient(str(tmp_path / "repo"), binary_path=script)
+
+    stream = client.backup_stream([tmp_path])
+    first = await anext(stream)
+    assert first.kind == "status"
+    await stream.aclose()
+
+    pid = int(pid_file.read_text())
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)
+
+
+class _FakeService:
+    def __init__(self, events: list[ResticBackupEvent]) -> None:
+        self._events = events
+
+    async def create_snapshot_stream(self, paths):
+        for event in self._events:
+            await asyncio.sleep(0)
+            yield event
+
+
+async def test_backup_task_reports_progress_and_result():
+    snapshot = ResticSnapshotWithSummary(
+        time=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        paths=["/data"],
+        hostname="h",
+        username="u",
+        id=SNAPSHOT_ID,
+        short_id=SNAPSHOT_ID[:8],
+    )
+    status = ResticBackupEvent(
+        kind="status", percent_done=0.5, total_files=2, files_done=1
+    )
+    summary = ResticBackupEvent(
+        kind="summary",
+        snapshot_id=SNAPSHOT_ID,
+        snapshot=snapshot,
+    )
+
+    service = _FakeService([status, summary])
+    progress = [p async for p in backup_task(service, [])]  # type: ignore[arg-type]
+
+    assert [p.progress for p in progress] == [0, 50.0, 100]
+    assert progress[1].message == describe_backup_status(status) == "1/2 个文件"
+    assert progress[-1].result is not None
+    assert progress[-1].result["short_id"] == SNAPSHOT_ID[:8]
@@ -0,0 +1,157 @@
+"""Unit tests for SnapshotCatalogue against a fake restic client."""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Sequence
+from unittest.mock import patch
+
+import pytest
+
+from app.snapshots.catalogue import SnapshotCatalogue, local_snapshots_dir
+from app.snapshots.models import ResticSnapshot
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _snapshot(
+    n: int, paths: list[str], excludes: Sequence[str] = ()
+) -> ResticSnapshot:
+    return ResticSnapshot(
+        time=BASE_TIME + timedelta(minutes=n),
+        paths=paths,
+        excludes=list(excludes),
+        hostname="host",
+        username="root",
+        id=f"{n:064x}",
+        short_id=f"{n:08x}",
+    )
+
+
+class FakeClient:
+    """Serves ``snapshots`` and mirrors them as files under ``<repo>/snapshots``."""
+
+    def __init__(self, repository_path: str) -> None:
+        self.repository_path = repository_path
+        self.snapshots: dict[str, ResticSnapshot] = {}
+        self.calls: list[tuple[str, ...]] = []
+
+    def put(self, snapshot: ResticSnapshot) -> None:
+        self.snapshots[snapshot.id] = snapshot
+        snapshots_dir = local_snapshots_dir(self.repository_path)
+        if snapshots_dir is not None:
+            snapshots_dir.mkdir(parents=True, exist_ok=True)
+            (snapshots_dir / snapshot.id).write_text("")
+
+    def drop(self, snapshot_id: str) -> None:
+        del self.snapshots[snapshot_id]
+        snapshots_dir = local_snapshots_dir(self.repository_path)
+        if snapshots_dir is not None:
+            (snapshots_dir / snapshot_id).unlink()
+
+    async def list_snapshots(self, snapshot_ids=()):
+        self.calls.append(tuple(snapshot_ids))
+        if snapshot_ids:
+            return [self.snapshots[i] for i in snapshot_ids]
+        return sorted(self.snapshots.values(), key=lambda s: s.time)
+
+
+@pytest.fixture
+def catalogue_config():
+    runtime_config = SimpleNamespace(
+        snapshots=SimpleNamespace(catalogue_refresh_seconds=300)
+    )
+    with patch("app.snapshots.catalogue.config", runtime_config):
+        yield runtime_config
+
+
+def test_local_snapshots_dir_detection():
+    assert local_snapshots_dir("/srv/restic") == Path("/srv/restic/snapshots")
+    assert local_snapshots_dir("sftp:user@host:/srv/restic") is None
+    assert local_snapshots_dir("s3:s3.amazonaws.com/bucket") is None
+    assert local_snapshots_dir("rest:https://host/") is None
+
+
+async def test_covering_uses_ancestors_and_excludes(tmp_path, catalogue_config):
+    client = FakeClient(str(tmp_path / "repo"))
+    world = tmp_path / "data" / "world"
+    client.put(_snapshot(1, [str(world)]))
+    client.put(_snapshot(2, [str(world / "region")]))
+    client.put(_snapshot(3, [str(tmp_path / "data")], [str(world / "region")]))
+    client.put(_snapshot(4, [str(tmp_path / "other")]))
+    catalogue = SnapshotCatalogue(client)  # type: ignore[arg-type]
+
+    region_file = world / "region" / "r.0.0.mca"
+    covering = await catalogue.covering([region_file])
+    assert [s.short_id for s in covering] == ["00000001", "00000002"]
+
+    both = await catalogue.covering([region_file, world / "level.dat"])
+    assert [s.short_id for s in both] == ["00000001"]
+
+    assert await catalogue.covering([tmp_path / "elsewhere"]) == []
+
+
+async def test_local_repository_syncs_incrementally(tmp_path, catalogue_config):
+    client = FakeClient(str(tmp_path / "repo"))
+    client.put(_snapshot(1, ["/a"]))
+    client.put(_snapshot(2, ["/b"]))
+    catalogue = SnapshotCatalogue(client)  # type: ignore[arg-type]
+
+    assert [s.short_id for s in await catalogue.snapshots()] == [
+        "00000001",
+        "00000002",
+    ]
+    assert client.calls == [()]
+
+    # Unchanged repository: no restic call at all.
+    await catalogue.snapshots()
+    assert client.calls == [()]
+
+    # A snapshot written by another client, and one forgotten elsewhere.
+    client.put(_snapshot(3, ["/c"]))
+    client.drop(_snapshot(1, []).id)
+    assert [s.short_id for s in await catalogue.snapshots()] == [
+        "00000002",
+        "00000003",
+    ]
+    assert client.calls == [(), (_snapshot(3, []).id,)]
+    assert await catalogue.covering([Path("/a/x")]) == []
+
+
+async def test_remote_repository_reloads_after_ttl(tmp_path, catalogue_config):
+    client = FakeClient("sftp:host:/restic")
+    client.put(_snapshot(1, ["/a"]))
+    catalogue = SnapshotCatalogue(client)  # type: ignore[arg-type]
+
+    await catalogue.snapshots()
+    client.put(_snapshot(2, ["/a"]))
+    assert len(await catalogue.snapshots()) == 1
+    assert client.calls == [()]
+
+    catalogue_config.snapshots.catalogue_refresh_seconds = 0
+    assert len(await catalogue.snapshots()) == 2
+    assert client.calls == [(), ()]
+
+
+async def test_add_and_discard_update_index(tmp_path, catalogue_config):
+    client = FakeClient("sftp:host:/restic")
+    client.put(_snapshot(1, ["/a"]))
+    catalogue = SnapshotCatalogue(client)  # type: ignore[arg-type]
+    await catalogue.snapshots()
+
+    created = _snapshot(2, ["/a/b"])
+    await catalogue.add([created])
+    assert [s.short_id for s in await catalogue.covering([Path("/a/b/c")])] == [
+        "00000001",
+        "00000002",
+    ]
+
+    catalogue.discard("00000001")
+    assert [s.short_id for s in await catalogue.covering([Path("/a/b/c")])] == [
+        "00000002"
+    ]
+    assert client.calls == [()]
+
+    catalogue.invalidate()
+    await catalogue.snapshots()
+    assert client.calls == [(), ()]
@@ -11,6 +11,7 @@ from app.snapshots.planner import (
     RestorePlan,
     TargetIgnoredError,
     build_restore_plan,
+    merge_steps,
 )
 
 SNAP = "abc123"
@@ -111,10 +112,11 @@ async def test_mixed_dir_and_file_targets(client):
         Path("/srv/x/data/world/entities/r.0.0.mca"),  # parent missing → skipped
     ]
     plan = await build_restore_plan(client, SNAP, targets, [])
+    # Both file groups fold into one include-based step at their common parent.
     assert plan.steps == (
-        FileStep(source_dir=Path("/srv/x/data"), includes=("/server.properties",)),
         FileStep(
-            source_dir=Path("/srv/x/data/world/region"), includes=("/r.0.0.mca",)
+            source_dir=Path("/srv/x/data"),
+            includes=("/server.properties", "/world/region/r.0.0.mca"),
         ),
     )
 
@@ -129,18 +131,56 @@ async def test_dir_steps_ordered_before_file_steps(client):
         await build_restore_plan(client, SNAP, targets, [])
 
 
-async def test_disjoint_dir_and_file_steps_order(client):
+async def test_exclude_free_dir_step_merges_into_includes(client):
     targets = [
         Path("/srv/x/data/server.properties"),
         Path("/srv/x/data/world"),
     ]
     plan = await build_restore_plan(client, SNAP, targets, [])
     assert plan.steps == (
-        DirStep(source_dir=Path("/srv/x/data/world"), excludes=()),
+        FileStep(
+            source_dir=Path("/srv/x/data"),
+            includes=("/server.properties", "/world"),
+        ),
+    )
+
+
+async def test_dir_step_with_excludes_stays_separate(client):
+    targets = [
+        Path("/srv/x/data/server.properties"),
+        Path("/srv/x/data/world"),
+    ]
+    ignored = [Path("/srv/x/data/world/.cache")]
+    plan = await build_restore_plan(client, SNAP, targets, ignored)
+    assert plan.steps == (
+        DirStep(source_dir=Path("/srv/x/data/world"), excludes=("/.cache",)),
         FileStep(source_dir=Path("/srv/x/data"), includes=("/server.properties",)),
     )
 
 
+def test_merge_steps_uses_deepest_common_ancestor():
+    steps = [
+        FileStep(source_dir=Path("/d/world/region"), includes=("/r.0.0.mca",)),
+        FileStep(source_dir=Path("/d/world/DIM-1/region"), includes=("/r.1.0.mca",)),
+        DirStep(source_dir=Path("/d/world/entities"), excludes=()),
+    ]
+    assert merge_steps(steps) == (
+        FileStep(
+            source_dir=Path("/d/world"),
+            includes=(
+                "/DIM-1/region/r.1.0.mca",
+                "/entities",
+                "/region/r.0.0.mca",
+            ),
+        ),
+    )
+
+
+def test_merge_steps_leaves_single_step_alone():
+    steps = [DirStep(source_dir=Path("/d/world"), excludes=())]
+    assert merge_steps(steps) == tuple(steps)
+
+
 async def test_ignored_target_raises(client):
     with pytest.raises(TargetIgnoredError):
         await build_restore_plan(
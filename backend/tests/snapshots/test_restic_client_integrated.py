@@ -125,6 +125,18 @@ class TestBackup:
         nodes = await client.ls(snapshot.id, data_dir / "world" / "region")
         assert nodes[data_dir / "world" / "region" / "r.0.0.mca"] is NodeKind.FILE
 
+    async def test_ls_nodes_reports_size_and_mtime(self, client, data_dir):
+        mca = data_dir / "world" / "region" / "r.0.0.mca"
+        snapshot = await client.backup([data_dir])
+
+        nodes = await client.ls_nodes(snapshot.id, mca.parent)
+        node = nodes[mca]
+        st = mca.stat()
+        assert node.kind is NodeKind.FILE
+        assert node.size == st.st_size
+        assert node.mtime is not None
+        assert int(node.mtime.timestamp()) == int(st.st_mtime)
+
     async def test_backup_rejects_relative_path(self, client):
         with pytest.raises(ValueError, match="absolute"):
             await client.backup([Path("relative/path")])
@@ -398,6 +410,21 @@ class TestSnapshotLifecycle:
         await client.forget(keep_last=1, prune=True)
         assert len(await client.list_snapshots()) == 1
 
+    async def test_forget_scoped_to_paths_keeps_other_snapshots(
+        self, client, data_dir
+    ):
+        plugins = data_dir / "plugins"
+        other = await client.backup([plugins])
+        for i in range(3):
+            (data_dir / "counter.txt").write_text(str(i))
+            await client.backup([data_dir])
+
+        await client.forget(keep_last=1, prune=True, paths=[data_dir])
+
+        remaining = await client.list_snapshots()
+        assert other.id in {s.id for s in remaining}
+        assert len([s for s in remaining if s.paths == [str(data_dir)]]) == 1
+
     async def test_forget_requires_policy(self, client):
         with pytest.raises(ValueError, match="retention policy"):
             await client.forget()
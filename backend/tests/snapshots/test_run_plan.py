@@ -0,0 +1,104 @@
+"""Unit tests for SnapshotService plan execution against a fake restic client."""
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.snapshots.models import ResticRestoreEvent
+from app.snapshots.planner import DirStep, FileStep, RestorePlan
+from app.snapshots.service import SnapshotService
+
+
+class FakeClient:
+    """``restore`` replays scripted status events per source dir."""
+
+    repository_path = "sftp:host:/repo"
+
+    def __init__(self, sizes: dict[Path, int], *, fail: Path | None = None) -> None:
+        self._sizes = sizes
+        self._fail = fail
+        self.running = 0
+        self.peak = 0
+
+    async def restore(self, snapshot_id, *, source_dir, target_dir, **_kwargs):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            total = self._sizes[source_dir]
+            for fraction in (0.5, 1.0):
+                await asyncio.sleep(0.01)
+                if source_dir == self._fail:
+                    raise RuntimeError("restic restore failed (exit 1)")
+                yield ResticRestoreEvent(
+                    kind="status",
+                    percent_done=fraction,
+                    total_bytes=total,
+                    bytes_restored=int(total * fraction),
+                )
+            yield ResticRestoreEvent(
+                kind="file", action="restored", item=str(target_dir / "f"), size=1
+            )
+            yield ResticRestoreEvent(
+                kind="summary", total_files=1, files_restored=1, total_bytes=total
+            )
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture
+def snapshots_config():
+    runtime_config = SimpleNamespace(
+        snapshots=SimpleNamespace(restore_parallel_steps=2)
+    )
+    with patch("app.snapshots.service.config", runtime_config):
+        yield runtime_config
+
+
+def _plan(*dirs: str) -> RestorePlan:
+    return RestorePlan(
+        snapshot_id="snap",
+        steps=tuple(
+            DirStep(source_dir=Path(d), excludes=("/.mcmap",)) for d in dirs
+        )
+        + (FileStep(source_dir=Path("/d"), includes=("/server.properties",)),),
+    )
+
+
+async def _drain(service: SnapshotService, plan: RestorePlan) -> list:
+    return [
+        event
+        async for event in service._run_plan(
+            plan, target_for=lambda step: step.source_dir, delete=True, dry_run=False
+        )
+    ]
+
+
+async def test_steps_run_concurrently_with_byte_weighted_progress(snapshots_config):
+    sizes = {Path("/d/a"): 900, Path("/d/b"): 90, Path("/d"): 10}
+    client = FakeClient(sizes)
+    service = SnapshotService(client, None)  # type: ignore[arg-type]
+
+    events = await _drain(service, _plan("/d/a", "/d/b"))
+
+    assert client.peak == 2
+    percents = [e.percent_done for e in events if e.kind == "status"]
+    assert percents == sorted(percents)
+    assert percents[-1] == pytest.approx(1.0)
+    assert len([e for e in events if e.kind == "file"]) == 3
+    summary = events[-1]
+    assert summary.kind == "summary"
+    assert (summary.total_files, summary.total_bytes) == (3, 1000)
+
+
+async def test_step_failure_propagates_and_cancels_siblings(snapshots_config):
+    sizes = {Path("/d/a"): 100, Path("/d/b"): 100, Path("/d"): 100}
+    client = FakeClient(sizes, fail=Path("/d/b"))
+    service = SnapshotService(client, None)  # type: ignore[arg-type]
+
+    with pytest.raises(RuntimeError, match="restic restore failed"):
+        await _drain(service, _plan("/d/a", "/d/b"))
+    await asyncio.sleep(0)
+    assert client.running == 0
@@ -75,6 +75,8 @@ def _make_server(servers_root: Path, server_id: str, level_name: str) -> FakeIns
 def ignored_paths(patterns: list[str]):
     mock_config = MagicMock()
     mock_config.snapshots.ignored_paths = patterns
+    mock_config.snapshots.ls_cache_max_nodes = 10_000
+    mock_config.snapshots.restore_parallel_steps = 2
     with patch("app.snapshots.service.config", mock_config):
         yield
 
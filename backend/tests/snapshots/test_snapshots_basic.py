@@ -95,6 +95,30 @@ class TestValidation:
             await client.forget(keep_within="   ")
 
 
+    async def test_forget_requires_absolute_paths(self):
+        client = ResticClient("/test/repo", "password")
+        with pytest.raises(ValueError, match="absolute"):
+            await client.forget(keep_last=1, paths=[Path("relative")])
+
+    async def test_forget_scopes_to_paths(self, monkeypatch):
+        calls: list[tuple[str, ...]] = []
+
+        async def fake_exec(*args: str, env=None) -> str:
+            calls.append(args)
+            return ""
+
+        monkeypatch.setattr("app.snapshots.restic.exec_command", fake_exec)
+        client = ResticClient("/test/repo", "password")
+
+        await client.forget(keep_last=2, prune=False, paths=[Path("/srv/alpha")])
+        await client.forget(keep_last=2, prune=False)
+
+        scoped, unscoped = calls
+        assert scoped[scoped.index("--path") + 1] == "/srv/alpha"
+        assert "--path" not in unscoped
+        assert scoped[scoped.index("--group-by") + 1] == ""
+
+
 class TestModels:
     def test_restic_snapshot_model(self):
         snapshot = ResticSnapshot(
@@ -221,6 +221,8 @@ def mock_snapshot_dependencies_setup(
     mock_snapshots_config = MagicMock()
     mock_snapshots_config.time_restriction = mock_time_restriction
     mock_snapshots_config.ignored_paths = ignored_paths or []
+    mock_snapshots_config.ls_cache_max_nodes = 10_000
+    mock_snapshots_config.restore_parallel_steps = 2
 
     mock_config = MagicMock()
     mock_config.snapshots = mock_snapshots_config
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+from app.snapshots.models import NodeKind
+from app.snapshots.planner import build_restore_plan
+from app.snapshots.tree_cache import CachedTreeReader
+
+SNAP = "f" * 64
+REGION = Path("/srv/x/data/world/region")
+
+
+class CountingReader:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, Path]] = []
+
+    async def ls(self, snapshot_id: str, path: Path) -> dict[Path, NodeKind]:
+        self.calls.append((snapshot_id, path))
+        if path == REGION:
+            return {
+                REGION: NodeKind.DIR,
+                REGION / "r.0.0.mca": NodeKind.FILE,
+                REGION / "r.0.1.mca": NodeKind.FILE,
+            }
+        return {}
+
+
+async def test_repeated_plans_hit_cache():
+    reader = CountingReader()
+    cache = CachedTreeReader(reader, max_nodes=100)
+    targets = [REGION / "r.0.0.mca", REGION / "r.0.1.mca"]
+
+    first = await build_restore_plan(cache, SNAP, targets, [])
+    second = await build_restore_plan(cache, SNAP, targets, [])
+
+    assert first == second
+    assert reader.calls == [(SNAP, REGION)]
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert (len(cache), cache.nodes) == (1, 3)
+
+
+async def test_returned_listing_is_a_copy():
+    cache = CachedTreeReader(CountingReader(), max_nodes=100)
+    listing = await cache.ls(SNAP, REGION)
+    listing.clear()
+    assert len(await cache.ls(SNAP, REGION)) == 3
+
+
+async def test_lru_eviction_by_node_budget():
+    reader = CountingReader()
+    cache = CachedTreeReader(reader, max_nodes=4)
+
+    await cache.ls(SNAP, REGION)  # 3 nodes
+    await cache.ls(SNAP, Path("/missing/a"))  # empty listing still costs 1
+    await cache.ls(SNAP, REGION)  # refresh REGION's recency
+    await cache.ls(SNAP, Path("/missing/b"))  # evicts /missing/a
+
+    assert cache.nodes == 4
+    await cache.ls(SNAP, REGION)
+    await cache.ls(SNAP, Path("/missing/a"))
+    assert reader.calls.count((SNAP, Path("/missing/a"))) == 2
+    assert reader.calls.count((SNAP, REGION)) == 1
+
+
+async def test_latest_alias_and_zero_budget_bypass_cache():
+    reader = CountingReader()
+    cache = CachedTreeReader(reader, max_nodes=0)
+    await cache.ls(SNAP, REGION)
+    await cache.ls(SNAP, REGION)
+    cache.max_nodes = 100
+    await cache.ls("latest", REGION)
+    await cache.ls("latest", REGION)
+    assert len(reader.calls) == 4
+    assert len(cache) == 0
+
+
+async def test_discard_snapshot_matches_short_ids():
+    cache = CachedTreeReader(CountingReader(), max_nodes=100)
+    await cache.ls(SNAP, REGION)
+    await cache.ls("abcd1234", REGION)
+    cache.discard_snapshot(SNAP[:8])
+    assert len(cache) == 1
+    assert cache.nodes == 3
@@ -0,0 +1,65 @@
+"""Unit tests for async_fs.clone_or_copy reflink-with-fallback copies."""
+
+import errno
+import os
+
+import pytest
+
+from app.utils import async_fs
+
+
+async def test_copy_is_independent_of_source(tmp_path):
+    src = tmp_path / "src.mca"
+    src.write_bytes(b"region" * 1000)
+    dst = tmp_path / "dst.mca"
+
+    await async_fs.clone_or_copy(src, dst)
+    with open(dst, "r+b") as f:
+        f.write(b"XX")
+
+    assert src.read_bytes() == b"region" * 1000
+    assert dst.read_bytes() == b"XX" + (b"region" * 1000)[2:]
+
+
+async def test_unsupported_clone_falls_back_to_copy(tmp_path, monkeypatch):
+    def no_clone(fd, request, arg):
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+    monkeypatch.setattr(async_fs.fcntl, "ioctl", no_clone)
+    src = tmp_path / "src.mca"
+    src.write_bytes(b"data")
+    dst = tmp_path / "dst.mca"
+    dst.write_bytes(b"stale contents")
+
+    assert await async_fs.clone_or_copy(src, dst) is False
+    assert dst.read_bytes() == b"data"
+
+
+async def test_clone_reports_success(tmp_path, monkeypatch):
+    requests = []
+
+    def fake_clone(fd, request, arg):
+        requests.append(request)
+        os.write(fd, (tmp_path / "src.mca").read_bytes())
+
+    monkeypatch.setattr(async_fs.fcntl, "ioctl", fake_clone)
+    src = tmp_path / "src.mca"
+    src.write_bytes(b"data")
+    dst = tmp_path / "dst.mca"
+
+    assert await async_fs.clone_or_copy(src, dst) is True
+    assert requests == [async_fs.FICLONE]
+    assert dst.read_bytes() == b"data"
+
+
+async def test_other_errors_propagate(tmp_path, monkeypatch):
+    def failing(fd, request, arg):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(async_fs.fcntl, "ioctl", failing)
+    src = tmp_path / "src.mca"
+    src.write_bytes(b"data")
+
+    with pytest.raises(OSError) as excinfo:
+        await async_fs.clone_or_copy(src, tmp_path / "dst.mca")
+    assert excinfo.value.errno == errno.ENOSPC
@@ -65,3 +65,25 @@ def test_settings_configured_binary_paths_win(tmp_path):
     assert settings.fd_binary_path == Path("/custom/fd")
     assert settings.mcmap_binary_path == Path("/custom/mcmap")
     assert settings.restic_binary_path == Path("/custom/restic")
+
+
+def test_settings_anchor_relative_mcmap_store_path(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    settings = config.Settings(
+        master_token="token",
+        jwt=config.JWTSettings(secret_key="secret"),
+        server_path=tmp_path,
+    )
+    assert settings.mcmap_store_path == tmp_path / "mcmap_store"
+
+    # A later chdir must not move the store.
+    monkeypatch.chdir(tmp_path / "..")
+    assert settings.mcmap_store_path == tmp_path / "mcmap_store"
+
+    custom = config.Settings(
+        master_token="token",
+        jwt=config.JWTSettings(secret_key="secret"),
+        server_path=tmp_path,
+        mcmap_store_path=Path("/srv/mcmap"),
+    )
+    assert custom.mcmap_store_path == Path("/srv/mcmap")
@@ -1,4 +1,17 @@
-from app.grid_geometry import build_grid_shapes, compute_boundary_rings, connected_components
+import random
+
+import pytest
+
+from app.grid_geometry import (
+    build_grid_shapes,
+    compute_boundary_rings,
+    connected_components,
+    simplify_ring,
+)
+from benchmarks.grid_geometry import (
+    reference_compute_boundary_rings,
+    reference_connected_components,
+)
 
 
 def normalize_ring(ring):
@@ -55,3 +68,46 @@ def test_build_grid_shapes_returns_component_metadata():
     assert shapes[1].id == "world-region-1"
     assert shapes[1].cell_count == 1
     assert shapes[1].bbox == (10, 10, 10, 10)
+
+
+def test_negative_coordinates_and_diagonal_pinch():
+    cells = [(-1, -1), (0, 0), (-3, 5)]
+
+    shapes = build_grid_shapes(cells, id_prefix="p")
+
+    assert [shape.bbox for shape in shapes] == [
+        (-1, -1, -1, -1),
+        (0, 0, 0, 0),
+        (-3, 5, -3, 5),
+    ]
+    assert normalize_rings(compute_boundary_rings(cells[:2])) == normalize_rings(
+        [
+            [(0, -1), (-1, -1), (-1, 0), (0, 0)],
+            [(1, 0), (0, 0), (0, 1), (1, 1)],
+        ]
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_set_based_reference(seed):
+    rng = random.Random(seed)
+    cells = {(rng.randrange(-20, 20), rng.randrange(-20, 20)) for _ in range(700)}
+
+    components = connected_components(cells)
+    # Components tied on (min z, min x) used to come out in set order.
+    assert sorted(components) == sorted(reference_connected_components(cells))
+    order = [(min(z for _, z in c), min(x for x, _ in c), c[0]) for c in components]
+    assert order == sorted(order)
+    for component in components:
+        assert compute_boundary_rings(component) == (
+            reference_compute_boundary_rings(component)
+        )
+    assert compute_boundary_rings(cells) == reference_compute_boundary_rings(cells)
+
+
+def test_simplify_ring_keeps_corners_and_drops_small_rings():
+    square = [(0, 0), (5, 0), (10, 0), (10, 5), (10, 10), (0, 10)]
+
+    assert simplify_ring(square, 1) == [(0, 0), (10, 0), (10, 10), (0, 10)]
+    assert simplify_ring(square, 0) == square
+    assert simplify_ring([(0, 0), (1, 0), (1, 1), (0, 1)], 2) == []
@@ -1,10 +1,13 @@
 # pyright: reportUnusedImport=false
 import os
+from types import SimpleNamespace
 
 import pytest
 
 from app.minecraft import DiskSpaceInfo, DockerMCManager, MCServerInfo, MCServerStatus
+from app.minecraft import instance as instance_module
 from app.minecraft.compose import ServerType
+from app.minecraft.rcon import RconError
 
 from .fixtures.test_utils import (
     TEST_ROOT_PATH,
@@ -152,3 +155,151 @@ async def test_get_disk_space_info_with_docker(teardown: list[str]):  # noqa: F8
     # Test that usage percentage is calculated correctly
     expected_percentage = (disk_info.used_bytes / disk_info.total_bytes) * 100
     assert abs(disk_info.usage_percentage - expected_percentage) < 0.01
+
+
+class _FakeRconClient:
+    def __init__(self, recorder: "_RconRecorder", fail: frozenset[str]) -> None:
+        self._recorder = recorder
+        self._fail = fail
+        self.timeout = 5.0
+        self.closed = False
+
+    async def command(self, command: str) -> str:
+        self._recorder.commands.append(f"rcon:{command}")
+        if command in self._fail:
+            raise RconError("RCON exchange failed")
+        return ""
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class _RconRecorder:
+    def __init__(
+        self,
+        *,
+        healthy: bool = True,
+        fail: frozenset[str] = frozenset(),
+        rcon_fail: frozenset[str] | None = None,
+    ):
+        self.commands: list[str] = []
+        self._healthy = healthy
+        self._fail = fail
+        self.client = (
+            _FakeRconClient(self, rcon_fail) if rcon_fail is not None else None
+        )
+
+    async def healthy(self) -> bool:
+        return self._healthy
+
+    async def open_rcon(self, *, timeout: float = 5.0):
+        if self.client is None:
+            raise RconError("cannot connect")
+        return self.client
+
+    async def send_command_rcon(self, command: str) -> str:
+        self.commands.append(command)
+        if command in self._fail:
+            raise RuntimeError("rcon-cli failed")
+        return ""
+
+
+def _patched_instance(monkeypatch, recorder: _RconRecorder):
+    instance = DockerMCManager(TEST_ROOT_PATH).get_instance("flush-test")
+    monkeypatch.setattr(instance, "healthy", recorder.healthy)
+    monkeypatch.setattr(instance, "open_rcon", recorder.open_rcon)
+    monkeypatch.setattr(instance, "send_command_rcon", recorder.send_command_rcon)
+    return instance
+
+
+@pytest.mark.asyncio
+async def test_saves_flushed_pauses_and_resumes_saving(monkeypatch):
+    recorder = _RconRecorder()
+    instance = _patched_instance(monkeypatch, recorder)
+
+    with pytest.raises(ValueError):
+        async with instance.saves_flushed() as paused:
+            assert paused is True
+            assert recorder.commands == ["save-off", "save-all flush"]
+            raise ValueError("backup failed")
+
+    assert recorder.commands == ["save-off", "save-all flush", "save-on"]
+
+
+@pytest.mark.asyncio
+async def test_saves_flushed_is_noop_when_stopped_or_rcon_fails(monkeypatch):
+    stopped = _RconRecorder(healthy=False)
+    async with _patched_instance(monkeypatch, stopped).saves_flushed() as paused:
+        assert paused is False
+    assert stopped.commands == []
+
+    broken = _RconRecorder(fail=frozenset({"save-off"}))
+    async with _patched_instance(monkeypatch, broken).saves_flushed() as paused:
+        assert paused is False
+    assert broken.commands == ["save-off"]
+
+
+@pytest.mark.asyncio
+async def test_saves_flushed_uses_one_rcon_connection(monkeypatch):
+    recorder = _RconRecorder(rcon_fail=frozenset())
+    async with _patched_instance(monkeypatch, recorder).saves_flushed() as paused:
+        assert paused is True
+
+    assert recorder.commands == [
+        "rcon:save-off",
+        "rcon:save-all flush",
+        "rcon:save-on",
+    ]
+    assert recorder.client is not None and recorder.client.closed
+
+
+@pytest.mark.asyncio
+async def test_saves_flushed_resumes_via_rcon_cli_when_connection_drops(monkeypatch):
+    recorder = _RconRecorder(rcon_fail=frozenset({"save-on"}))
+    async with _patched_instance(monkeypatch, recorder).saves_flushed() as paused:
+        assert paused is True
+
+    assert recorder.commands == [
+        "rcon:save-off",
+        "rcon:save-all flush",
+        "rcon:save-on",
+        "save-on",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_open_rcon_tries_container_addresses_before_loopback(monkeypatch):
+    instance = DockerMCManager(TEST_ROOT_PATH).get_instance("rcon-test")
+    attempts: list[tuple[str, int]] = []
+
+    async def fake_properties():
+        return SimpleNamespace(enable_rcon=True, rcon_password="secret", rcon_port=None)
+
+    async def fake_compose():
+        return SimpleNamespace(get_rcon_port=lambda: 34545)
+
+    async def fake_addresses():
+        return ["172.20.0.5", "172.21.0.7"]
+
+    async def fake_connect(client):
+        attempts.append((client.host, client.port))
+        if client.host != "172.21.0.7":
+            raise RconError(f"cannot connect to {client.host}:{client.port}")
+
+    monkeypatch.setattr(instance, "get_server_properties", fake_properties)
+    monkeypatch.setattr(instance, "get_compose_obj", fake_compose)
+    monkeypatch.setattr(instance, "get_container_addresses", fake_addresses)
+    monkeypatch.setattr(instance_module.RconClient, "connect", fake_connect)
+
+    client = await instance.open_rcon()
+    assert (client.host, client.port) == ("172.21.0.7", 25575)
+    assert attempts == [("172.20.0.5", 25575), ("172.21.0.7", 25575)]
+
+    async def no_addresses():
+        raise RuntimeError("Server rcon-test is not created")
+
+    monkeypatch.setattr(instance, "get_container_addresses", no_addresses)
+    attempts.clear()
+    with pytest.raises(RconError, match="127.0.0.1:34545"):
+        await instance.open_rcon()
+    assert attempts == [("127.0.0.1", 34545)]
@@ -0,0 +1,89 @@
+import asyncio
+import struct
+
+import pytest
+
+from app.minecraft.rcon import (
+    SERVERDATA_AUTH,
+    SERVERDATA_AUTH_RESPONSE,
+    SERVERDATA_EXECCOMMAND,
+    SERVERDATA_RESPONSE_VALUE,
+    RconClient,
+    RconError,
+    encode_packet,
+)
+
+
+class _FakeRconServer:
+    """Speaks just enough RCON: auth with ``secret``, echo commands back."""
+
+    def __init__(self) -> None:
+        self.commands: list[str] = []
+        self.connections = 0
+        self._server: asyncio.Server | None = None
+
+    async def __aenter__(self) -> int:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def __aexit__(self, *exc) -> None:
+        assert self._server is not None
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer) -> None:
+        self.connections += 1
+        try:
+            while True:
+                (length,) = struct.unpack("<i", await reader.readexactly(4))
+                data = await reader.readexactly(length)
+                request_id, packet_type = struct.unpack_from("<ii", data)
+                body = data[8:-2].decode()
+                if packet_type == SERVERDATA_AUTH:
+                    writer.write(encode_packet(request_id, SERVERDATA_RESPONSE_VALUE, ""))
+                    reply_id = request_id if body == "secret" else -1
+                    writer.write(encode_packet(reply_id, SERVERDATA_AUTH_RESPONSE, ""))
+                elif packet_type == SERVERDATA_EXECCOMMAND:
+                    self.commands.append(body)
+                    if body == "hang":
+                        continue
+                    writer.write(
+                        encode_packet(request_id, SERVERDATA_RESPONSE_VALUE, f"ok {body}")
+                    )
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+
+async def test_commands_share_one_connection():
+    fake = _FakeRconServer()
+    async with fake as port:
+        client = RconClient("127.0.0.1", port, "secret")
+        await client.connect()
+        replies = await asyncio.gather(*(client.command(f"say {i}") for i in range(5)))
+        await client.close()
+
+    assert replies == [f"ok say {i}" for i in range(5)]
+    assert fake.connections == 1
+    assert client.closed
+
+
+async def test_wrong_password_is_rejected():
+    async with _FakeRconServer() as port:
+        client = RconClient("127.0.0.1", port, "wrong")
+        with pytest.raises(RconError, match="authentication"):
+            await client.connect()
+    assert client.closed
+
+
+async def test_timeout_closes_the_connection():
+    async with _FakeRconServer() as port:
+        client = RconClient("127.0.0.1", port, "secret", timeout=0.1)
+        await client.connect()
+        with pytest.raises(RconError):
+            await client.command("hang")
+        assert client.closed
+        with pytest.raises(RconError, match="closed"):
+            await client.command("list")
@@ -13,6 +13,8 @@ def world_runtime_config(monkeypatch):
         snapshots=SimpleNamespace(
             world_restore=WorldRestoreConfig(),
             ignored_paths=[],
+            ls_cache_max_nodes=10_000,
+            restore_parallel_steps=2,
         ),
     )
     monkeypatch.setattr("app.world.dimension_labels.config", runtime_config)
@@ -0,0 +1,272 @@
+"""Tests for the chunk-scope merge loop in ``WorldRestoreOrchestrator._flow_chunks``.
+
+Staging and mcmap are replaced with in-process fakes so the scheduling of
+per-(region, subdir) merges can be observed directly.
+"""
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+from typing import cast
+
+import pytest
+
+from app.dynamic_config.configs.world import WorldConfig
+from app.models import RestorationSelection, RestorationType
+from app.snapshots import NodeKind, SnapshotService
+from app.world import restore as restore_module
+from app.world.restore import WorldRestoreOrchestrator
+
+
+class _FakeSnapshots:
+    """``stage`` drops a copy of every requested MCA except the missing ones."""
+
+    def __init__(self, missing: set[str]) -> None:
+        self._missing = missing
+        self.listings: dict[Path, list[str]] = {}
+        self.staged: list[Path] = []
+
+    async def list_directory(self, snapshot_id, path):
+        return {path / name: NodeKind.FILE for name in self.listings.get(path, [])}
+
+    async def stage(self, snapshot_id, include_paths, stage_root):
+        self.staged = list(include_paths)
+        for path in include_paths:
+            if path.suffix != ".mca" or path.name in self._missing:
+                continue
+            dest = SnapshotService.stage_destination(stage_root, path.resolve())
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(b"staged")
+        return
+        yield
+
+
+class _FakeInstance:
+    def __init__(self, data_path: Path) -> None:
+        self._data_path = data_path
+
+    def get_data_path(self) -> Path:
+        return self._data_path
+
+
+class _FakeDockerMC:
+    def __init__(self, instance: _FakeInstance) -> None:
+        self._instance = instance
+
+    def get_instance(self, server_id: str) -> _FakeInstance:
+        return self._instance
+
+
+def _orchestrator(
+    data_path: Path, monkeypatch: pytest.MonkeyPatch, *, workers: int, missing=()
+) -> tuple[WorldRestoreOrchestrator, SimpleNamespace]:
+    world = data_path / "world"
+    dim = SimpleNamespace(
+        region_dir=world / "region",
+        entities_dir=world / "entities",
+        poi_dir=None,
+    )
+    for d in (dim.region_dir, dim.entities_dir):
+        d.mkdir(parents=True)
+    monkeypatch.setattr(
+        restore_module,
+        "dynamic_config",
+        SimpleNamespace(
+            world=WorldConfig(chunk_merge_workers=workers),
+            snapshots=SimpleNamespace(
+                world_restore=SimpleNamespace(stage_cache_max_bytes=0)
+            ),
+        ),
+    )
+
+    async def fake_roots(_data_path):
+        return []
+
+    monkeypatch.setattr(restore_module, "discover_world_roots", fake_roots)
+    monkeypatch.setattr(restore_module, "_find_dimension", lambda *_: dim)
+    orchestrator = WorldRestoreOrchestrator(
+        snapshot_service=_FakeSnapshots(set(missing)),  # type: ignore[arg-type]
+        docker_mc_manager=_FakeDockerMC(_FakeInstance(data_path)),  # type: ignore[arg-type]
+        server_operation_lock=None,  # type: ignore[arg-type]
+        session_factory=None,  # type: ignore[arg-type]
+    )
+    return orchestrator, dim
+
+
+async def _run(orchestrator: WorldRestoreOrchestrator, chunks) -> list:
+    selection = RestorationSelection(
+        type=RestorationType.CHUNKS,
+        region_dir_relpath="world/region",
+        chunks=chunks,
+    )
+    return [
+        ev
+        async for ev in orchestrator._flow_chunks(
+            server_id="srv1",
+            source_snapshot_id="abcdef0123",
+            selection=selection,
+            restoration_id="rid",
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_merges_run_concurrently_up_to_worker_limit(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    orchestrator, _ = _orchestrator(tmp_path, monkeypatch, workers=3)
+    running = 0
+    peak = 0
+    merged: list[tuple[str, list[tuple[int, int]]]] = []
+
+    async def fake_replace(*, source_mca, target_mca, chunks, owned_by):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        merged.append((str(target_mca.relative_to(tmp_path)), chunks))
+        running -= 1
+
+    orchestrator._merge_replace = fake_replace
+    # Four regions x two subdirs = eight merges.
+    events = await _run(orchestrator, [(0, 0), (32, 0), (0, 32), (33, 33)])
+
+    assert peak == 3
+    assert len(merged) == 8
+    assert ("world/region/r.1.1.mca", [(1, 1)]) in merged
+    merge_events = [e for e in events if e.event_type == "merge_region"]
+    assert len(merge_events) == 8
+    assert {(e.rx, e.rz, e.sub_dir) for e in merge_events} == {
+        (rx, rz, sub)
+        for rx, rz in [(0, 0), (1, 0), (0, 1), (1, 1)]
+        for sub in ("region", "entities")
+    }
+    assert merge_events[-1].percent == 100.0
+
+
+@pytest.mark.asyncio
+async def test_missing_source_removes_live_chunks_and_skips_absent_targets(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    orchestrator, dim = _orchestrator(
+        tmp_path, monkeypatch, workers=4, missing={"r.0.0.mca"}
+    )
+    (dim.region_dir / "r.0.0.mca").write_bytes(b"live")
+    calls: list[tuple[str, str]] = []
+
+    async def fake_replace(*, source_mca, target_mca, chunks, owned_by):
+        calls.append(("replace", target_mca.parent.name))
+
+    async def fake_remove(*, target_mca, chunks, owned_by):
+        calls.append(("remove", target_mca.parent.name))
+
+    orchestrator._merge_replace = fake_replace
+    orchestrator._merge_remove = fake_remove
+    events = await _run(orchestrator, [(1, 1)])
+
+    # Region MCA exists live but not in the snapshot -> chunks removed;
+    # the entities MCA exists in neither, so nothing runs for it.
+    assert calls == [("remove", "region")]
+    merge_events = [e for e in events if e.event_type == "merge_region"]
+    assert [(e.rx, e.rz, e.sub_dir) for e in merge_events] == [(0, 0, "region")]
+
+
+@pytest.mark.asyncio
+async def test_failed_merge_cancels_pending_merges(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    orchestrator, _ = _orchestrator(tmp_path, monkeypatch, workers=2)
+    started: list[Path] = []
+    cancelled: list[Path] = []
+
+    async def fake_replace(*, source_mca, target_mca, chunks, owned_by):
+        started.append(target_mca)
+        if len(started) == 1:
+            raise restore_module.MCMapError("boom")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(target_mca)
+            raise
+
+    orchestrator._merge_replace = fake_replace
+    with pytest.raises(restore_module.MCMapError):
+        await _run(orchestrator, [(0, 0), (32, 0), (64, 0)])
+
+    # Every merge still in flight when the first one failed was cancelled.
+    assert len(started) >= 2
+    assert len(cancelled) == len(started) - 1
+
+
+@pytest.mark.asyncio
+async def test_stage_includes_only_discovered_mcc_sidecars(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    orchestrator, dim = _orchestrator(tmp_path, monkeypatch, workers=2)
+    # Live sidecar in r.0.0, another live one outside the selected regions.
+    (dim.region_dir / "c.3.4.mcc").write_bytes(b"live")
+    (dim.region_dir / "c.64.0.mcc").write_bytes(b"live")
+    snapshots = cast(_FakeSnapshots, orchestrator._snapshots)
+    snapshots.listings[dim.region_dir] = ["r.0.0.mca", "c.5.6.mcc", "c.-1.0.mcc"]
+    snapshots.listings[dim.entities_dir] = ["c.33.33.mcc"]
+
+    async def fake_replace(*, source_mca, target_mca, chunks, owned_by):
+        pass
+
+    orchestrator._merge_replace = fake_replace
+    await _run(orchestrator, [(0, 0), (33, 33)])
+
+    staged_mcc = {
+        str(p.relative_to(tmp_path)) for p in snapshots.staged if p.suffix == ".mcc"
+    }
+    assert staged_mcc == {
+        "world/region/c.3.4.mcc",
+        "world/region/c.5.6.mcc",
+        "world/entities/c.33.33.mcc",
+    }
+
+
+@pytest.mark.asyncio
+async def test_preview_merges_region_copies_only(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    orchestrator, dim = _orchestrator(tmp_path / "data", monkeypatch, workers=2)
+    (dim.region_dir / "r.0.0.mca").write_bytes(b"live")
+    (dim.entities_dir / "r.0.0.mca").write_bytes(b"live")
+    session_dir = tmp_path / "session"
+    staged = SnapshotService.stage_destination(
+        session_dir / "source", dim.region_dir.resolve() / "r.0.0.mca"
+    )
+    staged.parent.mkdir(parents=True)
+    staged.write_bytes(b"staged")
+    merged: list[Path] = []
+
+    async def fake_replace(*, source_mca, target_mca, chunks, owned_by):
+        merged.append(target_mca)
+        target_mca.write_bytes(b"merged")
+
+    orchestrator._merge_replace = fake_replace
+    selection = RestorationSelection(
+        type=RestorationType.CHUNKS,
+        region_dir_relpath="world/region",
+        chunks=[(0, 0)],
+    )
+    events = [
+        ev
+        async for ev in orchestrator._preview_chunk_merge(
+            server_id="srv1",
+            selection=selection,
+            session_dir=session_dir,
+            session_id="sid",
+        )
+    ]
+
+    preview_mca = SnapshotService.stage_destination(
+        session_dir / "preview", dim.region_dir / "r.0.0.mca"
+    )
+    assert merged == [preview_mca]
+    assert preview_mca.read_bytes() == b"merged"
+    # The live MCA was copied, not linked: the merge left it untouched.
+    assert (dim.region_dir / "r.0.0.mca").read_bytes() == b"live"
+    assert not list((session_dir / "preview").rglob("entities"))
+    assert [e.percent for e in events] == [100.0]
@@ -1,17 +1,17 @@
+import json
 from contextlib import asynccontextmanager
 from datetime import timedelta
 
 import pytest
 
 from app.background_tasks import TaskProgress, TaskStatus, TaskType, task_manager
-from app.chunk_prune.models import (
-    ChunkPrunePreviewGeometryResponse,
-    ChunkPruneTaskMetadata,
-)
+from app.chunk_prune.geometry_stream import GEOMETRY_STREAM_BATCH_SHAPES
+from app.chunk_prune.models import ChunkPruneTaskMetadata
 from app.chunk_prune.service import (
     ChunkPruneService,
     ChunkPruneTaskNotFound,
     ChunkPruneValidationError,
+    build_preview_geometry,
     region_relpath_for_event,
     seconds_to_ticks,
 )
@@ -72,6 +72,12 @@ def test_region_relpath_for_event_accepts_relative_and_absolute_paths(tmp_path):
     assert region_relpath_for_event(data_path, "world/entities/r.-1.2.mca") is None
     assert region_relpath_for_event(data_path, "../world/region/r.0.0.mca") is None
     assert region_relpath_for_event(data_path, "/outside/world/region/r.0.0.mca") is None
+    assert (
+        region_relpath_for_event(
+            data_path, ".mcmap/prune-scan/scan-1/world/region/r.0.0.mca"
+        )
+        is None
+    )
 
 
 async def test_preview_collects_chunks_pruned_region_event(tmp_path, monkeypatch):
@@ -92,7 +98,7 @@ async def test_preview_collects_chunks_pruned_region_event(tmp_path, monkeypatch
     class _FakeProc:
         returncode = 0
 
-        async def events(self, adapter):
+        async def events(self, adapter, types=None):
             yield MCMapChunksPrunedEvent(
                 type="chunks_pruned",
                 region="world/region/r.0.0.mca",
@@ -144,22 +150,29 @@ async def test_preview_collects_chunks_pruned_region_event(tmp_path, monkeypatch
         "app.chunk_prune.service.mcmap_runner.prune_inhabited",
         fake_prune_inhabited,
     )
+    region_dir = tmp_path / "world" / "region"
+    region_dir.mkdir(parents=True)
+    (region_dir / "r.0.0.mca").write_bytes(b"mca")
+
+    async def fake_prune_dimensions(data_path):
+        return {"world/region": region_dir}
+
     monkeypatch.setattr(service, "_write_claims_file", no_claims_file)
+    monkeypatch.setattr(service, "_prune_dimensions", fake_prune_dimensions)
 
-    progress = [
-        item async for item in service._run_prune_task(metadata, dry_run=True)
-    ]
+    progress = [item async for item in service._run_prune_task(metadata)]
 
     assert progress[-1].result is not None
     assert progress[-1].result["affected_region_counts_by_dimension"] == {
         "world/region": 1
     }
     assert "dimensions" not in progress[-1].result
-    assert metadata.geometry is not None
-    assert metadata.geometry.mode == "chunks"
-    assert metadata.geometry.threshold_seconds == 60
-    assert len(metadata.geometry.dimensions) == 1
-    dimension = metadata.geometry.dimensions[0]
+    assert metadata.selected_cells is not None
+    geometry = build_preview_geometry(metadata, metadata.selected_cells)
+    assert geometry.mode == "chunks"
+    assert geometry.threshold_seconds == 60
+    assert len(geometry.dimensions) == 1
+    dimension = geometry.dimensions[0]
     assert dimension.region_dir_relpath == "world/region"
     assert dimension.unit == "chunk"
     assert dimension.cell_count == 2
@@ -170,6 +183,9 @@ async def test_preview_collects_chunks_pruned_region_event(tmp_path, monkeypatch
     assert [_normalize_ring(ring) for ring in shape.rings] == [
         _normalize_ring([(6, 15), (4, 15), (4, 16), (6, 16)])
     ]
+    planned = metadata.plan["world/region"][(0, 0)]
+    assert planned.chunks == [(4, 15), (5, 15)]
+    assert planned.size == 3
 
 
 async def test_apply_requires_completed_preview(tmp_path):
@@ -388,14 +404,7 @@ async def test_chunk_prune_geometry_endpoint_returns_completed_preview_geometry(
         threshold_ticks=600,
         mode="regions",
         result={"dry_run": True},
-        geometry=ChunkPrunePreviewGeometryResponse(
-            task_id=task_id,
-            server_id="srv1",
-            mode="regions",
-            threshold_seconds=30,
-            threshold_ticks=600,
-            dimensions=[],
-        ),
+        selected_cells={},
     )
     monkeypatch.setattr(chunk_prune_router, "chunk_prune_service", service)
 
@@ -411,3 +420,90 @@ async def test_chunk_prune_geometry_endpoint_returns_completed_preview_geometry(
         assert response.dimensions == []
     finally:
         task_manager.remove_task(task_id)
+
+
+async def test_chunk_prune_geometry_stream_batches_and_simplifies(
+    tmp_path, monkeypatch
+):
+    service = ChunkPruneService(
+        docker=_FakeDocker(tmp_path),  # type: ignore[arg-type]
+        operation_lock=ServerOperationLock(),
+    )
+    task_id = "chunk-prune-geometry-stream"
+    task_manager.remove_task(task_id)
+
+    async def task_gen():
+        yield TaskProgress(progress=100, message="done", result={"dry_run": True})
+
+    submit = task_manager.submit(
+        TaskType.CHUNK_PRUNE_PREVIEW,
+        "preview",
+        task_gen(),
+        server_id="srv1",
+        task_id=task_id,
+    )
+    # A jagged diagonal band: one shape whose ring simplification shrinks.
+    staircase = {(x, z) for x in range(40) for z in range(x, x + 12)}
+    single_cells = {(100 + 2 * i, 0) for i in range(GEOMETRY_STREAM_BATCH_SHAPES)}
+    metadata = ChunkPruneTaskMetadata(
+        task_id=task_id,
+        server_id="srv1",
+        operation="preview",
+        data_path=tmp_path,
+        threshold_seconds=30,
+        threshold_ticks=600,
+        mode="chunks",
+        result={"dry_run": True},
+    )
+    metadata.selected_cells = {
+        "world/region": staircase | single_cells,
+        "world/DIM-1/region": {(0, 0)},
+    }
+    service._metadata[task_id] = metadata
+    monkeypatch.setattr(chunk_prune_router, "chunk_prune_service", service)
+
+    async def read(**params):
+        response = await chunk_prune_router.stream_chunk_prune_preview_geometry(
+            "srv1", task_id, **params
+        )
+        body = b""
+        async for chunk in response.body_iterator:
+            assert isinstance(chunk, bytes)
+            body += chunk
+        return [
+            json.loads(block.removeprefix("data: "))
+            for block in body.decode().split("\n\n")
+            if block
+        ]
+
+    try:
+        await submit.awaitable
+        events = await read(simplify=0, region="world/region")
+        assert [e["event_type"] for e in events] == [
+            "geometry",
+            "dimension",
+            "shapes",
+            "shapes",
+            "complete",
+        ]
+        assert events[1]["shape_count"] == GEOMETRY_STREAM_BATCH_SHAPES + 1
+        shapes = events[2]["shapes"] + events[3]["shapes"]
+        exact = next(s for s in shapes if s["cell_count"] == 480)
+        assert len(exact["rings"][0]) == 160
+
+        events = await read(simplify=3, region=None)
+        assert events[0]["simplify"] == 3
+        dimensions = [e for e in events if e["event_type"] == "dimension"]
+        assert [d["region_dir_relpath"] for d in dimensions] == [
+            "world/DIM-1/region",
+            "world/region",
+        ]
+        shapes = [
+            s for e in events if e["event_type"] == "shapes" for s in e["shapes"]
+        ]
+        simplified = next(s for s in shapes if s["cell_count"] == 480)
+        assert simplified["rings"] == [[[1, 0], [0, 12], [40, 51], [40, 39]]]
+        # Single cells are below the tolerance but keep their exact square.
+        assert all(len(s["rings"][0]) == 4 for s in shapes if s["cell_count"] == 1)
+    finally:
+        task_manager.remove_task(task_id)
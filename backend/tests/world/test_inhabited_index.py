@@ -0,0 +1,371 @@
+"""Tests for the chunk-prune InhabitedTime index and the indexed preview."""
+
+from contextlib import asynccontextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app.chunk_prune import service as service_module
+from app.chunk_prune.inhabited_index import (
+    INDEX_SCAN_THRESHOLD_TICKS,
+    DimensionIndex,
+    index_path,
+    load_index_sync,
+    save_index_sync,
+)
+from app.chunk_prune.models import ChunkPruneTaskMetadata
+from app.chunk_prune.service import ChunkPruneService
+from app.mcmap.events import (
+    MCMapChunksPrunedEvent,
+    MCMapPrunedChunk,
+    MCMapRegionPrunedEvent,
+)
+from app.world.layout import DimensionInfo, WorldRoot, WorldRootPath
+from app.world.locks import ServerOperationLock
+from app.world.region_files import parse_region_filename
+
+
+def _stat(mtime_ns: int, size: int):
+    return SimpleNamespace(st_mtime_ns=mtime_ns, st_size=size)
+
+
+def _index() -> DimensionIndex:
+    index = DimensionIndex()
+    index.put((0, 0), _stat(1, 10), [(0, 0, 100), (1, 0, 5000), (0, 1, 20)])  # type: ignore[arg-type]
+    index.put((-1, 0), _stat(2, 20), [(31, 31, 10)])  # type: ignore[arg-type]
+    index.put((5, 5), _stat(3, 30), [])  # type: ignore[arg-type]
+    return index
+
+
+def test_select_chunks_below_threshold():
+    selection = _index().select_chunks(1000)
+
+    assert selection.cells == {(0, 0), (0, 1), (-1, 31)}
+    assert selection.regions == {(0, 0), (-1, 0)}
+    assert selection.skipped_by_claims == 0
+
+
+def test_select_chunks_skips_claimed():
+    selection = _index().select_chunks(1000, frozenset({(-1, 31), (7, 7)}))
+
+    assert selection.cells == {(0, 0), (0, 1)}
+    assert selection.regions == {(0, 0)}
+    assert selection.skipped_by_claims == 1
+
+
+def test_select_regions_uses_region_max():
+    index = _index()
+
+    assert index.select_regions(1000).regions == {(-1, 0), (5, 5)}
+    assert index.select_regions(5001).regions == {(0, 0), (-1, 0), (5, 5)}
+    claimed = index.select_regions(5001, frozenset({(3, 3)}))
+    assert claimed.regions == {(-1, 0), (5, 5)}
+    assert claimed.skipped_by_claims == 1
+
+
+def test_stale_regions_tracks_mtime_size_and_removals():
+    index = _index()
+    stale = index.stale_regions(
+        {(0, 0): _stat(1, 10), (-1, 0): _stat(9, 20), (2, 2): _stat(1, 1)}  # type: ignore[arg-type]
+    )
+
+    assert stale == [(-1, 0), (2, 2)]
+    assert set(index.regions) == {(0, 0), (-1, 0)}
+    assert index.select_regions(INDEX_SCAN_THRESHOLD_TICKS).regions == {
+        (0, 0),
+        (-1, 0),
+    }
+
+
+def test_round_trip_and_corrupt_file(tmp_path: Path):
+    path = tmp_path / "world" / "region.idx"
+    path.parent.mkdir()
+    index = _index()
+    save_index_sync(path, index)
+
+    loaded = load_index_sync(path)
+    assert loaded.chunk_count == 4
+    assert loaded.regions[(0, 0)].mtime_ns == 1
+    assert loaded.select_chunks(1000).cells == index.select_chunks(1000).cells
+
+    path.write_bytes(path.read_bytes()[:-4])
+    assert load_index_sync(path).regions == {}
+    assert load_index_sync(tmp_path / "missing.idx").regions == {}
+
+
+class _FakeDocker:
+    def __init__(self, data_path: Path) -> None:
+        self._instance = SimpleNamespace(get_data_path=lambda: data_path)
+
+    def get_instance(self, server_id):
+        return self._instance
+
+
+def _write_region(region_dir: Path, name: str, data: bytes) -> None:
+    region_dir.mkdir(parents=True, exist_ok=True)
+    (region_dir / name).write_bytes(data)
+
+
+@pytest.fixture
+def indexed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    data_path = tmp_path / "data"
+    world = data_path / "world"
+    world.mkdir(parents=True)
+    (world / "level.dat").write_bytes(b"level")
+    _write_region(world / "region", "r.0.0.mca", b"aa")
+    _write_region(world / "region", "r.1.0.mca", b"bb")
+
+    # Every chunk's InhabitedTime is ``rx * 1000 + rel_x`` plus any bump
+    # for its region file name.
+    scans: list[tuple[Path, list[str]]] = []
+    bumps: dict[str, int] = {}
+    removed: list[tuple[str, list[tuple[int, int]]]] = []
+
+    class _FakeProc:
+        returncode = 0
+
+        def __init__(self, path: Path, threshold_ticks: int, mode: str) -> None:
+            self.path = path
+            self.threshold_ticks = threshold_ticks
+            self.mode = mode
+
+        async def events(self, adapter, types=None):
+            regions = sorted(self.path.glob("**/region/r.*.mca"))
+            scans.append(
+                (self.path, [p.relative_to(self.path).as_posix() for p in regions])
+            )
+            for region in regions:
+                parsed = parse_region_filename(region.name)
+                assert parsed is not None
+                rx, rz = parsed
+                times = [
+                    rx * 1000 + rel_x + bumps.get(region.name, 0) for rel_x in range(2)
+                ]
+                if self.mode == "regions":
+                    if max(times) < self.threshold_ticks:
+                        yield MCMapRegionPrunedEvent(
+                            type="region_pruned",
+                            region=str(region),
+                            region_x=rx,
+                            region_z=rz,
+                            chunks=len(times),
+                            max_inhabited_time=max(times),
+                            dry_run=True,
+                        )
+                    continue
+                chunks = [
+                    MCMapPrunedChunk(
+                        chunk_x=rx * 32 + rel_x,
+                        chunk_z=0,
+                        rel_x=rel_x,
+                        rel_z=0,
+                        inhabited_time=time,
+                    )
+                    for rel_x, time in enumerate(times)
+                    if time < self.threshold_ticks
+                ]
+                if chunks:
+                    yield MCMapChunksPrunedEvent(
+                        type="chunks_pruned",
+                        region=str(region),
+                        region_x=rx,
+                        region_z=rz,
+                        chunks=chunks,
+                        dry_run=True,
+                    )
+
+        async def terminate(self):
+            return None
+
+        async def stderr(self):
+            return ""
+
+    class _FakeRemoveProc:
+        returncode = 0
+
+        async def events(self, adapter, types=None):
+            return
+            yield
+
+    @asynccontextmanager
+    async def fake_prune_inhabited(*, path, threshold_ticks, mode, dry_run, **kwargs):
+        assert dry_run
+        yield _FakeProc(path, threshold_ticks, mode)
+
+    @asynccontextmanager
+    async def fake_remove_chunks(*, target_mca, chunks, owned_by):
+        removed.append((target_mca.relative_to(data_path).as_posix(), chunks))
+        yield _FakeRemoveProc()
+
+    async def no_claims(server_id, data_path):
+        return None
+
+    async def fake_roots(_data_path):
+        dim = DimensionInfo(
+            region_dir=world / "region", entities_dir=None, poi_dir=None
+        )
+        return [WorldRoot(name="world", path=world, dimensions=[dim])]
+
+    async def fake_root_paths(_data_path):
+        return [WorldRootPath(name="world", path=world)]
+
+    monkeypatch.setattr(
+        service_module.mcmap_runner, "prune_inhabited", fake_prune_inhabited
+    )
+    monkeypatch.setattr(
+        service_module.mcmap_runner, "remove_chunks", fake_remove_chunks
+    )
+    monkeypatch.setattr(service_module, "discover_world_roots", fake_roots)
+    monkeypatch.setattr(
+        service_module, "discover_world_root_paths", fake_root_paths
+    )
+    monkeypatch.setattr(service_module, "PRUNE_TEMP_BASE_DIR", tmp_path / "tmp")
+    monkeypatch.setattr(
+        service_module,
+        "config",
+        SimpleNamespace(
+            mcmap=SimpleNamespace(prune_index_enabled=True, prune_apply_workers=2)
+        ),
+    )
+    service = ChunkPruneService(
+        docker=_FakeDocker(data_path),  # type: ignore[arg-type]
+        operation_lock=ServerOperationLock(),
+    )
+    monkeypatch.setattr(service, "_extract_claims", no_claims)
+    return SimpleNamespace(
+        service=service,
+        data_path=data_path,
+        scans=scans,
+        bumps=bumps,
+        removed=removed,
+    )
+
+
+def _metadata(data_path: Path, threshold_ticks: int, mode: str = "chunks"):
+    return ChunkPruneTaskMetadata(
+        task_id=f"chunk-prune-preview-{threshold_ticks}-{mode}",
+        server_id="srv1",
+        operation="preview",
+        data_path=data_path,
+        threshold_seconds=threshold_ticks // 20,
+        threshold_ticks=threshold_ticks,
+        mode=mode,  # type: ignore[arg-type]
+    )
+
+
+async def _preview(service: ChunkPruneService, metadata: ChunkPruneTaskMetadata):
+    return [item async for item in service._run_preview_task(metadata)]
+
+
+async def test_indexed_preview_rescans_only_changed_regions(indexed, tmp_path):
+    service, data_path, scans = indexed.service, indexed.data_path, indexed.scans
+
+    metadata = _metadata(data_path, 1001)
+    progress = await _preview(service, metadata)
+
+    assert scans == [(data_path, ["world/region/r.0.0.mca", "world/region/r.1.0.mca"])]
+    result = progress[-1].result
+    assert result is not None
+    assert result["chunks_scanned"] == 4
+    assert result["chunks_selected"] == 3
+    assert result["regions_rescanned"] == 2
+    assert result["affected_region_counts_by_dimension"] == {"world/region": 2}
+    assert metadata.selected_cells is not None
+    assert len(metadata.selected_cells["world/region"]) == 3
+    assert index_path(data_path, "world/region").is_file()
+
+    # A fresh service reads the saved index; only the rewritten MCA rescans.
+    _write_region(data_path / "world" / "region", "r.1.0.mca", b"bbbb")
+    service._indexes.clear()
+    progress = await _preview(service, _metadata(data_path, 1001, mode="regions"))
+
+    assert len(scans) == 2
+    scan_root, scanned = scans[1]
+    assert scan_root.parent == data_path / ".mcmap" / "prune-scan"
+    assert scanned == ["world/region/r.1.0.mca"]
+    assert not scan_root.exists()
+    result = progress[-1].result
+    assert result is not None
+    assert result["regions_rescanned"] == 1
+    assert result["regions_selected"] == 1
+    assert "claims_loaded" not in result
+
+    # Nothing changed: no mcmap run at all.
+    await _preview(service, _metadata(data_path, 5))
+    assert len(scans) == 2
+
+
+def _apply_metadata(preview: ChunkPruneTaskMetadata) -> ChunkPruneTaskMetadata:
+    return ChunkPruneTaskMetadata(
+        task_id=preview.task_id.replace("preview", "apply"),
+        server_id=preview.server_id,
+        operation="apply",
+        data_path=preview.data_path,
+        threshold_seconds=preview.threshold_seconds,
+        threshold_ticks=preview.threshold_ticks,
+        mode=preview.mode,
+        plan={relpath: dict(regions) for relpath, regions in preview.plan.items()},
+    )
+
+
+async def test_apply_prunes_only_the_preview_plan(indexed):
+    service, data_path = indexed.service, indexed.data_path
+    world = data_path / "world"
+    _write_region(world / "entities", "r.0.0.mca", b"ee")
+
+    preview = _metadata(data_path, 1001)
+    await _preview(service, preview)
+    plan = preview.plan["world/region"]
+    assert {region: planned.chunks for region, planned in plan.items()} == {
+        (0, 0): [(0, 0), (1, 0)],
+        (1, 0): [(0, 0)],
+    }
+
+    # r.0.0 is untouched; r.1.0 was played in since and no longer qualifies.
+    _write_region(world / "region", "r.1.0.mca", b"bbbb")
+    indexed.bumps["r.1.0.mca"] = 5
+    apply = _apply_metadata(preview)
+    progress = [item async for item in service._run_planned_apply(apply)]
+
+    scan_root, scanned = indexed.scans[-1]
+    assert scan_root.parent == data_path / ".mcmap" / "prune-scan"
+    assert scanned == ["world/region/r.1.0.mca"]
+    assert not scan_root.exists()
+    assert sorted(indexed.removed) == [
+        ("world/entities/r.0.0.mca", [(0, 0), (1, 0)]),
+        ("world/region/r.0.0.mca", [(0, 0), (1, 0)]),
+    ]
+    result = progress[-1].result
+    assert result["dry_run"] is False
+    assert result["chunks_selected"] == 2
+    assert result["regions_selected"] == 1
+    assert result["regions_rescanned"] == 1
+    assert result["chunks_dropped"] == 1
+    assert result["affected_region_counts_by_dimension"] == {"world/region": 1}
+    # The preview's own plan is left as it was.
+    assert set(preview.plan["world/region"]) == {(0, 0), (1, 0)}
+
+
+async def test_apply_regions_mode_deletes_region_files(indexed):
+    service, data_path = indexed.service, indexed.data_path
+    region_dir = data_path / "world" / "region"
+    _write_region(region_dir, "c.5.5.mcc", b"big")
+    _write_region(region_dir, "c.40.0.mcc", b"big")
+
+    preview = _metadata(data_path, 1001, mode="regions")
+    await _preview(service, preview)
+    assert preview.plan["world/region"][(0, 0)].chunk_count == 2
+    scans_before = len(indexed.scans)
+
+    progress = [
+        item async for item in service._run_planned_apply(_apply_metadata(preview))
+    ]
+
+    assert len(indexed.scans) == scans_before
+    assert indexed.removed == []
+    assert sorted(p.name for p in region_dir.iterdir()) == ["c.40.0.mcc", "r.1.0.mca"]
+    result = progress[-1].result
+    assert result["regions_selected"] == 1
+    assert result["chunks_selected"] == 2
+    assert result["regions_rescanned"] == 0
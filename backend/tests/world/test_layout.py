@@ -356,7 +356,11 @@ async def test_dimension_scan_depth_comes_from_config(monkeypatch):
     monkeypatch.setattr(
         layout_module,
         "config",
-        SimpleNamespace(world=SimpleNamespace(dimension_max_depth_from_world_root=0)),
+        SimpleNamespace(
+            world=SimpleNamespace(
+                dimension_max_depth_from_world_root=0, layout_probe_workers=1
+            )
+        ),
     )
     with tempfile.TemporaryDirectory(prefix="layout_test_") as tmp:
         data_path = Path(tmp)
@@ -413,3 +417,45 @@ async def test_discover_world_roots_requires_fd(monkeypatch):
 
         with pytest.raises(WorldLayoutDiscoveryError, match="fd command not found"):
             await discover_world_roots(data_path)
+
+
+@pytest.mark.asyncio
+async def test_layout_cache_walks_only_when_directories_change(monkeypatch):
+    walks: list[Path] = []
+    list_dirs = layout_module._list_dirs_with_fd
+
+    async def counting_list_dirs(world_root, max_depth):
+        walks.append(world_root)
+        return await list_dirs(world_root, max_depth)
+
+    monkeypatch.setattr(layout_module, "_list_dirs_with_fd", counting_list_dirs)
+    with tempfile.TemporaryDirectory(prefix="layout_test_") as tmp:
+        data_path = Path(tmp)
+        _write_properties(data_path, "world")
+        world = data_path / "world"
+        _touch(world / "level.dat")
+        _touch(world / "region" / "r.0.0.mca")
+        (world / "DIM-1" / "region").mkdir(parents=True)
+
+        async def dimension_paths() -> list[str]:
+            roots = await discover_world_roots(data_path)
+            return list(_by_dimension_path(roots[0]))
+
+        assert await dimension_paths() == ["."]
+        assert await dimension_paths() == ["."]
+        assert len(walks) == 1
+
+        # Files only: the layout is re-probed, not walked again.
+        _touch(world / "session.lock")
+        _touch(world / "DIM-1" / "region" / "r.0.0.mca")
+        assert await dimension_paths() == [".", "DIM-1"]
+        assert len(walks) == 1
+
+        # A new directory means a new walk.
+        _touch(world / "dimensions" / "mod" / "x" / "region" / "r.0.0.mca")
+        assert await dimension_paths() == [".", "DIM-1", "dimensions/mod/x"]
+        assert len(walks) == 2
+
+        (world / "DIM-1" / "region" / "r.0.0.mca").unlink()
+        assert await dimension_paths() == [".", "dimensions/mod/x"]
+        assert len(walks) == 2
@@ -775,7 +775,11 @@ async def test_world_restore_preserves_ignored_paths(
     monkeypatch.setattr(
         "app.snapshots.service.config",
         SimpleNamespace(
-            snapshots=SimpleNamespace(ignored_paths=["<LEVEL_NAME>/ignored_cache"])
+            snapshots=SimpleNamespace(
+                ignored_paths=["<LEVEL_NAME>/ignored_cache"],
+                ls_cache_max_nodes=10_000,
+                restore_parallel_steps=2,
+            )
         ),
     )
 
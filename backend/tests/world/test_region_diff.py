@@ -0,0 +1,163 @@
+"""Tests for the snapshot-vs-live region diff and selection narrowing."""
+
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app.models import RestorationSelection, RestorationType
+from app.snapshots import NodeKind, ResticNode
+from app.world import restore as restore_module
+from app.world.layout import DimensionInfo, WorldRoot
+from app.world.restore import SelectionResolutionError, WorldRestoreOrchestrator
+
+MTIME_NS = 1_700_000_000_123_456_789
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class _FakeSnapshots:
+    """``list_directory_nodes`` serves ``nodes[dir]`` (name -> (size, mtime_ns))."""
+
+    def __init__(self) -> None:
+        self.nodes: dict[Path, dict[str, tuple[int, int]]] = {}
+        self.listed: list[Path] = []
+
+    async def list_directory_nodes(self, snapshot_id, path):
+        self.listed.append(path)
+        listing = {path: ResticNode(path=str(path), kind=NodeKind.DIR)}
+        for name, (size, mtime_ns) in self.nodes.get(path, {}).items():
+            mtime = EPOCH + timedelta(microseconds=mtime_ns // 1000)
+            listing[path / name] = ResticNode(
+                path=str(path / name), kind=NodeKind.FILE, size=size, mtime=mtime
+            )
+        return listing
+
+
+def _write(path: Path, data: bytes, mtime_ns: int = MTIME_NS) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def world(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    data_path = tmp_path.resolve() / "data"
+    world_dir = data_path / "world"
+    dim = DimensionInfo(
+        region_dir=world_dir / "region",
+        entities_dir=world_dir / "entities",
+        poi_dir=None,
+    )
+    nether = DimensionInfo(
+        region_dir=world_dir / "DIM-1" / "region", entities_dir=None, poi_dir=None
+    )
+    assert dim.entities_dir is not None
+    for d in (dim.region_dir, dim.entities_dir, nether.region_dir):
+        d.mkdir(parents=True)
+
+    async def fake_roots(_data_path):
+        return [WorldRoot(name="world", path=world_dir, dimensions=[dim, nether])]
+
+    monkeypatch.setattr(restore_module, "discover_world_roots", fake_roots)
+    instance = SimpleNamespace(get_data_path=lambda: data_path)
+    snapshots = _FakeSnapshots()
+    orchestrator = WorldRestoreOrchestrator(
+        snapshot_service=snapshots,  # type: ignore[arg-type]
+        docker_mc_manager=SimpleNamespace(get_instance=lambda _server_id: instance),  # type: ignore[arg-type]
+        server_operation_lock=None,  # type: ignore[arg-type]
+        session_factory=None,  # type: ignore[arg-type]
+    )
+    return orchestrator, snapshots, dim, nether
+
+
+async def test_diff_classifies_regions(world):
+    orchestrator, snapshots, dim, nether = world
+    # r.0.0 identical; r.1.0 resized; r.2.0 only its entities file differs;
+    # r.3.0 live only; r.4.0 snapshot only.
+    for name in ("r.0.0.mca", "r.1.0.mca", "r.2.0.mca", "r.3.0.mca"):
+        _write(dim.region_dir / name, b"live")
+    _write(dim.entities_dir / "r.2.0.mca", b"ents", MTIME_NS + 5_000)
+    _write(dim.region_dir / "r.9.9.mca", b"")  # empty files don't count
+    snapshots.nodes[dim.region_dir] = {
+        "r.0.0.mca": (4, MTIME_NS),
+        "r.1.0.mca": (8, MTIME_NS),
+        "r.2.0.mca": (4, MTIME_NS),
+        "r.4.0.mca": (4, MTIME_NS),
+        "c.0.0.mcc": (4, MTIME_NS),
+    }
+    snapshots.nodes[dim.entities_dir] = {"r.2.0.mca": (4, MTIME_NS)}
+
+    overworld, nether_diff = await orchestrator.diff_regions("srv1", "snap")
+
+    assert overworld.region_dir_relpath == "world/region"
+    assert overworld.changed == [(1, 0), (2, 0)]
+    assert overworld.added == [(3, 0)]
+    assert overworld.removed == [(4, 0)]
+    assert overworld.unchanged == 1
+    assert overworld.differing == [(1, 0), (2, 0), (3, 0), (4, 0)]
+    assert nether_diff.region_dir_relpath == "world/DIM-1/region"
+    assert nether_diff.differing == []
+
+
+async def test_diff_single_dimension(world):
+    orchestrator, snapshots, dim, nether = world
+
+    (diff,) = await orchestrator.diff_regions("srv1", "snap", "world/DIM-1/region")
+
+    assert diff.region_dir_relpath == "world/DIM-1/region"
+    assert snapshots.listed == [nether.region_dir]
+
+
+async def test_narrow_regions_and_chunks_to_differing(world):
+    orchestrator, snapshots, dim, _ = world
+    _write(dim.region_dir / "r.0.0.mca", b"live")
+    _write(dim.region_dir / "r.1.0.mca", b"live")
+    snapshots.nodes[dim.region_dir] = {
+        "r.0.0.mca": (4, MTIME_NS),
+        "r.1.0.mca": (4, MTIME_NS + 1_000_000),
+    }
+
+    regions = await orchestrator.narrow_to_differing(
+        "srv1",
+        "snap",
+        RestorationSelection(
+            type=RestorationType.REGIONS,
+            region_dir_relpath="world/region",
+            regions=[(0, 0), (1, 0)],
+        ),
+    )
+    assert regions.regions == [(1, 0)]
+
+    chunks = await orchestrator.narrow_to_differing(
+        "srv1",
+        "snap",
+        RestorationSelection(
+            type=RestorationType.CHUNKS,
+            region_dir_relpath="world/region",
+            chunks=[(0, 0), (32, 5), (40, 31)],
+        ),
+    )
+    assert chunks.chunks == [(32, 5), (40, 31)]
+
+    with pytest.raises(SelectionResolutionError):
+        await orchestrator.narrow_to_differing(
+            "srv1",
+            "snap",
+            RestorationSelection(
+                type=RestorationType.REGIONS,
+                region_dir_relpath="world/region",
+                regions=[(0, 0)],
+            ),
+        )
+
+
+async def test_narrow_leaves_whole_dimension_selections_alone(world):
+    orchestrator, snapshots, _, _ = world
+    selection = RestorationSelection(
+        type=RestorationType.DIMENSION, region_dir_relpath="world/region"
+    )
+
+    assert await orchestrator.narrow_to_differing("srv1", "snap", selection) is selection
+    assert snapshots.listed == []
@@ -0,0 +1,158 @@
+"""Tests for the snapshot staging cache shared by previews and chunk restores."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.snapshots import ResticRestoreEvent, SnapshotService
+from app.world.stage_cache import StagingCache
+
+
+class _FakeSnapshots:
+    """``stage`` writes ``contents[path]`` for every path the snapshot has."""
+
+    def __init__(self, contents: dict[Path, bytes]) -> None:
+        self.contents = contents
+        self.calls: list[tuple[str, list[Path]]] = []
+
+    async def stage(self, snapshot_id, include_paths, stage_root):
+        self.calls.append((snapshot_id, list(include_paths)))
+        for path in include_paths:
+            if path not in self.contents:
+                continue
+            dest = SnapshotService.stage_destination(stage_root, path)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_bytes(self.contents[path])
+        yield ResticRestoreEvent(kind="status", percent_done=1.0)
+
+
+A = Path("/data/world/region/r.0.0.mca")
+B = Path("/data/world/region/r.1.0.mca")
+MISSING = Path("/data/world/region/r.9.9.mca")
+
+
+async def _stage(cache, snapshots, snapshot_id, paths, root, max_bytes=1 << 20):
+    return [
+        event
+        async for event in cache.stage(
+            snapshots, snapshot_id, paths, root, max_bytes=max_bytes
+        )
+    ]
+
+
+@pytest.mark.asyncio
+async def test_second_stage_links_from_cache(tmp_path: Path):
+    snapshots = _FakeSnapshots({A: b"aaaa", B: b"bb"})
+    cache = StagingCache(tmp_path / "cache")
+
+    events = await _stage(cache, snapshots, "snap", [A, MISSING], tmp_path / "one")
+    assert [e.kind for e in events] == ["status"]
+    events = await _stage(cache, snapshots, "snap", [A, B, MISSING], tmp_path / "two")
+
+    # Only B had to come from restic the second time; MISSING is a cached absence.
+    assert snapshots.calls == [("snap", [A, MISSING]), ("snap", [B])]
+    assert [e.kind for e in events] == ["status"]
+    staged_a = SnapshotService.stage_destination(tmp_path / "two", A)
+    assert staged_a.read_bytes() == b"aaaa"
+    assert staged_a.stat().st_nlink == 3
+    assert not SnapshotService.stage_destination(tmp_path / "two", MISSING).exists()
+    assert (cache.hits, cache.misses, cache.bytes) == (2, 3, 6)
+    assert not list((tmp_path / "cache").glob(".incoming-*"))
+
+
+@pytest.mark.asyncio
+async def test_keys_are_per_snapshot(tmp_path: Path):
+    snapshots = _FakeSnapshots({A: b"old"})
+    cache = StagingCache(tmp_path / "cache")
+    await _stage(cache, snapshots, "snap1", [A], tmp_path / "one")
+    snapshots.contents[A] = b"new"
+    await _stage(cache, snapshots, "snap2", [A], tmp_path / "two")
+
+    assert SnapshotService.stage_destination(tmp_path / "one", A).read_bytes() == b"old"
+    assert SnapshotService.stage_destination(tmp_path / "two", A).read_bytes() == b"new"
+    assert len(snapshots.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used_over_budget(tmp_path: Path):
+    snapshots = _FakeSnapshots({A: b"a" * 6, B: b"b" * 6})
+    cache = StagingCache(tmp_path / "cache")
+
+    await _stage(cache, snapshots, "snap", [A], tmp_path / "one", max_bytes=10)
+    await _stage(cache, snapshots, "snap", [B], tmp_path / "two", max_bytes=10)
+
+    assert cache.bytes == 6
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+    # The evicted entry's stage dir keeps its link.
+    assert SnapshotService.stage_destination(tmp_path / "one", A).read_bytes() == b"a" * 6
+
+    await _stage(cache, snapshots, "snap", [A], tmp_path / "three", max_bytes=10)
+    assert snapshots.calls[-1] == ("snap", [A])
+
+
+class _GatedSnapshots(_FakeSnapshots):
+    """Holds ``stage`` calls that include ``gated`` until ``gate`` is set."""
+
+    def __init__(self, contents: dict[Path, bytes], gated: Path) -> None:
+        super().__init__(contents)
+        self.gated = gated
+        self.gate = asyncio.Event()
+        self.waiting = asyncio.Event()
+
+    async def stage(self, snapshot_id, include_paths, stage_root):
+        if self.gated in include_paths:
+            self.waiting.set()
+            await self.gate.wait()
+        async for event in super().stage(snapshot_id, include_paths, stage_root):
+            yield event
+
+
+@pytest.mark.asyncio
+async def test_concurrent_stage_cannot_evict_pinned_hits(tmp_path: Path):
+    c = Path("/data/world/region/r.2.0.mca")
+    snapshots = _GatedSnapshots({A: b"a" * 6, B: b"b" * 6, c: b"c" * 6}, gated=B)
+    cache = StagingCache(tmp_path / "cache")
+    await _stage(cache, snapshots, "snap", [A], tmp_path / "warm", max_bytes=10)
+
+    # A is a hit for the first stage, which then waits on restic for B while
+    # the second stage pushes the cache over budget.
+    first = asyncio.create_task(
+        _stage(cache, snapshots, "snap", [A, B], tmp_path / "one", max_bytes=10)
+    )
+    await snapshots.waiting.wait()
+    await _stage(cache, snapshots, "snap", [c], tmp_path / "two", max_bytes=10)
+    snapshots.gate.set()
+    await first
+
+    assert SnapshotService.stage_destination(tmp_path / "one", A).read_bytes() == b"a" * 6
+    assert SnapshotService.stage_destination(tmp_path / "one", B).read_bytes() == b"b" * 6
+    assert cache.bytes <= 10
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(("snapshot_id", "max_bytes"), [("latest", 1 << 20), ("snap", 0)])
+async def test_bypass_stages_directly(tmp_path: Path, snapshot_id, max_bytes):
+    snapshots = _FakeSnapshots({A: b"aaaa"})
+    cache = StagingCache(tmp_path / "cache")
+
+    for root in ("one", "two"):
+        await _stage(
+            cache, snapshots, snapshot_id, [A], tmp_path / root, max_bytes=max_bytes
+        )
+
+    assert len(snapshots.calls) == 2
+    assert len(cache) == 0
+    assert SnapshotService.stage_destination(tmp_path / "two", A).read_bytes() == b"aaaa"
+
+
+@pytest.mark.asyncio
+async def test_first_use_wipes_leftovers(tmp_path: Path):
+    root = tmp_path / "cache"
+    root.mkdir()
+    (root / "stale").write_bytes(b"x")
+    cache = StagingCache(root)
+
+    await _stage(cache, _FakeSnapshots({A: b"a"}), "snap", [A], tmp_path / "one")
+
+    assert not (root / "stale").exists()
@@ -62,6 +62,8 @@ const getTaskTypeName = (taskType: BackgroundTaskType): string => {
       return '区块清理预览'
     case 'chunk_prune_apply':
       return '区块清理删除'
+    case 'snapshot_backup':
+      return '创建快照'
     default:
       return '未知任务'
   }
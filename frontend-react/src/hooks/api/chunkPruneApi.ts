@@ -1,4 +1,5 @@
 import { api } from '@/utils/api'
+import { readEventStream } from '@/utils/eventStream'
 import {
   transformTask,
   type BackgroundTaskResponse,
@@ -6,12 +7,18 @@ import {
 import type { BackgroundTask } from '@/stores/useBackgroundTaskStore'
 import type {
   ChunkPruneApplyRequest,
+  ChunkPruneGeometryDimension,
+  ChunkPruneGeometryStreamEvent,
   ChunkPrunePreviewGeometryResponse,
   ChunkPrunePreviewRequest,
   ChunkPruneSettingsResponse,
   ChunkPruneStartResponse,
 } from '@/types/ChunkPrune'
 
+// Geometry snapshots copy every shape list, so publish them on a timer rather
+// than per batch.
+const PROGRESS_INTERVAL_MS = 250
+
 export interface ChunkPruneState {
   previewTask: BackgroundTask | null
   applyTask: BackgroundTask | null
@@ -52,6 +59,91 @@ export const chunkPruneApi = {
       )
       .then((r) => r.data),
 
+  // Streams geometry as SSE batches. Shapes accumulate in place and
+  // `onProgress` receives a snapshot of the geometry so far at most every
+  // PROGRESS_INTERVAL_MS; the promise resolves with the complete geometry and
+  // rejects if the stream ends early, fails, or `signal` aborts it.
+  streamPreviewGeometry: (
+    serverId: string,
+    previewTaskId: string,
+    opts: {
+      simplify?: number
+      signal?: AbortSignal
+      onProgress?: (geometry: ChunkPrunePreviewGeometryResponse) => void
+    } = {},
+  ): Promise<ChunkPrunePreviewGeometryResponse> =>
+    new Promise((resolve, reject) => {
+      let header: Omit<ChunkPrunePreviewGeometryResponse, 'dimensions'> | null =
+        null
+      const dimensions: ChunkPruneGeometryDimension[] = []
+      let completed = false
+      let lastProgress = 0
+      const snapshot = (): ChunkPrunePreviewGeometryResponse => ({
+        ...header!,
+        dimensions: dimensions.map((dim) => ({
+          ...dim,
+          shapes: dim.shapes.slice(),
+        })),
+      })
+      const params = new URLSearchParams({
+        simplify: String(opts.simplify ?? 0),
+      })
+      void readEventStream<ChunkPruneGeometryStreamEvent>({
+        url: `/servers/${serverId}/chunk-prune/previews/${previewTaskId}/geometry/stream?${params}`,
+        method: 'GET',
+        signal: opts.signal,
+        onEvent: (event) => {
+          if (event.event_type === 'geometry') {
+            header = {
+              task_id: event.task_id,
+              server_id: event.server_id,
+              mode: event.mode,
+              threshold_seconds: event.threshold_seconds,
+              threshold_ticks: event.threshold_ticks,
+            }
+            dimensions.length = 0
+            return
+          }
+          if (!header) return
+          if (event.event_type === 'dimension') {
+            dimensions.push({
+              region_dir_relpath: event.region_dir_relpath,
+              unit: event.unit,
+              cell_count: event.cell_count,
+              shapes: [],
+            })
+          } else if (event.event_type === 'shapes') {
+            const dim = dimensions.find(
+              (d) => d.region_dir_relpath === event.region_dir_relpath,
+            )
+            if (dim) {
+              for (const shape of event.shapes) dim.shapes.push(shape)
+            }
+          } else if (event.event_type === 'complete') {
+            completed = true
+            resolve({ ...header, dimensions })
+            return
+          }
+          const now = Date.now()
+          if (opts.onProgress && now - lastProgress >= PROGRESS_INTERVAL_MS) {
+            lastProgress = now
+            opts.onProgress(snapshot())
+          }
+        },
+        onClose: () => {
+          if (!completed) reject(new Error('geometry stream ended early'))
+        },
+        onError: (message) => reject(new Error(message)),
+      }).then(() => {
+        // readEventStream returns quietly on abort; settle the promise here.
+        if (!completed && opts.signal?.aborted) {
+          reject(
+            opts.signal.reason ?? new DOMException('Aborted', 'AbortError'),
+          )
+        }
+      })
+    }),
+
   startPreview: (serverId: string, request: ChunkPrunePreviewRequest) =>
     api
       .post<ChunkPruneStartResponse>(
@@ -4,6 +4,7 @@ import type {
   DimensionLabelsResponse,
   ListEligibleSnapshotsResponse,
   ListRestorationsResponse,
+  RegionDiffResponse,
   RestorationResponse,
   RestorationSelection,
   WorldLayoutResponse,
@@ -41,6 +42,23 @@ export const worldRestoreApi = {
       )
       .then((r) => r.data),
 
+  regionDiff: (
+    serverId: string,
+    snapshotId: string,
+    regionDirRelpath?: string,
+  ) =>
+    api
+      .get<RegionDiffResponse>(
+        `/servers/${serverId}/world-restore/region-diff`,
+        {
+          params: {
+            snapshot_id: snapshotId,
+            region_dir_relpath: regionDirRelpath,
+          },
+        },
+      )
+      .then((r) => r.data),
+
   createSnapshot: (serverId: string, selection: RestorationSelection) =>
     api
       .post<CreateSnapshotResponse>(
@@ -1,4 +1,4 @@
-import { useQuery } from '@tanstack/react-query'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 
 import { chunkPruneApi } from '@/hooks/api/chunkPruneApi'
 import { queryKeys } from '@/utils/api'
@@ -28,17 +28,26 @@ export const useChunkPruneState = (serverId: string | undefined) =>
     refetchOnMount: 'always',
   })
 
+// Geometry is streamed so the overlay can draw shapes as batches arrive;
+// partial geometry is published into the query cache along the way.
 export const useChunkPrunePreviewGeometry = (
   serverId: string | undefined,
   previewTaskId: string | undefined,
   enabled: boolean,
-) =>
-  useQuery({
-    queryKey: queryKeys.chunkPrune.previewGeometry(
-      serverId ?? '',
-      previewTaskId ?? '',
-    ),
-    queryFn: () => chunkPruneApi.getPreviewGeometry(serverId!, previewTaskId!),
+) => {
+  const queryClient = useQueryClient()
+  const queryKey = queryKeys.chunkPrune.previewGeometry(
+    serverId ?? '',
+    previewTaskId ?? '',
+  )
+  return useQuery({
+    queryKey,
+    queryFn: ({ signal }) =>
+      chunkPruneApi.streamPreviewGeometry(serverId!, previewTaskId!, {
+        signal,
+        onProgress: (geometry) => queryClient.setQueryData(queryKey, geometry),
+      }),
     enabled: !!serverId && !!previewTaskId && enabled,
     staleTime: Infinity,
   })
+}
@@ -1,6 +1,7 @@
 import { useQuery } from '@tanstack/react-query'
 
 import { worldRestoreApi } from '@/hooks/api/worldRestoreApi'
+import { useLivePlayerPositions } from '@/hooks/useLivePlayerPositions'
 import type { RestorationSelection } from '@/types/WorldRestore'
 import { queryKeys } from '@/utils/api'
 
@@ -22,13 +23,15 @@ export const useWorldDimensionLabels = (serverId: string | undefined) =>
 export const useWorldRestorePlayerLocations = (
   serverId: string | undefined,
   enabled = true,
-) =>
-  useQuery({
+) => {
+  useLivePlayerPositions(serverId, enabled)
+  return useQuery({
     queryKey: queryKeys.worldRestore.playerLocations(serverId ?? ''),
     queryFn: () => worldRestoreApi.getPlayerLocations(serverId!),
     enabled: !!serverId && enabled,
     staleTime: 30_000,
   })
+}
 
 export const useEligibleSnapshots = (
   serverId: string | undefined,
@@ -41,6 +44,23 @@ export const useEligibleSnapshots = (
     staleTime: 5_000,
   })
 
+export const useRegionDiff = (
+  serverId: string | undefined,
+  snapshotId: string | undefined,
+  regionDirRelpath?: string,
+) =>
+  useQuery({
+    queryKey: queryKeys.worldRestore.regionDiff(
+      serverId ?? '',
+      snapshotId ?? '',
+      regionDirRelpath,
+    ),
+    queryFn: () =>
+      worldRestoreApi.regionDiff(serverId!, snapshotId!, regionDirRelpath),
+    enabled: !!serverId && !!snapshotId,
+    staleTime: 5_000,
+  })
+
 export const useRestorations = (serverId: string | undefined) =>
   useQuery({
     queryKey: queryKeys.worldRestore.history(serverId ?? ''),
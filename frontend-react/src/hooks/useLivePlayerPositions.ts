@@ -0,0 +1,121 @@
+import { useQueryClient } from '@tanstack/react-query'
+import { useEffect } from 'react'
+
+import type {
+  EventPlayerPosition,
+  PlayerLocationEntry,
+  PlayerLocationsResponse,
+  PlayerPositionsEvent,
+} from '@/types/PlayerLocations'
+import { getApiBaseUrl, queryKeys } from '@/utils/api'
+
+const RECONNECT_DELAY_MS = 5000
+
+// Applies a full live snapshot to the cached locations. Players missing from
+// the snapshot keep their last position (the server saves it on logout) but
+// lose the live flag; the next refetch picks up their saved file.
+export function applyLivePositions(
+  data: PlayerLocationsResponse,
+  positions: EventPlayerPosition[],
+): PlayerLocationsResponse {
+  const relpathByDimension = new Map(
+    data.dimensions.map((d) => [d.dimension_id, d.region_dir_relpath]),
+  )
+  const byUuid = new Map(positions.map((p) => [p.player.uuid, p]))
+  const byName = new Map(positions.map((p) => [p.player.name.toLowerCase(), p]))
+  const matched = new Set<string>()
+
+  const toEntry = (
+    base: PlayerLocationEntry,
+    live: EventPlayerPosition,
+  ): PlayerLocationEntry => ({
+    ...base,
+    dimension_id: live.dimension_id,
+    region_dir_relpath: relpathByDimension.get(live.dimension_id) ?? null,
+    pos: { x: live.x, y: live.y, z: live.z },
+    live: true,
+  })
+
+  const players = data.players.map((entry) => {
+    const live =
+      (entry.uuid ? byUuid.get(entry.uuid) : undefined) ??
+      (entry.id_kind === 'name' ? byName.get(entry.id.toLowerCase()) : undefined)
+    if (!live) return entry.live ? { ...entry, live: false } : entry
+    matched.add(live.player.uuid)
+    return toEntry(entry, live)
+  })
+  for (const live of positions) {
+    if (matched.has(live.player.uuid)) continue
+    players.push(
+      toEntry(
+        {
+          id: live.player.uuid,
+          id_kind: 'uuid',
+          uuid: live.player.uuid,
+          source: 'rcon',
+          storage: 'live',
+          data_version: null,
+          dimension_id: live.dimension_id,
+          region_dir_relpath: null,
+          pos: { x: live.x, y: live.y, z: live.z },
+          live: true,
+        },
+        live,
+      ),
+    )
+  }
+  return { ...data, players }
+}
+
+// Follows `player_positions` frames on the events WebSocket and patches the
+// cached player locations, so markers move without refetching (and without
+// re-running mcmap). Frames only arrive when live positions are enabled.
+export const useLivePlayerPositions = (
+  serverId: string | undefined,
+  enabled = true,
+) => {
+  const queryClient = useQueryClient()
+
+  useEffect(() => {
+    if (!serverId || !enabled) return
+
+    let ws: WebSocket | null = null
+    let reconnectTimer: ReturnType<typeof setTimeout> | null = null
+    let stopped = false
+    const url = `${getApiBaseUrl(true).replace(/\/$/, '')}/events`
+
+    const connect = () => {
+      ws = new WebSocket(url)
+      ws.onmessage = (event) => {
+        let frame: { type?: string }
+        try {
+          frame = JSON.parse(event.data)
+        } catch {
+          return
+        }
+        if (frame.type !== 'player_positions') return
+        const positions = frame as PlayerPositionsEvent
+        if (positions.server_id !== serverId) return
+        queryClient.setQueryData<PlayerLocationsResponse>(
+          queryKeys.worldRestore.playerLocations(serverId),
+          (data) => (data ? applyLivePositions(data, positions.positions) : data),
+        )
+      }
+      ws.onclose = () => {
+        if (stopped) return
+        reconnectTimer = setTimeout(connect, RECONNECT_DELAY_MS)
+      }
+    }
+    connect()
+
+    return () => {
+      stopped = true
+      if (reconnectTimer) clearTimeout(reconnectTimer)
+      if (ws) {
+        ws.onclose = null
+        ws.onmessage = null
+        ws.close(1000)
+      }
+    }
+  }, [serverId, enabled, queryClient])
+}
@@ -12,6 +12,7 @@ export type BackgroundTaskType =
   | 'world_restore'
   | 'chunk_prune_preview'
   | 'chunk_prune_apply'
+  | 'snapshot_backup'
 
 export interface BackgroundTask {
   taskId: string
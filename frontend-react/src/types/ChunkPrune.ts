@@ -45,6 +45,30 @@ export interface ChunkPrunePreviewGeometryResponse {
   dimensions: ChunkPruneGeometryDimension[]
 }
 
+export type ChunkPruneGeometryStreamEvent =
+  | {
+      event_type: 'geometry'
+      task_id: string
+      server_id: string
+      mode: ChunkPruneMode
+      threshold_seconds: number
+      threshold_ticks: number
+      simplify: number
+    }
+  | {
+      event_type: 'dimension'
+      region_dir_relpath: string
+      unit: ChunkPruneGeometryUnit
+      cell_count: number
+      shape_count: number
+    }
+  | {
+      event_type: 'shapes'
+      region_dir_relpath: string
+      shapes: GridShape[]
+    }
+  | { event_type: 'complete' }
+
 export interface ChunkPruneResultData {
   mode: ChunkPruneMode
   dry_run: boolean
@@ -60,4 +84,6 @@ export interface ChunkPruneResultData {
   claimed_chunks_protected?: number
   chunks_skipped_by_claims?: number
   regions_skipped_by_claims?: number
+  regions_rescanned?: number
+  chunks_dropped?: number
 }
@@ -1,7 +1,12 @@
 // Mirrors backend `app/player_locations/models.py`.
 
 export type PlayerIdKind = 'uuid' | 'name'
-export type PlayerStorageKind = 'playerdata' | 'players_data' | 'legacy_players'
+// `live` marks online players that have no saved player file yet.
+export type PlayerStorageKind =
+  | 'playerdata'
+  | 'players_data'
+  | 'legacy_players'
+  | 'live'
 export type PlayerSkipReason =
   | 'parse_error'
   | 'missing_pos'
@@ -32,6 +37,8 @@ export interface PlayerLocationEntry {
   dimension_id: string
   region_dir_relpath: string | null
   pos: PlayerLocationPosition
+  // Position comes from RCON polling rather than the saved player file.
+  live: boolean
 }
 
 export interface PlayerLocationSkippedFile {
@@ -46,3 +53,20 @@ export interface PlayerLocationsResponse {
   players: PlayerLocationEntry[]
   skipped: PlayerLocationSkippedFile[]
 }
+
+// `player_positions` frame on the `/events` WebSocket (backend
+// `app/events/models.py`): every online player's live position on a server.
+export interface EventPlayerPosition {
+  player: { name: string; uuid: string; player_db_id: number }
+  dimension_id: string
+  x: number
+  y: number
+  z: number
+}
+
+export interface PlayerPositionsEvent {
+  type: 'player_positions'
+  server_id: string
+  timestamp: string
+  positions: EventPlayerPosition[]
+}
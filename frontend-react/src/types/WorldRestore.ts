@@ -83,6 +83,21 @@ export interface ListEligibleSnapshotsResponse {
   snapshots: ResticSnapshot[]
 }
 
+// Live regions relative to a snapshot, per dimension. `added` regions exist
+// only live (a region restore deletes them), `removed` only in the snapshot.
+export interface DimensionRegionDiff {
+  region_dir_relpath: string
+  changed: [number, number][]
+  added: [number, number][]
+  removed: [number, number][]
+  unchanged: number
+}
+
+export interface RegionDiffResponse {
+  snapshot_id: string
+  dimensions: DimensionRegionDiff[]
+}
+
 export interface CreateSnapshotResponse {
   message: string
   snapshot: ResticSnapshotWithSummary
@@ -161,6 +176,8 @@ export interface PreviewRequest {
 export interface RestoreRequest {
   source_snapshot_id: string
   selection: RestorationSelection
+  // Drop REGIONS/CHUNKS regions identical to the snapshot before restoring.
+  only_differing?: boolean
 }
 
 // Detail shape of the 423 (locked) response. Surfaces who is currently
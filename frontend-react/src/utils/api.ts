@@ -247,6 +247,18 @@ export const queryKeys = {
       [...queryKeys.worldRestore.all, "player-locations", serverId] as const,
     eligible: (serverId: string, selection: unknown) =>
       [...queryKeys.worldRestore.all, "eligible", serverId, selection] as const,
+    regionDiff: (
+      serverId: string,
+      snapshotId: string,
+      regionDirRelpath: string | undefined,
+    ) =>
+      [
+        ...queryKeys.worldRestore.all,
+        "region-diff",
+        serverId,
+        snapshotId,
+        regionDirRelpath,
+      ] as const,
     history: (serverId: string) =>
       [...queryKeys.worldRestore.all, "history", serverId] as const,
     restoration: (serverId: string, id: string) =>